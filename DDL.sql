@@ -48,6 +48,8 @@ CREATE TABLE [USER] (
     Last_login DATETIME,
     IFlag BIT,
     Bio_text NVARCHAR(MAX),
+    Bio_text_hash VARCHAR(64) NULL, -- SHA-256 trong blob store khi nội dung dài (services.blobs)
+    Bio_text_size INT NULL,
     Year_of_experience INT CHECK (Year_of_experience >= 0),
     Average_rating DECIMAL(3,1) DEFAULT NULL CHECK (Average_rating >= 0.0 AND Average_rating <= 5.0),
     SFlag BIT,
@@ -105,6 +107,8 @@ CREATE TABLE COURSE (
     [Language] NVARCHAR(50) NOT NULL,
     Title NVARCHAR(200) NOT NULL,
     [Description] NVARCHAR(MAX),
+    Description_hash VARCHAR(64) NULL,
+    Description_size INT NULL,
     Enrollment_count INT DEFAULT 0 CHECK (Enrollment_count >= 0),
     CONSTRAINT chk_course_title_length CHECK (LEN(Title) >= 5)
 );
@@ -194,7 +198,7 @@ CREATE TABLE CERTIFICATE (
     StudentID VARCHAR(10) NOT NULL,
     Expiry_date DATE, -- NULL = no expiration
     Issue_date DATE NOT NULL DEFAULT CAST(GETDATE() AS DATE),
-    Certificate_number VARCHAR(50) NOT NULL,
+    Certificate_number VARCHAR(64) NOT NULL, -- ký HMAC, xem backend/app/core/signing.py
     PRIMARY KEY (CertificateID, CourseID, StudentID),
     CONSTRAINT FK_Certificate_Course FOREIGN KEY (CourseID) 
         REFERENCES COURSE(CourseID) ON DELETE NO ACTION ON UPDATE NO ACTION,
@@ -310,6 +314,8 @@ CREATE TABLE ASSIGNMENT (
     AssID VARCHAR(10) PRIMARY KEY,
     Deadline DATETIME NOT NULL DEFAULT GETDATE(),
     [Description] NVARCHAR(MAX),
+    Description_hash VARCHAR(64) NULL,
+    Description_size INT NULL,
     Title NVARCHAR(200) NOT NULL,
     ModuleID VARCHAR(10) NOT NULL,
     CONSTRAINT FK_Assignment_LessonRef FOREIGN KEY (AssID) 
@@ -374,6 +380,8 @@ CREATE TABLE ASSIGN_SUBMISSION (
     UserID VARCHAR(10),
     AssID VARCHAR(10),
     Sub_content NVARCHAR(MAX), -- MAY CHANGE TO LINK/ DIR
+    Sub_content_hash VARCHAR(64) NULL,
+    Sub_content_size INT NULL,
     Grade DECIMAL(5,2) CHECK (Grade >= 0 AND Grade <= 100),
     Sub_date DATETIME NOT NULL DEFAULT GETDATE(),
     PRIMARY KEY (SubID),
@@ -390,6 +398,8 @@ CREATE TABLE QUIZ_SUBMISSION (
     UserID VARCHAR(10),
     QuizID VARCHAR(10),
     Sub_content NVARCHAR(MAX), -- MAY CHANGE TO LINK/ DIR
+    Sub_content_hash VARCHAR(64) NULL,
+    Sub_content_size INT NULL,
     Grade DECIMAL(5,2) CHECK (Grade >= 0 AND Grade <= 100),
     Sub_date DATETIME NOT NULL DEFAULT GETDATE(),
     PRIMARY KEY (SubID),
@@ -414,6 +424,123 @@ CREATE TABLE TAKE (
 );
 GO
 
+-- ================================================
+-- 27. BẢNG REPLICA_HEARTBEAT (đo độ trễ của read replica)
+-- ================================================
+CREATE TABLE REPLICA_HEARTBEAT (
+    HeartbeatID INT PRIMARY KEY,
+    Beat_at DATETIME2 NOT NULL
+);
+GO
+
+-- ================================================
+-- 28. BẢNG OUTBOX_EVENT (transactional outbox cho domain event)
+-- ================================================
+CREATE TABLE OUTBOX_EVENT (
+    EventID VARCHAR(32) PRIMARY KEY,
+    Event_type VARCHAR(64) NOT NULL,
+    Payload NVARCHAR(MAX) NOT NULL,
+    Created_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+    Claimed_at DATETIME2 NULL,
+    Dispatched_at DATETIME2 NULL,
+    Attempts INT NOT NULL DEFAULT 0
+);
+GO
+
+-- ================================================
+-- 29. BẢNG JOB_LEASE (lease và lịch chạy của job định kỳ)
+-- ================================================
+CREATE TABLE JOB_LEASE (
+    JobName VARCHAR(64) PRIMARY KEY,
+    Owner VARCHAR(100) NULL,
+    Lease_until DATETIME2 NULL,
+    Next_run_at DATETIME2 NULL,
+    Watermark DATETIME2 NULL,
+    Last_started_at DATETIME2 NULL,
+    Last_finished_at DATETIME2 NULL,
+    Last_duration_ms INT NULL,
+    Last_status VARCHAR(20) NULL,
+    Last_error NVARCHAR(500) NULL,
+    Run_count INT NOT NULL DEFAULT 0
+);
+GO
+
+-- ================================================
+-- 30. BẢNG CERTIFICATE_REVOCATION (số chứng chỉ đã bị thu hồi)
+-- ================================================
+CREATE TABLE CERTIFICATE_REVOCATION (
+    Certificate_number VARCHAR(64) PRIMARY KEY,
+    CertificateID VARCHAR(10) NOT NULL,
+    Revoked_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+    Reason NVARCHAR(200) NULL
+);
+GO
+
+-- ================================================
+-- 31. BẢNG IDEMPOTENCY_KEY (kết quả checkout theo Idempotency-Key)
+-- ================================================
+CREATE TABLE IDEMPOTENCY_KEY (
+    UserID VARCHAR(10) NOT NULL,
+    Idempotency_key VARCHAR(64) NOT NULL,
+    Request_hash VARCHAR(64) NOT NULL,
+    Status_code INT NOT NULL,
+    Response NVARCHAR(MAX) NOT NULL,
+    Created_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+    Expires_at DATETIME2 NOT NULL,
+    CONSTRAINT PK_IdempotencyKey PRIMARY KEY (UserID, Idempotency_key),
+    CONSTRAINT FK_IdempotencyKey_User FOREIGN KEY (UserID)
+        REFERENCES [USER](UserID) ON DELETE CASCADE ON UPDATE CASCADE
+);
+GO
+
+-- ================================================
+-- 32. BẢNG GRADING_LEASE (lease của người chấm trên bài nộp chưa chấm)
+-- ================================================
+CREATE TABLE GRADING_LEASE (
+    SubID VARCHAR(10) NOT NULL,
+    Grader VARCHAR(10) NOT NULL,
+    Claim_token VARCHAR(32) NOT NULL,
+    Claimed_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+    Lease_until DATETIME2 NOT NULL,
+    CONSTRAINT PK_GradingLease PRIMARY KEY (SubID),
+    CONSTRAINT FK_GradingLease_Submission FOREIGN KEY (SubID)
+        REFERENCES ASSIGN_SUBMISSION(SubID) ON DELETE CASCADE ON UPDATE CASCADE
+);
+GO
+
+-- ================================================
+-- 33. BẢNG HTTP_CACHE_VERSION (version của trang catalog/course cho conditional GET)
+-- ================================================
+CREATE TABLE HTTP_CACHE_VERSION (
+    ResourceKey VARCHAR(100) PRIMARY KEY,
+    Version BIGINT NOT NULL DEFAULT 0,
+    Modified_at DATETIME2(0) NOT NULL DEFAULT SYSUTCDATETIME()
+);
+GO
+
+-- ================================================
+-- INDEX cho các truy vấn theo khóa ngoại (xem MIGRATION_ADD_INDEXES.sql)
+-- ================================================
+CREATE UNIQUE NONCLUSTERED INDEX IX_Enrollment_Student ON ENROLLMENT (StudentID, CourseID) INCLUDE ([Status], Enroll_date, Progress);
+CREATE NONCLUSTERED INDEX IX_Enrollment_Completed ON ENROLLMENT (CourseID, StudentID) WHERE [Status] = 'Completed';
+CREATE NONCLUSTERED INDEX IX_Payment_User_Date ON PAYMENT (UserID, Payment_date);
+CREATE NONCLUSTERED INDEX IX_Payment_Date ON PAYMENT (Payment_date) INCLUDE (Amount, UserID);
+CREATE NONCLUSTERED INDEX IX_Certificate_Number ON CERTIFICATE (Certificate_number);
+CREATE NONCLUSTERED INDEX IX_Module_Course ON [MODULE] (CourseID);
+CREATE NONCLUSTERED INDEX IX_Content_Module ON CONTENT (ModuleID);
+CREATE NONCLUSTERED INDEX IX_AssignSubmission_Ass_User ON ASSIGN_SUBMISSION (AssID, UserID, Sub_date) INCLUDE (Grade);
+CREATE NONCLUSTERED INDEX IX_AssignSubmission_Ungraded ON ASSIGN_SUBMISSION (Sub_date) INCLUDE (AssID, UserID) WHERE Grade IS NULL;
+CREATE NONCLUSTERED INDEX IX_QuizSubmission_Quiz_User_Date ON QUIZ_SUBMISSION (QuizID, UserID, Sub_date) INCLUDE (Grade);
+CREATE NONCLUSTERED INDEX IX_Assignment_Deadline ON ASSIGNMENT (Deadline) INCLUDE (ModuleID, Title);
+CREATE NONCLUSTERED INDEX IX_Quiz_Deadline ON QUIZ (Deadline) INCLUDE (ModuleID, Title);
+CREATE NONCLUSTERED INDEX IX_Certificate_Expiry ON CERTIFICATE (Expiry_date);
+CREATE UNIQUE NONCLUSTERED INDEX IX_Certificate_Course_Student ON CERTIFICATE (CourseID, StudentID);
+CREATE NONCLUSTERED INDEX IX_OutboxEvent_Pending ON OUTBOX_EVENT (Dispatched_at, Created_at);
+CREATE NONCLUSTERED INDEX IX_IdempotencyKey_Expiry ON IDEMPOTENCY_KEY (Expires_at);
+CREATE NONCLUSTERED INDEX IX_GradingLease_Grader ON GRADING_LEASE (Grader, Lease_until);
+CREATE NONCLUSTERED INDEX IX_GradingLease_Expiry ON GRADING_LEASE (Lease_until);
+GO
+
 -- ================================================
 -- TRIGGERS để tự động đồng bộ LESSON_REF và tạo ID với prefix
 -- ================================================
@@ -463,8 +590,8 @@ BEGIN
     SELECT AssID FROM inserted;
     
     -- Sau đó thêm vào ASSIGNMENT
-    INSERT INTO ASSIGNMENT (AssID, Deadline, [Description], Title, ModuleID)
-    SELECT AssID, Deadline, [Description], Title, ModuleID
+    INSERT INTO ASSIGNMENT (AssID, Deadline, [Description], Description_hash, Description_size, Title, ModuleID)
+    SELECT AssID, Deadline, [Description], Description_hash, Description_size, Title, ModuleID
     FROM inserted;
 END;
 GO
@@ -527,7 +654,7 @@ BEGIN
     SET NOCOUNT ON;
     
     INSERT INTO [USER] (UserID, User_name, Email, [Password], Full_name, City, Country, 
-                        Phone, Date_of_birth, Last_login, IFlag, Bio_text, 
+                        Phone, Date_of_birth, Last_login, IFlag, Bio_text, Bio_text_hash, Bio_text_size,
                         Year_of_experience, SFlag, Total_enrollments)
     SELECT 
         CASE 
@@ -538,7 +665,7 @@ BEGIN
             ELSE i.UserID
         END,
         i.User_name, i.Email, i.[Password], i.Full_name, i.City, i.Country,
-        i.Phone, i.Date_of_birth, i.Last_login, i.IFlag, i.Bio_text,
+        i.Phone, i.Date_of_birth, i.Last_login, i.IFlag, i.Bio_text, i.Bio_text_hash, i.Bio_text_size,
         i.Year_of_experience, i.SFlag, i.Total_enrollments
     FROM inserted i;
 END;
@@ -552,7 +679,7 @@ AS
 BEGIN
     SET NOCOUNT ON;
     
-    INSERT INTO COURSE (CourseID, Difficulty, [Language], Title, [Description])
+    INSERT INTO COURSE (CourseID, Difficulty, [Language], Title, [Description], Description_hash, Description_size)
     SELECT 
         CASE 
             WHEN i.CourseID IS NULL OR i.CourseID = '' THEN
@@ -561,7 +688,7 @@ BEGIN
                     ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS VARCHAR), 5)
             ELSE i.CourseID
         END,
-        i.Difficulty, i.[Language], i.Title, i.[Description]
+        i.Difficulty, i.[Language], i.Title, i.[Description], i.Description_hash, i.Description_size
     FROM inserted i;
 END;
 GO
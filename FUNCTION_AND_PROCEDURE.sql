@@ -43,6 +43,7 @@ GO
 -- ARGS:
 --      + Keyword(NVARCHAR(50))
 -- RETURNS: TABLE
+-- NOTE: descriptions moved to the blob store (MIGRATION_BLOB_STORE.sql) are NULL here and never match
 CREATE OR ALTER FUNCTION GetInstructorByKeyword (
     @Keyword NVARCHAR(50)
 )
@@ -121,6 +122,7 @@ GO
 
 
 -- 1. GetInstructorCourseDetails: QUERY thông tin các khóa học có Instructor quản lí, sắp xếp theo Độ khó giảm và title theo alphabet
+-- NOTE: superseded by GET /api/instructors/me/dashboard (services/dashboard_service.py), which returns the same courses with enrollment and grading figures
 -- ARGS:
 --      + InstructorID(VARCHAR(10)): ID của User
 CREATE OR ALTER PROCEDURE GetInstructorCourseDetails (
@@ -0,0 +1,84 @@
+-- ================================================
+-- MUDemy migration: secondary indexes for foreign-key access paths
+-- Safe to re-run: each index is only created when missing.
+-- ONLINE = ON keeps the tables readable and writable while the index builds
+-- (Enterprise/Developer, Azure SQL); other editions fall back to an offline build.
+-- ================================================
+USE MUDemy;
+GO
+
+DECLARE @with NVARCHAR(100) =
+    CASE WHEN CAST(SERVERPROPERTY('EngineEdition') AS INT) IN (3, 5, 8)
+         THEN N' WITH (ONLINE = ON, SORT_IN_TEMPDB = ON)'
+         ELSE N' WITH (SORT_IN_TEMPDB = ON)'
+    END;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Enrollment_Student' AND object_id = OBJECT_ID(N'dbo.ENROLLMENT'))
+    EXEC (N'CREATE NONCLUSTERED INDEX IX_Enrollment_Student ON dbo.ENROLLMENT (StudentID, CourseID) INCLUDE ([Status], Enroll_date, Progress)' + @with);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Payment_User_Date' AND object_id = OBJECT_ID(N'dbo.PAYMENT'))
+    EXEC (N'CREATE NONCLUSTERED INDEX IX_Payment_User_Date ON dbo.PAYMENT (UserID, Payment_date)' + @with);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Payment_Date' AND object_id = OBJECT_ID(N'dbo.PAYMENT'))
+    EXEC (N'CREATE NONCLUSTERED INDEX IX_Payment_Date ON dbo.PAYMENT (Payment_date) INCLUDE (Amount, UserID)' + @with);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Certificate_Number' AND object_id = OBJECT_ID(N'dbo.CERTIFICATE'))
+    EXEC (N'CREATE NONCLUSTERED INDEX IX_Certificate_Number ON dbo.CERTIFICATE (Certificate_number)' + @with);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Module_Course' AND object_id = OBJECT_ID(N'dbo.MODULE'))
+    EXEC (N'CREATE NONCLUSTERED INDEX IX_Module_Course ON dbo.[MODULE] (CourseID)' + @with);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Content_Module' AND object_id = OBJECT_ID(N'dbo.CONTENT'))
+    EXEC (N'CREATE NONCLUSTERED INDEX IX_Content_Module ON dbo.CONTENT (ModuleID)' + @with);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_AssignSubmission_Ass_User' AND object_id = OBJECT_ID(N'dbo.ASSIGN_SUBMISSION'))
+    EXEC (N'CREATE NONCLUSTERED INDEX IX_AssignSubmission_Ass_User ON dbo.ASSIGN_SUBMISSION (AssID, UserID, Sub_date) INCLUDE (Grade)' + @with);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_QuizSubmission_Quiz_User_Date' AND object_id = OBJECT_ID(N'dbo.QUIZ_SUBMISSION'))
+    EXEC (N'CREATE NONCLUSTERED INDEX IX_QuizSubmission_Quiz_User_Date ON dbo.QUIZ_SUBMISSION (QuizID, UserID, Sub_date) INCLUDE (Grade)' + @with);
+
+-- Time windows scanned by the scheduled deadline and certificate-expiry sweeps
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Assignment_Deadline' AND object_id = OBJECT_ID(N'dbo.ASSIGNMENT'))
+    EXEC (N'CREATE NONCLUSTERED INDEX IX_Assignment_Deadline ON dbo.ASSIGNMENT (Deadline) INCLUDE (ModuleID, Title)' + @with);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Quiz_Deadline' AND object_id = OBJECT_ID(N'dbo.QUIZ'))
+    EXEC (N'CREATE NONCLUSTERED INDEX IX_Quiz_Deadline ON dbo.QUIZ (Deadline) INCLUDE (ModuleID, Title)' + @with);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Certificate_Expiry' AND object_id = OBJECT_ID(N'dbo.CERTIFICATE'))
+    EXEC (N'CREATE NONCLUSTERED INDEX IX_Certificate_Expiry ON dbo.CERTIFICATE (Expiry_date)' + @with);
+
+-- Completed enrollments still waiting for a certificate (certificate issuance job)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Enrollment_Completed' AND object_id = OBJECT_ID(N'dbo.ENROLLMENT'))
+    EXEC (N'CREATE NONCLUSTERED INDEX IX_Enrollment_Completed ON dbo.ENROLLMENT (CourseID, StudentID) WHERE [Status] = ''Completed''' + @with);
+
+-- Grading queue: ungraded assignment submissions oldest first
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_AssignSubmission_Ungraded' AND object_id = OBJECT_ID(N'dbo.ASSIGN_SUBMISSION'))
+    EXEC (N'CREATE NONCLUSTERED INDEX IX_AssignSubmission_Ungraded ON dbo.ASSIGN_SUBMISSION (Sub_date) INCLUDE (AssID, UserID) WHERE Grade IS NULL' + @with);
+GO
+
+-- Fresh statistics so the new indexes are costed correctly right away
+UPDATE STATISTICS dbo.ENROLLMENT;
+UPDATE STATISTICS dbo.PAYMENT;
+UPDATE STATISTICS dbo.CERTIFICATE;
+UPDATE STATISTICS dbo.[MODULE];
+UPDATE STATISTICS dbo.CONTENT;
+UPDATE STATISTICS dbo.ASSIGN_SUBMISSION;
+UPDATE STATISTICS dbo.QUIZ_SUBMISSION;
+UPDATE STATISTICS dbo.ASSIGNMENT;
+UPDATE STATISTICS dbo.QUIZ;
+GO
+
+-- Rollback:
+-- DROP INDEX IF EXISTS IX_Enrollment_Student ON dbo.ENROLLMENT;
+-- DROP INDEX IF EXISTS IX_Payment_User_Date ON dbo.PAYMENT;
+-- DROP INDEX IF EXISTS IX_Payment_Date ON dbo.PAYMENT;
+-- DROP INDEX IF EXISTS IX_Certificate_Number ON dbo.CERTIFICATE;
+-- DROP INDEX IF EXISTS IX_Module_Course ON dbo.[MODULE];
+-- DROP INDEX IF EXISTS IX_Content_Module ON dbo.CONTENT;
+-- DROP INDEX IF EXISTS IX_AssignSubmission_Ass_User ON dbo.ASSIGN_SUBMISSION;
+-- DROP INDEX IF EXISTS IX_QuizSubmission_Quiz_User_Date ON dbo.QUIZ_SUBMISSION;
+-- DROP INDEX IF EXISTS IX_Assignment_Deadline ON dbo.ASSIGNMENT;
+-- DROP INDEX IF EXISTS IX_Quiz_Deadline ON dbo.QUIZ;
+-- DROP INDEX IF EXISTS IX_Certificate_Expiry ON dbo.CERTIFICATE;
+-- DROP INDEX IF EXISTS IX_Enrollment_Completed ON dbo.ENROLLMENT;
+-- DROP INDEX IF EXISTS IX_AssignSubmission_Ungraded ON dbo.ASSIGN_SUBMISSION;
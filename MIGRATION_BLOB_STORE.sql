@@ -0,0 +1,100 @@
+-- ================================================
+-- MUDemy migration: blob store for large text columns
+-- Adds <column>_hash / <column>_size next to USER.Bio_text, COURSE.Description,
+-- ASSIGNMENT.Description and the two Sub_content columns, and passes them
+-- through the INSTEAD OF INSERT triggers. Safe to re-run.
+-- T-SQL cannot read the blob store: a moved body is NULL in its row. So
+-- dbo.GetInstructorByKeyword still matches Qualification and COURSE.Title,
+-- but stops matching COURSE.Description text longer than BLOB_INLINE_MAX.
+-- Raise BLOB_INLINE_MAX before migrating if that search has to cover full
+-- descriptions.
+-- The backend writes bodies longer than BLOB_INLINE_MAX to BLOB_DIR from then
+-- on; existing rows are moved afterwards, in batches, from backend/ with:
+--     python -m app.migrate_blobs --batch-size 500
+-- ================================================
+USE MUDemy;
+GO
+
+IF COL_LENGTH(N'dbo.[USER]', N'Bio_text_hash') IS NULL
+    ALTER TABLE dbo.[USER] ADD Bio_text_hash VARCHAR(64) NULL, Bio_text_size INT NULL;
+IF COL_LENGTH(N'dbo.COURSE', N'Description_hash') IS NULL
+    ALTER TABLE dbo.COURSE ADD Description_hash VARCHAR(64) NULL, Description_size INT NULL;
+IF COL_LENGTH(N'dbo.ASSIGNMENT', N'Description_hash') IS NULL
+    ALTER TABLE dbo.ASSIGNMENT ADD Description_hash VARCHAR(64) NULL, Description_size INT NULL;
+IF COL_LENGTH(N'dbo.ASSIGN_SUBMISSION', N'Sub_content_hash') IS NULL
+    ALTER TABLE dbo.ASSIGN_SUBMISSION ADD Sub_content_hash VARCHAR(64) NULL, Sub_content_size INT NULL;
+IF COL_LENGTH(N'dbo.QUIZ_SUBMISSION', N'Sub_content_hash') IS NULL
+    ALTER TABLE dbo.QUIZ_SUBMISSION ADD Sub_content_hash VARCHAR(64) NULL, Sub_content_size INT NULL;
+GO
+
+-- The INSTEAD OF INSERT triggers list their columns; without these the new
+-- columns would be dropped on insert (same bodies as DDL.sql)
+CREATE OR ALTER TRIGGER trg_ass_insert_lesson_ref
+ON ASSIGNMENT
+INSTEAD OF INSERT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    INSERT INTO LESSON_REF (LessonID)
+    SELECT AssID FROM inserted;
+
+    INSERT INTO ASSIGNMENT (AssID, Deadline, [Description], Description_hash, Description_size, Title, ModuleID)
+    SELECT AssID, Deadline, [Description], Description_hash, Description_size, Title, ModuleID
+    FROM inserted;
+END;
+GO
+
+CREATE OR ALTER TRIGGER trg_user_id_auto_increment
+ON [USER]
+INSTEAD OF INSERT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    INSERT INTO [USER] (UserID, User_name, Email, [Password], Full_name, City, Country,
+                        Phone, Date_of_birth, Last_login, IFlag, Bio_text, Bio_text_hash, Bio_text_size,
+                        Year_of_experience, SFlag, Total_enrollments)
+    SELECT
+        CASE
+            WHEN i.UserID IS NULL OR i.UserID = '' THEN
+                'USR' + RIGHT('00000' + CAST(
+                    ISNULL((SELECT MAX(CAST(SUBSTRING(UserID, 4, 5) AS INT)) FROM [USER]), 0) +
+                    ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS VARCHAR), 5)
+            ELSE i.UserID
+        END,
+        i.User_name, i.Email, i.[Password], i.Full_name, i.City, i.Country,
+        i.Phone, i.Date_of_birth, i.Last_login, i.IFlag, i.Bio_text, i.Bio_text_hash, i.Bio_text_size,
+        i.Year_of_experience, i.SFlag, i.Total_enrollments
+    FROM inserted i;
+END;
+GO
+
+CREATE OR ALTER TRIGGER trg_course_id_auto_increment
+ON COURSE
+INSTEAD OF INSERT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    INSERT INTO COURSE (CourseID, Difficulty, [Language], Title, [Description], Description_hash, Description_size)
+    SELECT
+        CASE
+            WHEN i.CourseID IS NULL OR i.CourseID = '' THEN
+                'CRS' + RIGHT('00000' + CAST(
+                    ISNULL((SELECT MAX(CAST(SUBSTRING(CourseID, 4, 5) AS INT)) FROM COURSE), 0) +
+                    ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS VARCHAR), 5)
+            ELSE i.CourseID
+        END,
+        i.Difficulty, i.[Language], i.Title, i.[Description], i.Description_hash, i.Description_size
+    FROM inserted i;
+END;
+GO
+
+-- Rollback (only after moving bodies back inline; the blob files stay in BLOB_DIR):
+-- re-run the three triggers from the previous DDL.sql, then
+-- ALTER TABLE dbo.[USER] DROP COLUMN Bio_text_hash, Bio_text_size;
+-- ALTER TABLE dbo.COURSE DROP COLUMN Description_hash, Description_size;
+-- ALTER TABLE dbo.ASSIGNMENT DROP COLUMN Description_hash, Description_size;
+-- ALTER TABLE dbo.ASSIGN_SUBMISSION DROP COLUMN Sub_content_hash, Sub_content_size;
+-- ALTER TABLE dbo.QUIZ_SUBMISSION DROP COLUMN Sub_content_hash, Sub_content_size;
@@ -0,0 +1,57 @@
+-- ================================================
+-- MUDemy migration: single-request checkout (POST /api/checkout)
+-- * IDEMPOTENCY_KEY stores the first response per (user, Idempotency-Key)
+--   so that a retried checkout is answered without charging again.
+-- * IX_Enrollment_Student becomes UNIQUE on (StudentID, CourseID): two
+--   checkouts for the same student and course can both pass the "already
+--   enrolled" check, and only the index stops the second one from committing.
+-- The script stops before touching the index while duplicate enrollments
+-- exist; list them with
+--     SELECT StudentID, CourseID, COUNT(*) FROM dbo.ENROLLMENT
+--     GROUP BY StudentID, CourseID HAVING COUNT(*) > 1;
+-- and remove (or refund) the extra rows first. Safe to re-run.
+-- ================================================
+USE MUDemy;
+GO
+
+IF OBJECT_ID(N'dbo.IDEMPOTENCY_KEY', N'U') IS NULL
+    CREATE TABLE dbo.IDEMPOTENCY_KEY (
+        UserID VARCHAR(10) NOT NULL,
+        Idempotency_key VARCHAR(64) NOT NULL,
+        Request_hash VARCHAR(64) NOT NULL,
+        Status_code INT NOT NULL,
+        Response NVARCHAR(MAX) NOT NULL,
+        Created_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        Expires_at DATETIME2 NOT NULL,
+        CONSTRAINT PK_IdempotencyKey PRIMARY KEY (UserID, Idempotency_key),
+        CONSTRAINT FK_IdempotencyKey_User FOREIGN KEY (UserID)
+            REFERENCES dbo.[USER](UserID) ON DELETE CASCADE ON UPDATE CASCADE
+    );
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = N'IX_IdempotencyKey_Expiry' AND object_id = OBJECT_ID(N'dbo.IDEMPOTENCY_KEY'))
+    CREATE NONCLUSTERED INDEX IX_IdempotencyKey_Expiry ON dbo.IDEMPOTENCY_KEY (Expires_at);
+GO
+
+IF EXISTS (SELECT 1 FROM dbo.ENROLLMENT GROUP BY StudentID, CourseID HAVING COUNT(*) > 1)
+    THROW 50001, N'ENROLLMENT has duplicate (StudentID, CourseID) rows; resolve them before making IX_Enrollment_Student unique.', 1;
+GO
+
+DECLARE @with NVARCHAR(100) =
+    CASE WHEN CAST(SERVERPROPERTY('EngineEdition') AS INT) IN (3, 5, 8)
+         THEN N' WITH (ONLINE = ON, SORT_IN_TEMPDB = ON'
+         ELSE N' WITH (SORT_IN_TEMPDB = ON'
+    END;
+
+-- DROP_EXISTING swaps the non-unique index from MIGRATION_ADD_INDEXES.sql in one step
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Enrollment_Student' AND object_id = OBJECT_ID(N'dbo.ENROLLMENT'))
+    EXEC (N'CREATE UNIQUE NONCLUSTERED INDEX IX_Enrollment_Student ON dbo.ENROLLMENT (StudentID, CourseID) INCLUDE ([Status], Enroll_date, Progress)' + @with + N')')
+ELSE IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Enrollment_Student' AND object_id = OBJECT_ID(N'dbo.ENROLLMENT') AND is_unique = 0)
+    EXEC (N'CREATE UNIQUE NONCLUSTERED INDEX IX_Enrollment_Student ON dbo.ENROLLMENT (StudentID, CourseID) INCLUDE ([Status], Enroll_date, Progress)' + @with + N', DROP_EXISTING = ON)');
+GO
+
+-- Rollback (the API then relies on its "already enrolled" check alone):
+-- CREATE NONCLUSTERED INDEX IX_Enrollment_Student ON dbo.ENROLLMENT (StudentID, CourseID)
+--     INCLUDE ([Status], Enroll_date, Progress) WITH (DROP_EXISTING = ON);
+-- DROP TABLE IF EXISTS dbo.IDEMPOTENCY_KEY;
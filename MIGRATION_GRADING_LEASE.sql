@@ -0,0 +1,34 @@
+-- ================================================
+-- MUDemy migration: grader leases on ungraded submissions
+-- Adds GRADING_LEASE, which the grading queue uses so that two instructors
+-- do not claim the same submission, plus the indexes for "my claims" and
+-- for expiring stale leases. Run before deploying the grading queue.
+-- Safe to re-run.
+-- ================================================
+USE MUDemy;
+GO
+
+IF OBJECT_ID(N'dbo.GRADING_LEASE', N'U') IS NULL
+    CREATE TABLE dbo.GRADING_LEASE (
+        SubID VARCHAR(10) NOT NULL,
+        Grader VARCHAR(10) NOT NULL,
+        Claim_token VARCHAR(32) NOT NULL,
+        Claimed_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        Lease_until DATETIME2 NOT NULL,
+        CONSTRAINT PK_GradingLease PRIMARY KEY (SubID),
+        CONSTRAINT FK_GradingLease_Submission FOREIGN KEY (SubID)
+            REFERENCES dbo.ASSIGN_SUBMISSION(SubID) ON DELETE CASCADE ON UPDATE CASCADE
+    );
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = N'IX_GradingLease_Grader' AND object_id = OBJECT_ID(N'dbo.GRADING_LEASE'))
+    CREATE NONCLUSTERED INDEX IX_GradingLease_Grader ON dbo.GRADING_LEASE (Grader, Lease_until);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = N'IX_GradingLease_Expiry' AND object_id = OBJECT_ID(N'dbo.GRADING_LEASE'))
+    CREATE NONCLUSTERED INDEX IX_GradingLease_Expiry ON dbo.GRADING_LEASE (Lease_until);
+GO
+
+-- Rollback (leases are transient; dropping them only releases open claims):
+-- DROP TABLE IF EXISTS dbo.GRADING_LEASE;
@@ -0,0 +1,24 @@
+-- ================================================
+-- MUDemy migration: shared version stamps for conditional GET
+-- Adds HTTP_CACHE_VERSION, which the API reads (one primary-key lookup) to
+-- answer If-None-Match / If-Modified-Since on the catalog and course pages
+-- and bumps after every course, module, content, category or prerequisite
+-- write. Safe to re-run.
+-- Writes made outside the API do not bump a stamp. After editing those
+-- tables by hand, bump the affected keys too, e.g.
+--     UPDATE dbo.HTTP_CACHE_VERSION SET Version = Version + 1, Modified_at = SYSUTCDATETIME()
+--     WHERE ResourceKey IN ('catalog', 'course:CRS00001');
+-- ================================================
+USE MUDemy;
+GO
+
+IF OBJECT_ID(N'dbo.HTTP_CACHE_VERSION', N'U') IS NULL
+    CREATE TABLE dbo.HTTP_CACHE_VERSION (
+        ResourceKey VARCHAR(100) PRIMARY KEY,
+        Version BIGINT NOT NULL DEFAULT 0,
+        Modified_at DATETIME2(0) NOT NULL DEFAULT SYSUTCDATETIME()
+    );
+GO
+
+-- Rollback:
+-- DROP TABLE IF EXISTS dbo.HTTP_CACHE_VERSION;
@@ -0,0 +1,28 @@
+-- ================================================
+-- MUDemy migration: leases and schedule for periodic jobs
+-- Adds JOB_LEASE, one row per scheduled job, so that only one API worker
+-- runs a leased job at a time and the next run time, watermark and last
+-- outcome survive restarts. Rows are created by the scheduler on first run.
+-- Safe to re-run.
+-- ================================================
+USE MUDemy;
+GO
+
+IF OBJECT_ID(N'dbo.JOB_LEASE', N'U') IS NULL
+    CREATE TABLE dbo.JOB_LEASE (
+        JobName VARCHAR(64) PRIMARY KEY,
+        Owner VARCHAR(100) NULL,
+        Lease_until DATETIME2 NULL,
+        Next_run_at DATETIME2 NULL,
+        Watermark DATETIME2 NULL,
+        Last_started_at DATETIME2 NULL,
+        Last_finished_at DATETIME2 NULL,
+        Last_duration_ms INT NULL,
+        Last_status VARCHAR(20) NULL,
+        Last_error NVARCHAR(500) NULL,
+        Run_count INT NOT NULL DEFAULT 0
+    );
+GO
+
+-- Rollback (set SCHEDULER_ENABLED=false first):
+-- DROP TABLE IF EXISTS dbo.JOB_LEASE;
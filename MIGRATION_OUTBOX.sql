@@ -0,0 +1,29 @@
+-- ================================================
+-- MUDemy migration: transactional outbox for domain events
+-- Adds OUTBOX_EVENT, which services write in the same transaction as the
+-- change that raised the event, and the index the relay job uses to find
+-- undelivered rows. Run before deploying the API that emits events.
+-- Safe to re-run.
+-- ================================================
+USE MUDemy;
+GO
+
+IF OBJECT_ID(N'dbo.OUTBOX_EVENT', N'U') IS NULL
+    CREATE TABLE dbo.OUTBOX_EVENT (
+        EventID VARCHAR(32) PRIMARY KEY,
+        Event_type VARCHAR(64) NOT NULL,
+        Payload NVARCHAR(MAX) NOT NULL,
+        Created_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        Claimed_at DATETIME2 NULL,
+        Dispatched_at DATETIME2 NULL,
+        Attempts INT NOT NULL DEFAULT 0
+    );
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = N'IX_OutboxEvent_Pending' AND object_id = OBJECT_ID(N'dbo.OUTBOX_EVENT'))
+    CREATE NONCLUSTERED INDEX IX_OutboxEvent_Pending ON dbo.OUTBOX_EVENT (Dispatched_at, Created_at);
+GO
+
+-- Rollback (only once no API instance emits events):
+-- DROP TABLE IF EXISTS dbo.OUTBOX_EVENT;
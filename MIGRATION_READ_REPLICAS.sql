@@ -0,0 +1,19 @@
+-- ================================================
+-- MUDemy migration: heartbeat table for read-replica lag checks
+-- Adds REPLICA_HEARTBEAT. One API worker updates its single row on the
+-- primary every REPLICA_CHECK_INTERVAL, and every worker reads it back from
+-- each replica to measure lag. Run on the primary; the table reaches the
+-- replicas through replication. Safe to re-run.
+-- ================================================
+USE MUDemy;
+GO
+
+IF OBJECT_ID(N'dbo.REPLICA_HEARTBEAT', N'U') IS NULL
+    CREATE TABLE dbo.REPLICA_HEARTBEAT (
+        HeartbeatID INT PRIMARY KEY,
+        Beat_at DATETIME2 NOT NULL
+    );
+GO
+
+-- Rollback (set DATABASE_REPLICA_URLS to empty first):
+-- DROP TABLE IF EXISTS dbo.REPLICA_HEARTBEAT;
@@ -0,0 +1,34 @@
+-- ================================================
+-- MUDemy migration: signed certificate numbers and revocations
+-- Widens CERTIFICATE.Certificate_number for HMAC-signed numbers and adds the
+-- revocation table read by /api/certificates/verify. Safe to re-run.
+-- Numbers issued before this migration keep working: the verify endpoint
+-- looks unsigned numbers up in CERTIFICATE instead.
+-- ================================================
+USE MUDemy;
+GO
+
+IF COL_LENGTH(N'dbo.CERTIFICATE', N'Certificate_number') < 64
+BEGIN
+    -- The index depends on the column, so it is rebuilt around the ALTER
+    IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Certificate_Number' AND object_id = OBJECT_ID(N'dbo.CERTIFICATE'))
+        DROP INDEX IX_Certificate_Number ON dbo.CERTIFICATE;
+    ALTER TABLE dbo.CERTIFICATE ALTER COLUMN Certificate_number VARCHAR(64) NOT NULL;
+    CREATE NONCLUSTERED INDEX IX_Certificate_Number ON dbo.CERTIFICATE (Certificate_number);
+END
+GO
+
+IF OBJECT_ID(N'dbo.CERTIFICATE_REVOCATION', N'U') IS NULL
+    CREATE TABLE dbo.CERTIFICATE_REVOCATION (
+        Certificate_number VARCHAR(64) PRIMARY KEY,
+        CertificateID VARCHAR(10) NOT NULL,
+        Revoked_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        Reason NVARCHAR(200) NULL
+    );
+GO
+
+-- Rollback (only once no signed number is longer than 50 characters):
+-- DROP TABLE IF EXISTS dbo.CERTIFICATE_REVOCATION;
+-- DROP INDEX IF EXISTS IX_Certificate_Number ON dbo.CERTIFICATE;
+-- ALTER TABLE dbo.CERTIFICATE ALTER COLUMN Certificate_number VARCHAR(50) NOT NULL;
+-- CREATE NONCLUSTERED INDEX IX_Certificate_Number ON dbo.CERTIFICATE (Certificate_number);
@@ -0,0 +1,29 @@
+-- ================================================
+-- MUDemy migration: one certificate per student and course
+-- The CERTIFICATE primary key includes CertificateID, so it does not stop two
+-- certificate issuance runs (or an instructor and the job) from issuing the
+-- same (CourseID, StudentID) twice. IX_Certificate_Course_Student does.
+-- The script stops while duplicates exist; list them with
+--     SELECT CourseID, StudentID, COUNT(*) FROM dbo.CERTIFICATE
+--     GROUP BY CourseID, StudentID HAVING COUNT(*) > 1;
+-- and revoke and delete the extra certificates first. Safe to re-run.
+-- ================================================
+USE MUDemy;
+GO
+
+IF EXISTS (SELECT 1 FROM dbo.CERTIFICATE GROUP BY CourseID, StudentID HAVING COUNT(*) > 1)
+    THROW 50001, N'CERTIFICATE has duplicate (CourseID, StudentID) rows; resolve them before adding IX_Certificate_Course_Student.', 1;
+GO
+
+DECLARE @with NVARCHAR(100) =
+    CASE WHEN CAST(SERVERPROPERTY('EngineEdition') AS INT) IN (3, 5, 8)
+         THEN N' WITH (ONLINE = ON, SORT_IN_TEMPDB = ON)'
+         ELSE N' WITH (SORT_IN_TEMPDB = ON)'
+    END;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Certificate_Course_Student' AND object_id = OBJECT_ID(N'dbo.CERTIFICATE'))
+    EXEC (N'CREATE UNIQUE NONCLUSTERED INDEX IX_Certificate_Course_Student ON dbo.CERTIFICATE (CourseID, StudentID)' + @with);
+GO
+
+-- Rollback:
+-- DROP INDEX IF EXISTS IX_Certificate_Course_Student ON dbo.CERTIFICATE;
@@ -58,6 +58,9 @@ AS
 BEGIN
     SET NOCOUNT ON;
 
+    -- Chấm điểm (UPDATE chỉ đổi Grade) không cần kiểm tra lại Deadline
+    IF NOT UPDATE(Sub_date) RETURN;
+
     -- Kiểm tra ngày nộp (Sub_date) so với Deadline trong bảng ASSIGNMENT
     IF EXISTS (
         SELECT 1
@@ -84,6 +87,9 @@ AS
 BEGIN
     SET NOCOUNT ON;
 
+    -- Chấm điểm (UPDATE chỉ đổi Grade) không cần kiểm tra lại Deadline
+    IF NOT UPDATE(Sub_date) RETURN;
+
     -- Kiểm tra ngày nộp (Sub_date) so với Deadline trong bảng QUIZ
     IF EXISTS (
         SELECT 1
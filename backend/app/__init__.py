@@ -1,13 +1,46 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from .api import *
+from .core import config, get_logger
+from .core.admission import AdmissionMiddleware, controller
+from .core.compression import CompressionMiddleware
+from .core.health import InFlightMiddleware
+from .core.ratelimit import RateLimitMiddleware, limiter
+from .core.responses import FastJSONResponse
+from .models import ReadYourWritesMiddleware, get_engine, replicas
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Built per worker at startup rather than at import, so a preloading master never owns a pool
+    get_engine()
+    import anyio.to_thread
+    # Admission control hands out THREADPOOL_SIZE slots; the pool running sync endpoints must match
+    anyio.to_thread.current_default_thread_limiter().total_tokens = config.THREADPOOL_SIZE
+    from .core.events import bus
+    from .services import outbox, scheduler
+    outbox.start()   # also picks up events a dead worker left undelivered
+    if config.SCHEDULER_ENABLED:
+        scheduler.start()
+    elif replicas.configured:
+        get_logger("APP").warning("SCHEDULER_ENABLED is off, so replica lag is never measured; reads stay on the primary")
+    yield
+    scheduler.stop()
+    bus.close()
+    outbox.stop()
 
 
 def create_app() -> FastAPI:
     """App factory to create FastAPI instance."""
+    from .api import (routes_admin, routes_assessment, routes_course, routes_enrollment, routes_login,
+                      routes_resource, routes_user, routes_utils)
+
     app = FastAPI(
         title="Mudemy",
         description="Backend service for mudemy.",
-        version="1.0.0"
+        version="1.0.0",
+        default_response_class=FastJSONResponse,
+        lifespan=lifespan,
     )
 
     app.include_router(routes_utils.router, tags=["Utils"])
@@ -19,5 +52,14 @@ def create_app() -> FastAPI:
     app.include_router(routes_assessment.router, prefix="/api", tags=["Assessment"])
     app.include_router(routes_enrollment.router, prefix="/api", tags=["Enrollment"])
     app.include_router(routes_resource.router, prefix="/api", tags=["Resource"])
+    app.include_router(routes_admin.router, prefix="/api/admin", tags=["Admin"])
+
+    app.add_middleware(ReadYourWritesMiddleware)
+    if config.ADMISSION_ENABLED:
+        app.add_middleware(AdmissionMiddleware, controller=controller)
+    if config.RATE_LIMIT_ENABLED:
+        app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    app.add_middleware(InFlightMiddleware)
+    app.add_middleware(CompressionMiddleware)
     
     return app
\ No newline at end of file
@@ -269,6 +269,60 @@ const API_DOCS = [
       ]
     }
   },
+  {
+    group: "User",
+    name: "Get My Instructor Dashboard",
+    method: "GET",
+    path: "/api/instructors/me/dashboard",
+    input: {},
+    note: "Instructors only. Replaces /instructors/{id}/courses + /courses/id/{id} + enrollments per course; cached per instructor and refreshed on enrollments, submissions and grading in their courses",
+    output: {
+      status: "success",
+      courses: [
+        {
+          CourseID: "CRS00001",
+          Title: "Intro to SQL",
+          Difficulty: "Beginner",
+          Language: "Vietnamese",
+          Description: "...",
+          Enrollment_count: 42,
+          average_progress: 37.5,
+          completed: 6,
+          average_grade: 7.85,
+          ungraded: 3
+        }
+      ],
+      assessments: [
+        {
+          kind: "assignment",
+          lesson_id: "LES00010",
+          title: "Normalization exercise",
+          deadline: "2025-11-30T23:59:00",
+          module_id: "MOD00002",
+          course_id: "CRS00001",
+          submissions: 12,
+          graded: 9,
+          ungraded: 3,
+          average_grade: 7.85
+        },
+        // ...most ungraded first
+      ],
+      recent_activity: [
+        {
+          kind: "assignment_submission",   // or "quiz_submission", "enrollment"
+          ref_id: "SUB00123",
+          lesson_id: "LES00010",
+          title: "Normalization exercise",
+          course_id: "CRS00001",
+          user_id: "USR00013",
+          user_name: "Nguyễn Văn B",
+          at: "2025-11-23T07:58:00"
+        }
+      ],
+      totals: { courses: 1, enrollments: 42, ungraded: 3 },
+      generated_at: "2025-11-23T08:00:00"
+    }
+  },
   {
     group: "User",
     name: "List Students",
@@ -531,6 +585,23 @@ const API_DOCS = [
       enrollment_id: "ENR001",
     },
   },
+  {
+    group: "Enrollment",
+    name: "Checkout (Pay and Enroll)",
+    method: "POST",
+    path: "/api/checkout",
+    input: {
+      "CourseID": "CRS00001",
+      "Amount": 199000,
+      "Payment_method": "Credit Card"
+    },
+    note: "Creates the payment and the enrollment in one transaction. Send a unique Idempotency-Key header per purchase; retries with the same key return the first response (with Idempotent-Replayed: true) instead of paying again. 409 if already enrolled, 422 if the key was used for a different body",
+    output: {
+      status: "created",
+      payment_id: "PAY001",
+      enrollment_id: "ENR001",
+    },
+  },
   {
     group: "Enrollment",
     name: "Get My Enrollments",
@@ -553,6 +624,52 @@ const API_DOCS = [
       ],
     },
   },
+  {
+    group: "Enrollment",
+    name: "Get My Dashboard",
+    method: "GET",
+    path: "/api/me/dashboard",
+    input: {},
+    note: "Students only. Replaces /enrollments/me + /courses/{id}/progress per course + /enrollments/me/stats; cached per user and refreshed when lessons are taken, enrollments change or work is submitted",
+    output: {
+      status: "success",
+      enrollments: [
+        {
+          id: "CRS00001",
+          enrollment_id: "ENR001",
+          title: "Intro to SQL",
+          description: "...",
+          instructor: "Nguyen Van A",
+          status: "Active",
+          enroll_date: "2025-11-22T07:04:07",
+          progress: 50.0,
+          lessons: []
+        },
+        // ...more enrollments
+      ],
+      stats: {
+        total_enrollments: 2,
+        active: 1,
+        completed: 1,
+        dropped: 0,
+        suspended: 0,
+        average_progress: 50.0
+      },
+      deadlines: [
+        {
+          kind: "assignment",
+          lesson_id: "LES00010",
+          title: "Normalization exercise",
+          deadline: "2025-11-30T23:59:00",
+          module_id: "MOD00002",
+          course_id: "CRS00001",
+          submitted: false
+        },
+        // ...soonest first
+      ],
+      generated_at: "2025-11-23T08:00:00"
+    }
+  },
   {
     group: "Enrollment",
     name: "Get Enrollment by ID",
@@ -742,6 +859,153 @@ const API_DOCS = [
       grade: 9.5
     }
   },
+  {
+    group: "Assessment",
+    name: "Stream Submission Content",
+    method: "GET",
+    path: "/api/submissions/assignment/SUB001/content",
+    input: {},
+    note: "Also /api/submissions/quiz/{sub_id}/content. Instructors, or the student who submitted. text/plain, streamed from the blob store when the body is longer than BLOB_INLINE_MAX; X-Content-Size gives its size in bytes then",
+    output: "https://github.com/student/cafe-app"
+  },
+  {
+    group: "Assessment",
+    name: "Get Grading Queue",
+    method: "GET",
+    path: "/api/grading/queue?limit=100",
+    input: {},
+    note: "Instructors only. Oldest ungraded assignment submissions across all courses they teach; Sub_content is not included",
+    output: {
+      status: "success",
+      ungraded: 68,
+      leased: 5,
+      available: 63,
+      items: [
+        {
+          SubID: "SUB001",
+          AssID: "ASS001",
+          title: "Build a cafe app",
+          CourseID: "CRS001",
+          UserID: "USR010",
+          Sub_date: "2025-11-14T09:00:00",
+          claimed_by: "USR002",
+          lease_until: "2025-11-20T10:15:00"
+        }
+      ]
+    }
+  },
+  {
+    group: "Assessment",
+    name: "Claim Grading Work",
+    method: "POST",
+    path: "/api/grading/claim",
+    input: {
+      "count": 10
+    },
+    note: "Leases up to count (max GRADING_CLAIM_MAX) unleased submissions for GRADING_LEASE_SECONDS; other graders cannot claim them meanwhile",
+    output: {
+      status: "success",
+      count: 1,
+      submissions: [
+        {
+          SubID: "SUB002",
+          AssID: "ASS001",
+          title: "Build a cafe app",
+          CourseID: "CRS001",
+          UserID: "USR011",
+          Sub_date: "2025-11-14T10:00:00",
+          claimed_by: "USR002",
+          lease_until: "2025-11-20T10:15:00"
+        }
+      ]
+    }
+  },
+  {
+    group: "Assessment",
+    name: "Renew Grading Leases",
+    method: "POST",
+    path: "/api/grading/renew",
+    input: {
+      "SubIDs": ["SUB002"]
+    },
+    output: {
+      status: "success",
+      renewed: 1
+    }
+  },
+  {
+    group: "Assessment",
+    name: "Release Grading Leases",
+    method: "POST",
+    path: "/api/grading/release",
+    input: {
+      "SubIDs": ["SUB002"]
+    },
+    output: {
+      status: "success",
+      released: 1
+    }
+  },
+  {
+    group: "Assessment",
+    name: "Open Queued Submission",
+    method: "GET",
+    path: "/api/grading/submissions/SUB002",
+    input: {},
+    output: {
+      status: "success",
+      submission: {
+        SubID: "SUB002",
+        AssID: "ASS001",
+        CourseID: "CRS001",
+        UserID: "USR011",
+        Sub_date: "2025-11-14T10:00:00",
+        Sub_content: "https://github.com/student/cafe-app",
+        Grade: null,
+        claimed_by: "USR002",
+        lease_until: "2025-11-20T10:15:00"
+      }
+    }
+  },
+  {
+    group: "Assessment",
+    name: "Grade Queued Submission",
+    method: "PUT",
+    path: "/api/grading/submissions/SUB002/grade",
+    input: {
+      "grade": 9.5
+    },
+    note: "409 if another grader holds a live lease on it or it is already graded",
+    output: {
+      status: "graded",
+      submission_id: "SUB002",
+      grade: 9.5
+    }
+  },
+  {
+    group: "Assessment",
+    name: "Grade Submissions in Bulk",
+    method: "POST",
+    path: "/api/grades/batch",
+    input: {
+      "grades": [
+        { "SubID": "SUB001", "type": "assignment", "grade": 9.5 },
+        { "SubID": "QSub001", "type": "quiz", "grade": 80 },
+        { "SubID": "SUB999", "type": "assignment", "grade": 7 }
+      ]
+    },
+    note: "Instructors (their courses) and admins. Up to GRADE_BATCH_MAX items in one transaction; one result per item in order, status graded | unchanged | not_found | leased | duplicate | invalid",
+    output: {
+      status: "success",
+      count: 3,
+      summary: { graded: 2, not_found: 1 },
+      results: [
+        { SubID: "SUB001", status: "graded", grade: 9.5 },
+        { SubID: "QSub001", status: "graded", grade: 80.0 },
+        { SubID: "SUB999", status: "not_found" }
+      ]
+    }
+  },
   {
     group: "Assessment",
     name: "Create Quiz",
@@ -874,6 +1138,30 @@ const API_DOCS = [
       resource_id: "RES002"
     }
   },
+  {
+    group: "Resource",
+    name: "Upload Resource File",
+    method: "PUT",
+    path: "/api/resources/RES002/file?filename=react-hooks-cheat.pdf",
+    input: "<raw file bytes as the request body>",
+    note: "Instructors only. The body is stored as /res/[RES002]<filename> (filename defaults to File_Name) and File_link is pointed at it; 413 above RESOURCE_MAX_UPLOAD bytes",
+    output: {
+      status: "uploaded",
+      resource_id: "RES002",
+      File_link: "/res/[RES002]react-hooks-cheat.pdf",
+      size: 482133,
+      etag: "\"cea004-75b55-18dff764ea51dd5a\""
+    }
+  },
+  {
+    group: "Resource",
+    name: "Download Resource",
+    method: "GET",
+    path: "/api/resources/RES002/download",
+    input: {},
+    note: "Also HEAD. Streams the file at File_link with a strong ETag and Accept-Ranges: bytes. Send Range: bytes=0-1023 for a 206 (416 when out of range), If-None-Match for a 304, If-Range to resume safely. An http(s) File_link is a 307 redirect; a link with no stored file is 404",
+    output: "<file bytes>"
+  },
   {
     group: "Resource",
     name: "Provide Resource to Lesson",
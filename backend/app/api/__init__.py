@@ -1,4 +1,14 @@
-from . import routes_course, routes_login, routes_utils, routes_enrollment, routes_resource, routes_assessment, routes_user
+import importlib
 
 __all__ = ["routes_course", "routes_login", "routes_utils", "routes_user",
-            "routes_enrollment", "routes_resource", "routes_assessment"]
\ No newline at end of file
+            "routes_enrollment", "routes_resource", "routes_assessment", "routes_admin"]
+
+
+def __getattr__(name):
+    # Routers are imported on first access, so `app.api.auth` or `app.api.schemas`
+    # can be used from scripts without building every route
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,17 +1,17 @@
 from fastapi import HTTPException, status, Cookie
 from datetime import datetime, timedelta, timezone
-from jose import JWTError, jwt
 from pydantic import BaseModel
-from ..models import User, mudemy_session
-from ..services import UserService
+from ..services import UserService, container
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends
+from ..core import config, get_logger, ratelimit
 SECRET_KEY = "Please dont look at my secret key, if you take this key then u can stole all my data..."
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-user_service = UserService(mudemy_session)
+user_service = container.get(UserService)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+logger = get_logger("AUTH", sample_rate=config.LOG_SAMPLE_RATE)
 
 class CurrentUser(BaseModel):
     user_id: str
@@ -21,6 +21,7 @@ def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
+    from jose import jwt  # deferred: python-jose pulls in rsa/ecdsa/pyasn1 at import
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -33,16 +34,27 @@ def get_current_user_from_session(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    current_user = decode_token(token)
+    if current_user is None:
+        raise credentials_exception
+    return current_user
+
+def decode_token(token: str):
+    """Return the CurrentUser carried by a bearer token, or None when it is invalid."""
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
-        role_str: str = payload.get("role")
-        print("Decoded payload:", payload)
-        if user_id is None or role_str is None:
-            raise credentials_exception
-        return CurrentUser(user_id=user_id, role=role_str)
     except JWTError:
-        raise credentials_exception
+        return None
+    user_id: int = payload.get("sub")
+    role_str: str = payload.get("role")
+    logger.debug(f"Decoded token sub={user_id} role={role_str}")
+    if user_id is None or role_str is None:
+        return None
+    return CurrentUser(user_id=user_id, role=role_str)
+
+# Rate limits are kept per user once the middleware has verified the token
+ratelimit.set_identifier(lambda token: getattr(decode_token(token), "user_id", None))
 
 # def get_current_user_from_session(
 #     session_id: str | None = Cookie(None, alias="session_id") 
@@ -0,0 +1,137 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from ..core import profiling
+from ..core.profiling import ProfiledRoute
+from .auth import get_current_user_from_session, decode_token, CurrentUser
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+def is_admin_request(request: Request) -> bool:
+    """True when the request carries a valid admin bearer token."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    current_user = decode_token(token)
+    return current_user is not None and current_user.role == 'admin'
+
+
+profiling.set_authorizer(is_admin_request)
+
+
+def require_admin(current_user: CurrentUser = Depends(get_current_user_from_session)) -> CurrentUser:
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Not authorized, requires ADMIN role")
+    return current_user
+
+
+# ============================================================
+# PROFILING ROUTES
+# ============================================================
+@router.get("/profiles")
+def list_profiles(current_user: CurrentUser = Depends(require_admin)):
+    """Most recent request profiles, newest first"""
+    profiles = profiling.get_profiles()
+    return {
+        "status": "success",
+        "count": len(profiles),
+        "profiles": [p.summary() for p in profiles]
+    }
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, current_user: CurrentUser = Depends(require_admin)):
+    """Profile summary with its SQL timeline"""
+    profile = profiling.get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return {"status": "success", "profile": {**profile.summary(), "sql": profile.sql}}
+
+
+@router.get("/profiles/{profile_id}/folded", response_class=PlainTextResponse)
+def get_profile_folded(profile_id: str, current_user: CurrentUser = Depends(require_admin)):
+    """Collapsed stacks for flamegraph.pl, speedscope or inferno"""
+    profile = profiling.get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile.folded())
+
+
+@router.delete("/profiles")
+def clear_profiles(current_user: CurrentUser = Depends(require_admin)):
+    profiling.clear_profiles()
+    return {"status": "deleted"}
+
+
+# ============================================================
+# DOMAIN EVENT ROUTES
+# ============================================================
+@router.get("/events")
+def event_stats(current_user: CurrentUser = Depends(require_admin)):
+    """Event bus subscribers and outbox backlog for this worker"""
+    from ..core.events import bus
+    from ..services import outbox
+    return {"status": "success", "bus": bus.stats(), "outbox": outbox.stats()}
+
+
+# ============================================================
+# RATE LIMIT ROUTES
+# ============================================================
+@router.get("/rate-limits")
+def rate_limit_stats(current_user: CurrentUser = Depends(require_admin)):
+    """Rate limit policies with allowed/denied counts and bucket store state for this worker"""
+    from ..core import ratelimit
+    return {"status": "success", **ratelimit.limiter.stats()}
+
+
+@router.get("/admission")
+def admission_stats(current_user: CurrentUser = Depends(require_admin)):
+    """Running, waiting and shed requests per route class for this worker"""
+    from ..core.admission import controller
+    return {"status": "success", **controller.stats()}
+
+
+@router.get("/files")
+def file_store_stats(current_user: CurrentUser = Depends(require_admin)):
+    """Open file handles and their hit rate in this worker's resource file store"""
+    from ..core.filestore import store
+    return {"status": "success", **store.stats()}
+
+
+# ============================================================
+# BACKGROUND JOB ROUTES
+# ============================================================
+@router.get("/jobs")
+def list_jobs(current_user: CurrentUser = Depends(require_admin)):
+    """Schedule and recent runs in this worker, plus the shared lease row of each job"""
+    from ..services import leases, scheduler
+    rows = {row.JobName: row for row in leases.rows()}
+    jobs = []
+    for job in scheduler.status():
+        row = rows.get(job["name"])
+        job["lease"] = None if row is None else {
+            "owner": row.Owner,
+            "lease_until": row.Lease_until,
+            "next_run_at": row.Next_run_at,
+            "watermark": row.Watermark,
+            "last_started_at": row.Last_started_at,
+            "last_finished_at": row.Last_finished_at,
+            "last_duration_ms": row.Last_duration_ms,
+            "last_status": row.Last_status,
+            "last_error": row.Last_error,
+            "run_count": row.Run_count,
+        }
+        jobs.append(job)
+    return {"status": "success", "count": len(jobs), "jobs": jobs}
+
+
+@router.post("/jobs/{name}/run")
+def run_job(name: str, current_user: CurrentUser = Depends(require_admin)):
+    """Run a job as soon as a worker picks up its lease"""
+    from ..services import leases, scheduler
+    if name not in {job["name"] for job in scheduler.status()}:
+        raise HTTPException(status_code=404, detail="Job not found")
+    leases.make_due(name)
+    scheduler.run_now(name)
+    return {"status": "scheduled", "job": name}
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Body, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Dict, Any, List, Optional
 from sqlalchemy import text
 
-from ..models import mudemy_session
+from ..models import mudemy_session, use_replica
+from ..core import config
+from ..core.profiling import ProfiledRoute
 from ..services import (
     AssignmentService,
     QuizService,
@@ -12,19 +14,27 @@ from ..services import (
     AssignSubmissionService,
     QuizSubmissionService,
     ModuleService,
+    GradingQueueService,
+    BatchGradingService,
+    blobs,
+    container,
 )
+from ..services.grading_service import AlreadyGraded, LeaseHeld
+from ..services.projections import SUMMARY
 from .auth import get_current_user_from_session, CurrentUser
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 # Initialize services
-assignment_service = AssignmentService(mudemy_session)
-quiz_service = QuizService(mudemy_session)
-question_service = QuestionService(mudemy_session)
-answer_service = AnswerService(mudemy_session)
-assign_submission_service = AssignSubmissionService(mudemy_session)
-quiz_submission_service = QuizSubmissionService(mudemy_session)
-module_service = ModuleService(mudemy_session)
+assignment_service = container.get(AssignmentService)
+quiz_service = container.get(QuizService)
+question_service = container.get(QuestionService)
+answer_service = container.get(AnswerService)
+assign_submission_service = container.get(AssignSubmissionService)
+quiz_submission_service = container.get(QuizSubmissionService)
+module_service = container.get(ModuleService)
+grading_queue = container.get(GradingQueueService)
+batch_grading = container.get(BatchGradingService)
 
 # ============================================================
 # ASSIGNMENT ROUTES
@@ -57,7 +67,7 @@ def read_assignment(
 		"assignment": {
 			"AssID": assignment.AssID,
 			"Deadline": assignment.Deadline,
-			"Description": assignment.Description,
+			"Description": blobs.text(assignment, "Description"),
 			"Title": assignment.Title,
 			"ModuleID": assignment.ModuleID
 		}
@@ -96,14 +106,14 @@ def get_assignments_by_module(
     module_id: str,
     current_user: CurrentUser = Depends(get_current_user_from_session)
 ):
-	assignments = assignment_service.get_assignments_by_module(module_id)
+	assignments = assignment_service.get_assignments_by_module(module_id, view=SUMMARY)
 	return {
 		"status": "success",
 		"count": len(assignments),
 		"assignments": [{
 			"AssID": a.AssID,
 			"Deadline": a.Deadline,
-			"Description": a.Description,
+			"Description": blobs.text(a, "Description"),
 			"Title": a.Title,
 			"ModuleID": a.ModuleID
 		} for a in assignments]
@@ -180,7 +190,7 @@ def get_quizzes_by_module(
     module_id: str,
     current_user: CurrentUser = Depends(get_current_user_from_session)
 ):
-	quizzes = quiz_service.get_quizzes_by_module(module_id)
+	quizzes = quiz_service.get_quizzes_by_module(module_id, view=SUMMARY)
 	return {
 		"status": "success",
 		"count": len(quizzes),
@@ -219,7 +229,7 @@ def get_questions_for_quiz(
     quiz_id: str,
     current_user: CurrentUser = Depends(get_current_user_from_session)
 ):
-	questions = question_service.get_questions_by_quiz(quiz_id)
+	questions = question_service.get_questions_by_quiz(quiz_id, view=SUMMARY)
 	return {
 		"status": "success",
 		"count": len(questions),
@@ -296,11 +306,11 @@ def get_answers_for_question(
     question_id: str,
     current_user: CurrentUser = Depends(get_current_user_from_session)
 ):
-	question = question_service.get_question_by_id(question_id)
+	question = question_service.get_question_by_id(question_id, view="key")
 	if not question:
 		raise HTTPException(status_code=404, detail="Question not found")
 		
-	answers = answer_service.get_answers_by_question(question_id, question.QuizID)
+	answers = answer_service.get_answers_by_question(question_id, question.QuizID, view=SUMMARY)
 	return {
 		"status": "success",
 		"count": len(answers),
@@ -384,7 +394,7 @@ def get_assignment_submissions(
 ):
 	if current_user.role == 'tutee':
 		raise HTTPException(status_code=403, detail="Not authorized, requires INSTRUCTOR role")
-	submissions = assign_submission_service.get_submissions_by_assignment(ass_id)
+	submissions = assign_submission_service.get_submissions_by_assignment(ass_id, view=SUMMARY)
 	return {
 		"status": "success",
 		"count": len(submissions),
@@ -392,7 +402,7 @@ def get_assignment_submissions(
 			"SubID": s.SubID,
 			"UserID": s.UserID,
 			"AssID": s.AssID,
-			"Sub_content": s.Sub_content,
+			"Sub_content": blobs.text(s, "Sub_content"),
 			"Grade": s.Grade,
 			"Sub_date": s.Sub_date
 		} for s in submissions]
@@ -442,7 +452,7 @@ def get_quiz_submissions(
 ):
 	if current_user.role == 'tutee':
 		raise HTTPException(status_code=403, detail="Not authorized, requires INSTRUCTOR role")
-	submissions = quiz_submission_service.get_submissions_by_quiz(quiz_id)
+	submissions = quiz_submission_service.get_submissions_by_quiz(quiz_id, view=SUMMARY)
 	return {
 		"status": "success",
 		"count": len(submissions),
@@ -450,7 +460,7 @@ def get_quiz_submissions(
 			"SubID": s.SubID,
 			"UserID": s.UserID,
 			"QuizID": s.QuizID,
-			"Sub_content": s.Sub_content,
+			"Sub_content": blobs.text(s, "Sub_content"),
 			"Grade": s.Grade,
 			"Sub_date": s.Sub_date
 		} for s in submissions]
@@ -475,6 +485,34 @@ def grade_quiz_submission(
         raise HTTPException(status_code=404, detail="Submission not found")
     return {"status": "graded", "submission_id": sub_id, "grade": submission.Grade}
 
+
+def _submission_content(submission, current_user: CurrentUser) -> StreamingResponse:
+    if not submission:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    if current_user.role == 'tutee' and submission.UserID != current_user.user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to view this submission")
+    headers = {"X-Content-Size": str(submission.Sub_content_size)} if submission.Sub_content_hash else {}
+    return StreamingResponse(blobs.stream(submission, "Sub_content"), media_type="text/plain; charset=utf-8",
+                             headers=headers)
+
+
+@router.get("/submissions/assignment/{sub_id}/content")
+def get_assignment_submission_content(
+    sub_id: str,
+    current_user: CurrentUser = Depends(get_current_user_from_session)
+):
+    """Stream an assignment submission's content (Instructor, or the student who submitted it)"""
+    return _submission_content(assign_submission_service.get_submission_by_id(sub_id), current_user)
+
+
+@router.get("/submissions/quiz/{sub_id}/content")
+def get_quiz_submission_content(
+    sub_id: str,
+    current_user: CurrentUser = Depends(get_current_user_from_session)
+):
+    """Stream a quiz submission's content (Instructor, or the student who submitted it)"""
+    return _submission_content(quiz_submission_service.get_submission_by_id(sub_id), current_user)
+
 @router.get("/quizzes/{quiz_id}/submissions/latest")
 def get_latest_quiz_submissions(
     quiz_id: str,
@@ -485,7 +523,7 @@ def get_latest_quiz_submissions(
         raise HTTPException(status_code=403, detail="Not authorized, requires INSTRUCTOR role")
 
     sql = text("""
-        SELECT qs.SubID, qs.UserID, qs.QuizID, qs.Grade, qs.Sub_date, qs.Sub_content
+        SELECT qs.SubID, qs.UserID, qs.QuizID, qs.Grade, qs.Sub_date, qs.Sub_content, qs.Sub_content_hash
         FROM QUIZ_SUBMISSION qs
         JOIN (
             SELECT UserID, MAX(Sub_date) AS max_sub_date
@@ -496,10 +534,10 @@ def get_latest_quiz_submissions(
         WHERE qs.QuizID = :quiz_id
     """)
 
-    with mudemy_session() as session:
+    with use_replica(), mudemy_session() as session:
         rows = session.execute(sql, {"quiz_id": quiz_id}).fetchall()
         submissions = [
-            {"SubID": r[0], "UserID": r[1], "QuizID": r[2], "Grade": r[3], "Sub_date": r[4], "Sub_content": r[5]}
+            {"SubID": r[0], "UserID": r[1], "QuizID": r[2], "Grade": r[3], "Sub_date": r[4], "Sub_content": blobs.text(r, "Sub_content")}
             for r in rows
         ]
         return {"status": "success", "count": len(submissions), "submissions": submissions}
@@ -515,7 +553,7 @@ def get_latest_assignment_submissions(
         raise HTTPException(status_code=403, detail="Not authorized, requires INSTRUCTOR role")
 
     sql = text("""
-        SELECT s.SubID, s.UserID, s.AssID, s.Grade, s.Sub_date, s.Sub_content
+        SELECT s.SubID, s.UserID, s.AssID, s.Grade, s.Sub_date, s.Sub_content, s.Sub_content_hash
         FROM ASSIGN_SUBMISSION s
         JOIN (
             SELECT UserID, MAX(Sub_date) AS max_sub_date
@@ -526,14 +564,115 @@ def get_latest_assignment_submissions(
         WHERE s.AssID = :ass_id
     """)
 
-    with mudemy_session() as session:
+    with use_replica(), mudemy_session() as session:
         rows = session.execute(sql, {"ass_id": ass_id}).fetchall()
         submissions = [
-            {"SubID": r[0], "UserID": r[1], "AssID": r[2], "Grade": r[3], "Sub_date": r[4], "Sub_content": r[5]}
+            {"SubID": r[0], "UserID": r[1], "AssID": r[2], "Grade": r[3], "Sub_date": r[4], "Sub_content": blobs.text(r, "Sub_content")}
             for r in rows
         ]
         return {"status": "success", "count": len(submissions), "submissions": submissions}
 
+# ============================================================
+# GRADING QUEUE ROUTES
+# ============================================================
+
+def _require_instructor(current_user: CurrentUser) -> None:
+    if current_user.role != 'tutor':
+        raise HTTPException(status_code=403, detail="Not authorized, requires INSTRUCTOR role")
+
+
+@router.get("/grading/queue")
+def get_grading_queue(
+    limit: int = Query(100, ge=1, le=500),
+    current_user: CurrentUser = Depends(get_current_user_from_session)
+):
+    """Oldest ungraded assignment submissions across my courses, with who is grading them"""
+    _require_instructor(current_user)
+    return {"status": "success", **grading_queue.get_queue(current_user.user_id, limit)}
+
+
+@router.post("/grading/claim")
+def claim_grading_work(
+    count: int = Body(10, embed=True),
+    current_user: CurrentUser = Depends(get_current_user_from_session)
+):
+    """Lease a batch of the oldest unclaimed submissions to me (GRADING_LEASE_SECONDS)"""
+    _require_instructor(current_user)
+    items = grading_queue.claim(current_user.user_id, current_user.user_id, count)
+    return {"status": "success", "count": len(items), "submissions": items}
+
+
+@router.post("/grading/renew")
+def renew_grading_leases(
+    sub_ids: List[str] = Body(..., embed=True, alias="SubIDs"),
+    current_user: CurrentUser = Depends(get_current_user_from_session)
+):
+    """Extend my live leases"""
+    _require_instructor(current_user)
+    return {"status": "success", "renewed": grading_queue.renew(current_user.user_id, sub_ids)}
+
+
+@router.post("/grading/release")
+def release_grading_leases(
+    sub_ids: List[str] = Body(..., embed=True, alias="SubIDs"),
+    current_user: CurrentUser = Depends(get_current_user_from_session)
+):
+    """Put submissions I claimed back in the queue"""
+    _require_instructor(current_user)
+    return {"status": "success", "released": grading_queue.release(current_user.user_id, sub_ids)}
+
+
+@router.get("/grading/submissions/{sub_id}")
+def open_queued_submission(
+    sub_id: str,
+    current_user: CurrentUser = Depends(get_current_user_from_session)
+):
+    """A submission from my queue with its content"""
+    _require_instructor(current_user)
+    submission = grading_queue.get_submission(current_user.user_id, sub_id)
+    if submission is None:
+        raise HTTPException(status_code=404, detail="Submission not found in your courses")
+    return {"status": "success", "submission": submission}
+
+
+@router.put("/grading/submissions/{sub_id}/grade")
+def grade_queued_submission(
+    sub_id: str,
+    grade: float = Body(..., embed=True),
+    current_user: CurrentUser = Depends(get_current_user_from_session)
+):
+    """Grade a submission from my queue; 409 if another grader holds it or it is already graded"""
+    _require_instructor(current_user)
+    try:
+        submission = grading_queue.grade(current_user.user_id, current_user.user_id, sub_id, grade)
+    except (LeaseHeld, AlreadyGraded) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if submission is None:
+        raise HTTPException(status_code=404, detail="Submission not found in your courses")
+    return {"status": "graded", "submission_id": sub_id, "grade": submission.Grade}
+
+
+
+@router.post("/grades/batch")
+def grade_batch(
+    grades: List[Dict[str, Any]] = Body(..., embed=True),
+    current_user: CurrentUser = Depends(get_current_user_from_session)
+):
+    """Grade many assignment/quiz submissions in one transaction, with one result per item"""
+    if current_user.role == 'tutee':
+        raise HTTPException(status_code=403, detail="Not authorized, requires INSTRUCTOR role")
+    if not grades:
+        raise HTTPException(status_code=400, detail="No grades provided")
+    if len(grades) > config.GRADE_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {config.GRADE_BATCH_MAX} grades per batch")
+
+    instructor_id = None if current_user.role == 'admin' else current_user.user_id
+    results = batch_grading.grade_batch(current_user.user_id, grades, instructor_id)
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return {"status": "success", "count": len(results), "summary": counts, "results": results}
+
 # ============================================================
 # STATS ROUTES (from SQL Procedures)
 # ============================================================
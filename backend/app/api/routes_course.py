@@ -4,31 +4,41 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 from sqlalchemy import text
 
-from ..models import mudemy_session
+from ..models import mudemy_session, use_replica
+from ..core.profiling import ProfiledRoute
 from ..services import (
     CourseService, ModuleService, RequiresService, ContentService,
     LessonRefService, TextService, VideoService, ImageService,
-    CategoryService)
+    CategoryService, blobs, container)
 from .auth import get_current_user_from_session, CurrentUser
+from ..services.projections import SUMMARY
+from ..core import config, get_logger, http_cache
 
-router = APIRouter()
+logger = get_logger("COURSE")
+
+router = APIRouter(route_class=ProfiledRoute)
 
 # Initialize all services
-course_service = CourseService(mudemy_session)
-module_service = ModuleService(mudemy_session)
-requires_service = RequiresService(mudemy_session)
-content_service = ContentService(mudemy_session)
-lesson_ref_service = LessonRefService(mudemy_session)
-text_service = TextService(mudemy_session)
-video_service = VideoService(mudemy_session)
-image_service = ImageService(mudemy_session)
-category_service = CategoryService(mudemy_session)
+course_service = container.get(CourseService)
+module_service = container.get(ModuleService)
+requires_service = container.get(RequiresService)
+content_service = container.get(ContentService)
+lesson_ref_service = container.get(LessonRefService)
+text_service = container.get(TextService)
+video_service = container.get(VideoService)
+image_service = container.get(ImageService)
+category_service = container.get(CategoryService)
+
+
+def cached(key_template: str, policy: str) -> List:
+    """Authenticate, then answer 304 from the shared version stamp of ``key_template``."""
+    return [Depends(get_current_user_from_session), Depends(http_cache.conditional(key_template, policy))]
 
 
 # ============================================================
 # COURSE ROUTES
 # ============================================================
-@router.get("/courses")
+@router.get("/courses", dependencies=cached("catalog", config.HTTP_CACHE_CATALOG_POLICY))
 def get_all_courses(
     limit: int = Query(100, ge=1, le=100),
     difficulty: Optional[str] = None,
@@ -36,9 +46,9 @@ def get_all_courses(
 ):
     """Get all courses with optional filtering"""
     if difficulty:
-        courses = course_service.get_courses_by_difficulty(difficulty)
+        courses = course_service.get_courses_by_difficulty(difficulty, view=SUMMARY)
     else:
-        courses = course_service.get_all_courses(limit)
+        courses = course_service.get_all_courses(limit, view=SUMMARY)
     
     return {
         "status": "success",
@@ -49,7 +59,7 @@ def get_all_courses(
                 "Title": c.Title,
                 "Difficulty": c.Difficulty,
                 "Language": c.Language,
-                "Description": c.Description
+                "Description": blobs.text(c, "Description")
             } for c in courses
         ]
     }
@@ -65,7 +75,7 @@ def create_course(
         raise HTTPException(status_code=403, detail="Not authorized, requires INSTRUCTOR role")
     
     try:
-        print("Creating course with data:", course_data)
+        logger.debug(f"Creating course: {course_data.get('Title')}")
         course = course_service.create_course(course_data)
         return JSONResponse(
             status_code=201,
@@ -79,7 +89,7 @@ def create_course(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/courses/id/{course_id}")
+@router.get("/courses/id/{course_id}", dependencies=cached("course:{course_id}", config.HTTP_CACHE_COURSE_POLICY))
 def get_course(
     course_id: str,
     current_user: CurrentUser = Depends(get_current_user_from_session)
@@ -102,7 +112,7 @@ def get_course(
             "Title": course.Title,
             "Difficulty": course.Difficulty,
             "Language": course.Language,
-            "Description": course.Description,
+            "Description": blobs.text(course, "Description"),
             "Categories": [c.Category for c in categories],
             "Prerequisites": [p.Required_courseID for p in prerequisites]
         }
@@ -151,7 +161,7 @@ def get_course_progress(
     """
     student_id = current_user.user_id
     
-    with mudemy_session() as session:
+    with use_replica(), mudemy_session() as session:
         # Assuming SQL Server based on your previous 'EXEC' syntax
         query = text("SELECT dbo.CalculateContentCompletionRate(:student_id, :course_id)")
         
@@ -174,7 +184,7 @@ def search_courses(
     current_user: CurrentUser = Depends(get_current_user_from_session)
 ):
     """Search courses by title"""
-    courses = course_service.search_courses_by_title(title)
+    courses = course_service.search_courses_by_title(title, view=SUMMARY)
     return {
         "status": "success",
         "count": len(courses),
@@ -183,7 +193,7 @@ def search_courses(
             "Title": c.Title,
             "Difficulty": c.Difficulty,
             "Language": c.Language,
-            "Description": c.Description
+            "Description": blobs.text(c, "Description")
         } for c in courses]
     }
 
@@ -277,7 +287,6 @@ def get_prerequisites(
 @router.get("/courses/{course_id}/prerequisites/f")
 def check_prerequisites(course_id: str, current_user: CurrentUser = Depends(get_current_user_from_session)):
     """Get all prerequisites for a course (Using CheckPrerequisiteCompletion PROCEDURE)"""
-    print(course_id)
     sid = current_user.user_id
     result = []
     with mudemy_session() as session:
@@ -323,13 +332,13 @@ def create_module(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/courses/{course_id}/modules")
+@router.get("/courses/{course_id}/modules", dependencies=cached("course:{course_id}", config.HTTP_CACHE_COURSE_POLICY))
 def get_course_modules(
     course_id: str,
     current_user: CurrentUser = Depends(get_current_user_from_session)
 ):
     """Get all modules for a course"""
-    modules = module_service.get_modules_by_course(course_id)
+    modules = module_service.get_modules_by_course(course_id, view=SUMMARY)
     return {
         "status": "success",
         "count": len(modules),
@@ -416,13 +425,13 @@ def create_content(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/modules/{module_id}/content")
+@router.get("/modules/{module_id}/content", dependencies=cached("module:{module_id}", config.HTTP_CACHE_COURSE_POLICY))
 def get_module_content(
     module_id: str,
     current_user: CurrentUser = Depends(get_current_user_from_session)
 ):
     """Get all content for a module"""
-    contents = content_service.get_content_by_module(module_id)
+    contents = content_service.get_content_by_module(module_id, view=SUMMARY)
     return {
         "status": "success",
         "count": len(contents),
@@ -1,16 +1,20 @@
-from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query
 from fastapi.responses import JSONResponse
 from .auth import *
 from typing import Dict, Any, List, Optional
 
-from ..models import mudemy_session
-from ..services import EnrollmentService, PaymentService, CertificateService
+from ..core.profiling import ProfiledRoute
+from .schemas import CourseEnrollmentListResponse, PaymentListResponse
+from ..services import EnrollmentService, PaymentService, CertificateService, DashboardService, container
+from ..services.enrollment_service import AlreadyCertified, AlreadyEnrolled, CourseNotFound
+from ..services.idempotency import IdempotencyMismatch
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
-enrollment_service = EnrollmentService(mudemy_session)
-payment_service = PaymentService(mudemy_session)
-certificate_service = CertificateService(mudemy_session)
+enrollment_service = container.get(EnrollmentService)
+payment_service = container.get(PaymentService)
+certificate_service = container.get(CertificateService)
+dashboard_service = container.get(DashboardService)
 
 
 @router.post("/enroll")
@@ -21,10 +25,42 @@ def create_enrollment(data: Dict[str, Any] = Body(...), current_user: CurrentUse
 
 	# ensure StudentID is set to current user if not provided
 	data.setdefault('StudentID', current_user.user_id)
-	e = enrollment_service.create_enrollment(data)
+	try:
+		e = enrollment_service.create_enrollment(data)
+	except AlreadyEnrolled as e:
+		raise HTTPException(status_code=409, detail=str(e))
 	return JSONResponse(status_code=201, content={"status": "created", "enrollment_id": e.EnrollmentID})
 
 
+@router.post("/checkout")
+def checkout(
+	data: Dict[str, Any] = Body(...),
+	idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
+	current_user: CurrentUser = Depends(get_current_user_from_session)
+):
+	"""Pay for and enroll in a course in one request; retries with the same Idempotency-Key return the first result"""
+	if current_user.role != 'tutee':
+		raise HTTPException(status_code=403, detail="Not authorized, requires STUDENT role")
+	if not data.get('CourseID') or data.get('Amount') is None:
+		raise HTTPException(status_code=400, detail="CourseID and Amount are required")
+	if idempotency_key is not None and not 0 < len(idempotency_key) <= 64:
+		raise HTTPException(status_code=400, detail="Idempotency-Key must be 1-64 characters")
+	try:
+		response, replayed = enrollment_service.checkout(
+			current_user.user_id, data['CourseID'], data['Amount'], data.get('Payment_method'), idempotency_key
+		)
+	except AlreadyEnrolled as e:
+		raise HTTPException(status_code=409, detail=str(e))
+	except IdempotencyMismatch as e:
+		raise HTTPException(status_code=422, detail=str(e))
+	except CourseNotFound as e:
+		raise HTTPException(status_code=404, detail=str(e))
+	except ValueError as e:
+		raise HTTPException(status_code=400, detail=str(e))
+	headers = {"Idempotent-Replayed": "true"} if replayed else None
+	return JSONResponse(status_code=response.status_code, content=response.body, headers=headers)
+
+
 @router.get("/enrollments/me")
 def my_enrollments(current_user: CurrentUser = Depends(get_current_user_from_session)):
 	if current_user.role == 'tutor':
@@ -98,24 +134,13 @@ def get_enrollment(enrollment_id: str, current_user: CurrentUser = Depends(get_c
 	}
 
 
-@router.get("/courses/{course_id}/enrollments")
+@router.get("/courses/{course_id}/enrollments", response_model=CourseEnrollmentListResponse)
 def get_enrollments_by_course(course_id: str, current_user: CurrentUser = Depends(get_current_user_from_session)):
 	if current_user.role == 'tutee':
 		raise HTTPException(status_code=403, detail="Not authorized, requires instructor/admin role")
 
 	items = enrollment_service.get_course_enrollments(course_id)
-	return {
-		"status": "success",
-		"count": len(items),
-		"enrollments": [{
-			"EnrollmentID": e.EnrollmentID,
-			"CourseID": e.CourseID,
-			"PaymentID": e.PaymentID,
-			"StudentID": e.StudentID,
-			"Status": e.Status,
-			"Enroll_date": e.Enroll_date
-		} for e in items]
-	}
+	return {"status": "success", "count": len(items), "enrollments": items}
 
 
 @router.put("/enrollments/{enrollment_id}")
@@ -164,6 +189,14 @@ def my_enrollment_stats(current_user: CurrentUser = Depends(get_current_user_fro
 	return {"status": "success", "stats": stats}
 
 
+@router.get("/me/dashboard")
+def my_dashboard(current_user: CurrentUser = Depends(get_current_user_from_session)):
+	"""My enrollments with progress, enrollment stats and upcoming deadlines in one call"""
+	if current_user.role == 'tutor':
+		raise HTTPException(status_code=403, detail="Not authorized, requires STUDENT role")
+	return {"status": "success", **dashboard_service.get_student_dashboard(current_user.user_id)}
+
+
 # ---------------------------
 # Payment Endpoints
 # ---------------------------
@@ -197,40 +230,20 @@ def get_payment(payment_id: str, current_user: CurrentUser = Depends(get_current
 		}
 	}
 
-@router.get("/payments/user/{user_id}")
+@router.get("/payments/user/{user_id}", response_model=PaymentListResponse)
 def get_payments_by_user(user_id: str, current_user: CurrentUser = Depends(get_current_user_from_session)):
 	if current_user.role == 'tutee' and user_id != current_user.user_id:
 		raise HTTPException(status_code=403, detail="Not authorized to view other user's payments")
 	items = payment_service.get_payments_by_user(user_id)
-	return {
-		"status": "success",
-		"count": len(items),
-		"payments": [{
-			"PaymentID": p.PaymentID,
-			"Amount": p.Amount,
-			"Payment_date": p.Payment_date,
-			"Payment_method": p.Payment_method,
-			"UserID": p.UserID
-		} for p in items]
-	}
+	return {"status": "success", "count": len(items), "payments": items}
 
 
-@router.get("/payments")
+@router.get("/payments", response_model=PaymentListResponse)
 def get_all_payments(limit: int = 100, current_user: CurrentUser = Depends(get_current_user_from_session)):
 	if current_user.role == 'tutee':
 		raise HTTPException(status_code=403, detail="Not authorized, requires admin role")
 	items = payment_service.get_all_payments(limit=limit)
-	return {
-		"status": "success",
-		"count": len(items),
-		"payments": [{
-			"PaymentID": p.PaymentID,
-			"Amount": p.Amount,
-			"Payment_date": p.Payment_date,
-			"Payment_method": p.Payment_method,
-			"UserID": p.UserID
-		} for p in items]
-	}
+	return {"status": "success", "count": len(items), "payments": items}
 
 
 @router.put("/payments/{payment_id}")
@@ -272,10 +285,36 @@ def create_certificate(data: Dict[str, Any] = Body(...), current_user: CurrentUs
 	"""Create a certificate (INSTRUCTOR only)"""
 	if current_user.role == 'tutee':
 		raise HTTPException(status_code=403, detail="Not authorized to create certificate")
-	c = certificate_service.create_certificate(data)
+	try:
+		c = certificate_service.create_certificate(data)
+	except AlreadyCertified as e:
+		raise HTTPException(status_code=409, detail=str(e))
 	return JSONResponse(status_code=201, content={"status": "created", "certificate_id": c.CertificateID})
 
 
+@router.get("/certificates/verify/{number}")
+def verify_certificate(number: str):
+	"""Public check of a signed certificate number: signature, expiry and revocation, no database round trip"""
+	result = certificate_service.verify_certificate(number)
+	if result is None:
+		raise HTTPException(status_code=404, detail="Certificate not found")
+	return {"status": "success", "certificate": result}
+
+
+@router.post("/certificates/{certificate_id}/revoke")
+def revoke_certificate(
+	certificate_id: str,
+	data: Dict[str, Any] = Body(default={}), current_user: CurrentUser = Depends(get_current_user_from_session)
+):
+	"""Revoke a certificate (INSTRUCTOR only)"""
+	if current_user.role == 'tutee':
+		raise HTTPException(status_code=403, detail="Not authorized to revoke certificate")
+	number = certificate_service.revoke_certificate(certificate_id, data.get("reason"))
+	if number is None:
+		raise HTTPException(status_code=404, detail="Certificate not found")
+	return {"status": "revoked", "certificate_id": certificate_id, "certificate_number": number}
+
+
 @router.get("/certificates/{certificate_id}")
 def get_certificate(certificate_id: str, current_user: CurrentUser = Depends(get_current_user_from_session)):
 	c = certificate_service.get_certificate_by_id(certificate_id)
@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Body, Response, HTTPException
-from ..models import *
-from ..services import *
-from ..core import *
+from ..core.profiling import ProfiledRoute
+from ..services import UserService, container
+from ..core import get_logger
 from .auth import create_access_token 
 # No need for uuid or datetime imports here anymore
 
 logger = get_logger("LOGIN")
-router = APIRouter()
-user_service = UserService(mudemy_session)
+router = APIRouter(route_class=ProfiledRoute)
+user_service = container.get(UserService)
 
 @router.get("/roles")
 def get_role():
@@ -26,7 +26,7 @@ def login(
     password = data.get("password")
     role = data.get("role")
     
-    print("Login attempt:", username, password, role)
+    logger.info(f"Login attempt: user={username} role={role}")
 
     user = user_service.get_user_by_username(username)
     if not username: 
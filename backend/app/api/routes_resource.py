@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Body, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
+import os
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, RedirectResponse
+from starlette.concurrency import run_in_threadpool
 from .auth import *
 from typing import Dict, Any, List, Optional
-from ..models import mudemy_session
-from ..services import ResourceService, ProvideResourceService
+from ..core import config
+from ..core.filestore import FileNotStored, store as file_store
+from ..core.profiling import ProfiledRoute
+from ..core.responses import FileRangeResponse
+from ..services import ResourceService, ProvideResourceService, container
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
-resource_service = ResourceService(mudemy_session)
-provide_service = ProvideResourceService(mudemy_session)
+resource_service = container.get(ResourceService)
+provide_service = container.get(ProvideResourceService)
 
 
 @router.post("/resources")
@@ -103,6 +109,63 @@ def update_resource_external_link(resource_id: str, data: Dict[str, Any] = Body(
 	return {"status": "updated", "resource_id": updated.ResourceID}
 
 
+@router.api_route("/resources/{resource_id}/download", methods=["GET", "HEAD"])
+def download_resource(resource_id: str, request: Request, current_user: CurrentUser = Depends(get_current_user_from_session)):
+    """The resource's file, with Range and If-None-Match support; an http(s) File_link is redirected to"""
+    r = resource_service.get_resource_by_id(resource_id)
+    if not r:
+        raise HTTPException(status_code=404, detail=f"Resource not found: {resource_id}")
+    try:
+        handle = file_store.acquire(r.File_link)
+    except FileNotStored:
+        if r.File_link.startswith(("http://", "https://")):
+            return RedirectResponse(r.File_link, status_code=307)
+        raise HTTPException(status_code=404, detail="Resource file is not stored")
+
+    filename = r.File_Name
+    if not os.path.splitext(filename)[1]:
+        filename += os.path.splitext(r.File_link)[1]
+    return FileRangeResponse(handle, file_store, request.headers, request.method, filename=filename,
+                             cache_control=config.RESOURCE_CACHE_POLICY, chunk_size=config.RESOURCE_CHUNK_SIZE)
+
+
+@router.put("/resources/{resource_id}/file")
+async def upload_resource_file(resource_id: str, request: Request, filename: Optional[str] = Query(None),
+                               current_user: CurrentUser = Depends(get_current_user_from_session)):
+    """Store the raw request body as the resource's file and point File_link at it (Instructor only)"""
+    if current_user.role == 'tutee':
+        raise HTTPException(status_code=403, detail="Not authorized, requires INSTRUCTOR role")
+    r = await run_in_threadpool(resource_service.get_resource_by_id, resource_id)
+    if not r:
+        raise HTTPException(status_code=404, detail=f"Resource not found: {resource_id}")
+    name = os.path.basename((filename or r.File_Name).replace("\\", "/")).strip()
+    if name in ("", ".", ".."):
+        raise HTTPException(status_code=400, detail="Invalid file name")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > config.RESOURCE_MAX_UPLOAD:
+        raise HTTPException(status_code=413, detail=f"File larger than {config.RESOURCE_MAX_UPLOAD} bytes")
+
+    # Same layout as the seeded links: /res/[RES002]react-hooks-cheat.pdf
+    key = f"/res/[{resource_id}]{name}"
+    writer = await run_in_threadpool(file_store.writer, key)
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > config.RESOURCE_MAX_UPLOAD:
+                raise HTTPException(status_code=413, detail=f"File larger than {config.RESOURCE_MAX_UPLOAD} bytes")
+            if chunk:
+                await run_in_threadpool(writer.write, chunk)
+        stat = await run_in_threadpool(writer.commit)
+    except BaseException:
+        writer.abort()
+        raise
+    if r.File_link != key:
+        await run_in_threadpool(resource_service.update_resource_file_link, resource_id, key)
+    return JSONResponse(status_code=201, content={"status": "uploaded", "resource_id": resource_id,
+                                                  "File_link": key, "size": stat.size, "etag": stat.etag})
+
+
 @router.get("/resources/count")
 def resource_count(current_user: CurrentUser = Depends(get_current_user_from_session)):
 	cnt = resource_service.get_resource_count()
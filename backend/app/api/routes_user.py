@@ -3,21 +3,26 @@ from fastapi.responses import JSONResponse
 from .auth import *
 from typing import Dict, Any
 
-from ..models import mudemy_session
-from ..services import UserService, TakeService, InterestsService, InstructService, QualificationService
+from ..core.profiling import ProfiledRoute
+from .schemas import UserListResponse
+from ..services.projections import SUMMARY
+from ..services import UserService, TakeService, InterestsService, InstructService, QualificationService, DashboardService, blobs, container
+from ..core import config, get_logger
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
+logger = get_logger("USER", sample_rate=config.LOG_SAMPLE_RATE)
 
-user_service = UserService(mudemy_session)
-take_service = TakeService(mudemy_session)
-interests_service = InterestsService(mudemy_session)
-instruct_service = InstructService(mudemy_session)
-qualification_service = QualificationService(mudemy_session)
+user_service = container.get(UserService)
+take_service = container.get(TakeService)
+interests_service = container.get(InterestsService)
+instruct_service = container.get(InstructService)
+qualification_service = container.get(QualificationService)
+dashboard_service = container.get(DashboardService)
 
 
 @router.get("/users/me")
 def get_me(current_user: CurrentUser = Depends(get_current_user_from_session)):
-	u = user_service.get_user_by_id(current_user.user_id)
+	u = user_service.get_user_by_id(current_user.user_id, view="profile")
 	if not u:
 		raise HTTPException(status_code=404, detail="User not found")
 	return {
@@ -33,7 +38,7 @@ def get_me(current_user: CurrentUser = Depends(get_current_user_from_session)):
 			"Date_of_birth": u.Date_of_birth,
 			"Last_login": u.Last_login,
 			"IFlag": u.IFlag,
-			"Bio_text": u.Bio_text,
+			"Bio_text": blobs.text(u, "Bio_text"),
 			"Year_of_experience": u.Year_of_experience,
 			"Average_rating":u.Average_rating,
 			"SFlag": u.SFlag,
@@ -51,38 +56,18 @@ def create_user(data: Dict[str, Any] = Body(...)):
 	return JSONResponse(status_code=201, content={"status": "created", "user_id": u.UserID})
 
 
-@router.get("/users")
+@router.get("/users", response_model=UserListResponse)
 def list_users(limit: int = 100, current_user: CurrentUser = Depends(get_current_user_from_session)):
 	if current_user.role == 'tutee':
 		raise HTTPException(status_code=403, detail="Not authorized")
 
-	users = user_service.get_all_users(limit=limit)
-	return {
-		"status": "success",
-		"count": len(users),
-		"users": [{
-			"UserID": u.UserID,
-			"User_name": u.User_name,
-			"Email": u.Email,
-			"Full_name": u.Full_name,
-			"City": u.City,
-			"Country": u.Country,
-			"Phone": u.Phone,
-			"Date_of_birth": u.Date_of_birth,
-			"Last_login": u.Last_login,
-			"IFlag": u.IFlag,
-			"Bio_text": u.Bio_text,
-			"Year_of_experience": u.Year_of_experience,
-			"Average_rating":u.Average_rating,
-			"SFlag": u.SFlag,
-			"Total_enrollments": u.Total_enrollments
-		} for u in users]
-	}
+	users = user_service.get_all_users(limit=limit, view="profile")
+	return {"status": "success", "count": len(users), "users": users}
 
 
 @router.get("/users/id/{user_id}")
 def get_user(user_id: str, current_user: CurrentUser = Depends(get_current_user_from_session)):
-	u = user_service.get_user_by_id(user_id)
+	u = user_service.get_user_by_id(user_id, view="profile")
 	if not u:
 		raise HTTPException(status_code=404, detail="User not found")
 	if current_user.role == 'tutee' and current_user.user_id != user_id:
@@ -100,7 +85,7 @@ def get_user(user_id: str, current_user: CurrentUser = Depends(get_current_user_
 			"Date_of_birth": u.Date_of_birth,
 			"Last_login": u.Last_login,
 			"IFlag": u.IFlag,
-			"Bio_text": u.Bio_text,
+			"Bio_text": blobs.text(u, "Bio_text"),
 			"Year_of_experience": u.Year_of_experience,
 			"Average_rating":u.Average_rating,
 			"SFlag": u.SFlag,
@@ -142,7 +127,7 @@ def delete_user(user_id: str, current_user: CurrentUser = Depends(get_current_us
 def list_instructors(current_user: CurrentUser = Depends(get_current_user_from_session)):
 	if current_user.role == 'tutee':
 		raise HTTPException(status_code=403, detail="Not authorized")
-	items = user_service.get_instructors()
+	items = user_service.get_instructors(view="instructor")
 	return {
 		"status": "success",
 		"count": len(items),
@@ -155,7 +140,7 @@ def list_instructors(current_user: CurrentUser = Depends(get_current_user_from_s
 			"Country": u.Country,
 			"Phone": u.Phone,
 			"Date_of_birth": u.Date_of_birth,
-			"Bio_text": u.Bio_text,
+			"Bio_text": blobs.text(u, "Bio_text"),
 			"Year_of_experience": u.Year_of_experience,
 			"Average_rating":u.Average_rating
 		} for u in items]
@@ -166,7 +151,7 @@ def list_instructors(current_user: CurrentUser = Depends(get_current_user_from_s
 def list_students(current_user: CurrentUser = Depends(get_current_user_from_session)):
 	if current_user.role == 'tutee':
 		raise HTTPException(status_code=403, detail="Not authorized")
-	items = user_service.get_students()
+	items = user_service.get_students(view="student")
 	return {
 		"status": "success",
 		"count": len(items),
@@ -209,7 +194,7 @@ def increment_enrollments(user_id: str, current_user: CurrentUser = Depends(get_
 def search_users(name: str = Query(...), current_user: CurrentUser = Depends(get_current_user_from_session)):
 	if current_user.role == 'tutee':
 		raise HTTPException(status_code=403, detail="Not authorized")
-	items = user_service.search_users_by_name(name)
+	items = user_service.search_users_by_name(name, view=SUMMARY)
 	return {
 		"status": "success",
 		"count": len(items),
@@ -241,8 +226,7 @@ def create_take(data: Dict[str, Any] = Body(...), current_user: CurrentUser = De
 
 @router.get("/takes/{user_id}/progress")
 def get_lesson_progress(user_id: str, current_user: CurrentUser = Depends(get_current_user_from_session)):
-	print("LOGGGGG huhu")
-	print("Current user:", current_user)
+	logger.debug(f"Progress requested for {user_id} by {current_user.user_id}")
 	if current_user.role == 'tutee' and user_id != current_user.user_id:
 		raise HTTPException(status_code=403, detail="Not authorized")
 	stats = take_service.get_lesson_progress(user_id)
@@ -255,7 +239,7 @@ def get_take(user_id: str, lesson_id: str, current_user: CurrentUser = Depends(g
 	if current_user.role == 'tutee' and user_id != current_user.user_id:
 		raise HTTPException(status_code=403, detail="Not authorized")
 	t = take_service.get_take(user_id, lesson_id)
-	print("User ID:", user_id, "Lesson ID:", lesson_id, "Take:", t)
+	logger.debug(f"Take lookup user={user_id} lesson={lesson_id} found={t is not None}")
 	if not t:
 		raise HTTPException(status_code=404, detail="Take not found 1")
 	return {"status": "success", "take": {"UserID": t.UserID, "LessonID": t.LessonID, "is_finished": getattr(t, 'is_finished', None)}}
@@ -380,6 +364,14 @@ def get_instructor_courses(user_id: str, current_user: CurrentUser = Depends(get
 	}
 
 
+@router.get("/instructors/me/dashboard")
+def my_instructor_dashboard(current_user: CurrentUser = Depends(get_current_user_from_session)):
+	"""My courses with enrollment counts and average grades, the grading backlog and recent activity in one call"""
+	if current_user.role != 'tutor':
+		raise HTTPException(status_code=403, detail="Not authorized, requires INSTRUCTOR role")
+	return {"status": "success", **dashboard_service.get_instructor_dashboard(current_user.user_id)}
+
+
 @router.get("/courses/{course_id}/instructors")
 def get_course_instructors(course_id: str, current_user: CurrentUser = Depends(get_current_user_from_session)):
 	if current_user.role == 'tutee':
@@ -1,11 +1,71 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from ..models import get_engine, replicas
+from ..core.profiling import ProfiledRoute
+from ..core import blobstore, config, filestore, health
+from ..core.ratelimit import limiter
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+def check_database():
+    """Round-trip a trivial query through the pool."""
+    with get_engine().connect() as conn:
+        conn.execute(text("SELECT 1")).scalar()
+
+
+def check_pool():
+    """Fail when nearly every pooled connection is checked out."""
+    pool = get_engine().pool
+    if not hasattr(pool, "checkedout"):
+        return {"pool": type(pool).__name__}
+    checked_out = pool.checkedout()
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    capacity = pool.size() + max(max_overflow, 0)
+    details = {"checked_out": checked_out, "capacity": capacity}
+    if max_overflow >= 0 and capacity and checked_out / capacity >= config.HEALTH_POOL_SATURATION:
+        raise RuntimeError(f"connection pool saturated ({checked_out}/{capacity})")
+    return details
+
+
+def check_replicas():
+    """Report replica lag; reads fall back to the primary, so this never fails readiness."""
+    replicas.choose()
+    return {"replicas": replicas.status()}
+
+
+health.register_check("database", check_database)
+health.register_check("pool", check_pool)
+if replicas.configured:
+    health.register_check("replicas", check_replicas)
+if config.RATE_LIMIT_ENABLED and config.RATE_LIMIT_STORE_URL:
+    health.register_check("rate_limit_store", limiter.store.check)
+health.register_check("blob_store", blobstore.store.check)
+health.register_check("resource_store", filestore.store.check)
 
-router = APIRouter()
 
 @router.get("/health")
 def health_check():
     return {"status": "ok"}
 
+
+@router.get("/health/live")
+def liveness():
+    """Process is up; never touches dependencies."""
+    return {"status": "ok", "uptime_seconds": health.uptime_seconds()}
+
+
+@router.get("/health/ready")
+async def readiness():
+    """Dependency checks with per-check latency; 503 when traffic should be shed."""
+    ready, checks = await health.readiness()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "unavailable", "checks": checks},
+    )
+
 @router.get("/")
 def root():
-    return {"message": "Backend is up and running. Navigate to ./docs for Swagger contents"}
\ No newline at end of file
+    return {"message": "Backend is up and running. Navigate to ./docs for Swagger contents"}
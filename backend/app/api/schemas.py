@@ -0,0 +1,79 @@
+"""Response models for list endpoints with large payloads.
+
+Routes declaring these as ``response_model`` can return ORM rows directly;
+FastAPI validates them from attributes and serializes straight to JSON bytes
+in pydantic-core instead of walking nested dicts with ``jsonable_encoder``.
+"""
+from datetime import date, datetime
+from typing import Any, List, Optional
+
+from pydantic import BaseModel, ConfigDict, model_validator
+
+from ..services import blobs
+
+
+class ORMModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UserOut(ORMModel):
+    UserID: str
+    User_name: str
+    Email: str
+    Full_name: Optional[str] = None
+    City: Optional[str] = None
+    Country: Optional[str] = None
+    Phone: Optional[str] = None
+    Date_of_birth: Optional[date] = None
+    Last_login: Optional[datetime] = None
+    IFlag: Optional[bool] = None
+    Bio_text: Optional[str] = None
+    Year_of_experience: Optional[int] = None
+    Average_rating: Optional[float] = None
+    SFlag: Optional[bool] = None
+    Total_enrollments: Optional[int] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _stored_bio(cls, obj: Any) -> Any:
+        # A long Bio_text lives in the blob store and the column is NULL
+        if getattr(obj, "Bio_text_hash", None) is None:
+            return obj
+        data = {name: getattr(obj, name) for name in cls.model_fields}
+        data["Bio_text"] = blobs.text(obj, "Bio_text")
+        return data
+
+
+class UserListResponse(BaseModel):
+    status: str
+    count: int
+    users: List[UserOut]
+
+
+class PaymentOut(ORMModel):
+    PaymentID: str
+    Amount: int
+    Payment_date: Optional[datetime] = None
+    Payment_method: Optional[str] = None
+    UserID: Optional[str] = None
+
+
+class PaymentListResponse(BaseModel):
+    status: str
+    count: int
+    payments: List[PaymentOut]
+
+
+class CourseEnrollmentOut(ORMModel):
+    EnrollmentID: str
+    CourseID: str
+    PaymentID: str
+    StudentID: str
+    Status: Optional[str] = None
+    Enroll_date: Optional[datetime] = None
+
+
+class CourseEnrollmentListResponse(BaseModel):
+    status: str
+    count: int
+    enrollments: List[CourseEnrollmentOut]
@@ -0,0 +1,225 @@
+"""Admission control: per route class concurrency limits with bounded, prioritised queues.
+
+Sync endpoints all share one threadpool (THREADPOOL_SIZE threads), so a burst
+of slow report queries can hold every thread while logins queue behind them.
+Each ``/api`` request is put in a route class (auth, catalog, writes,
+reports, downloads). A class runs at most ``limit`` requests at once, and all
+classes together at most THREADPOOL_SIZE. Downloads are the exception: they
+spend most of their time waiting on the client, so they are bounded only by
+their own limit. Requests over the limit wait in their
+class's queue. When a slot frees up, the waiting class with the best (lowest)
+priority goes first, so interactive traffic overtakes reports. A request
+that finds its queue full, or waits longer than the class's ``timeout``, is
+shed straight away with 503 and a Retry-After estimated from recent service
+times. Admin and health routes are never queued.
+
+All bookkeeping happens on the event loop, so it needs no locks.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from . import config
+from .logger import get_logger
+from .ratelimit import path_pattern
+
+logger = get_logger("ADMISSION")
+
+AUTH = "auth"
+CATALOG = "catalog"
+WRITES = "writes"
+REPORTS = "reports"
+DOWNLOADS = "downloads"
+
+
+@dataclass
+class RouteClass:
+    name: str
+    limit: int              # requests of this class running at once
+    max_queue: int          # waiting requests before new ones are shed
+    timeout: float          # seconds a request may wait for a slot
+    priority: int           # lower goes first when a slot frees up
+    threadpool: bool = True     # counts against THREADPOOL_SIZE; False for requests spent mostly waiting on the client
+    active: int = 0
+    admitted: int = 0
+    queued: int = 0
+    shed_queue_full: int = 0
+    shed_timeout: int = 0
+    wait_ms_total: float = 0.0
+    wait_ms_max: float = 0.0
+    service_ms: float = 0.0           # moving average, for Retry-After
+    waiting: Deque[asyncio.Future] = field(default_factory=deque, repr=False)
+
+    @classmethod
+    def parse(cls, name: str, spec: str, priority: int, threadpool: bool = True) -> "RouteClass":
+        """``"8/100/2"``: 8 at once, up to 100 waiting, each for at most 2 seconds."""
+        limit, max_queue, timeout = spec.split("/")
+        return cls(name=name, limit=int(limit), max_queue=int(max_queue), timeout=float(timeout), priority=priority,
+                   threadpool=threadpool)
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue has probably drained."""
+        per_request = (self.service_ms or 1000.0) / 1000.0
+        return max(1, math.ceil(per_request * (len(self.waiting) + 1) / max(1, self.limit)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "limit": self.limit, "max_queue": self.max_queue, "timeout_seconds": self.timeout,
+                "priority": self.priority, "threadpool": self.threadpool, "active": self.active, "waiting": len(self.waiting),
+                "admitted": self.admitted, "queued": self.queued,
+                "shed": {"queue_full": self.shed_queue_full, "timeout": self.shed_timeout},
+                "wait_ms_avg": round(self.wait_ms_total / self.queued, 3) if self.queued else 0.0,
+                "wait_ms_max": round(self.wait_ms_max, 3), "service_ms_avg": round(self.service_ms, 3)}
+
+
+class AdmissionController:
+    def __init__(self, capacity: int, classes: List[RouteClass], rules: List[Tuple[str, str, str]],
+                 default_read: str, default_write: str, prefix: str = "/api", exempt: Tuple[str, ...] = ()):
+        self.capacity = capacity
+        self.classes = {route_class.name: route_class for route_class in classes}
+        self._by_priority = sorted(classes, key=lambda route_class: route_class.priority)
+        self._rules = [(method, path_pattern(path), name) for method, path, name in rules]
+        self.default_read = default_read
+        self.default_write = default_write
+        self.prefix = prefix
+        self.exempt = exempt
+        self.active = 0
+
+    def classify(self, method: str, path: str) -> Optional[RouteClass]:
+        if not path.startswith(self.prefix) or path.startswith(self.exempt):
+            return None
+        for rule_method, pattern, name in self._rules:
+            if rule_method in ("*", method) and pattern.match(path):
+                return self.classes[name]
+        return self.classes[self.default_read if method in ("GET", "HEAD") else self.default_write]
+
+    def _can_start(self, route_class: RouteClass) -> bool:
+        return route_class.active < route_class.limit and (not route_class.threadpool or self.active < self.capacity)
+
+    def _start(self, route_class: RouteClass) -> None:
+        route_class.active += 1
+        route_class.admitted += 1
+        self.active += route_class.threadpool
+
+    async def acquire(self, route_class: RouteClass) -> bool:
+        """Wait for a slot; False when the request was shed."""
+        # Only classes competing for the same slots can be ahead
+        ahead = any(other.waiting for other in self._by_priority if other.priority <= route_class.priority
+                    and (other is route_class or other.threadpool and route_class.threadpool))
+        if not ahead and self._can_start(route_class):
+            self._start(route_class)
+            return True
+        if len(route_class.waiting) >= route_class.max_queue:
+            route_class.shed_queue_full += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        route_class.waiting.append(waiter)
+        route_class.queued += 1
+        self._dispatch()   # the waiters ahead may be stuck on their own class limit, not on capacity
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, route_class.timeout)
+        except asyncio.TimeoutError:
+            route_class.shed_timeout += 1
+            return False
+        except asyncio.CancelledError:
+            # Client went away; hand back a slot that was granted in the meantime
+            if waiter.done() and not waiter.cancelled():
+                self.release(route_class, 0.0)
+            raise
+        finally:
+            if waiter in route_class.waiting:
+                route_class.waiting.remove(waiter)
+            waited = (time.perf_counter() - started) * 1000
+            route_class.wait_ms_total += waited
+            route_class.wait_ms_max = max(route_class.wait_ms_max, waited)
+        return True
+
+    def release(self, route_class: RouteClass, service_ms: float) -> None:
+        route_class.active -= 1
+        self.active -= route_class.threadpool
+        if service_ms:
+            route_class.service_ms = service_ms if not route_class.service_ms else \
+                0.9 * route_class.service_ms + 0.1 * service_ms
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiters, best priority first and FIFO within a class."""
+        for route_class in self._by_priority:
+            while route_class.waiting and self._can_start(route_class):
+                waiter = route_class.waiting.popleft()
+                if waiter.done():   # timed out or cancelled
+                    continue
+                self._start(route_class)
+                waiter.set_result(True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"capacity": self.capacity, "active": self.active,
+                "shed": sum(c.shed_queue_full + c.shed_timeout for c in self.classes.values()),
+                "classes": [route_class.stats() for route_class in self._by_priority]}
+
+
+class AdmissionMiddleware:
+    """ASGI middleware holding a slot of the request's route class until the response is sent."""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        route_class = self.controller.classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.controller.acquire(route_class):
+            logger.debug(f"Shed {scope['method']} {scope['path']} ({route_class.name}: "
+                           f"{route_class.active} running, {len(route_class.waiting)} waiting)")
+            body = b'{"detail":"Server busy, retry later"}'
+            await send({"type": "http.response.start", "status": 503, "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(route_class.retry_after()).encode()),
+            ]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route_class, (time.perf_counter() - started) * 1000)
+
+
+controller = AdmissionController(
+    capacity=config.THREADPOOL_SIZE,
+    classes=[
+        RouteClass.parse(AUTH, config.ADMISSION_AUTH, priority=0),
+        RouteClass.parse(CATALOG, config.ADMISSION_CATALOG, priority=1),
+        RouteClass.parse(WRITES, config.ADMISSION_WRITES, priority=1),
+        RouteClass.parse(REPORTS, config.ADMISSION_REPORTS, priority=2),
+        # A download holds its slot while a slow client reads, but only touches the threadpool between chunks
+        RouteClass.parse(DOWNLOADS, config.ADMISSION_DOWNLOADS, priority=1, threadpool=False),
+    ],
+    rules=[
+        ("*", "/api/auth/login", AUTH),
+        ("*", "/api/auth/logout", AUTH),
+        ("GET", "/api/users/me", AUTH),
+        # Stored procedures, SQL functions and whole-table listings
+        ("GET", "/api/modules/{module_id}/quiz-stats", REPORTS),
+        ("GET", "/api/courses/{course_id}/progress", REPORTS),
+        ("GET", "/api/enrollments/me/stats", REPORTS),
+        ("GET", "/api/courses/{course_id}/enrollments", REPORTS),
+        ("GET", "/api/payments", REPORTS),
+        ("GET", "/api/payments/user/{user_id}", REPORTS),
+        ("GET", "/api/resources/count", REPORTS),
+        ("GET", "/api/resources/{resource_id}/download", DOWNLOADS),
+        ("HEAD", "/api/resources/{resource_id}/download", DOWNLOADS),
+    ],
+    default_read=CATALOG,
+    default_write=WRITES,
+    exempt=("/api/admin",),
+)
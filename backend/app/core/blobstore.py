@@ -0,0 +1,161 @@
+"""Content-addressed store for large text bodies, on the local filesystem.
+
+A body is keyed by the SHA-256 of its UTF-8 bytes, so the same text is stored
+once however many rows point at it. Blobs are compressed (zstd when the
+``zstandard`` package is installed, gzip otherwise) and written to
+``BLOB_DIR/ab/cd/<hash>.<codec>`` through a temporary file and ``os.replace``:
+readers never see half a blob, and two workers writing the same body end up
+with the same file. The codec is part of the file name, so changing
+BLOB_CODEC leaves existing blobs readable.
+
+``iter_text`` decompresses and decodes as it reads, so a body can be streamed
+to a client without holding it in memory. ``read_text`` returns the whole
+body and keeps recent ones up to CACHE_MAX_CHARS in an LRU. Entries never go
+stale, because a hash always names the same text.
+
+Blobs are never deleted here: rows share them, and a blob written by a
+transaction that later rolled back is only wasted space.
+"""
+import codecs
+import contextlib
+import gzip
+import hashlib
+import os
+import string
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional, Tuple
+
+from . import config, health
+from .cache import TTLCache
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CHUNK_SIZE = 64 * 1024
+CACHE_MAX_CHARS = 256 * 1024    # longer bodies are read from disk every time
+
+
+class BlobNotFound(LookupError):
+    """No blob is stored under the hash."""
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    hash: str
+    size: int       # UTF-8 bytes before compression
+
+
+def _zstd_open(path: str) -> BinaryIO:
+    return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+
+
+# File suffix -> (compress(data, level), open decompressing reader)
+_codecs: Dict[str, Tuple[Callable[[bytes, int], bytes], Callable[[str], BinaryIO]]] = {
+    "gz": (lambda data, level: gzip.compress(data, compresslevel=level, mtime=0), lambda path: gzip.open(path, "rb")),
+}
+if zstandard is not None:
+    _codecs["zst"] = (lambda data, level: zstandard.ZstdCompressor(level=level).compress(data), _zstd_open)
+
+
+class LocalBlobStore:
+    def __init__(self, root: str, codec: str = "zstd", level: int = 6, cache_size: int = 512):
+        self.root = root
+        self.suffix = "zst" if codec == "zstd" and "zst" in _codecs else "gz"
+        self.level = max(1, min(9, level))
+        self._cache = TTLCache(maxsize=cache_size, ttl=None)
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.deduplicated = 0
+        self.bytes_in = 0
+        self.bytes_stored = 0
+
+    def _path(self, digest: str, suffix: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.{suffix}")
+
+    def _find(self, digest: str) -> Optional[str]:
+        if len(digest) != 64 or not set(digest) <= set(string.hexdigits):
+            return None
+        for suffix in (self.suffix, *(other for other in _codecs if other != self.suffix)):
+            path = self._path(digest, suffix)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def exists(self, digest: str) -> bool:
+        return self._find(digest) is not None
+
+    def put(self, text: str) -> BlobRef:
+        """Store ``text`` unless an identical body is already stored."""
+        data = text.encode("utf-8")
+        ref = BlobRef(hash=hashlib.sha256(data).hexdigest(), size=len(data))
+        if self._find(ref.hash) is not None:
+            with self._lock:
+                self.deduplicated += 1
+            return ref
+
+        path = self._path(ref.hash, self.suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = _codecs[self.suffix][0](data, self.level)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(compressed)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+        with self._lock:
+            self.writes += 1
+            self.bytes_in += len(data)
+            self.bytes_stored += len(compressed)
+        return ref
+
+    def open(self, digest: str) -> BinaryIO:
+        """Binary reader over the decompressed body."""
+        path = self._find(digest)
+        if path is None:
+            raise BlobNotFound(digest)
+        return _codecs[path.rsplit(".", 1)[1]][1](path)
+
+    def iter_text(self, digest: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+        """The body as decoded text chunks, read ``chunk_size`` bytes at a time."""
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        with self.open(digest) as fh:
+            while True:
+                block = fh.read(chunk_size)
+                if not block:
+                    break
+                text = decoder.decode(block)
+                if text:
+                    yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def read_text(self, digest: str) -> str:
+        text = self._cache.get(digest)
+        if text is None:
+            with self.open(digest) as fh:
+                text = fh.read().decode("utf-8")
+            if len(text) <= CACHE_MAX_CHARS:
+                self._cache.set(digest, text)
+        return text
+
+    def check(self) -> Dict[str, Any]:
+        return health.check_writable(self.root)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"root": self.root, "codec": self.suffix, "writes": self.writes, "deduplicated": self.deduplicated,
+                "bytes_in": self.bytes_in, "bytes_stored": self.bytes_stored,
+                "ratio": round(self.bytes_stored / self.bytes_in, 3) if self.bytes_in else None,
+                "cache": self._cache.stats()}
+
+
+store = LocalBlobStore(config.BLOB_DIR, config.BLOB_CODEC, config.BLOB_COMPRESS_LEVEL, config.BLOB_CACHE_SIZE)
@@ -0,0 +1,163 @@
+import gzip
+import hashlib
+from typing import Callable, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from . import config
+from .cache import TTLCache
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Levels are configured as a 1-9 effort and spread over each codec's own range:
+# gzip 1-9, brotli quality 1-11, zstd 1-19 (20-22 are "ultra" levels, too slow for responses)
+_LEVEL_RANGES: Dict[str, Tuple[int, int]] = {"gzip": (1, 9), "br": (1, 11), "zstd": (1, 19)}
+
+
+def codec_level(encoding: str, level: int) -> int:
+    low, high = _LEVEL_RANGES[encoding]
+    level = max(1, min(9, level))
+    return low + round((level - 1) * (high - low) / 8)
+
+
+_codecs: Dict[str, Callable[[bytes, int], bytes]] = {"gzip": lambda data, level: gzip.compress(data, compresslevel=level, mtime=0)}
+if brotli is not None:
+    _codecs["br"] = lambda data, level: brotli.compress(data, quality=level)
+if zstandard is not None:
+    _codecs["zstd"] = lambda data, level: zstandard.ZstdCompressor(level=level).compress(data)
+
+_COMPRESSIBLE = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def _parse_route_levels(spec: str) -> Dict[str, int]:
+    """Parse ``"/api/courses=9,/api/users=4"`` into {path prefix: level}."""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        prefix, _, level = item.partition("=")
+        levels[prefix.strip()] = max(1, min(9, int(level)))
+    return levels
+
+
+def negotiate(accept_encoding: str, preference) -> Optional[str]:
+    """Pick the client's highest-q encoding we support, ties broken by server preference."""
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            weights[name] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for name in preference:
+        q = weights.get(name, wildcard)
+        if name in _codecs and q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing buffered text/JSON responses above ``min_size``.
+
+    Responses carrying an ETag are compressed once per (path, ETag, encoding, body
+    digest) and served from a TTL cache afterwards. The digest is part of the key
+    because an ETag alone may outlive the data it was issued for; streaming bodies
+    and responses offering byte ranges pass through untouched.
+    """
+
+    def __init__(self, app, min_size: int = None, level: int = None, route_levels: Dict[str, int] = None,
+                 preference: Tuple[str, ...] = None, cache: TTLCache = None):
+        self.app = app
+        self.min_size = config.COMPRESSION_MIN_SIZE if min_size is None else min_size
+        self.level = config.COMPRESSION_LEVEL if level is None else level
+        route_levels = _parse_route_levels(config.COMPRESSION_ROUTE_LEVELS) if route_levels is None else route_levels
+        self.route_levels = sorted(route_levels.items(), key=lambda item: len(item[0]), reverse=True)
+        self.preference = preference or tuple(e.strip() for e in config.COMPRESSION_ENCODINGS.split(",") if e.strip())
+        self.cache = cache if cache is not None else TTLCache(config.COMPRESSION_CACHE_SIZE, config.COMPRESSION_CACHE_TTL)
+
+    def level_for(self, path: str) -> int:
+        for prefix, level in self.route_levels:
+            if path.startswith(prefix):
+                return level
+        return self.level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.preference)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if message.get("more_body", False) or not self._eligible(start["status"], headers, body):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            etag = headers.get("etag")
+            level = self.level_for(scope["path"])
+            key = None
+            if etag:
+                digest = hashlib.blake2b(body, digest_size=16).digest()
+                key = (scope["path"], scope.get("query_string", b""), etag, encoding, level, digest)
+            compressed = self.cache.get(key) if key else None
+            if compressed is None:
+                compressed = _codecs[encoding](body, codec_level(encoding, level))
+                if key:
+                    self.cache.set(key, compressed)
+
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"   # the compressed bytes are a different representation
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _eligible(self, status: int, headers: MutableHeaders, body: bytes) -> bool:
+        if status < 200 or status in (204, 206, 304) or len(body) < self.min_size:
+            return False
+        if "content-encoding" in headers or "no-transform" in headers.get("cache-control", ""):
+            return False
+        # Byte ranges address the stored bytes: compressing would weaken the ETag, so a
+        # later Range + If-Range no longer matches and the client downloads the whole file
+        if "content-range" in headers or headers.get("accept-ranges", "none") != "none":
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(_COMPRESSIBLE)
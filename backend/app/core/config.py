@@ -0,0 +1,145 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Readiness probe (/health/ready)
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2.0"))          # seconds per dependency check
+HEALTH_POOL_SATURATION = float(os.getenv("HEALTH_POOL_SATURATION", "0.9"))      # checked-out / capacity ratio
+HEALTH_MAX_INFLIGHT = int(os.getenv("HEALTH_MAX_INFLIGHT", "64"))               # concurrent requests before shedding
+
+# Logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()                          # "text" or "json"
+LOG_MODULE_LEVELS = os.getenv("LOG_MODULE_LEVELS", "")                         # e.g. "LOGIN=WARNING,COURSE_SERVICE=DEBUG"
+LOG_ENQUEUE = os.getenv("LOG_ENQUEUE", "true").lower() == "true"              # write from a background thread
+LOG_DIAGNOSE = os.getenv("LOG_DIAGNOSE", "false").lower() == "true"           # variable values in tracebacks
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))                 # fraction kept for per-request debug events
+
+# Request profiling (/api/admin/profiles)
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "X-Profile")                      # admin-only opt-in header
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.0"))          # fraction of all requests profiled
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "50"))             # profiles kept in memory
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1.0"))          # stack sampling interval
+
+# Conditional GET on catalog/course pages
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+HTTP_CACHE_CATALOG_POLICY = os.getenv("HTTP_CACHE_CATALOG_POLICY", "private, max-age=30")    # /courses listing
+HTTP_CACHE_COURSE_POLICY = os.getenv("HTTP_CACHE_COURSE_POLICY", "private, no-cache")       # revalidate course pages every time
+
+# Response compression
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))          # bytes; smaller bodies go out as-is
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "5"))                   # 1-9 effort, scaled to each codec's range
+COMPRESSION_ROUTE_LEVELS = os.getenv("COMPRESSION_ROUTE_LEVELS", "/api/courses=9,/api/modules=9")   # cached catalog pages pay once
+COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip")     # server preference order
+COMPRESSION_CACHE_SIZE = int(os.getenv("COMPRESSION_CACHE_SIZE", "512"))       # precompressed bodies kept
+COMPRESSION_CACHE_TTL = float(os.getenv("COMPRESSION_CACHE_TTL", "300"))       # seconds
+
+# Production server (python -m app.serve)
+DEBUG = os.getenv("DEBUG", "false").lower() == "true"                         # dev reloader in app.main
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "0"))                       # worker processes; 0 = one per core
+SERVER_LOOP = os.getenv("SERVER_LOOP", "auto")                                 # "auto" picks uvloop when installed
+SERVER_HTTP = os.getenv("SERVER_HTTP", "auto")                                 # "auto" picks httptools when installed
+SERVER_PRELOAD = os.getenv("SERVER_PRELOAD", "true").lower() == "true"        # import the app once before forking
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))                      # pending connections on the listen socket
+SERVER_KEEPALIVE = int(os.getenv("SERVER_KEEPALIVE", "5"))                     # idle keep-alive seconds
+SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "0"))               # recycle a worker after N requests; 0 = never
+SERVER_MAX_REQUESTS_JITTER = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "0")) # spread recycling so workers don't restart together
+SERVER_DRAIN_SECONDS = float(os.getenv("SERVER_DRAIN_SECONDS", "5"))          # readiness fails this long before the listener closes
+SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))      # whole shutdown budget per worker, drain included
+SERVER_WORKER_TIMEOUT = int(os.getenv("SERVER_WORKER_TIMEOUT", "60"))          # silent workers are killed and replaced
+
+# Read replicas (DATABASE_REPLICA_URLS in app.models)
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))    # replicas further behind serve no reads
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "1"))      # seconds between heartbeat/lag checks
+
+# Domain events (core.events bus, OUTBOX_EVENT relay in services.events)
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "1000"))                  # events buffered per async subscriber
+EVENT_PUBLISH_TIMEOUT = float(os.getenv("EVENT_PUBLISH_TIMEOUT", "0.05"))     # seconds a writer waits on a full queue before dropping
+EVENT_BATCH_SIZE = int(os.getenv("EVENT_BATCH_SIZE", "100"))                   # default batch handed to async subscribers
+EVENT_BATCH_WAIT = float(os.getenv("EVENT_BATCH_WAIT", "0.05"))               # seconds an async batch waits to fill
+OUTBOX_RELAY_INTERVAL = float(os.getenv("OUTBOX_RELAY_INTERVAL", "1"))        # seconds between relay passes
+OUTBOX_RELAY_BATCH = int(os.getenv("OUTBOX_RELAY_BATCH", "200"))               # acks per UPDATE / rows claimed per pass
+OUTBOX_REDELIVER_AFTER = float(os.getenv("OUTBOX_REDELIVER_AFTER", "60"))     # undelivered this long (or claim this old) = republish
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))              # redeliveries before a row is left for an operator
+OUTBOX_RETENTION_HOURS = float(os.getenv("OUTBOX_RETENTION_HOURS", "24"))     # dispatched rows kept this long; 0 = forever
+
+# Background jobs (core.scheduler, JOB_LEASE leases in services.jobs)
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"  # run scheduled jobs in this process
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "2"))                   # jobs that may run at the same time
+SCHEDULER_INITIAL_DELAY = float(os.getenv("SCHEDULER_INITIAL_DELAY", "10"))   # seconds after startup before the first runs
+SCHEDULER_LEASE_SECONDS = float(os.getenv("SCHEDULER_LEASE_SECONDS", "300"))  # a worker that dies mid-run blocks the job this long
+SCHEDULER_HISTORY = int(os.getenv("SCHEDULER_HISTORY", "20"))                  # runs kept per job for /api/admin/jobs
+DEADLINE_SWEEP_INTERVAL = float(os.getenv("DEADLINE_SWEEP_INTERVAL", "300"))  # seconds between deadline reminder sweeps
+REMINDER_LEAD_HOURS = float(os.getenv("REMINDER_LEAD_HOURS", "24"))           # remind this long before a deadline
+EXPIRY_SWEEP_INTERVAL = float(os.getenv("EXPIRY_SWEEP_INTERVAL", "3600"))     # seconds between certificate expiry sweeps
+
+# Certificate issuance (certificate_issuance job)
+CERTIFICATE_ISSUE_INTERVAL = float(os.getenv("CERTIFICATE_ISSUE_INTERVAL", "300"))  # seconds between issuance passes
+CERTIFICATE_ISSUE_BATCH = int(os.getenv("CERTIFICATE_ISSUE_BATCH", "500"))     # certificates per INSERT/transaction
+CERTIFICATE_VALID_DAYS = int(os.getenv("CERTIFICATE_VALID_DAYS", "0"))        # expiry after issue; 0 = never expires
+
+# Signed certificate numbers (core.signing, /api/certificates/verify)
+CERTIFICATE_SIGNING_KEY = os.getenv("CERTIFICATE_SIGNING_KEY", "mudemy-dev-certificate-key")  # set a long random secret in production
+CERTIFICATE_KEY_ID = int(os.getenv("CERTIFICATE_KEY_ID", "1"))               # 0-255, embedded in every number
+CERTIFICATE_RETIRED_KEYS = os.getenv("CERTIFICATE_RETIRED_KEYS", "")          # "id:secret,..." still accepted after a rotation
+CERTIFICATE_SIGNATURE_BYTES = int(os.getenv("CERTIFICATE_SIGNATURE_BYTES", "8"))  # truncated HMAC; 8 keeps numbers within 64 chars
+REVOCATION_REFRESH_INTERVAL = float(os.getenv("REVOCATION_REFRESH_INTERVAL", "60"))  # seconds between revocation set reloads
+
+# Checkout idempotency keys (IDEMPOTENCY_KEY, services.idempotency)
+IDEMPOTENCY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))       # a key can be replayed this long
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "100000"))        # purge trims the oldest keys beyond this
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))     # recent responses kept in memory per worker
+IDEMPOTENCY_CACHE_SECONDS = float(os.getenv("IDEMPOTENCY_CACHE_SECONDS", "600"))  # in-memory copies are dropped after this
+IDEMPOTENCY_PURGE_INTERVAL = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", "900"))  # seconds between purge passes
+
+# Rate limiting (core.ratelimit); limits are "requests/seconds": a bucket of that many, refilled over that long
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_STORE_URL = os.getenv("RATE_LIMIT_STORE_URL", "")                  # "" = per-worker buckets; sqlite:///path shares them
+RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "300/60")                # any other /api request, per user or IP
+RATE_LIMIT_LOGIN = os.getenv("RATE_LIMIT_LOGIN", "20/300")                    # POST /api/auth/login, per IP
+RATE_LIMIT_SUBMIT = os.getenv("RATE_LIMIT_SUBMIT", "30/60")                   # quiz and assignment submissions, per user
+RATE_LIMIT_CHECKOUT = os.getenv("RATE_LIMIT_CHECKOUT", "10/60")               # POST /api/checkout, per user
+RATE_LIMIT_MAX_BUCKETS = int(os.getenv("RATE_LIMIT_MAX_BUCKETS", "100000"))   # in-process buckets / cached tokens per worker
+RATE_LIMIT_TOKEN_CACHE_SECONDS = float(os.getenv("RATE_LIMIT_TOKEN_CACHE_SECONDS", "60"))  # a token is verified once per this
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"  # key on X-Forwarded-For (behind a proxy)
+
+# Dashboards (services.dashboard_service)
+DASHBOARD_CACHE_SIZE = int(os.getenv("DASHBOARD_CACHE_SIZE", "10000"))         # dashboards kept in memory per worker
+DASHBOARD_CACHE_SECONDS = float(os.getenv("DASHBOARD_CACHE_SECONDS", "60"))    # bounds staleness in workers that missed the event
+DASHBOARD_DEADLINE_DAYS = float(os.getenv("DASHBOARD_DEADLINE_DAYS", "14"))    # how far ahead "upcoming deadlines" looks
+DASHBOARD_DEADLINE_LIMIT = int(os.getenv("DASHBOARD_DEADLINE_LIMIT", "20"))    # deadlines listed at most
+DASHBOARD_ACTIVITY_LIMIT = int(os.getenv("DASHBOARD_ACTIVITY_LIMIT", "20"))    # recent enrollments/submissions on the instructor dashboard
+
+# Grading queue and batch grading (GRADING_LEASE, services.grading_service)
+GRADING_LEASE_SECONDS = float(os.getenv("GRADING_LEASE_SECONDS", "900"))      # a claimed submission returns to the queue after this
+GRADING_CLAIM_MAX = int(os.getenv("GRADING_CLAIM_MAX", "50"))                  # submissions one claim may lease
+GRADE_BATCH_MAX = int(os.getenv("GRADE_BATCH_MAX", "5000"))                    # items one POST /grades/batch may carry
+
+# Blob store for large text columns (core.blobstore, services.blobs)
+BLOB_DIR = os.getenv("BLOB_DIR", "blobs")                                     # root of the local blob store
+BLOB_INLINE_MAX = int(os.getenv("BLOB_INLINE_MAX", "4000"))                   # longer bodies (characters) leave the row
+BLOB_CODEC = os.getenv("BLOB_CODEC", "zstd").lower()                          # "zstd" (falls back to gzip) or "gzip"
+BLOB_COMPRESS_LEVEL = int(os.getenv("BLOB_COMPRESS_LEVEL", "6"))              # 1-9 effort
+BLOB_CACHE_SIZE = int(os.getenv("BLOB_CACHE_SIZE", "512"))                    # decoded bodies kept in memory per worker
+BLOB_MIGRATE_BATCH = int(os.getenv("BLOB_MIGRATE_BATCH", "500"))              # rows per transaction in python -m app.migrate_blobs
+
+# Resource files (core.filestore, GET /api/resources/{id}/download)
+RESOURCE_STORE = os.getenv("RESOURCE_STORE", "local")                        # storage backend; "local" keeps files under RESOURCE_DIR
+RESOURCE_DIR = os.getenv("RESOURCE_DIR", "resources")                         # File_link "/res/a.pdf" is RESOURCE_DIR/res/a.pdf
+RESOURCE_OPEN_FILES = int(os.getenv("RESOURCE_OPEN_FILES", "128"))            # file descriptors kept open per worker for hot files
+RESOURCE_CHUNK_SIZE = int(os.getenv("RESOURCE_CHUNK_SIZE", str(256 * 1024)))  # bytes per read when the server cannot send the file itself
+RESOURCE_MAX_UPLOAD = int(os.getenv("RESOURCE_MAX_UPLOAD", str(512 * 1024 * 1024)))  # bytes one PUT /resources/{id}/file may carry
+RESOURCE_CACHE_POLICY = os.getenv("RESOURCE_CACHE_POLICY", "private, no-cache")  # clients revalidate with the ETag
+
+# Admission control (core.admission); classes are "running/queued/seconds": concurrent requests,
+# waiting requests and seconds a request may wait before it is shed with 503
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))                      # threads for sync endpoints = requests admitted at once
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_AUTH = os.getenv("ADMISSION_AUTH", "8/200/2")                       # login, logout, /users/me; served first
+ADMISSION_CATALOG = os.getenv("ADMISSION_CATALOG", "32/400/3")                # other reads
+ADMISSION_WRITES = os.getenv("ADMISSION_WRITES", "16/200/5")                  # other POST/PUT/DELETE
+ADMISSION_REPORTS = os.getenv("ADMISSION_REPORTS", "4/20/10")                 # stats, stored procedures, full listings; served last
+ADMISSION_DOWNLOADS = os.getenv("ADMISSION_DOWNLOADS", "64/256/5")           # resource file downloads; outside the threadpool capacity
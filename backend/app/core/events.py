@@ -0,0 +1,208 @@
+"""In-process publish/subscribe for domain events.
+
+Synchronous subscribers run in the publishing thread right after the write
+commits. Asynchronous subscribers get their own bounded queue and a worker
+thread that hands them events in batches; when a queue is full the publisher
+waits up to EVENT_PUBLISH_TIMEOUT (back-pressure on writers) and then drops
+the event for that subscriber. ``publish`` reports whether every subscriber
+took the event, and the optional ``on_done`` callback fires once every
+subscriber has handled it without raising, which is what the outbox relay
+waits for before marking an event delivered.
+"""
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import config
+from .logger import get_logger
+
+logger = get_logger("EVENTS")
+
+SYNC = "sync"
+ASYNC = "async"
+
+_STOP = object()
+
+
+class _Delivery:
+    """Counts outstanding subscribers for one published event."""
+
+    __slots__ = ("remaining", "failed", "on_done", "_lock")
+
+    def __init__(self, remaining: int, on_done: Optional[Callable[[], None]]):
+        self.remaining = remaining
+        self.failed = False
+        self.on_done = on_done
+        self._lock = threading.Lock()
+
+    def settle(self, ok: bool) -> None:
+        with self._lock:
+            self.failed = self.failed or not ok
+            self.remaining -= 1
+            done = self.remaining == 0 and not self.failed
+        if done and self.on_done is not None:
+            try:
+                self.on_done()
+            except Exception as e:
+                logger.error(f"Event completion callback failed: {e}")
+
+
+@dataclass
+class Subscription:
+    event_type: type
+    handler: Callable
+    mode: str = SYNC
+    batch_size: int = 1
+    max_wait: float = 0.0
+    name: str = ""
+    delivered: int = 0
+    failed: int = 0
+    dropped: int = 0
+    _queue: Optional[queue.Queue] = field(default=None, repr=False)
+    _thread: Optional[threading.Thread] = field(default=None, repr=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"handler": self.name, "event": self.event_type.__name__, "mode": self.mode,
+                "batch_size": self.batch_size, "queued": self._queue.qsize() if self._queue else 0,
+                "delivered": self.delivered, "failed": self.failed, "dropped": self.dropped}
+
+
+class EventBus:
+    """Dispatches events to the subscribers registered for their type (or a base class of it)."""
+
+    def __init__(self):
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self.published = 0
+
+    def subscribe(self, event_type: type, handler: Callable = None, *, mode: str = SYNC,
+                  batch_size: int = None, max_wait: float = None):
+        """Register ``handler`` for ``event_type``; usable as a decorator.
+
+        Sync handlers take one event. Async handlers take a list of up to
+        ``batch_size`` events, collected for at most ``max_wait`` seconds.
+        """
+        if handler is None:
+            return lambda fn: self.subscribe(event_type, fn, mode=mode, batch_size=batch_size, max_wait=max_wait)
+        if mode not in (SYNC, ASYNC):
+            raise ValueError(f"Unknown subscriber mode: {mode}")
+        subscription = Subscription(
+            event_type=event_type,
+            handler=handler,
+            mode=mode,
+            batch_size=max(1, batch_size or (config.EVENT_BATCH_SIZE if mode == ASYNC else 1)),
+            max_wait=config.EVENT_BATCH_WAIT if max_wait is None else max_wait,
+            name=getattr(handler, "__qualname__", repr(handler)),
+        )
+        with self._lock:
+            self._subscriptions.append(subscription)
+            if self._pid is not None and mode == ASYNC:
+                self._start_worker(subscription)
+        return handler
+
+    def publish(self, event: Any, on_done: Optional[Callable[[], None]] = None) -> bool:
+        """Deliver ``event``; False when an async subscriber's queue stayed full and the event was dropped."""
+        self._ensure_started()
+        targets = [s for s in self._subscriptions if isinstance(event, s.event_type)]
+        self.published += 1
+        if not targets:
+            if on_done is not None:
+                on_done()
+            return True
+
+        delivery = _Delivery(len(targets), on_done)
+        accepted = True
+        for subscription in targets:
+            if subscription.mode == SYNC:
+                delivery.settle(self._call(subscription, subscription.handler, event, 1))
+                continue
+            try:
+                subscription._queue.put((event, delivery), timeout=config.EVENT_PUBLISH_TIMEOUT)
+            except queue.Full:
+                subscription.dropped += 1
+                accepted = False
+                logger.warning(f"Dropped {type(event).__name__} for {subscription.name}: queue full")
+                delivery.settle(False)
+        return accepted
+
+    def _call(self, subscription: Subscription, handler: Callable, payload: Any, count: int) -> bool:
+        try:
+            handler(payload)
+        except Exception as e:
+            subscription.failed += count
+            logger.error(f"Event handler {subscription.name} failed: {e}")
+            return False
+        subscription.delivered += count
+        return True
+
+    # ------------------------------------------------------------------
+    # Async workers
+    # ------------------------------------------------------------------
+    def _ensure_started(self) -> None:
+        # Threads do not survive fork; a forked worker starts its own on first publish
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            for subscription in self._subscriptions:
+                if subscription.mode == ASYNC:
+                    self._start_worker(subscription)
+
+    def _start_worker(self, subscription: Subscription) -> None:
+        subscription._queue = queue.Queue(maxsize=config.EVENT_QUEUE_SIZE)
+        subscription._thread = threading.Thread(target=self._run, args=(subscription,),
+                                                name=f"events-{subscription.name}", daemon=True)
+        subscription._thread.start()
+
+    def _run(self, subscription: Subscription) -> None:
+        q = subscription._queue
+        while True:
+            item = q.get()
+            if item is _STOP:
+                return
+            batch: List[Tuple[Any, _Delivery]] = [item]
+            deadline = time.monotonic() + subscription.max_wait
+            stop = False
+            while len(batch) < subscription.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = q.get(timeout=remaining) if remaining > 0 else q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            ok = self._call(subscription, subscription.handler, [event for event, _ in batch], len(batch))
+            for _, delivery in batch:
+                delivery.settle(ok)
+            if stop:
+                return
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Let async subscribers drain what is queued, then stop their threads."""
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            workers = [s for s in self._subscriptions if s.mode == ASYNC and s._thread is not None]
+            for subscription in workers:
+                try:
+                    subscription._queue.put(_STOP, timeout=timeout)
+                except queue.Full:
+                    logger.warning(f"Event queue for {subscription.name} still full at shutdown")
+            deadline = time.monotonic() + timeout
+            for subscription in workers:
+                subscription._thread.join(max(0.0, deadline - time.monotonic()))
+            self._pid = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"published": self.published, "subscribers": [s.stats() for s in self._subscriptions]}
+
+
+bus = EventBus()
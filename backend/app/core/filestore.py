@@ -0,0 +1,222 @@
+"""Storage for resource files (RESOURCE.File_link).
+
+A File_link such as ``/res/[RES002]react-hooks-cheat.pdf`` is a key in the
+configured ``FileStore``. ``LocalFileStore`` keeps it at
+``RESOURCE_DIR/res/[RES002]react-hooks-cheat.pdf``. Keys are checked so they
+cannot climb out of the root.
+
+Serving a file (``core.responses.FileRangeResponse``) takes a ``FileHandle``
+from ``acquire`` and gives it back with ``release``. The local store keeps a
+bounded LRU of open file descriptors, so hot lecture files are not reopened
+on every request. One descriptor is shared by every request reading that file.
+Reads use ``os.pread`` and never move a shared offset. Before a cached
+descriptor is reused, ``acquire`` stats the path. If the file was replaced,
+the old descriptor is retired and closed once its last reader releases it.
+Uploads go through a temporary file and ``os.replace``, so a reader either
+keeps the old bytes or gets the new file, never a mix.
+
+ETags are strong. They are built from inode, size and modification time, all
+of which change when the bytes are replaced.
+"""
+import contextlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from typing import Any, BinaryIO, Dict, Optional, Protocol
+
+from . import config, health
+
+
+class FileNotStored(LookupError):
+    """No file is stored under the key."""
+
+
+@dataclass(frozen=True)
+class FileStat:
+    size: int
+    last_modified: str      # HTTP date
+    etag: str               # strong, quoted
+
+
+@dataclass(eq=False)
+class FileHandle:
+    """An open stored file. ``path``/``fileobj`` are set when the server may send it without reading it."""
+    key: str
+    stat: FileStat
+    path: Optional[str] = None
+    fileobj: Optional[BinaryIO] = None
+    refs: int = field(default=0, repr=False)
+    retired: bool = field(default=False, repr=False)
+    ident: tuple = field(default=(), repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def read(self, offset: int, size: int) -> bytes:
+        """Up to ``size`` bytes at ``offset``; safe to call from several threads at once."""
+        fd = self.fileobj.fileno()
+        if hasattr(os, "pread"):
+            return os.pread(fd, size, offset)
+        with self._lock:    # no pread on Windows: seek and read under the handle's lock
+            os.lseek(fd, offset, os.SEEK_SET)
+            return os.read(fd, size)
+
+
+class FileWriter(Protocol):
+    def write(self, data: bytes) -> None:
+        """Append to the file being written."""
+
+    def commit(self) -> FileStat:
+        """Publish the file under its key, replacing any previous one."""
+
+    def abort(self) -> None:
+        """Drop what was written; the key keeps its previous file."""
+
+
+class FileStore(Protocol):
+    def acquire(self, key: str) -> FileHandle:
+        """Open ``key`` for reading; raises FileNotStored."""
+
+    def release(self, handle: FileHandle) -> None:
+        """Give back a handle from ``acquire``."""
+
+    def writer(self, key: str) -> FileWriter:
+        """Start writing ``key``; nothing is visible until ``commit``."""
+
+    def delete(self, key: str) -> bool:
+        """Remove ``key``; False when nothing was stored."""
+
+    def check(self) -> Dict[str, Any]:
+        """Readiness probe: raises when files cannot be written."""
+
+
+def _ident(st: os.stat_result) -> tuple:
+    return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _stat(st: os.stat_result) -> FileStat:
+    return FileStat(size=st.st_size, last_modified=formatdate(st.st_mtime, usegmt=True),
+                    etag=f'"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"')
+
+
+class _LocalWriter:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, self.tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        self.fh = os.fdopen(fd, "wb")
+
+    def write(self, data: bytes) -> None:
+        self.fh.write(data)
+
+    def commit(self) -> FileStat:
+        try:
+            self.fh.flush()
+            os.fsync(self.fh.fileno())
+            self.fh.close()
+            os.replace(self.tmp, self.path)
+        except BaseException:
+            self.abort()
+            raise
+        return _stat(os.stat(self.path))
+
+    def abort(self) -> None:
+        self.fh.close()
+        with contextlib.suppress(OSError):
+            os.unlink(self.tmp)
+
+
+class LocalFileStore:
+    def __init__(self, root: str, max_open: int = 128):
+        self.root = os.path.realpath(root)
+        self.max_open = max_open
+        self._open: "OrderedDict[str, FileHandle]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reopened = 0
+
+    def _path(self, key: str) -> str:
+        parts = key.replace("\\", "/").split("/")
+        if not key or "\0" in key or any(part in (".", "..") for part in parts) or ":" in parts[0]:
+            raise FileNotStored(key)
+        path = os.path.realpath(os.path.join(self.root, *filter(None, parts)))
+        if os.path.commonpath((self.root, path)) != self.root or path == self.root:
+            raise FileNotStored(key)
+        return path
+
+    def acquire(self, key: str) -> FileHandle:
+        path = self._path(key)
+        try:
+            ident = _ident(os.stat(path))
+        except (FileNotFoundError, NotADirectoryError):
+            raise FileNotStored(key) from None
+        with self._lock:
+            handle = self._open.get(path)
+            if handle is not None and handle.ident == ident:
+                self._open.move_to_end(path)
+                handle.refs += 1
+                self.hits += 1
+                return handle
+            if handle is not None:
+                self.reopened += 1
+                self._retire(path)
+
+        try:
+            fileobj = open(path, "rb", buffering=0)
+        except (FileNotFoundError, IsADirectoryError):
+            raise FileNotStored(key) from None
+        st = os.fstat(fileobj.fileno())
+        handle = FileHandle(key=key, stat=_stat(st), path=path, fileobj=fileobj, refs=1, ident=_ident(st))
+        with self._lock:
+            if path in self._open:
+                self._retire(path)
+            self._open[path] = handle
+            self.misses += 1
+            while len(self._open) > self.max_open:
+                self._retire(next(iter(self._open)))
+        return handle
+
+    def release(self, handle: FileHandle) -> None:
+        with self._lock:
+            handle.refs -= 1
+            close = handle.retired and handle.refs == 0
+        if close:
+            handle.fileobj.close()
+
+    def _retire(self, path: str) -> None:
+        # Caller holds the lock; a handle still being read is closed by its last release
+        handle = self._open.pop(path)
+        handle.retired = True
+        if handle.refs == 0:
+            handle.fileobj.close()
+
+    def writer(self, key: str) -> _LocalWriter:
+        return _LocalWriter(self._path(key))
+
+    def delete(self, key: str) -> bool:
+        try:
+            os.unlink(self._path(key))
+            return True
+        except (FileNotStored, FileNotFoundError):
+            return False
+
+    def check(self) -> Dict[str, Any]:
+        return health.check_writable(self.root)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_use = sum(1 for handle in self._open.values() if handle.refs)
+            return {"store": "local", "root": self.root, "open": len(self._open), "in_use": in_use,
+                    "max_open": self.max_open, "hits": self.hits, "misses": self.misses, "reopened": self.reopened}
+
+
+def open_store(name: str) -> FileStore:
+    """``local`` keeps files under RESOURCE_DIR; other backends plug in here."""
+    if name == "local":
+        return LocalFileStore(config.RESOURCE_DIR, config.RESOURCE_OPEN_FILES)
+    raise ValueError(f"Unsupported RESOURCE_STORE: {name}")
+
+
+store = open_store(config.RESOURCE_STORE)
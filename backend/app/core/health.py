@@ -0,0 +1,125 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from . import config
+
+# Dedicated pool so probes still run when the request threadpool is exhausted
+_probe_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="health-probe")
+
+_checks: Dict[str, Callable[[], Optional[Dict[str, Any]]]] = {}
+_started_at = time.monotonic()
+_draining = False
+
+
+def register_check(name: str, check: Callable[[], Optional[Dict[str, Any]]]) -> None:
+    """Register a readiness check.
+
+    A check raises to report failure and may return a dict of extra details.
+    """
+    _checks[name] = check
+
+
+def check_writable(path: str) -> Dict[str, Any]:
+    """Create and remove a probe file in ``path``; raises when the directory cannot be written."""
+    os.makedirs(path, exist_ok=True)
+    fd, probe = tempfile.mkstemp(dir=path, prefix=".health-")
+    try:
+        os.write(fd, b"ok")
+    finally:
+        os.close(fd)
+        os.unlink(probe)
+    return {"path": os.path.abspath(path)}
+
+
+def set_draining(draining: bool = True) -> None:
+    """Mark the process as shutting down so readiness starts failing."""
+    global _draining
+    _draining = draining
+
+
+def uptime_seconds() -> float:
+    return round(time.monotonic() - _started_at, 3)
+
+
+class InFlightTracker:
+    """Thread-safe counter of requests currently being served."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._count = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self._lock:
+            self._count += 1
+            self.peak = max(self.peak, self._count)
+        return self
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self._count -= 1
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+
+inflight = InFlightTracker()
+
+
+class InFlightMiddleware:
+    """ASGI middleware feeding the in-flight counter (probe paths excluded)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/health"):
+            await self.app(scope, receive, send)
+            return
+        with inflight:
+            await self.app(scope, receive, send)
+
+
+async def _run_check(name: str, check: Callable, timeout: float) -> Tuple[bool, Dict[str, Any]]:
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    try:
+        details = await asyncio.wait_for(loop.run_in_executor(_probe_executor, check), timeout)
+        result = {"status": "ok", **(details or {})}
+        ok = True
+    except asyncio.TimeoutError:
+        result = {"status": "timeout", "error": f"no answer within {timeout}s"}
+        ok = False
+    except Exception as e:
+        result = {"status": "error", "error": str(e)}
+        ok = False
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return ok, result
+
+
+async def readiness(timeout: float = None) -> Tuple[bool, Dict[str, Any]]:
+    """Run every registered check concurrently, each bounded by ``timeout``."""
+    timeout = config.HEALTH_CHECK_TIMEOUT if timeout is None else timeout
+    names = list(_checks)
+    outcomes = await asyncio.gather(*(_run_check(n, _checks[n], timeout) for n in names))
+    checks = {name: result for name, (_, result) in zip(names, outcomes)}
+    ready = all(ok for ok, _ in outcomes)
+
+    load = {"inflight": inflight.count, "peak": inflight.peak, "limit": config.HEALTH_MAX_INFLIGHT}
+    if inflight.count >= config.HEALTH_MAX_INFLIGHT:
+        load["status"] = "overloaded"
+        ready = False
+    else:
+        load["status"] = "ok"
+    checks["load"] = load
+
+    if _draining:
+        checks["lifecycle"] = {"status": "draining"}
+        ready = False
+    return ready, checks
@@ -0,0 +1,147 @@
+import threading
+import zlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from . import config, get_logger
+from ..models import HttpCacheVersion, mudemy_session, use_primary
+
+logger = get_logger("HTTP_CACHE")
+
+# Stamps live in HTTP_CACHE_VERSION on the primary, so every worker sees a write
+# as soon as it commits. A key without a row has never been written through the app.
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(microsecond=0, tzinfo=None)
+
+
+class VersionStore:
+    """Version stamps keyed by resource, e.g. ``catalog`` or ``course:CRS00001``, shared by every worker.
+
+    ``get`` is one primary-key lookup. ``bump`` runs after the service's own
+    commit, in a short transaction of its own.
+    """
+
+    def __init__(self, db_session: sessionmaker, attempts: int = 3):
+        self.db_session = db_session
+        self.attempts = attempts
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[int, datetime]]:
+        """(version, last modified) of ``key``, or None when it was never bumped."""
+        with use_primary(), self.db_session() as session:
+            row = session.execute(
+                select(HttpCacheVersion.Version, HttpCacheVersion.Modified_at)
+                .where(HttpCacheVersion.ResourceKey == key)
+            ).first()
+        if row is None:
+            return None
+        return row.Version, row.Modified_at.replace(tzinfo=timezone.utc)
+
+    def bump(self, *keys: str) -> None:
+        now = _now()
+        for attempt in range(self.attempts):
+            with use_primary(), self.db_session() as session:
+                try:
+                    # Sorted, so two bumps of the same keys lock rows in the same order
+                    for key in sorted(set(keys)):
+                        updated = session.execute(
+                            update(HttpCacheVersion)
+                            .where(HttpCacheVersion.ResourceKey == key)
+                            .values(Version=HttpCacheVersion.Version + 1, Modified_at=now)
+                        ).rowcount
+                        if not updated:
+                            session.add(HttpCacheVersion(ResourceKey=key, Version=1, Modified_at=now))
+                            session.flush()
+                    session.commit()
+                    return
+                except IntegrityError:
+                    # Another worker created the row first; the UPDATE finds it next time
+                    session.rollback()
+                except Exception as e:
+                    session.rollback()
+                    with self._lock:
+                        self.errors += 1
+                    logger.error(f"Could not bump {', '.join(keys)}: {e}")
+                    return
+        with self._lock:
+            self.errors += 1
+        logger.error(f"Could not bump {', '.join(keys)} after {self.attempts} attempts")
+
+
+versions = VersionStore(mudemy_session)
+
+
+def bump(*keys: str) -> None:
+    """Invalidate cached representations of ``keys``; called by services after commit."""
+    versions.bump(*keys)
+
+
+def course_key(course_id: str) -> str:
+    return f"course:{course_id}"
+
+
+def module_key(module_id: str) -> str:
+    return f"module:{module_id}"
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag == etag or tag == f"W/{etag}" for tag in candidates)
+
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified <= since
+
+
+def conditional(key_template: str, policy: str) -> Callable:
+    """Dependency adding ETag/Last-Modified/Cache-Control, answering 304 when the client is current.
+
+    ``key_template`` is formatted with the path parameters (``"course:{course_id}"``).
+    It runs before the route handler, so a 304 costs one primary-key lookup.
+    """
+
+    def check(request: Request, response: Response) -> None:
+        if not config.HTTP_CACHE_ENABLED:
+            return
+        stamp = versions.get(key_template.format(**request.path_params))
+        variant = zlib.crc32(str(request.query_params).encode()) if request.query_params else 0
+        headers = {"Cache-Control": policy, "Vary": "Authorization"}
+        if stamp is None:
+            # Never bumped: no Last-Modified to offer, only the version-0 ETag
+            etag, last_modified = f'"0-{variant:x}"', None
+        else:
+            version, last_modified = stamp
+            # The timestamp keeps a recreated database from reusing an old ETag
+            etag = f'"{version}.{int(last_modified.timestamp()):x}-{variant:x}"'
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+        headers["ETag"] = etag
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, etag)
+        else:
+            if_modified_since = request.headers.get("if-modified-since")
+            not_modified = (last_modified is not None and if_modified_since is not None
+                            and _not_modified_since(if_modified_since, last_modified))
+        if not_modified:
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return check
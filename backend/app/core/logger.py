@@ -1,18 +1,59 @@
 from loguru import logger
+import random
 import sys
 
-logger.remove()  
+from . import config
+
+TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+    "<level>{level: <4}</level> | "
+    "<cyan>{extra[context]}</cyan> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
+    "<level>{message}</level>"
+)
+
+
+def _parse_module_levels(spec: str) -> dict:
+    """Parse ``"LOGIN=WARNING,COURSE_SERVICE=DEBUG"`` into {context: level number}."""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = logger.level(level.strip().upper()).no
+    return levels
+
+
+_default_level = logger.level(config.LOG_LEVEL.upper()).no
+_module_levels = _parse_module_levels(config.LOG_MODULE_LEVELS)
+
+
+def _filter(record) -> bool:
+    """Per-context level threshold, then random sampling for bound ``sample_rate``."""
+    extra = record["extra"]
+    if record["level"].no < _module_levels.get(extra.get("context"), _default_level):
+        return False
+    rate = extra.get("sample_rate")
+    return rate is None or rate >= 1.0 or random.random() < rate
+
+
+logger.remove()
+logger.configure(extra={"context": "Default"})
 logger.add(
     sys.stdout,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
-           "<level>{level: <4}</level> | "
-           "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
-           "<level>{message}</level>",
-    colorize=True,
-    backtrace=True,   
-    diagnose=True     
+    level=min([_default_level, *_module_levels.values()]),
+    format=TEXT_FORMAT,
+    filter=_filter,
+    serialize=config.LOG_FORMAT == "json",
+    colorize=config.LOG_FORMAT != "json",
+    enqueue=config.LOG_ENQUEUE,   # records are written by a background thread
+    backtrace=True,
+    diagnose=config.LOG_DIAGNOSE
 )
 
-def get_logger(name: str = "Default"):
-    """Return a logger instance with a given name."""
-    return logger.bind(context=name)
\ No newline at end of file
+def get_logger(name: str = "Default", sample_rate: float = None):
+    """Return a logger instance with a given name.
+
+    ``sample_rate`` keeps only that fraction of records, for high-volume events.
+    """
+    if sample_rate is None:
+        return logger.bind(context=name)
+    return logger.bind(context=name, sample_rate=sample_rate)
@@ -0,0 +1,231 @@
+import contextvars
+import functools
+import inspect
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from . import config
+
+_current: contextvars.ContextVar[Optional["Profile"]] = contextvars.ContextVar("profile", default=None)
+_profiles: deque = deque(maxlen=config.PROFILE_BUFFER_SIZE)
+_profiles_lock = threading.Lock()
+_authorizer: Callable[[Any], bool] = lambda request: False
+_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def set_authorizer(authorizer: Callable[[Any], bool]) -> None:
+    """Decide whether a request may ask for a profile via the ``PROFILE_HEADER`` header."""
+    global _authorizer
+    _authorizer = authorizer
+
+
+class Profile:
+    """Stack samples and SQL timeline of a single request."""
+
+    def __init__(self, method: str, path: str, route: str, reason: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.route = route
+        self.reason = reason
+        self.started_at = datetime.now(timezone.utc)
+        self.status_code: Optional[int] = None
+        self.duration_ms = 0.0
+        self.stacks: Counter = Counter()
+        self.sql: List[Dict[str, Any]] = []
+        self._t0 = time.perf_counter()
+
+    def offset_ms(self) -> float:
+        return round((time.perf_counter() - self._t0) * 1000, 3)
+
+    def folded(self) -> str:
+        """Collapsed stacks (``frame;frame;frame count``), as read by flamegraph.pl and speedscope."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "reason": self.reason,
+            "status_code": self.status_code,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": self.duration_ms,
+            "samples": sum(self.stacks.values()),
+            "sql_count": len(self.sql),
+            "sql_ms": round(sum(q["duration_ms"] for q in self.sql), 3),
+        }
+
+
+def get_profiles() -> List[Profile]:
+    with _profiles_lock:
+        return list(reversed(_profiles))
+
+
+def get_profile(profile_id: str) -> Optional[Profile]:
+    with _profiles_lock:
+        return next((p for p in _profiles if p.id == profile_id), None)
+
+
+def clear_profiles() -> None:
+    with _profiles_lock:
+        _profiles.clear()
+
+
+class _Sampler:
+    """One background thread sampling the stacks of threads serving profiled requests."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._targets: Dict[int, tuple] = {}   # thread id -> (profile, stop code object)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, thread_id: int, profile: Profile, stop_code) -> None:
+        with self._lock:
+            self._targets[thread_id] = (profile, stop_code)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def remove(self, thread_id: int) -> None:
+        with self._lock:
+            self._targets.pop(thread_id, None)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                targets = dict(self._targets)
+            if not targets:
+                self._wakeup.clear()
+                self._wakeup.wait()
+                continue
+            frames = sys._current_frames()
+            for thread_id, (profile, stop_code) in targets.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    profile.stacks[_fold(frame, stop_code)] += 1
+            del frames
+            time.sleep(self.interval)
+
+
+def _fold(frame, stop_code) -> str:
+    names = []
+    while frame is not None and frame.f_code is not stop_code:
+        code = frame.f_code
+        filename = code.co_filename
+        if filename.startswith(_root):
+            filename = os.path.relpath(filename, _root)
+        else:
+            filename = os.path.basename(filename)
+        names.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names)) or "<idle>"
+
+
+_sampler = _Sampler(config.PROFILE_INTERVAL_MS / 1000.0)
+
+
+def _profiled(endpoint: Callable) -> Callable:
+    """Wrap an endpoint so the thread actually running it is sampled while a profile is active."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            profile = _current.get()
+            if profile is None:
+                return await endpoint(*args, **kwargs)
+            thread_id = threading.get_ident()
+            _sampler.add(thread_id, profile, wrapper.__code__)
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _sampler.remove(thread_id)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            profile = _current.get()
+            if profile is None:
+                return endpoint(*args, **kwargs)
+            thread_id = threading.get_ident()
+            _sampler.add(thread_id, profile, wrapper.__code__)
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _sampler.remove(thread_id)
+    return wrapper
+
+
+def _should_profile(request) -> Optional[str]:
+    if request.headers.get(config.PROFILE_HEADER) and _authorizer(request):
+        return "header"
+    if config.PROFILE_SAMPLE_RATE > 0 and random.random() < config.PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute capturing a stack profile and SQL timeline for opted-in requests.
+
+    Requests are profiled when they carry ``PROFILE_HEADER`` and pass the
+    registered authorizer, or at random with ``PROFILE_SAMPLE_RATE``.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _profiled(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request):
+            reason = _should_profile(request)
+            if reason is None:
+                return await handler(request)
+            profile = Profile(request.method, request.url.path, self.path, reason)
+            token = _current.set(profile)
+            try:
+                response = await handler(request)
+                profile.status_code = response.status_code
+                if reason == "header":
+                    response.headers["X-Profile-Id"] = profile.id
+                return response
+            finally:
+                _current.reset(token)
+                profile.duration_ms = profile.offset_ms()
+                with _profiles_lock:
+                    _profiles.append(profile)
+
+        return profiled_handler
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context._profile_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    start = getattr(context, "_profile_start", None)
+    if profile is None or start is None:
+        return
+    profile.sql.append({
+        "offset_ms": round((start - profile._t0) * 1000, 3),
+        "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+        "statement": " ".join(statement.split())[:500],
+        "rows": cursor.rowcount,
+    })
@@ -0,0 +1,348 @@
+"""Token-bucket rate limiting for the HTTP API.
+
+A bucket holds up to ``burst`` tokens and refills at ``rate`` tokens per
+second; a request takes one token or is rejected with 429 and Retry-After.
+Each bucket is stored as a single number, the time at which it will be full
+again (the GCRA form of a token bucket), so a shared store only needs an
+atomic compare-and-set on one value per key.
+
+Policies match on method and path template; the first match wins and the
+default policy covers everything else under ``/api``. Requests are keyed by
+user ID when they carry a valid bearer token and by client IP otherwise (or
+always by IP for a policy such as login). Buckets live in-process by default;
+with RATE_LIMIT_STORE_URL set they live in a ``SharedBucketStore`` so every
+worker draws from the same bucket.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple
+
+from . import config
+from .cache import TTLCache
+from .logger import get_logger
+
+logger = get_logger("RATE_LIMIT")
+
+
+@dataclass(frozen=True)
+class Limit:
+    rate: float      # tokens added per second
+    burst: int       # bucket size
+
+    @classmethod
+    def parse(cls, spec: str) -> "Limit":
+        """``"30/60"``: a bucket of 30 requests that refills completely in 60 seconds."""
+        burst, _, seconds = spec.partition("/")
+        return cls(rate=int(burst) / float(seconds), burst=int(burst))
+
+    @property
+    def window(self) -> float:
+        """Seconds an empty bucket takes to fill."""
+        return self.burst / self.rate
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+
+def _consume(full_at: Optional[float], limit: Limit, now: float) -> Tuple[Decision, float]:
+    """Take one token from a bucket that is full at ``full_at``; returns the decision and the new ``full_at``."""
+    full_at = max(full_at or now, now)
+    new_full_at = full_at + 1 / limit.rate
+    if new_full_at - now > limit.window:
+        return Decision(False, 0, full_at - limit.window + 1 / limit.rate - now), full_at
+    return Decision(True, int((limit.window - (new_full_at - now)) * limit.rate + 1e-9), 0.0), new_full_at
+
+
+class BucketStore(Protocol):
+    def take(self, key: str, limit: Limit) -> Decision:
+        """Take a token from ``key``'s bucket."""
+
+    def check(self) -> Dict[str, Any]:
+        """Readiness probe: raises when the store cannot be reached."""
+
+
+class MemoryBucketStore:
+    """Buckets in this process; the least recently used are dropped beyond ``maxsize``."""
+
+    def __init__(self, maxsize: int = 100_000, clock: Callable[[], float] = time.time):
+        self.maxsize = maxsize
+        self.clock = clock
+        self._buckets: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, limit: Limit) -> Decision:
+        now = self.clock()
+        with self._lock:
+            decision, self._buckets[key] = _consume(self._buckets.get(key), limit, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.maxsize:
+                # An evicted bucket comes back full, which is where an idle one would be anyway
+                self._buckets.popitem(last=False)
+        return decision
+
+    def check(self) -> Dict[str, Any]:
+        return {"store": "memory"}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"store": "memory", "buckets": len(self._buckets), "maxsize": self.maxsize}
+
+
+class SharedBackend(Protocol):
+    """Atomic single-value storage shared by every worker (Redis, memcached, a database...)."""
+
+    def get(self, key: str) -> Optional[float]:
+        """Current value, or None when the key is absent or expired."""
+
+    def compare_and_set(self, key: str, expected: Optional[float], value: float, ttl: float) -> bool:
+        """Store ``value`` (expiring after ``ttl`` seconds) only if the key still holds ``expected``."""
+
+
+class SharedBucketStore:
+    """Buckets kept in a ``SharedBackend``; a lost compare-and-set race is retried."""
+
+    def __init__(self, backend: SharedBackend, attempts: int = 5, clock: Callable[[], float] = time.time):
+        self.backend = backend
+        self.attempts = attempts
+        self.clock = clock
+        self.conflicts = 0
+        self.errors = 0
+
+    def take(self, key: str, limit: Limit) -> Decision:
+        try:
+            for _ in range(self.attempts):
+                now = self.clock()
+                current = self.backend.get(key)
+                decision, full_at = _consume(current, limit, now)
+                if not decision.allowed:
+                    return decision
+                if self.backend.compare_and_set(key, current, full_at, limit.window):
+                    return decision
+                self.conflicts += 1
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Rate limit store unavailable, allowing request: {e}")
+            return Decision(True, 0, 0.0)
+        # Still contended after every attempt: this key is busy enough to refuse
+        return Decision(False, 0, 1 / limit.rate)
+
+    def check(self) -> Dict[str, Any]:
+        # take() fails open, so an unreachable backend only shows up here
+        self.backend.get("health:probe")
+        return {"store": type(self.backend).__name__}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"store": type(self.backend).__name__, "cas_conflicts": self.conflicts, "errors": self.errors}
+
+
+class SQLiteBackend:
+    """Local stand-in for a shared backend: a SQLite file every worker on this host opens.
+
+    One connection per thread (and per process, so nothing is shared across
+    a fork); expired rows are deleted every ``purge_every`` writes.
+    """
+
+    def __init__(self, path: str, purge_every: int = 10_000):
+        self.path = path
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._writes = 0
+        self._connect().execute("CREATE TABLE IF NOT EXISTS bucket (key TEXT PRIMARY KEY, value REAL NOT NULL, "
+                                "expires_at REAL NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        pid, conn = getattr(self._local, "conn", (None, None))
+        if pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = (os.getpid(), conn)
+        return conn
+
+    def get(self, key: str) -> Optional[float]:
+        row = self._connect().execute("SELECT value FROM bucket WHERE key = ? AND expires_at > ?",
+                                      (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def compare_and_set(self, key: str, expected: Optional[float], value: float, ttl: float) -> bool:
+        conn = self._connect()
+        now = time.time()
+        if expected is None:
+            # Absent or expired: claim the row unless another worker just wrote a live value
+            changed = conn.execute(
+                "INSERT INTO bucket (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+                "WHERE bucket.expires_at <= ?", (key, value, now + ttl, now)).rowcount
+        else:
+            changed = conn.execute("UPDATE bucket SET value = ?, expires_at = ? WHERE key = ? AND value = ?",
+                                   (value, now + ttl, key, expected)).rowcount
+        self._writes += 1
+        if self._writes % self.purge_every == 0:
+            conn.execute("DELETE FROM bucket WHERE expires_at <= ?", (now,))
+        return changed == 1
+
+
+def store_from_url(url: str) -> BucketStore:
+    """``""`` for in-process buckets, ``sqlite:///path`` for the shared SQLite stand-in."""
+    if not url:
+        return MemoryBucketStore(config.RATE_LIMIT_MAX_BUCKETS)
+    if url.startswith("sqlite:///"):
+        return SharedBucketStore(SQLiteBackend(url[len("sqlite:///"):]))
+    raise ValueError(f"Unsupported RATE_LIMIT_STORE_URL: {url}")
+
+
+# ------------------------------------------------------------------
+# Policies
+# ------------------------------------------------------------------
+def path_pattern(template: str) -> re.Pattern:
+    """Regex matching a route template such as ``/api/quizzes/{quiz_id}/submit``."""
+    return re.compile("^" + re.sub(r"\\\{[^}]+\\\}", "[^/]+", re.escape(template)) + "$")
+
+
+BY_USER = "user"   # user ID from the bearer token, client IP for anonymous requests
+BY_IP = "ip"
+
+
+@dataclass
+class Policy:
+    name: str
+    limit: Limit
+    method: str = "*"
+    path: str = ""          # template such as "/api/quizzes/{id}/submit"; "" matches every path
+    key: str = BY_USER
+    allowed: int = 0
+    denied: int = 0
+    _pattern: Optional[re.Pattern] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if self.path:
+            self._pattern = path_pattern(self.path)
+
+    def matches(self, method: str, path: str) -> bool:
+        return (self.method in ("*", method)) and (self._pattern is None or self._pattern.match(path) is not None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "method": self.method, "path": self.path or "*", "key": self.key,
+                "rate": self.limit.rate, "burst": self.limit.burst, "allowed": self.allowed, "denied": self.denied}
+
+
+class RateLimiter:
+    """Picks the policy and bucket key for a request and asks the store for a token.
+
+    ``identify`` maps a bearer token to a user ID (None when invalid); results
+    are cached so a token is verified once per RATE_LIMIT_TOKEN_CACHE_SECONDS.
+    """
+
+    def __init__(self, store: BucketStore, policies: List[Policy], default: Optional[Policy] = None,
+                 identify: Callable[[str], Optional[str]] = None, prefix: str = "/api"):
+        self.store = store
+        self.policies = policies
+        self.default = default
+        self.identify = identify
+        self.prefix = prefix
+        self._users = TTLCache(maxsize=config.RATE_LIMIT_MAX_BUCKETS, ttl=config.RATE_LIMIT_TOKEN_CACHE_SECONDS)
+
+    def policy_for(self, method: str, path: str) -> Optional[Policy]:
+        if not path.startswith(self.prefix):
+            return None
+        for policy in self.policies:
+            if policy.matches(method, path):
+                return policy
+        return self.default
+
+    def client_key(self, scope, policy: Policy) -> str:
+        if policy.key == BY_USER and self.identify is not None:
+            token = _bearer_token(scope)
+            if token:
+                user_id = self._users.get(token, False)
+                if user_id is False:
+                    user_id = self.identify(token)
+                    self._users.set(token, user_id)
+                if user_id:
+                    return f"user:{user_id}"
+        return f"ip:{_client_ip(scope)}"
+
+    def check(self, scope) -> Tuple[Optional[Policy], Optional[Decision]]:
+        policy = self.policy_for(scope["method"], scope["path"])
+        if policy is None:
+            return None, None
+        decision = self.store.take(f"{policy.name}:{self.client_key(scope, policy)}", policy.limit)
+        if decision.allowed:
+            policy.allowed += 1
+        else:
+            policy.denied += 1
+        return policy, decision
+
+    def stats(self) -> Dict[str, Any]:
+        policies = self.policies + ([self.default] if self.default else [])
+        return {"store": self.store.stats(), "token_cache": self._users.stats(),
+                "policies": [policy.stats() for policy in policies]}
+
+
+def _bearer_token(scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return token.strip() if scheme.lower() == "bearer" else None
+    return None
+
+
+def _client_ip(scope) -> str:
+    if config.RATE_LIMIT_TRUST_FORWARDED:
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """ASGI middleware answering 429 with Retry-After once a bucket is empty."""
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        policy, decision = self.limiter.check(scope)
+        if decision is None or decision.allowed:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = max(1, int(decision.retry_after + 0.999))
+        body = b'{"detail":"Too many requests"}'
+        await send({"type": "http.response.start", "status": 429, "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+            (b"ratelimit-policy", f"{policy.limit.burst};w={int(policy.limit.window)}".encode()),
+        ]})
+        await send({"type": "http.response.body", "body": body})
+
+
+limiter = RateLimiter(
+    store_from_url(config.RATE_LIMIT_STORE_URL),
+    policies=[
+        Policy("login", Limit.parse(config.RATE_LIMIT_LOGIN), "POST", "/api/auth/login", key=BY_IP),
+        Policy("submit", Limit.parse(config.RATE_LIMIT_SUBMIT), "POST", "/api/quizzes/{quiz_id}/submit"),
+        Policy("submit", Limit.parse(config.RATE_LIMIT_SUBMIT), "POST", "/api/assignments/{ass_id}/submit"),
+        Policy("checkout", Limit.parse(config.RATE_LIMIT_CHECKOUT), "POST", "/api/checkout"),
+    ],
+    default=Policy("default", Limit.parse(config.RATE_LIMIT_DEFAULT)),
+)
+
+
+def set_identifier(identify: Callable[[str], Optional[str]]) -> None:
+    """Install the bearer token -> user ID lookup (the API layer owns token decoding)."""
+    limiter.identify = identify
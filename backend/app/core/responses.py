@@ -0,0 +1,152 @@
+import json
+import mimetypes
+from datetime import date, datetime, time
+from decimal import Decimal
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+from .filestore import FileHandle, FileStore
+from .http_cache import _etag_matches, _not_modified_since
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback keeps the app working without the wheel
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Encode the types SQLAlchemy rows carry, matching jsonable_encoder's output."""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when installed, stdlib json otherwise."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """``bytes=a-b`` / ``bytes=a-`` / ``bytes=-n`` as a half-open (start, end) within ``size``.
+
+    None means "send the whole file": the header is malformed or asks for
+    several ranges, which a server may answer with a plain 200. An
+    unsatisfiable range raises ValueError.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = (part.strip() for part in spec.partition("-"))
+    if not dash or not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+    if not first:
+        if int(last) == 0 or size == 0:
+            raise ValueError(header)
+        return max(0, size - int(last)), size
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    return start, min(int(last) + 1, size) if last else size
+
+
+class FileRangeResponse(Response):
+    """A stored file (``core.filestore``) with Range, conditional GET and zero-copy sending.
+
+    The body is sent, in order of preference:
+
+    * ``http.response.zerocopysend`` on servers offering it, which sendfile(2)
+      straight from the cached descriptor, ranges included;
+    * ``http.response.pathsend`` for whole files on servers offering it (they
+      open and sendfile the path themselves);
+    * otherwise ``os.pread`` of RESOURCE_CHUNK_SIZE blocks in the threadpool, which
+      is what uvicorn gets.
+
+    The handle is released once the body is sent or the client goes away.
+    """
+
+    def __init__(self, handle: FileHandle, store: FileStore, request_headers: Headers, method: str = "GET",
+                 filename: Optional[str] = None, media_type: Optional[str] = None,
+                 cache_control: Optional[str] = None, chunk_size: int = 256 * 1024):
+        self.handle = handle
+        self.store = store
+        self.chunk_size = chunk_size
+        self.send_body = method != "HEAD"
+        self.background = None
+        stat = handle.stat
+        self.start, self.end = 0, stat.size
+        headers = {"ETag": stat.etag, "Last-Modified": stat.last_modified, "Accept-Ranges": "bytes"}
+        if cache_control:
+            headers["Cache-Control"] = cache_control
+
+        if_none_match = request_headers.get("if-none-match")
+        if_modified_since = request_headers.get("if-modified-since")
+        if (if_none_match is not None and _etag_matches(if_none_match, stat.etag)) or \
+                (if_none_match is None and if_modified_since is not None
+                 and _not_modified_since(if_modified_since, parsedate_to_datetime(stat.last_modified))):
+            self.status_code, self.send_body = 304, False
+            self.init_headers(headers)
+            return
+
+        media_type = media_type or mimetypes.guess_type(handle.key)[0] or "application/octet-stream"
+        headers["Content-Type"] = media_type
+        if filename:
+            headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(filename)}"
+        self.status_code = 200
+        requested = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if requested and (if_range is None or if_range in (stat.etag, stat.last_modified)):
+            try:
+                span = parse_range(requested, stat.size)
+            except ValueError:
+                self.status_code, self.send_body = 416, False
+                headers["Content-Range"] = f"bytes */{stat.size}"
+                headers.pop("Content-Type")
+                self.init_headers({**headers, "Content-Length": "0"})
+                return
+            if span is not None:
+                self.status_code = 206
+                self.start, self.end = span
+                headers["Content-Range"] = f"bytes {self.start}-{self.end - 1}/{stat.size}"
+        headers["Content-Length"] = str(self.end - self.start)
+        self.init_headers(headers)
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if not self.send_body:
+                await send({"type": "http.response.body", "body": b""})
+                return
+            extensions = scope.get("extensions") or {}
+            if self.handle.fileobj is not None and "http.response.zerocopysend" in extensions:
+                await send({"type": "http.response.zerocopysend", "file": self.handle.fileobj,
+                            "offset": self.start, "count": self.end - self.start})
+            elif self.handle.path is not None and self.status_code == 200 and "http.response.pathsend" in extensions:
+                await send({"type": "http.response.pathsend", "path": self.handle.path})
+            else:
+                offset, more = self.start, True
+                while more:
+                    size = min(self.chunk_size, self.end - offset)
+                    chunk = await run_in_threadpool(self.handle.read, offset, size) if size > 0 else b""
+                    offset += len(chunk)
+                    # An empty read means the file was truncated in place; the server drops the short response
+                    more = bool(chunk) and offset < self.end
+                    await send({"type": "http.response.body", "body": chunk, "more_body": more})
+        finally:
+            self.store.release(self.handle)
@@ -0,0 +1,199 @@
+"""In-process periodic job scheduler.
+
+Due times live in a heap keyed on ``time.monotonic()``; one thread sleeps
+until the earliest entry and hands due jobs to a small pool, so a slow job
+never delays the others. Every worker process runs its own scheduler. With a
+lease store configured a job only runs in the worker that wins its lease, and
+the store tells the losers when the job is next due; without one every worker
+runs every job.
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Protocol, Tuple
+
+from . import config
+from .logger import get_logger
+
+logger = get_logger("SCHEDULER")
+
+
+@dataclass
+class RunRecord:
+    started_at: datetime
+    duration_ms: float = 0.0
+    status: str = "running"   # running, ok, error
+    result: Any = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"started_at": self.started_at.isoformat(), "duration_ms": round(self.duration_ms, 3),
+                "status": self.status, "result": self.result, "error": self.error}
+
+
+@dataclass
+class Job:
+    name: str
+    fn: Callable[[Any], Any]
+    interval: float
+    lease_seconds: float
+    leased: bool = True
+    due: float = 0.0
+    running: bool = False
+    runs: int = 0
+    skipped: int = 0
+    history: Deque[RunRecord] = field(default_factory=lambda: deque(maxlen=config.SCHEDULER_HISTORY))
+
+    def status(self) -> Dict[str, Any]:
+        return {"name": self.name, "interval_seconds": self.interval, "leased": self.leased,
+                "lease_seconds": self.lease_seconds,
+                "running": self.running, "due_in_seconds": round(max(0.0, self.due - time.monotonic()), 3),
+                "runs": self.runs, "skipped_lease_held": self.skipped,
+                "last_run": self.history[-1].to_dict() if self.history else None,
+                "history": [record.to_dict() for record in self.history]}
+
+
+class LeaseStore(Protocol):
+    def acquire(self, job: Job) -> Tuple[Optional[Any], float]:
+        """Return ``(grant, 0)`` when this worker may run ``job`` now, else ``(None, seconds until due)``."""
+
+    def release(self, job: Job, grant: Any, record: RunRecord) -> None:
+        """Record the run and let the next run happen ``job.interval`` seconds from now."""
+
+
+class Scheduler:
+    def __init__(self, leases: Optional[LeaseStore] = None):
+        self.leases = leases
+        self._jobs: Dict[str, Job] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._pid: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def add(self, name: str, fn: Callable[[Any], Any], interval: float, *, leased: bool = True,
+            lease_seconds: float = None, initial_delay: float = None) -> Job:
+        """Run ``fn(grant)`` every ``interval`` seconds; the grant is whatever the lease store hands out.
+
+        ``leased=False`` runs the job in every worker (per-process caches); its grant is None.
+        """
+        job = Job(name=name, fn=fn, interval=interval, leased=leased,
+                  lease_seconds=lease_seconds or config.SCHEDULER_LEASE_SECONDS)
+        with self._cond:
+            self._jobs[name] = job
+            self._schedule(job, config.SCHEDULER_INITIAL_DELAY if initial_delay is None else initial_delay)
+        return job
+
+    def run_now(self, name: str) -> bool:
+        """Make ``name`` due immediately (still subject to its lease)."""
+        with self._cond:
+            job = self._jobs.get(name)
+            if job is None:
+                return False
+            self._schedule(job, 0.0)
+        return True
+
+    def _schedule(self, job: Job, delay: float) -> None:
+        # Caller holds the condition; superseded heap entries are skipped when popped
+        job.due = time.monotonic() + max(0.0, delay)
+        heapq.heappush(self._heap, (job.due, next(self._seq), job.name))
+        self._cond.notify()
+
+    # ------------------------------------------------------------------
+    # Loop
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._cond:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._pool = ThreadPoolExecutor(max_workers=config.SCHEDULER_WORKERS, thread_name_prefix="job")
+            self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+            self._thread.start()
+        logger.info(f"Scheduler started with {len(self._jobs)} jobs (pid {os.getpid()})")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            if self._pid != os.getpid():
+                return
+            self._pid = None
+            self._cond.notify()
+        self._thread.join(timeout)
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def _run(self) -> None:
+        pid = os.getpid()
+        while True:
+            with self._cond:
+                job = self._wait_for_due(pid)
+                if job is None:
+                    return
+                if job.running:
+                    self._schedule(job, job.interval)
+                    continue
+                job.running = True
+                # Provisional: the run reschedules itself when it finishes
+                self._schedule(job, job.interval + job.lease_seconds)
+            self._pool.submit(self._execute, job)
+
+    def _wait_for_due(self, pid: int) -> Optional[Job]:
+        """Pop the next due job, sleeping until one is due; None once stopped. Caller holds the condition."""
+        while self._pid == pid:
+            while self._heap and self._heap[0][0] != getattr(self._jobs.get(self._heap[0][2]), "due", None):
+                heapq.heappop(self._heap)
+            now = time.monotonic()
+            if self._heap and self._heap[0][0] <= now:
+                return self._jobs[heapq.heappop(self._heap)[2]]
+            self._cond.wait(self._heap[0][0] - now if self._heap else None)
+        return None
+
+    def _execute(self, job: Job) -> None:
+        delay = job.interval
+        try:
+            grant = None
+            leased = self.leases is not None and job.leased
+            if leased:
+                try:
+                    grant, wait = self.leases.acquire(job)
+                except Exception as e:
+                    logger.error(f"Could not acquire lease for job {job.name}: {e}")
+                    grant, wait = None, job.interval
+                if grant is None:
+                    job.skipped += 1
+                    delay = wait
+                    return
+
+            record = RunRecord(started_at=datetime.utcnow())
+            job.history.append(record)
+            start = time.perf_counter()
+            try:
+                record.result = job.fn(grant)
+                record.status = "ok"
+            except Exception as e:
+                record.status, record.error = "error", f"{type(e).__name__}: {e}"
+                logger.error(f"Job {job.name} failed: {e}")
+            record.duration_ms = (time.perf_counter() - start) * 1000
+            job.runs += 1
+            logger.debug(f"Job {job.name} {record.status} in {record.duration_ms:.1f}ms: {record.result}")
+
+            if leased:
+                try:
+                    self.leases.release(job, grant, record)
+                except Exception as e:
+                    logger.error(f"Could not release lease for job {job.name}: {e}")
+        finally:
+            with self._cond:
+                job.running = False
+                self._schedule(job, delay)
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [job.status() for job in self._jobs.values()]
@@ -0,0 +1,139 @@
+"""Signed certificate numbers that can be verified without a database lookup.
+
+A number is ``<payload>.<signature>``, both URL-safe base64 without padding.
+The payload packs the signing key id, issue and expiry day (days since
+2000-01-01, expiry 0 = never) and the length-prefixed certificate, course and
+student IDs; the signature is the first CERTIFICATE_SIGNATURE_BYTES of its
+HMAC-SHA256. Keys listed in CERTIFICATE_RETIRED_KEYS still verify, so the
+signing key can be rotated without invalidating issued certificates.
+"""
+import base64
+import hashlib
+import hmac
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional
+
+from . import config
+
+EPOCH = date(2000, 1, 1)
+_HEADER = struct.Struct(">BHH")
+
+
+class InvalidCertificate(ValueError):
+    """The number is malformed, signed with an unknown key, or its signature does not match."""
+
+
+@dataclass(frozen=True)
+class CertificateClaims:
+    certificate_id: str
+    course_id: str
+    student_id: str
+    issued: date
+    expires: Optional[date]
+
+    def is_expired(self, today: date = None) -> bool:
+        return self.expires is not None and self.expires <= (today or date.today())
+
+
+@lru_cache(maxsize=8)
+def _parse_keys(key_id: int, key: str, retired: str) -> Dict[int, bytes]:
+    keys = {}
+    for entry in filter(None, (part.strip() for part in retired.split(","))):
+        kid, _, secret = entry.partition(":")
+        keys[int(kid)] = secret.encode()
+    keys[key_id] = key.encode()
+    return keys
+
+
+def _keys() -> Dict[int, bytes]:
+    return _parse_keys(config.CERTIFICATE_KEY_ID, config.CERTIFICATE_SIGNING_KEY, config.CERTIFICATE_RETIRED_KEYS)
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _signature(key: bytes, payload: bytes) -> bytes:
+    return hmac.new(key, payload, hashlib.sha256).digest()[:config.CERTIFICATE_SIGNATURE_BYTES]
+
+
+def sign_certificate(certificate_id: str, course_id: str, student_id: str,
+                     issued: date, expires: Optional[date] = None) -> str:
+    payload = _HEADER.pack(config.CERTIFICATE_KEY_ID, (issued - EPOCH).days,
+                           (expires - EPOCH).days if expires else 0)
+    for value in (certificate_id, course_id, student_id):
+        raw = value.encode("utf-8")
+        payload += bytes([len(raw)]) + raw
+    return f"{_b64encode(payload)}.{_b64encode(_signature(_keys()[config.CERTIFICATE_KEY_ID], payload))}"
+
+
+def read_certificate(number: str) -> CertificateClaims:
+    """Claims of a signed certificate number; raises InvalidCertificate unless the signature checks out."""
+    try:
+        encoded_payload, encoded_signature = number.split(".")
+        payload, signature = _b64decode(encoded_payload), _b64decode(encoded_signature)
+        key_id, issued, expires = _HEADER.unpack_from(payload)
+    except (ValueError, struct.error) as e:
+        raise InvalidCertificate("Malformed certificate number") from e
+    key = _keys().get(key_id)
+    if key is None or not hmac.compare_digest(signature, _signature(key, payload)):
+        raise InvalidCertificate("Certificate signature does not match")
+
+    values, offset = [], _HEADER.size
+    for _ in range(3):
+        length = payload[offset] if offset < len(payload) else -1
+        if length < 0 or offset + 1 + length > len(payload):
+            raise InvalidCertificate("Malformed certificate number")
+        values.append(payload[offset + 1:offset + 1 + length].decode("utf-8"))
+        offset += 1 + length
+    return CertificateClaims(certificate_id=values[0], course_id=values[1], student_id=values[2],
+                             issued=EPOCH + timedelta(days=issued),
+                             expires=EPOCH + timedelta(days=expires) if expires else None)
+
+
+def is_signed_number(number: Optional[str]) -> bool:
+    """Shape check only (no signature verification): numbers issued before signing have no '.'."""
+    return bool(number) and number.count(".") == 1
+
+
+class RevocationSet:
+    """Revoked certificate numbers held in memory and replaced wholesale by ``refresh``.
+
+    The first lookup loads the set if no refresh has happened yet; after that
+    membership checks never touch the database.
+    """
+
+    def __init__(self, loader: Callable[[], Iterable[str]]):
+        self._loader = loader
+        self._numbers = frozenset()
+        self._lock = threading.Lock()
+        self.loaded_at: Optional[float] = None
+
+    def refresh(self) -> int:
+        numbers = frozenset(self._loader())
+        with self._lock:
+            self._numbers = numbers
+            self.loaded_at = time.monotonic()
+        return len(numbers)
+
+    def add(self, number: str) -> None:
+        with self._lock:
+            self._numbers = self._numbers | {number}
+
+    def __contains__(self, number: str) -> bool:
+        if self.loaded_at is None:
+            self.refresh()
+        return number in self._numbers
+
+    def stats(self) -> Dict[str, object]:
+        age = None if self.loaded_at is None else round(time.monotonic() - self.loaded_at, 3)
+        return {"revoked": len(self._numbers), "age_seconds": age}
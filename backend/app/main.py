@@ -1,9 +1,6 @@
-from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI
-import uvicorn
-import os
 from app import create_app
+from app.core import config
 import warnings
 warnings.filterwarnings('ignore', message='.*Unrecognized server version info.*')
 
@@ -23,11 +20,11 @@ app.add_middleware(
 
 if __name__ == "__main__":
     #http://127.0.0.1:8000/docs   
-    #reload_flag = os.getenv("DEBUG", "false").lower() == "true"
-
+    # Dev server only; production runs through `python -m app.serve`
+    import uvicorn
     uvicorn.run(
         "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
+        host=config.SERVER_HOST,
+        port=config.SERVER_PORT,
+        reload=config.DEBUG,
     )
@@ -0,0 +1,35 @@
+"""Move long text bodies already in the database into the blob store.
+
+    python -m app.migrate_blobs --dry-run
+    python -m app.migrate_blobs --batch-size 500
+
+Run from ``backend/`` once MIGRATION_BLOB_STORE.sql has added the hash and
+size columns, with the same BLOB_DIR as the API workers. Rows are moved
+BLOB_MIGRATE_BATCH at a time, one transaction per batch, so the script can
+be stopped and started again at any point.
+"""
+import argparse
+import sys
+
+from .core import config
+from .core.blobstore import store
+from .models import mudemy_session, use_primary
+from .services.blobs import migrate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move long text bodies out of their rows into the blob store.")
+    parser.add_argument("--batch-size", type=int, default=config.BLOB_MIGRATE_BATCH, help="rows per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="only count the rows that would move")
+    args = parser.parse_args(argv)
+
+    with use_primary():
+        moved = migrate(mudemy_session, args.batch_size, args.dry_run)
+    for name, count in moved.items():
+        print(f"{name:<30} {count:>8} {'to move' if args.dry_run else 'moved'}")
+    print(store.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
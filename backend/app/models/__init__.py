@@ -1,20 +1,33 @@
-from sqlalchemy import create_engine, func
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 from .base import Base
 from .models import *
 import os
-from dotenv import load_dotenv
+import threading
+from ..core import get_logger
+from .routing import (ReadYourWritesMiddleware, ReplicaSet, RoutingSession, request_scope, route_reads,
+                      use_primary, use_replica)
 
 # SERVER_NAME = 'DESKTOP-IM92AEE\\SQLEXPRESS' 
 # SERVER_NAME = r'localhost\SQLEXPRESS'
 # DATABASE_NAME = 'MUDemy'
-load_dotenv()
+# .env is loaded once by core.config
 
 SERVER_NAME = os.getenv('DB_SERVER')
 DATABASE_NAME = os.getenv('DB_NAME')
 CONNECTION_STRING = f'mssql+pyodbc://@{SERVER_NAME}/{DATABASE_NAME}?driver=ODBC+Driver+17+for+SQL+Server&trusted_connection=yes'
 
-print(f"{SERVER_NAME=} {DATABASE_NAME=} {CONNECTION_STRING}")
+# Full SQLAlchemy URL override, e.g. sqlite:///bench.db for the benchmark suite
+DATABASE_URL = os.getenv('DATABASE_URL')
+if DATABASE_URL:
+    CONNECTION_STRING = DATABASE_URL
+
+# Comma-separated read replicas, e.g. sqlite:///bench_replica.db next to a sqlite:///bench.db primary
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+
+logger = get_logger("MODELS")
 
 
 # USERNAME = "student123"
@@ -24,8 +37,55 @@ print(f"{SERVER_NAME=} {DATABASE_NAME=} {CONNECTION_STRING}")
 #     "?driver=ODBC+Driver+17+for+SQL+Server"
 # )
 
-engine = create_engine(CONNECTION_STRING, echo=False) 
-mudemy_session = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+def _engine_options(url: str) -> dict:
+    """SQLite stand-ins are shared across request threads; in-memory needs a single connection."""
+    if not url.startswith('sqlite'):
+        return {}
+    options = {'connect_args': {'check_same_thread': False}}
+    if make_url(url).database in (None, '', ':memory:'):
+        options['poolclass'] = StaticPool
+    return options
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Create the engine on first use, so importing the app never loads the DB driver."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                if DATABASE_URL:
+                    logger.info(f"Database target: {make_url(DATABASE_URL).render_as_string(hide_password=True)}")
+                else:
+                    logger.info(f"Database target: server={SERVER_NAME} database={DATABASE_NAME}")
+                _engine = create_engine(CONNECTION_STRING, echo=False, **_engine_options(CONNECTION_STRING))
+    return _engine
+
+def _create_replica_engine(url: str):
+    logger.info(f"Read replica: {make_url(url).render_as_string(hide_password=True)}")
+    return create_engine(url, echo=False, **_engine_options(url))
+
+replicas = ReplicaSet(DATABASE_REPLICA_URLS, _create_replica_engine, get_engine)
+if replicas.configured:
+    RoutingSession.replicas = replicas
+
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker that binds to ``get_engine()`` when the first session is opened."""
+
+    def __call__(self, **local_kw):
+        if self.kw.get('bind') is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+mudemy_session = _LazySessionmaker(class_=RoutingSession if replicas.configured else Session,
+                                   autocommit=False, autoflush=False, expire_on_commit=False)
+
+def __getattr__(name):
+    # ``from app.models import engine`` keeps working; the engine is built on access
+    if name == 'engine':
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __all__ = [
@@ -39,6 +99,7 @@ __all__ = [
     "Enrollment",
     "Payment",
     "Certificate",
+    "CertificateRevocation",
     "Module",
     "LessonRef",
     "Content",
@@ -54,10 +115,25 @@ __all__ = [
     "AssignSubmission",
     "QuizSubmission",
     "Take",
+    "ReplicaHeartbeat",
+    "HttpCacheVersion",
+    "OutboxEvent",
+    "JobLease",
+    "IdempotencyKey",
+    "GradingLease",
     "engine",
+    "get_engine",
     "mudemy_session",
+    "replicas",
+    "route_reads",
+    "use_replica",
+    "use_primary",
+    "request_scope",
+    "ReadYourWritesMiddleware",
     "Base",
-    "generate_id"
+    "generate_id",
+    "allocate_ids",
+    "is_duplicate_key"
 ]
 
 prefix_map = {"User.UserID":["USR",5],
@@ -93,4 +169,47 @@ def generate_id(session, id_column):
         else:
             new_number = 1
             
-        return f"{prefix}{new_number:0{pad_len}d}"
\ No newline at end of file
+        return f"{prefix}{new_number:0{pad_len}d}"
+
+
+# Highest ID number handed out by allocate_ids in this process, per column
+_allocated = {}
+_allocated_lock = threading.Lock()
+
+
+def allocate_ids(session, id_column, count):
+    """Block of ``count`` consecutive IDs after the current highest, read inside ``session``'s transaction.
+
+    For set-based inserts: the whole block goes in one statement, and a
+    concurrent writer taking the same IDs surfaces as an IntegrityError to
+    retry. Blocks never overlap ones already handed out in this process, so
+    only writers in other processes can collide. Orders by length first so
+    ``CER1000`` counts as higher than ``CER999``.
+    """
+    key = str(id_column)
+    prefix, pad_len = prefix_map.get(key)
+    last_id = session.execute(
+        select(id_column)
+        .where(id_column.like(f"{prefix}%"))
+        .order_by(func.length(id_column).desc(), id_column.desc())
+        .limit(1)
+    ).scalar()
+    try:
+        first = int(last_id[len(prefix):]) + 1 if last_id else 1
+    except ValueError:
+        first = 1
+    with _allocated_lock:
+        # IDs from a rolled-back block are skipped, leaving a gap
+        first = max(first, _allocated.get(key, 0) + 1)
+        _allocated[key] = first + count - 1
+    return [f"{prefix}{number:0{pad_len}d}" for number in range(first, first + count)]
+
+
+# PK/unique violations: SQL Server errors 2627/2601, SQLite, PostgreSQL
+_DUPLICATE_KEY_MARKERS = ("(2627)", "(2601)", "duplicate key", "UNIQUE constraint failed")
+
+
+def is_duplicate_key(error) -> bool:
+    """True when an IntegrityError is a taken key (worth retrying), not a FK/CHECK/NOT NULL failure."""
+    message = str(getattr(error, "orig", error))
+    return any(marker in message for marker in _DUPLICATE_KEY_MARKERS)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Date, DECIMAL, Text as TextType, ForeignKey, Boolean, NVARCHAR, FetchedValue, CheckConstraint
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Date, DECIMAL, Text as TextType, ForeignKey, Boolean, NVARCHAR, FetchedValue, CheckConstraint, Index, text
 from datetime import datetime, date
 from .base import Base
 from sqlalchemy.ext.hybrid import hybrid_property
@@ -21,6 +21,8 @@ class User(Base):
     Last_login = Column(DateTime)
     IFlag = Column(Boolean)  # Instructor flag
     Bio_text = Column(NVARCHAR(None))  # NVARCHAR(MAX)
+    Bio_text_hash = Column(String(64))  # blob store key when the body is kept out of row (services.blobs)
+    Bio_text_size = Column(Integer)  # body size in UTF-8 bytes
     Year_of_experience = Column(Integer)
     Average_rating = Column(DECIMAL(3, 1),CheckConstraint("Average_rating >= 0.0 AND Average_rating <= 5.0"),nullable=True,default=None)
     SFlag = Column(Boolean)  # Student flag
@@ -68,6 +70,8 @@ class Course(Base):
     Language = Column(NVARCHAR(50), nullable=False)
     Title = Column(NVARCHAR(200), nullable=False)
     Description = Column(NVARCHAR(None))  # NVARCHAR(MAX)
+    Description_hash = Column(String(64))  # blob store key when the body is kept out of row (services.blobs)
+    Description_size = Column(Integer)  # body size in UTF-8 bytes
     Enrollment_count = Column(Integer,CheckConstraint("Enrollment_count >= 0"),nullable=False,default=0)
 
 class Requires(Base):
@@ -88,7 +92,16 @@ class Instruct(Base):
 
 class Enrollment(Base):
     __tablename__ = 'ENROLLMENT'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # The primary key leads with EnrollmentID, so per-student lookups need their own path;
+        # unique, so two concurrent checkouts cannot both enroll the same student
+        Index('IX_Enrollment_Student', 'StudentID', 'CourseID', unique=True,
+              mssql_include=['Status', 'Enroll_date', 'Progress']),
+        # Completed enrollments still waiting for a certificate (certificate issuance job)
+        Index('IX_Enrollment_Completed', 'CourseID', 'StudentID',
+              mssql_where=text("Status = 'Completed'"), sqlite_where=text("Status = 'Completed'")),
+        {'extend_existing': True},
+    )
     
     EnrollmentID = Column(String(10), unique=True, nullable=False)
     CourseID = Column(String(10), ForeignKey('COURSE.CourseID', ondelete='CASCADE', onupdate='CASCADE'), primary_key=True)
@@ -101,7 +114,11 @@ class Enrollment(Base):
 
 class Payment(Base):
     __tablename__ = 'PAYMENT'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('IX_Payment_User_Date', 'UserID', 'Payment_date'),
+        Index('IX_Payment_Date', 'Payment_date', mssql_include=['Amount', 'UserID']),
+        {'extend_existing': True},
+    )
     
     PaymentID = Column(String(10), primary_key=True)
     Amount = Column(Integer, nullable=False)
@@ -112,19 +129,38 @@ class Payment(Base):
 
 class Certificate(Base):
     __tablename__ = 'CERTIFICATE'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('IX_Certificate_Number', 'Certificate_number'),
+        Index('IX_Certificate_Expiry', 'Expiry_date'),
+        # The primary key includes CertificateID, so only this keeps one certificate per student and course
+        Index('IX_Certificate_Course_Student', 'CourseID', 'StudentID', unique=True),
+        {'extend_existing': True},
+    )
     
     CertificateID = Column(String(10), unique=True, nullable=False)
     CourseID = Column(String(10), ForeignKey('COURSE.CourseID'), primary_key=True)
     StudentID = Column(String(10), ForeignKey('USER.UserID'), primary_key=True)
     Expiry_date = Column(Date)
     Issue_date = Column(Date, default=datetime.utcnow)
-    Certificate_number = Column(String(50), nullable=False)
+    Certificate_number = Column(String(64), nullable=False)   # signed, see core.signing
+
+
+class CertificateRevocation(Base):
+    __tablename__ = 'CERTIFICATE_REVOCATION'
+    __table_args__ = {'extend_existing': True}
+
+    Certificate_number = Column(String(64), primary_key=True)
+    CertificateID = Column(String(10), nullable=False)
+    Revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    Reason = Column(NVARCHAR(200))
 
 
 class Module(Base):
     __tablename__ = 'MODULE'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('IX_Module_Course', 'CourseID'),
+        {'extend_existing': True},
+    )
     
     ModuleID = Column(String(10), primary_key=True)
     Title = Column(NVARCHAR(200), nullable=False)
@@ -140,7 +176,10 @@ class LessonRef(Base):
 
 class Content(Base):
     __tablename__ = 'CONTENT'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('IX_Content_Module', 'ModuleID'),
+        {'extend_existing': True},
+    )
     
     ContentID = Column(String(10), ForeignKey('LESSON_REF.LessonID', ondelete='CASCADE', onupdate='CASCADE'), primary_key=True)
     Slides = Column(NVARCHAR(100))
@@ -195,18 +234,26 @@ class ProvideResource(Base):
 
 class Assignment(Base):
     __tablename__ = 'ASSIGNMENT'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('IX_Assignment_Deadline', 'Deadline', mssql_include=['ModuleID', 'Title']),
+        {'extend_existing': True},
+    )
     
     AssID = Column(String(10), ForeignKey('LESSON_REF.LessonID', ondelete='CASCADE', onupdate='CASCADE'), primary_key=True)
     Deadline = Column(DateTime, nullable=False, default=datetime.utcnow)
     Description = Column(NVARCHAR(None))  # NVARCHAR(MAX)
+    Description_hash = Column(String(64))  # blob store key when the body is kept out of row (services.blobs)
+    Description_size = Column(Integer)  # body size in UTF-8 bytes
     Title = Column(NVARCHAR(200), nullable=False)
     ModuleID = Column(String(10), ForeignKey('MODULE.ModuleID'))
 
 
 class Quiz(Base):
     __tablename__ = 'QUIZ'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('IX_Quiz_Deadline', 'Deadline', mssql_include=['ModuleID', 'Title']),
+        {'extend_existing': True},
+    )
     
     QuizID = Column(String(10), ForeignKey('LESSON_REF.LessonID', ondelete='CASCADE', onupdate='CASCADE'), primary_key=True)
     Time_limit = Column(Integer)
@@ -238,32 +285,131 @@ class Answer(Base):
 
 class AssignSubmission(Base):
     __tablename__ = 'ASSIGN_SUBMISSION'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('IX_AssignSubmission_Ass_User', 'AssID', 'UserID', 'Sub_date', mssql_include=['Grade']),
+        # Grading queue: ungraded submissions oldest first
+        Index('IX_AssignSubmission_Ungraded', 'Sub_date', mssql_include=['AssID', 'UserID'],
+              mssql_where=text("Grade IS NULL"), sqlite_where=text("Grade IS NULL")),
+        {'extend_existing': True},
+    )
     
     SubID = Column(String(10), primary_key=True)
     UserID = Column(String(10), ForeignKey('USER.UserID', ondelete='CASCADE', onupdate='CASCADE'))
     AssID = Column(String(10), ForeignKey('ASSIGNMENT.AssID', ondelete='CASCADE', onupdate='CASCADE'))
     Sub_content = Column(NVARCHAR(None))  # NVARCHAR(MAX)
+    Sub_content_hash = Column(String(64))  # blob store key when the body is kept out of row (services.blobs)
+    Sub_content_size = Column(Integer)  # body size in UTF-8 bytes
     Grade = Column(DECIMAL(5, 2))
     Sub_date = Column(DateTime, nullable=False, default=datetime.utcnow)
 
 
 class QuizSubmission(Base):
     __tablename__ = 'QUIZ_SUBMISSION'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('IX_QuizSubmission_Quiz_User_Date', 'QuizID', 'UserID', 'Sub_date', mssql_include=['Grade']),
+        {'extend_existing': True},
+    )
     
     SubID = Column(String(10), primary_key=True)
     UserID = Column(String(10), ForeignKey('USER.UserID', ondelete='CASCADE', onupdate='CASCADE'))
     QuizID = Column(String(10), ForeignKey('QUIZ.QuizID', ondelete='CASCADE', onupdate='CASCADE'))
     Sub_content = Column(NVARCHAR(None))  # NVARCHAR(MAX)
+    Sub_content_hash = Column(String(64))  # blob store key when the body is kept out of row (services.blobs)
+    Sub_content_size = Column(Integer)  # body size in UTF-8 bytes
     Grade = Column(DECIMAL(5, 2))
     Sub_date = Column(DateTime, nullable=False, default=datetime.utcnow)
 
 
 class Take(Base):
     __tablename__ = 'TAKE'
+    # (UserID, LessonID) primary key already serves per-user lookups
     __table_args__ = {'extend_existing': True}
     
     UserID = Column(String(10), ForeignKey('USER.UserID', ondelete='CASCADE', onupdate='CASCADE'), primary_key=True)
     LessonID = Column(String(10), ForeignKey('LESSON_REF.LessonID', ondelete='CASCADE', onupdate='CASCADE'), primary_key=True)
-    is_finished = Column(Boolean, default=False)
\ No newline at end of file
+    is_finished = Column(Boolean, default=False)
+
+
+class ReplicaHeartbeat(Base):
+    __tablename__ = 'REPLICA_HEARTBEAT'
+    __table_args__ = {'extend_existing': True}
+
+    HeartbeatID = Column(Integer, primary_key=True, autoincrement=False)
+    Beat_at = Column(DateTime, nullable=False)
+
+
+class HttpCacheVersion(Base):
+    __tablename__ = 'HTTP_CACHE_VERSION'
+    __table_args__ = {'extend_existing': True}
+
+    ResourceKey = Column(String(100), primary_key=True)     # "catalog", "course:CRS00001", "module:MOD001"
+    Version = Column(BigInteger, nullable=False, default=0)
+    Modified_at = Column(DateTime, nullable=False)
+
+
+class OutboxEvent(Base):
+    __tablename__ = 'OUTBOX_EVENT'
+    __table_args__ = (
+        # The relay scans for undelivered rows oldest first
+        Index('IX_OutboxEvent_Pending', 'Dispatched_at', 'Created_at'),
+        {'extend_existing': True},
+    )
+
+    EventID = Column(String(32), primary_key=True)
+    Event_type = Column(String(64), nullable=False)
+    Payload = Column(NVARCHAR(None), nullable=False)  # NVARCHAR(MAX), JSON
+    Created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    Claimed_at = Column(DateTime)
+    Dispatched_at = Column(DateTime)
+    Attempts = Column(Integer, nullable=False, default=0)
+
+
+class JobLease(Base):
+    __tablename__ = 'JOB_LEASE'
+    __table_args__ = {'extend_existing': True}
+
+    JobName = Column(String(64), primary_key=True)
+    Owner = Column(String(100))
+    Lease_until = Column(DateTime)
+    Next_run_at = Column(DateTime)
+    Watermark = Column(DateTime)                # end of the window the last successful sweep covered
+    Last_started_at = Column(DateTime)
+    Last_finished_at = Column(DateTime)
+    Last_duration_ms = Column(Integer)
+    Last_status = Column(String(20))
+    Last_error = Column(NVARCHAR(500))
+    Run_count = Column(Integer, nullable=False, default=0)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = 'IDEMPOTENCY_KEY'
+    __table_args__ = (
+        # The purge job deletes expired keys oldest first
+        Index('IX_IdempotencyKey_Expiry', 'Expires_at'),
+        {'extend_existing': True},
+    )
+
+    UserID = Column(String(10), ForeignKey('USER.UserID', ondelete='CASCADE', onupdate='CASCADE'), primary_key=True)
+    Idempotency_key = Column(String(64), primary_key=True)
+    Request_hash = Column(String(64), nullable=False)    # SHA-256 of the request body
+    Status_code = Column(Integer, nullable=False)
+    Response = Column(NVARCHAR(None), nullable=False)     # NVARCHAR(MAX), JSON
+    Created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    Expires_at = Column(DateTime, nullable=False)
+
+
+class GradingLease(Base):
+    __tablename__ = 'GRADING_LEASE'
+    __table_args__ = (
+        Index('IX_GradingLease_Grader', 'Grader', 'Lease_until'),
+        Index('IX_GradingLease_Expiry', 'Lease_until'),
+        {'extend_existing': True},
+    )
+
+    SubID = Column(String(10), ForeignKey('ASSIGN_SUBMISSION.SubID', ondelete='CASCADE', onupdate='CASCADE'),
+                   primary_key=True)
+    # No FK to USER: ASSIGN_SUBMISSION already cascades from USER, and SQL Server rejects a second cascade path
+    Grader = Column(String(10), nullable=False)
+    Claim_token = Column(String(32), nullable=False)     # one per claim call, to read back what it won
+    Claimed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    Lease_until = Column(DateTime, nullable=False)
@@ -0,0 +1,284 @@
+"""Primary/replica routing for ``mudemy_session``.
+
+Sessions bind to the primary unless the current service call is a read
+(``get_*``/``search_*`` on a class decorated with ``route_reads``) or runs
+inside ``use_replica()``. Once anything has been written in a session, or in
+the current request when ``ReadYourWritesMiddleware`` is installed, later
+reads stay on the primary so callers always see their own writes.
+
+Replica lag is measured with a heartbeat row that one worker writes on the
+primary and every worker reads back from each replica, both as scheduled jobs;
+replicas further behind than REPLICA_MAX_LAG_SECONDS, or unreachable, are
+skipped until they catch up. Requests only read the last measurement, and
+fall back to the primary when it is older than the lag budget.
+"""
+import contextvars
+import inspect
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event, select, update
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..core import config, get_logger
+from .models import ReplicaHeartbeat
+
+logger = get_logger("DB_ROUTING")
+
+PRIMARY = "primary"
+REPLICA = "replica"
+READ_PREFIXES = ("get_", "search_")
+
+_route = contextvars.ContextVar("db_route", default=None)
+# One mutable dict per request; threadpool copies of the context share it
+_request_state = contextvars.ContextVar("db_request_state", default=None)
+
+
+class ReplicaSet:
+    """Replica engines with the lag measured in the background every REPLICA_CHECK_INTERVAL."""
+
+    def __init__(self, urls: List[str], engine_factory: Callable[[str], Engine], primary: Callable[[], Engine]):
+        self.urls = urls
+        self._engine_factory = engine_factory
+        self._primary = primary
+        self._engines: Optional[List[Engine]] = None
+        self._lag: List[Optional[float]] = [None] * len(urls)
+        self._checked_at = float("-inf")
+        self._beat_ok = True
+        self._lock = threading.Lock()
+        self._engines_lock = threading.Lock()
+        self._next = itertools.count()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.urls)
+
+    def engines(self) -> List[Engine]:
+        if self._engines is None:
+            with self._engines_lock:
+                if self._engines is None:
+                    self._engines = [self._engine_factory(url) for url in self.urls]
+        return self._engines
+
+    def choose(self) -> Optional[Engine]:
+        """A replica within the lag budget (round-robin), or None to use the primary.
+
+        Only reads the last measurement; ``beat`` and ``measure`` run on the
+        scheduler (app.services.jobs), never on a request thread.
+        """
+        if not self.urls:
+            return None
+        if time.monotonic() - self._checked_at > config.REPLICA_MAX_LAG_SECONDS + 2 * config.REPLICA_CHECK_INTERVAL:
+            return None   # measurements stopped (scheduler not running); a replica could be any distance behind
+        healthy = [engine for engine, lag in zip(self.engines(), self._lag) if _in_rotation(lag)]
+        if not healthy:
+            return None
+        return healthy[next(self._next) % len(healthy)]
+
+    def beat(self) -> None:
+        """Write the heartbeat row on the primary; one worker does this per interval."""
+        now = datetime.utcnow()
+        try:
+            with self._primary().begin() as conn:
+                beat = update(ReplicaHeartbeat).where(ReplicaHeartbeat.HeartbeatID == 1).values(Beat_at=now)
+                if conn.execute(beat).rowcount == 0:
+                    conn.execute(ReplicaHeartbeat.__table__.insert().values(HeartbeatID=1, Beat_at=now))
+            self._beat_ok = True
+        except Exception as e:
+            if self._beat_ok:
+                logger.warning(f"Could not write replica heartbeat on primary: {e}")
+            self._beat_ok = False
+
+    def measure(self) -> List[Optional[float]]:
+        """Lag of each replica: how far its heartbeat is behind the primary's.
+
+        Both timestamps come from the same writer, so clock skew between hosts
+        does not matter. A primary heartbeat older than the lag budget means
+        nobody is beating, and then no replica can be vouched for.
+        """
+        with self._lock:
+            return self._measure()
+
+    def _measure(self) -> List[Optional[float]]:
+        stale_after = config.REPLICA_MAX_LAG_SECONDS + 2 * config.REPLICA_CHECK_INTERVAL
+        try:
+            with self._primary().connect() as conn:
+                latest = conn.execute(select(ReplicaHeartbeat.Beat_at)
+                                      .where(ReplicaHeartbeat.HeartbeatID == 1)).scalar()
+        except Exception as e:
+            logger.warning(f"Could not read replica heartbeat on primary: {e}")
+            latest = None
+        fresh = latest is not None and (datetime.utcnow() - latest).total_seconds() <= stale_after
+
+        lags = []
+        for engine, previous in zip(self.engines(), self._lag):
+            reason = None
+            try:
+                with engine.connect() as conn:
+                    seen = conn.execute(select(ReplicaHeartbeat.Beat_at)
+                                        .where(ReplicaHeartbeat.HeartbeatID == 1)).scalar()
+                if not fresh:
+                    lag, reason = None, "primary heartbeat stale"
+                elif seen is None:
+                    lag, reason = None, "no heartbeat yet"
+                else:
+                    lag = max(0.0, (latest - seen).total_seconds())
+                    reason = f"lag {lag:.1f}s"
+            except Exception as e:
+                lag, reason = None, f"unreachable: {e}"
+            if _in_rotation(lag) != _in_rotation(previous) and self._checked_at != float("-inf"):
+                name = engine.url.render_as_string(hide_password=True)
+                if _in_rotation(lag):
+                    logger.info(f"Replica {name} back in rotation ({reason})")
+                else:
+                    logger.warning(f"Replica {name} out of rotation ({reason})")
+            lags.append(lag)
+        self._lag = lags
+        self._checked_at = time.monotonic()
+        return lags
+
+    def refresh(self) -> List[Optional[float]]:
+        """Beat and measure in one go (benchmarks, manual checks)."""
+        self.beat()
+        return self.measure()
+
+    def status(self) -> List[Dict[str, object]]:
+        engines = self._engines or []
+        return [{"url": engine.url.render_as_string(hide_password=True),
+                 "lag_seconds": None if lag is None else round(lag, 3),
+                 "in_rotation": _in_rotation(lag)}
+                for engine, lag in zip(engines, self._lag)]
+
+
+def _in_rotation(lag: Optional[float]) -> bool:
+    return lag is not None and lag <= config.REPLICA_MAX_LAG_SECONDS
+
+
+class RoutingSession(Session):
+    """Session whose bind follows the current route; anything written pins it to the primary."""
+
+    replicas: Optional[ReplicaSet] = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.replicas is not None and not self._flushing and _wants_replica(self):
+            engine = self.info.get("replica")
+            if engine is None:
+                engine = self.replicas.choose()
+                if engine is not None:
+                    self.info["replica"] = engine   # one replica per session keeps reads consistent
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+def _wants_replica(session: Session) -> bool:
+    if _route.get() != REPLICA or session.info.get("wrote"):
+        return False
+    state = _request_state.get()
+    return not (state and state["wrote"])
+
+
+def _mark_written(session: Session) -> None:
+    session.info["wrote"] = True
+    session.info.pop("replica", None)
+    state = _request_state.get()
+    if state is not None:
+        state["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session, flush_context):
+    _mark_written(session)
+
+
+def _is_write(orm_execute_state) -> bool:
+    if orm_execute_state.is_select:
+        return False
+    statement = orm_execute_state.statement
+    if isinstance(statement, TextClause):
+        return not statement.text.lstrip().upper().startswith(("SELECT", "WITH"))
+    return True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _before_execute(orm_execute_state):
+    # Bulk UPDATE/DELETE and raw statements skip the flush
+    if _is_write(orm_execute_state):
+        _mark_written(orm_execute_state.session)
+
+
+@contextmanager
+def _routed(route: str):
+    token = _route.set(route)
+    try:
+        yield
+    finally:
+        _route.reset(token)
+
+
+def use_replica():
+    """Route reads in this block to a replica (unless something was already written)."""
+    return _routed(REPLICA)
+
+
+def use_primary():
+    """Keep every statement in this block on the primary."""
+    return _routed(PRIMARY)
+
+
+@contextmanager
+def request_scope():
+    """Share read-your-writes state across every session opened in this block."""
+    token = _request_state.set({"wrote": False})
+    try:
+        yield
+    finally:
+        _request_state.reset(token)
+
+
+def _scoped(fn, route: str):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _route.get() is not None:
+            return fn(*args, **kwargs)   # the outermost service call decides
+        token = _route.set(route)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _route.reset(token)
+    return wrapper
+
+
+def route_reads(cls):
+    """Class decorator: ``get_*``/``search_*`` methods read from replicas, every other method pins the primary.
+
+    Without configured replicas the class is returned untouched.
+    """
+    if RoutingSession.replicas is None:
+        return cls
+    for name, fn in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(fn):
+            continue
+        setattr(cls, name, _scoped(fn, REPLICA if name.startswith(READ_PREFIXES) else PRIMARY))
+    return cls
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware giving each request its own read-your-writes scope."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with request_scope():
+            await self.app(scope, receive, send)
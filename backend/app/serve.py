@@ -0,0 +1,158 @@
+"""Production launcher.
+
+    python -m app.serve
+
+Runs ``app.main:app`` on every core with settings from ``core.config``. With
+gunicorn installed (Linux/macOS) the app is imported once in the master and
+forked into uvicorn workers; elsewhere uvicorn's own supervisor spawns the
+workers. ``python -m app.main`` stays the single-process dev server.
+
+On SIGTERM a worker first reports "draining" on /health/ready for
+SERVER_DRAIN_SECONDS so the load balancer stops routing to it, then stops
+accepting and lets in-flight requests finish within SERVER_GRACEFUL_TIMEOUT.
+"""
+import os
+import signal
+import threading
+
+import uvicorn
+
+from .core import config, health
+from .core.logger import get_logger
+
+logger = get_logger("SERVER")
+
+APP = "app.main:app"
+
+try:
+    from gunicorn.app.base import BaseApplication
+    from gunicorn.arbiter import Arbiter
+except ImportError:
+    BaseApplication = None
+
+
+def worker_count() -> int:
+    return config.WEB_CONCURRENCY if config.WEB_CONCURRENCY > 0 else (os.cpu_count() or 1)
+
+
+def _shutdown_timeout() -> int:
+    return max(1, int(config.SERVER_GRACEFUL_TIMEOUT - config.SERVER_DRAIN_SECONDS))
+
+
+def _worker_options() -> dict:
+    return {
+        "loop": config.SERVER_LOOP,
+        "http": config.SERVER_HTTP,
+        "timeout_graceful_shutdown": _shutdown_timeout(),
+    }
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that fails readiness before it stops accepting connections.
+
+    A second signal (or Ctrl+C) during the drain exits straight away.
+    """
+
+    _drain_timer = None
+
+    def handle_exit(self, sig, frame) -> None:
+        if self._drain_timer is not None or sig == signal.SIGINT or config.SERVER_DRAIN_SECONDS <= 0:
+            super().handle_exit(sig, frame)
+            return
+        health.set_draining(True)
+        logger.info(f"Draining for {config.SERVER_DRAIN_SECONDS}s before shutdown (pid {os.getpid()})")
+        self._drain_timer = threading.Timer(config.SERVER_DRAIN_SECONDS, super().handle_exit, (sig, frame))
+        self._drain_timer.daemon = True
+        self._drain_timer.start()
+
+
+if BaseApplication is not None:
+    try:
+        from uvicorn_worker import UvicornWorker
+    except ImportError:
+        from uvicorn.workers import UvicornWorker
+
+    class DrainingUvicornWorker(UvicornWorker):
+        CONFIG_KWARGS = _worker_options()
+
+        async def _serve(self) -> None:
+            # Same as UvicornWorker._serve, with the draining server
+            self.config.app = self.wsgi
+            server = DrainingServer(config=self.config)
+            self._install_sigquit_handler()
+            await server.serve(sockets=self.sockets)
+            if not server.started:
+                raise SystemExit(Arbiter.WORKER_BOOT_ERROR)
+
+    def _post_fork(server, worker) -> None:
+        # Connections opened while preloading belong to the master; never share them
+        from .models import get_engine
+        get_engine().dispose(close=False)
+
+    class GunicornApplication(BaseApplication):
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self) -> None:
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from .main import app
+            return app
+
+
+def gunicorn_options() -> dict:
+    options = {
+        "bind": f"{config.SERVER_HOST}:{config.SERVER_PORT}",
+        "workers": worker_count(),
+        "worker_class": "app.serve.DrainingUvicornWorker",
+        "preload_app": config.SERVER_PRELOAD,
+        "backlog": config.SERVER_BACKLOG,
+        "keepalive": config.SERVER_KEEPALIVE,
+        "max_requests": config.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": config.SERVER_MAX_REQUESTS_JITTER,
+        "graceful_timeout": config.SERVER_GRACEFUL_TIMEOUT,
+        "timeout": config.SERVER_WORKER_TIMEOUT,
+        "post_fork": _post_fork,
+    }
+    if os.path.isdir("/dev/shm"):
+        options["worker_tmp_dir"] = "/dev/shm"   # heartbeat files off disk-backed /tmp in containers
+    return options
+
+
+def uvicorn_options(workers: int) -> dict:
+    return {
+        "host": config.SERVER_HOST,
+        "port": config.SERVER_PORT,
+        "workers": workers,
+        "backlog": config.SERVER_BACKLOG,
+        "timeout_keep_alive": config.SERVER_KEEPALIVE,
+        "limit_max_requests": config.SERVER_MAX_REQUESTS or None,
+        "limit_max_requests_jitter": config.SERVER_MAX_REQUESTS_JITTER,
+        **_worker_options(),
+    }
+
+
+def main() -> None:
+    workers = worker_count()
+    if BaseApplication is not None and workers > 1:
+        logger.info(f"Starting gunicorn with {workers} uvicorn workers on {config.SERVER_HOST}:{config.SERVER_PORT}")
+        GunicornApplication(gunicorn_options()).run()
+        return
+
+    options = uvicorn_options(workers)
+    if workers > 1:
+        # uvicorn's supervisor spawns fresh interpreters: no preload and no drain window
+        logger.warning("gunicorn not installed; falling back to uvicorn's process manager")
+        logger.info(f"Starting {workers} uvicorn workers on {config.SERVER_HOST}:{config.SERVER_PORT}")
+        uvicorn.run(APP, **options)
+        return
+
+    logger.info(f"Starting single uvicorn worker on {config.SERVER_HOST}:{config.SERVER_PORT}")
+    DrainingServer(uvicorn.Config(APP, **options)).run()
+
+
+if __name__ == "__main__":
+    main()
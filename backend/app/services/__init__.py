@@ -35,6 +35,20 @@ from .assessment_service import (
 
 from .resource_service import ResourceService, ProvideResourceService
 
+from .dashboard_service import DashboardService
+
+from .grading_service import BatchGradingService, GradingQueueService
+
+from . import blobs
+
+from .container import ServiceContainer, container
+
+from .events import DomainEvent, emit, outbox
+
+from .idempotency import idempotency
+
+from .jobs import leases, scheduler
+
 __all__ = [
     # User services
     'UserService',
@@ -70,4 +84,30 @@ __all__ = [
     # Resource services
     'ResourceService',
     'ProvideResourceService',
+
+    # Dashboards
+    'DashboardService',
+
+    # Grading
+    'GradingQueueService',
+    'BatchGradingService',
+
+    # Large text columns in the blob store
+    'blobs',
+
+    # Shared instances
+    'ServiceContainer',
+    'container',
+
+    # Domain events
+    'DomainEvent',
+    'emit',
+    'outbox',
+
+    # Checkout idempotency keys
+    'idempotency',
+
+    # Background jobs
+    'leases',
+    'scheduler',
 ]
\ No newline at end of file
@@ -7,9 +7,22 @@ from ..models.models import (
     Assignment, Quiz, Question, Answer,
     AssignSubmission, QuizSubmission
 )
-from ..models import generate_id
+from ..models import generate_id, route_reads
+from .projections import FULL, View, projection
+from .events import AssignmentGraded, AssignmentSubmitted, QuizGraded, QuizSubmitted, as_float, emit
 
 
+def assignment_graded(submission: AssignSubmission) -> AssignmentGraded:
+    return AssignmentGraded(sub_id=submission.SubID, ass_id=submission.AssID, user_id=submission.UserID,
+                            grade=as_float(submission.Grade))
+
+
+def quiz_graded(submission: QuizSubmission) -> QuizGraded:
+    return QuizGraded(sub_id=submission.SubID, quiz_id=submission.QuizID, user_id=submission.UserID,
+                      grade=as_float(submission.Grade))
+
+
+@route_reads
 class AssignmentService:
     """Service for Assignment CRUD operations"""
     
@@ -37,20 +50,20 @@ class AssignmentService:
                     raise ValueError(f"Error creating assignment: {str(e)}")
         raise Exception(f"Failed to generate unique ID for {Assignment.__name__} after {self.max_retries} attempts.")
     
-    def get_assignment_by_id(self, ass_id: str) -> Optional[Assignment]:
+    def get_assignment_by_id(self, ass_id: str, view: View = FULL) -> Optional[Assignment]:
         """Get assignment by ID"""
         with self.db_session() as session:
-            return session.query(Assignment).filter(Assignment.AssID == ass_id).first()
+            return session.query(*projection(Assignment, view)).filter(Assignment.AssID == ass_id).first()
     
-    def get_assignments_by_module(self, module_id: str) -> List[Assignment]:
+    def get_assignments_by_module(self, module_id: str, view: View = FULL) -> List[Assignment]:
         """Get all assignments for a module"""
         with self.db_session() as session:
-            return session.query(Assignment).filter(Assignment.ModuleID == module_id).all()
+            return session.query(*projection(Assignment, view)).filter(Assignment.ModuleID == module_id).all()
     
-    def get_all_assignments(self) -> List[Assignment]:
+    def get_all_assignments(self, view: View = FULL) -> List[Assignment]:
         """Get all assignments"""
         with self.db_session() as session:
-            return session.query(Assignment).all()
+            return session.query(*projection(Assignment, view)).all()
     
     def update_assignment(self, ass_id: str, update_data: Dict[str, Any]) -> Optional[Assignment]:
         """Update assignment information"""
@@ -87,14 +100,21 @@ class AssignmentService:
     
     def get_upcoming_assignments(self, days: int = 7) -> List[Assignment]:
         """Get assignments due within specified days"""
+        now = datetime.utcnow()
+        return self.get_assignments_due_between(now, now + timedelta(days=days), inclusive_start=True)
+    
+    def get_assignments_due_between(self, start: datetime, end: datetime,
+                                    inclusive_start: bool = False) -> List[Assignment]:
+        """Get assignments whose deadline falls in (start, end], oldest deadline first (IX_Assignment_Deadline)"""
         with self.db_session() as session:
-            future_date = datetime.utcnow() + timedelta(days=days)
+            after = Assignment.Deadline >= start if inclusive_start else Assignment.Deadline > start
             return session.query(Assignment).filter(
-                Assignment.Deadline <= future_date,
-                Assignment.Deadline >= datetime.utcnow()
-            ).all()
+                after,
+                Assignment.Deadline <= end
+            ).order_by(Assignment.Deadline).all()
 
 
+@route_reads
 class QuizService:
     """Service for Quiz CRUD operations"""
     
@@ -122,20 +142,20 @@ class QuizService:
                     raise ValueError(f"Error creating quiz: {str(e)}")
         raise Exception(f"Failed to generate unique ID for {Quiz.__name__} after {self.max_retries} attempts.")
     
-    def get_quiz_by_id(self, quiz_id: str) -> Optional[Quiz]:
+    def get_quiz_by_id(self, quiz_id: str, view: View = FULL) -> Optional[Quiz]:
         """Get quiz by ID"""
         with self.db_session() as session:
-            return session.query(Quiz).filter(Quiz.QuizID == quiz_id).first()
+            return session.query(*projection(Quiz, view)).filter(Quiz.QuizID == quiz_id).first()
     
-    def get_quizzes_by_module(self, module_id: str) -> List[Quiz]:
+    def get_quizzes_by_module(self, module_id: str, view: View = FULL) -> List[Quiz]:
         """Get all quizzes for a module"""
         with self.db_session() as session:
-            return session.query(Quiz).filter(Quiz.ModuleID == module_id).all()
+            return session.query(*projection(Quiz, view)).filter(Quiz.ModuleID == module_id).all()
     
-    def get_all_quizzes(self) -> List[Quiz]:
+    def get_all_quizzes(self, view: View = FULL) -> List[Quiz]:
         """Get all quizzes"""
         with self.db_session() as session:
-            return session.query(Quiz).all()
+            return session.query(*projection(Quiz, view)).all()
     
     def update_quiz(self, quiz_id: str, update_data: Dict[str, Any]) -> Optional[Quiz]:
         """Update quiz information"""
@@ -172,14 +192,21 @@ class QuizService:
     
     def get_upcoming_quizzes(self, days: int = 7) -> List[Quiz]:
         """Get quizzes due within specified days"""
+        now = datetime.utcnow()
+        return self.get_quizzes_due_between(now, now + timedelta(days=days), inclusive_start=True)
+    
+    def get_quizzes_due_between(self, start: datetime, end: datetime,
+                                inclusive_start: bool = False) -> List[Quiz]:
+        """Get quizzes whose deadline falls in (start, end], oldest deadline first (IX_Quiz_Deadline)"""
         with self.db_session() as session:
-            future_date = datetime.utcnow() + timedelta(days=days)
+            after = Quiz.Deadline >= start if inclusive_start else Quiz.Deadline > start
             return session.query(Quiz).filter(
-                Quiz.Deadline <= future_date,
-                Quiz.Deadline >= datetime.utcnow()
-            ).all()
+                after,
+                Quiz.Deadline <= end
+            ).order_by(Quiz.Deadline).all()
 
 
+@route_reads
 class QuestionService:
     """Service for Question CRUD operations"""
     
@@ -207,15 +234,15 @@ class QuestionService:
                     raise ValueError(f"Error creating question: {str(e)}")
         raise Exception(f"Failed to generate unique ID for {Question.__name__} after {self.max_retries} attempts.")
     
-    def get_question_by_id(self, question_id: str) -> Optional[Question]:
+    def get_question_by_id(self, question_id: str, view: View = FULL) -> Optional[Question]:
         """Get question by ID"""
         with self.db_session() as session:
-            return session.query(Question).filter(Question.QuestionID == question_id).first()
+            return session.query(*projection(Question, view)).filter(Question.QuestionID == question_id).first()
     
-    def get_questions_by_quiz(self, quiz_id: str) -> List[Question]:
+    def get_questions_by_quiz(self, quiz_id: str, view: View = FULL) -> List[Question]:
         """Get all questions for a quiz"""
         with self.db_session() as session:
-            return session.query(Question).filter(Question.QuizID == quiz_id).all()
+            return session.query(*projection(Question, view)).filter(Question.QuizID == quiz_id).all()
     
     def update_question(self, question_id: str, update_data: Dict[str, Any]) -> Optional[Question]:
         """Update question information"""
@@ -249,6 +276,7 @@ class QuestionService:
             return session.query(Question).filter(Question.QuizID == quiz_id).count()
 
 
+@route_reads
 class AnswerService:
     """Service for Answer CRUD operations"""
     
@@ -285,10 +313,10 @@ class AnswerService:
                 Answer.AnswerID == answer_id
             ).first()
     
-    def get_answers_by_question(self, question_id: str, quiz_id: str) -> List[Answer]:
+    def get_answers_by_question(self, question_id: str, quiz_id: str, view: View = FULL) -> List[Answer]:
         """Get all answers for a question"""
         with self.db_session() as session:
-            return session.query(Answer).filter(
+            return session.query(*projection(Answer, view)).filter(
                 Answer.QuestionID == question_id,
                 Answer.QuizID == quiz_id
             ).all()
@@ -348,6 +376,7 @@ class AnswerService:
             return True
 
 
+@route_reads
 class AssignSubmissionService:
     """Service for Assignment Submission CRUD operations"""
     
@@ -364,6 +393,8 @@ class AssignSubmissionService:
                 try:
                     submission = AssignSubmission(**submission_data)
                     session.add(submission)
+                    emit(session, AssignmentSubmitted(sub_id=submission.SubID, ass_id=submission.AssID,
+                                                      user_id=submission.UserID))
                     session.commit()
                     session.refresh(submission)
                     return submission
@@ -375,20 +406,20 @@ class AssignSubmissionService:
                     raise ValueError(f"Error creating submission: {str(e)}")
         raise Exception(f"Failed to generate unique ID for {AssignSubmission.__name__} after {self.max_retries} attempts.")
     
-    def get_submission_by_id(self, sub_id: str) -> Optional[AssignSubmission]:
+    def get_submission_by_id(self, sub_id: str, view: View = FULL) -> Optional[AssignSubmission]:
         """Get submission by ID"""
         with self.db_session() as session:
-            return session.query(AssignSubmission).filter(AssignSubmission.SubID == sub_id).first()
+            return session.query(*projection(AssignSubmission, view)).filter(AssignSubmission.SubID == sub_id).first()
     
-    def get_submissions_by_assignment(self, ass_id: str) -> List[AssignSubmission]:
+    def get_submissions_by_assignment(self, ass_id: str, view: View = FULL) -> List[AssignSubmission]:
         """Get all submissions for an assignment"""
         with self.db_session() as session:
-            return session.query(AssignSubmission).filter(AssignSubmission.AssID == ass_id).all()
+            return session.query(*projection(AssignSubmission, view)).filter(AssignSubmission.AssID == ass_id).all()
     
-    def get_submissions_by_user(self, user_id: str) -> List[AssignSubmission]:
+    def get_submissions_by_user(self, user_id: str, view: View = FULL) -> List[AssignSubmission]:
         """Get all submissions by a user"""
         with self.db_session() as session:
-            return session.query(AssignSubmission).filter(AssignSubmission.UserID == user_id).all()
+            return session.query(*projection(AssignSubmission, view)).filter(AssignSubmission.UserID == user_id).all()
     
     def get_user_submission_for_assignment(self, user_id: str, ass_id: str) -> Optional[AssignSubmission]:
         """Get a specific user's submission for an assignment"""
@@ -405,10 +436,13 @@ class AssignSubmissionService:
             if not submission:
                 return None
             
+            previous_grade = submission.Grade
             for key, value in update_data.items():
                 if hasattr(submission, key):
                     setattr(submission, key, value)
             
+            if submission.Grade != previous_grade:
+                emit(session, assignment_graded(submission))
             session.commit()
             session.refresh(submission)
             return submission
@@ -421,6 +455,7 @@ class AssignSubmissionService:
                 return None
             
             submission.Grade = grade
+            emit(session, assignment_graded(submission))
             session.commit()
             session.refresh(submission)
             return submission
@@ -453,6 +488,7 @@ class AssignSubmissionService:
             ).all()
 
 
+@route_reads
 class QuizSubmissionService:
     """Service for Quiz Submission CRUD operations"""
     
@@ -469,6 +505,8 @@ class QuizSubmissionService:
                 try:
                     submission = QuizSubmission(**submission_data)
                     session.add(submission)
+                    emit(session, QuizSubmitted(sub_id=submission.SubID, quiz_id=submission.QuizID,
+                                                user_id=submission.UserID))
                     session.commit()
                     session.refresh(submission)
                     return submission
@@ -480,20 +518,20 @@ class QuizSubmissionService:
                     raise ValueError(f"Error creating quiz submission: {str(e)}")
         raise Exception(f"Failed to generate unique ID for {QuizSubmission.__name__} after {self.max_retries} attempts.")
     
-    def get_submission_by_id(self, sub_id: str) -> Optional[QuizSubmission]:
+    def get_submission_by_id(self, sub_id: str, view: View = FULL) -> Optional[QuizSubmission]:
         """Get submission by ID"""
         with self.db_session() as session:
-            return session.query(QuizSubmission).filter(QuizSubmission.SubID == sub_id).first()
+            return session.query(*projection(QuizSubmission, view)).filter(QuizSubmission.SubID == sub_id).first()
     
-    def get_submissions_by_quiz(self, quiz_id: str) -> List[QuizSubmission]:
+    def get_submissions_by_quiz(self, quiz_id: str, view: View = FULL) -> List[QuizSubmission]:
         """Get all submissions for a quiz"""
         with self.db_session() as session:
-            return session.query(QuizSubmission).filter(QuizSubmission.QuizID == quiz_id).all()
+            return session.query(*projection(QuizSubmission, view)).filter(QuizSubmission.QuizID == quiz_id).all()
     
-    def get_submissions_by_user(self, user_id: str) -> List[QuizSubmission]:
+    def get_submissions_by_user(self, user_id: str, view: View = FULL) -> List[QuizSubmission]:
         """Get all quiz submissions by a user"""
         with self.db_session() as session:
-            return session.query(QuizSubmission).filter(QuizSubmission.UserID == user_id).all()
+            return session.query(*projection(QuizSubmission, view)).filter(QuizSubmission.UserID == user_id).all()
     
     def get_user_submissions_for_quiz(self, user_id: str, quiz_id: str) -> List[QuizSubmission]:
         """Get all attempts by a user for a specific quiz"""
@@ -532,10 +570,13 @@ class QuizSubmissionService:
             if not submission:
                 return None
             
+            previous_grade = submission.Grade
             for key, value in update_data.items():
                 if hasattr(submission, key):
                     setattr(submission, key, value)
             
+            if submission.Grade != previous_grade:
+                emit(session, quiz_graded(submission))
             session.commit()
             session.refresh(submission)
             return submission
@@ -548,6 +589,7 @@ class QuizSubmissionService:
                 return None
             
             submission.Grade = grade
+            emit(session, quiz_graded(submission))
             session.commit()
             session.refresh(submission)
             return submission
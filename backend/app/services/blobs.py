@@ -0,0 +1,122 @@
+"""Large text columns kept in the blob store (``core.blobstore``) instead of the row.
+
+USER.Bio_text, COURSE.Description, ASSIGNMENT.Description and the two
+Sub_content columns are NVARCHAR(MAX). When a row is flushed with a body
+longer than BLOB_INLINE_MAX characters, the body goes to the blob store and
+the column is set to NULL. ``<column>_hash`` and ``<column>_size`` then point
+at the blob, so queries listing these rows no longer carry the body. Shorter
+bodies stay inline with a NULL hash. Services keep assigning the plain
+column, and the flush hooks below do the rest. Core ``insert()``/``update()``
+statements bypass them and should not write these columns.
+
+Readers use ``text(row, column)``, which returns the inline value or the
+stored body. ``stream`` yields the body in chunks. ``migrate`` moves bodies
+already in the database out in batches; ``python -m app.migrate_blobs`` runs it.
+"""
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import bindparam, event as orm_event, func, inspect, select, update
+from sqlalchemy.orm import sessionmaker
+
+from ..core import config, get_logger
+from ..core.blobstore import BlobNotFound, store
+from ..models.models import Assignment, AssignSubmission, Course, QuizSubmission, User
+
+logger = get_logger("BLOBS")
+
+BLOB_COLUMNS: Dict[type, Tuple[str, ...]] = {
+    User: ("Bio_text",),
+    Course: ("Description",),
+    Assignment: ("Description",),
+    AssignSubmission: ("Sub_content",),
+    QuizSubmission: ("Sub_content",),
+}
+
+
+def _externalize(mapper, connection, target) -> None:
+    attrs = inspect(target).attrs
+    for column in BLOB_COLUMNS[type(target)]:
+        if not attrs[column].history.has_changes():
+            continue
+        value = getattr(target, column)
+        if value is not None and len(value) > config.BLOB_INLINE_MAX:
+            ref = store.put(value)
+            setattr(target, column, None)
+            setattr(target, f"{column}_hash", ref.hash)
+            setattr(target, f"{column}_size", ref.size)
+        else:
+            setattr(target, f"{column}_hash", None)
+            setattr(target, f"{column}_size", None)
+
+
+for _model in BLOB_COLUMNS:
+    orm_event.listen(_model, "before_insert", _externalize)
+    orm_event.listen(_model, "before_update", _externalize)
+
+
+def text(row: Any, column: str) -> Optional[str]:
+    """``column`` of an entity, or of a result row that also selected ``<column>_hash``"""
+    digest = getattr(row, f"{column}_hash", None)
+    if digest is None:
+        return getattr(row, column)
+    try:
+        return store.read_text(digest)
+    except BlobNotFound:
+        logger.error(f"Blob {digest} for {column} is missing from {config.BLOB_DIR}")
+        return None
+
+
+def stream(row: Any, column: str) -> Iterator[str]:
+    """``column`` in chunks, without loading a stored body into memory"""
+    digest = getattr(row, f"{column}_hash", None)
+    if digest is not None:
+        yield from store.iter_text(digest)
+    elif getattr(row, column) is not None:
+        yield getattr(row, column)
+
+
+def migrate(db_session: sessionmaker, batch_size: int = config.BLOB_MIGRATE_BATCH,
+            dry_run: bool = False) -> Dict[str, int]:
+    """Move inline bodies longer than BLOB_INLINE_MAX to the blob store, ``batch_size`` rows per transaction.
+
+    Rows are walked in primary key order. Each batch is written with one
+    executemany UPDATE that only matches rows whose body is still the one that
+    was read, so a concurrent edit is kept (and externalized by its own flush).
+    """
+    moved: Dict[str, int] = {}
+    for model, columns in BLOB_COLUMNS.items():
+        table = model.__table__
+        key = table.primary_key.columns[0]
+        for column in columns:
+            body = table.c[column]
+            name = f"{table.name}.{column}"
+            moved[name] = 0
+            after = None
+            while True:
+                query = select(key, body).where(body.isnot(None), func.length(body) > config.BLOB_INLINE_MAX)
+                if after is not None:
+                    query = query.where(key > after)
+                with db_session() as session:
+                    rows = session.execute(query.order_by(key).limit(batch_size)).all()
+                    if not rows:
+                        break
+                    after = rows[-1][0]
+                    if dry_run:
+                        moved[name] += len(rows)
+                        continue
+                    params = []
+                    for pk, value in rows:
+                        ref = store.put(value)
+                        params.append({"b_key": pk, "b_body": value, "b_hash": ref.hash, "b_size": ref.size})
+                    session.execute(
+                        update(table)
+                        .where(key == bindparam("b_key"), body == bindparam("b_body"))
+                        .values({column: None, f"{column}_hash": bindparam("b_hash"),
+                                 f"{column}_size": bindparam("b_size")}),
+                        params,
+                    )
+                    session.commit()
+                moved[name] += len(rows)
+                logger.info(f"{name}: {moved[name]} bodies moved so far")
+    return moved
+
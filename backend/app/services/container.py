@@ -0,0 +1,34 @@
+import threading
+from typing import Dict, Type, TypeVar
+
+from sqlalchemy.orm import sessionmaker
+
+from ..models import mudemy_session
+
+T = TypeVar("T")
+
+
+class ServiceContainer:
+    """One shared instance per service class, created on first request for it.
+
+    Services are stateless apart from the session factory, so every router and
+    dependency can share the same object.
+    """
+
+    def __init__(self, db_session: sessionmaker):
+        self.db_session = db_session
+        self._instances: Dict[type, object] = {}
+        self._lock = threading.Lock()
+
+    def get(self, service_cls: Type[T]) -> T:
+        instance = self._instances.get(service_cls)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(service_cls)
+                if instance is None:
+                    instance = service_cls(self.db_session)
+                    self._instances[service_cls] = instance
+        return instance
+
+
+container = ServiceContainer(mudemy_session)
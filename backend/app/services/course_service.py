@@ -6,8 +6,14 @@ from ..models.models import (
     Course, Module, Requires, Content, LessonRef, 
     Text, Video, Image, Category
 )
-from ..models import generate_id
+from ..models import generate_id, route_reads
+from .projections import FULL, View, projection
+from ..core import config, get_logger, http_cache
 
+logger = get_logger("COURSE_SERVICE")
+sampled_logger = get_logger("COURSE_SERVICE", sample_rate=config.LOG_SAMPLE_RATE)
+
+@route_reads
 class CourseService:
     """Service for Course CRUD operations"""
     
@@ -26,27 +32,27 @@ class CourseService:
                     session.add(course)
                     session.commit()
                     session.refresh(course)
-                    print(f"Successfully created {new_id} on attempt {attempt + 1}")
+                    http_cache.bump("catalog")
+                    sampled_logger.debug(f"Successfully created {new_id} on attempt {attempt + 1}")
                     return course
                 except IntegrityError as e:
                     session.rollback()
-                    print("Integrity Error:", str(e.orig))
-                    print(f"Collision detected for {new_id}. Retrying...")
+                    logger.warning(f"Collision detected for {new_id}. Retrying... ({e.orig})")
                     continue
                 except Exception as e:
                     session.rollback()
                     raise e
         raise Exception(f"Failed to generate unique ID for {Course.__name__} after {self.max_retries} attempts.")
     
-    def get_course_by_id(self, course_id: str) -> Optional[Course]:
+    def get_course_by_id(self, course_id: str, view: View = FULL) -> Optional[Course]:
         """Get course by ID"""
         with self.db_session() as session:
-            return session.query(Course).filter(Course.CourseID == course_id).first()
+            return session.query(*projection(Course, view)).filter(Course.CourseID == course_id).first()
     
-    def get_all_courses(self, limit: int = 100) -> List[Course]:
+    def get_all_courses(self, limit: int = 100, view: View = FULL) -> List[Course]:
         """Get all courses with pagination"""
         with self.db_session() as session:
-            return session.query(Course).limit(limit).all()
+            return session.query(*projection(Course, view)).limit(limit).all()
     
     def update_course(self, course_id: str, update_data: Dict[str, Any]) -> Optional[Course]:
         """Update course information"""
@@ -61,6 +67,7 @@ class CourseService:
             
             session.commit()
             session.refresh(course)
+            http_cache.bump("catalog", http_cache.course_key(course_id))
             return course
     
     def delete_course(self, course_id: str) -> bool:
@@ -72,19 +79,21 @@ class CourseService:
             
             session.delete(course)
             session.commit()
+            http_cache.bump("catalog", http_cache.course_key(course_id))
             return True
     
-    def search_courses_by_title(self, title: str) -> List[Course]:
+    def search_courses_by_title(self, title: str, view: View = FULL) -> List[Course]:
         """Search courses by title"""
         with self.db_session() as session:
-            return session.query(Course).filter(Course.Title.like(f'%{title}%')).all()
+            return session.query(*projection(Course, view)).filter(Course.Title.like(f'%{title}%')).all()
     
-    def get_courses_by_difficulty(self, difficulty: str) -> List[Course]:
+    def get_courses_by_difficulty(self, difficulty: str, view: View = FULL) -> List[Course]:
         """Get courses by difficulty level"""
         with self.db_session() as session:
-            return session.query(Course).filter(Course.Difficulty == difficulty).all()
+            return session.query(*projection(Course, view)).filter(Course.Difficulty == difficulty).all()
 
 
+@route_reads
 class ModuleService:
     """Service for Module CRUD operations"""
     
@@ -104,6 +113,7 @@ class ModuleService:
                     session.add(module)
                     session.commit()
                     session.refresh(module)
+                    http_cache.bump(http_cache.course_key(module.CourseID))
                     return module
                 except IntegrityError:
                     session.rollback()
@@ -113,15 +123,15 @@ class ModuleService:
                     raise ValueError(f"Error creating module: {str(e)}")
         raise Exception(f"Failed to generate unique ID for {Module.__name__} after {self.max_retries} attempts.")
     
-    def get_module_by_id(self, module_id: str) -> Optional[Module]:
+    def get_module_by_id(self, module_id: str, view: View = FULL) -> Optional[Module]:
         """Get module by ID"""
         with self.db_session() as session:
-            return session.query(Module).filter(Module.ModuleID == module_id).first()
+            return session.query(*projection(Module, view)).filter(Module.ModuleID == module_id).first()
     
-    def get_modules_by_course(self, course_id: str) -> List[Module]:
+    def get_modules_by_course(self, course_id: str, view: View = FULL) -> List[Module]:
         """Get all modules for a specific course"""
         with self.db_session() as session:
-            return session.query(Module).filter(Module.CourseID == course_id).all()
+            return session.query(*projection(Module, view)).filter(Module.CourseID == course_id).all()
     
     def update_module(self, module_id: str, update_data: Dict[str, Any]) -> Optional[Module]:
         """Update module information"""
@@ -129,6 +139,7 @@ class ModuleService:
             module = session.query(Module).filter(Module.ModuleID == module_id).first()
             if not module:
                 return None
+            previous_course_id = module.CourseID
             
             for key, value in update_data.items():
                 if hasattr(module, key):
@@ -136,6 +147,8 @@ class ModuleService:
             
             session.commit()
             session.refresh(module)
+            http_cache.bump(http_cache.course_key(previous_course_id), http_cache.course_key(module.CourseID),
+                            http_cache.module_key(module_id))
             return module
     
     def delete_module(self, module_id: str) -> bool:
@@ -147,9 +160,11 @@ class ModuleService:
             
             session.delete(module)
             session.commit()
+            http_cache.bump(http_cache.course_key(module.CourseID), http_cache.module_key(module_id))
             return True
 
 
+@route_reads
 class RequiresService:
     """Service for course prerequisites (Requires) operations"""
     
@@ -167,6 +182,7 @@ class RequiresService:
                 session.add(prerequisite)
                 session.commit()
                 session.refresh(prerequisite)
+                http_cache.bump(http_cache.course_key(course_id))
                 return prerequisite
             except IntegrityError as e:
                 session.rollback()
@@ -190,9 +206,11 @@ class RequiresService:
             
             session.delete(prerequisite)
             session.commit()
+            http_cache.bump(http_cache.course_key(course_id))
             return True
 
 
+@route_reads
 class ContentService:
     """Service for Content CRUD operations"""
     
@@ -212,6 +230,7 @@ class ContentService:
                     session.add(content)
                     session.commit()
                     session.refresh(content)
+                    http_cache.bump(http_cache.module_key(content.ModuleID))
                     return content
                 except IntegrityError:
                     session.rollback()
@@ -221,15 +240,15 @@ class ContentService:
                     raise ValueError(f"Error creating content: {str(e)}")
         raise Exception(f"Failed to generate unique ID for {Content.__name__} after {max_retries} attempts.")
     
-    def get_content_by_id(self, content_id: str) -> Optional[Content]:
+    def get_content_by_id(self, content_id: str, view: View = FULL) -> Optional[Content]:
         """Get content by ID"""
         with self.db_session() as session:
-            return session.query(Content).filter(Content.ContentID == content_id).first()
+            return session.query(*projection(Content, view)).filter(Content.ContentID == content_id).first()
     
-    def get_content_by_module(self, module_id: str) -> List[Content]:
+    def get_content_by_module(self, module_id: str, view: View = FULL) -> List[Content]:
         """Get all content for a specific module"""
         with self.db_session() as session:
-            return session.query(Content).filter(Content.ModuleID == module_id).all()
+            return session.query(*projection(Content, view)).filter(Content.ModuleID == module_id).all()
     
     def update_content(self, content_id: str, update_data: Dict[str, Any]) -> Optional[Content]:
         """Update content information"""
@@ -237,6 +256,7 @@ class ContentService:
             content = session.query(Content).filter(Content.ContentID == content_id).first()
             if not content:
                 return None
+            previous_module_id = content.ModuleID
             
             for key, value in update_data.items():
                 if hasattr(content, key):
@@ -244,6 +264,7 @@ class ContentService:
             
             session.commit()
             session.refresh(content)
+            http_cache.bump(http_cache.module_key(previous_module_id), http_cache.module_key(content.ModuleID))
             return content
     
     def delete_content(self, content_id: str) -> bool:
@@ -255,9 +276,11 @@ class ContentService:
             
             session.delete(content)
             session.commit()
+            http_cache.bump(http_cache.module_key(content.ModuleID))
             return True
 
 
+@route_reads
 class LessonRefService:
     """Service for LessonRef operations"""
     
@@ -294,6 +317,7 @@ class LessonRefService:
             return True
 
 
+@route_reads
 class TextService:
     """Service for Text content operations"""
     
@@ -361,6 +385,7 @@ class TextService:
             return True
 
 
+@route_reads
 class VideoService:
     """Service for Video content operations"""
     
@@ -428,6 +453,7 @@ class VideoService:
             return True
 
 
+@route_reads
 class ImageService:
     """Service for Image content operations"""
     
@@ -495,6 +521,7 @@ class ImageService:
             return True
 
 
+@route_reads
 class CategoryService:
     """Service for Category operations"""
     
@@ -509,6 +536,7 @@ class CategoryService:
                 session.add(cat)
                 session.commit()
                 session.refresh(cat)
+                http_cache.bump(http_cache.course_key(course_id))
                 return cat
             except IntegrityError as e:
                 session.rollback()
@@ -537,4 +565,5 @@ class CategoryService:
             
             session.delete(cat)
             session.commit()
+            http_cache.bump(http_cache.course_key(course_id))
             return True
\ No newline at end of file
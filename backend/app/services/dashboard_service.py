@@ -0,0 +1,289 @@
+"""Landing-page dashboards assembled from a fixed number of set-based queries.
+
+The student dashboard takes two queries, however many courses the student has.
+One query loads the enrollments with course title, instructor and progress,
+and the per-status stats are counted from those rows. The other unions the
+assignments and quizzes due in the next DASHBOARD_DEADLINE_DAYS across all of
+the student's active courses.
+
+The instructor dashboard takes three queries:
+
+* the taught courses with Enrollment_count and enrollment progress;
+* every assessment in those courses with submission, graded and ungraded
+  counts and the average grade;
+* the latest enrollments and submissions across them.
+
+Course averages are weighted from the assessment rows. This supersedes the
+GetInstructorCourseDetails procedure.
+
+Dashboards are cached per user for DASHBOARD_CACHE_SECONDS. The events that
+change one drop it in the worker that committed them:
+
+* lesson progress, enrollment and submission events for students;
+* enrollment, submission and grading events in a taught course, looked up by
+  course or assessment, for instructors.
+
+Other workers catch up when the TTL runs out. A dashboard dropped by an event
+is rebuilt from the primary for the next REPLICA_MAX_LAG_SECONDS, since a
+replica may not have the change yet and the stale result would be cached.
+"""
+import threading
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Set
+
+from sqlalchemy import and_, case, exists, func, literal, null, select, union_all
+from sqlalchemy.orm import sessionmaker
+
+from ..core import config
+from ..core.cache import TTLCache
+from ..core.events import bus
+from ..models import route_reads, use_primary
+from ..models.models import (Assignment, AssignSubmission, Course, Enrollment, Instruct, Module, Quiz, QuizSubmission,
+                             User)
+from . import blobs
+from .container import container
+from .enrollment_service import EnrollmentService, enrollment_stats
+from .events import (AssignmentGraded, AssignmentSubmitted, EnrollmentChanged, EnrollmentCreated, EnrollmentDeleted,
+                     LessonProgressChanged, QuizGraded, QuizSubmitted, as_float)
+
+
+@route_reads
+class DashboardService:
+    """Service for the per-user dashboards"""
+
+    def __init__(self, db_session: sessionmaker, max_retries=50):
+        self.db_session = db_session
+        self.max_retries = max_retries
+        self.students = TTLCache(maxsize=config.DASHBOARD_CACHE_SIZE, ttl=config.DASHBOARD_CACHE_SECONDS)
+        self.instructors = TTLCache(maxsize=config.DASHBOARD_CACHE_SIZE, ttl=config.DASHBOARD_CACHE_SECONDS)
+        # CourseID / AssID / QuizID -> instructors whose cached dashboard shows it; at most one entry per row
+        self._watchers: Dict[str, Set[str]] = {}
+        self._watch_lock = threading.Lock()
+        # Users whose dashboard an event just dropped; their rebuild reads the primary
+        self._invalidated = TTLCache(maxsize=config.DASHBOARD_CACHE_SIZE,
+                                     ttl=config.REPLICA_MAX_LAG_SECONDS + config.REPLICA_CHECK_INTERVAL)
+
+    def _rebuild_route(self, user_id: str):
+        return use_primary() if self._invalidated.get(user_id) else nullcontext()
+
+    def get_student_dashboard(self, student_id: str) -> Dict[str, Any]:
+        """Enrollments with progress, enrollment stats and upcoming deadlines for a student"""
+        now = datetime.utcnow()
+        dashboard = self.students.get(student_id)
+        if dashboard is None:
+            with self._rebuild_route(student_id):
+                enrollments = container.get(EnrollmentService).get_student_enrollments_with_details(student_id)
+                deadlines = self.get_upcoming_deadlines(student_id, now,
+                                                        now + timedelta(days=config.DASHBOARD_DEADLINE_DAYS))
+            counts: Dict[str, int] = {}
+            for enrollment in enrollments:
+                counts[enrollment["status"]] = counts.get(enrollment["status"], 0) + 1
+            stats = enrollment_stats(counts)
+            active = [e["progress"] for e in enrollments if e["status"] == 'Active']
+            stats["average_progress"] = round(sum(active) / len(active), 1) if active else 0.0
+            dashboard = {"enrollments": enrollments, "stats": stats, "deadlines": deadlines, "generated_at": now}
+            self.students.set(student_id, dashboard)
+        # A cached dashboard may hold deadlines that have passed since it was built
+        return {**dashboard, "deadlines": [d for d in dashboard["deadlines"] if d["deadline"] > now]}
+
+    def get_upcoming_deadlines(self, student_id: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Assignments and quizzes due in (start, end] in the student's active courses, soonest first"""
+        # IN rather than a join, so a deadline is listed once however many enrollment rows match
+        active_courses = select(Enrollment.CourseID).where(Enrollment.StudentID == student_id,
+                                                           Enrollment.Status == 'Active')
+        assignments = (
+            select(literal("assignment").label("kind"), Assignment.AssID.label("lesson_id"), Assignment.Title,
+                   Assignment.Deadline, Module.ModuleID, Module.CourseID,
+                   case((exists().where(AssignSubmission.AssID == Assignment.AssID, AssignSubmission.UserID == student_id), 1),
+                        else_=0).label("submitted"))
+            .join(Module, Assignment.ModuleID == Module.ModuleID)
+            .where(Module.CourseID.in_(active_courses), Assignment.Deadline > start, Assignment.Deadline <= end)
+        )
+        quizzes = (
+            select(literal("quiz").label("kind"), Quiz.QuizID.label("lesson_id"), Quiz.Title,
+                   Quiz.Deadline, Module.ModuleID, Module.CourseID,
+                   case((exists().where(QuizSubmission.QuizID == Quiz.QuizID, QuizSubmission.UserID == student_id), 1),
+                        else_=0).label("submitted"))
+            .join(Module, Quiz.ModuleID == Module.ModuleID)
+            .where(Module.CourseID.in_(active_courses), Quiz.Deadline > start, Quiz.Deadline <= end)
+        )
+        due = union_all(assignments, quizzes).subquery()
+        with self.db_session() as session:
+            rows = session.execute(
+                select(due).order_by(due.c.Deadline).limit(config.DASHBOARD_DEADLINE_LIMIT)
+            ).all()
+        return [{"kind": row.kind, "lesson_id": row.lesson_id, "title": row.Title, "deadline": row.Deadline,
+                 "module_id": row.ModuleID, "course_id": row.CourseID, "submitted": bool(row.submitted)}
+                for row in rows]
+
+    def get_instructor_dashboard(self, instructor_id: str) -> Dict[str, Any]:
+        """Taught courses with enrollment and grade figures, the grading backlog and recent activity"""
+        dashboard = self.instructors.get(instructor_id)
+        if dashboard is not None:
+            return dashboard
+
+        with self._rebuild_route(instructor_id):
+            courses = self.get_taught_courses(instructor_id)
+            assessments = self.get_assessment_backlog(instructor_id)
+            recent_activity = self.get_recent_activity(instructor_id)
+        grades: Dict[str, List[float]] = {}   # course -> [sum of grades, graded count, ungraded count]
+        for assessment in assessments:
+            total = grades.setdefault(assessment["course_id"], [0.0, 0, 0])
+            total[0] += (assessment["average_grade"] or 0.0) * assessment["graded"]
+            total[1] += assessment["graded"]
+            total[2] += assessment["ungraded"]
+        for course in courses:
+            graded_sum, graded, ungraded = grades.get(course["CourseID"], (0.0, 0, 0))
+            course["average_grade"] = round(graded_sum / graded, 2) if graded else None
+            course["ungraded"] = ungraded
+
+        dashboard = {
+            "courses": courses,
+            "assessments": assessments,
+            "recent_activity": recent_activity,
+            "totals": {"courses": len(courses),
+                       "enrollments": sum(c["Enrollment_count"] for c in courses),
+                       "ungraded": sum(a["ungraded"] for a in assessments)},
+            "generated_at": datetime.utcnow(),
+        }
+        self._watch(instructor_id, [c["CourseID"] for c in courses] + [a["lesson_id"] for a in assessments])
+        self.instructors.set(instructor_id, dashboard)
+        return dashboard
+
+    def get_taught_courses(self, instructor_id: str) -> List[Dict[str, Any]]:
+        """Courses the instructor teaches, hardest first then by title, with enrollment progress figures"""
+        taught = select(Instruct.CourseID).where(Instruct.UserID == instructor_id)
+        progress = (
+            select(Enrollment.CourseID, func.avg(Enrollment.Progress).label("average_progress"),
+                   func.sum(case((Enrollment.Status == 'Completed', 1), else_=0)).label("completed"))
+            .where(Enrollment.CourseID.in_(taught))
+            .group_by(Enrollment.CourseID)
+            .subquery()
+        )
+        with self.db_session() as session:
+            rows = session.execute(
+                select(Course.CourseID, Course.Title, Course.Difficulty, Course.Language, Course.Description,
+                       Course.Description_hash, Course.Enrollment_count, progress.c.average_progress, progress.c.completed)
+                .join(Instruct, and_(Instruct.CourseID == Course.CourseID, Instruct.UserID == instructor_id))
+                .outerjoin(progress, progress.c.CourseID == Course.CourseID)
+                .order_by(Course.Difficulty.desc(), Course.Title)
+            ).all()
+        return [{"CourseID": row.CourseID, "Title": row.Title, "Difficulty": row.Difficulty, "Language": row.Language,
+                 "Description": blobs.text(row, "Description"), "Enrollment_count": row.Enrollment_count,
+                 "average_progress": round(as_float(row.average_progress) or 0.0, 1),
+                 "completed": int(row.completed or 0)}
+                for row in rows]
+
+    def get_assessment_backlog(self, instructor_id: str) -> List[Dict[str, Any]]:
+        """Assignments and quizzes in the instructor's courses with submission counts, most ungraded first"""
+        taught = select(Instruct.CourseID).where(Instruct.UserID == instructor_id)
+        assignments = (
+            select(literal("assignment").label("kind"), Assignment.AssID.label("lesson_id"), Assignment.Title,
+                   Assignment.Deadline, Module.ModuleID, Module.CourseID,
+                   func.count(AssignSubmission.SubID).label("submissions"),
+                   func.count(AssignSubmission.Grade).label("graded"),
+                   func.avg(AssignSubmission.Grade).label("average_grade"))
+            .join(Module, Assignment.ModuleID == Module.ModuleID)
+            .outerjoin(AssignSubmission, AssignSubmission.AssID == Assignment.AssID)
+            .where(Module.CourseID.in_(taught))
+            .group_by(Assignment.AssID, Assignment.Title, Assignment.Deadline, Module.ModuleID, Module.CourseID)
+        )
+        quizzes = (
+            select(literal("quiz").label("kind"), Quiz.QuizID.label("lesson_id"), Quiz.Title,
+                   Quiz.Deadline, Module.ModuleID, Module.CourseID,
+                   func.count(QuizSubmission.SubID).label("submissions"),
+                   func.count(QuizSubmission.Grade).label("graded"),
+                   func.avg(QuizSubmission.Grade).label("average_grade"))
+            .join(Module, Quiz.ModuleID == Module.ModuleID)
+            .outerjoin(QuizSubmission, QuizSubmission.QuizID == Quiz.QuizID)
+            .where(Module.CourseID.in_(taught))
+            .group_by(Quiz.QuizID, Quiz.Title, Quiz.Deadline, Module.ModuleID, Module.CourseID)
+        )
+        with self.db_session() as session:
+            rows = session.execute(union_all(assignments, quizzes)).all()
+        backlog = [{"kind": row.kind, "lesson_id": row.lesson_id, "title": row.Title, "deadline": row.Deadline,
+                    "module_id": row.ModuleID, "course_id": row.CourseID, "submissions": row.submissions,
+                    "graded": row.graded, "ungraded": row.submissions - row.graded,
+                    "average_grade": round(as_float(row.average_grade), 2) if row.average_grade is not None else None}
+                   for row in rows]
+        backlog.sort(key=lambda a: (-a["ungraded"], a["deadline"]))
+        return backlog
+
+    def get_recent_activity(self, instructor_id: str) -> List[Dict[str, Any]]:
+        """The latest enrollments and submissions in the instructor's courses, newest first"""
+        taught = select(Instruct.CourseID).where(Instruct.UserID == instructor_id)
+        limit = config.DASHBOARD_ACTIVITY_LIMIT
+        # Each branch keeps only its own newest rows, so the union never grows past 3 * limit
+        branches = [
+            select(literal("enrollment").label("kind"), Enrollment.EnrollmentID.label("ref_id"),
+                   null().label("lesson_id"), Course.Title, Enrollment.CourseID, Enrollment.StudentID.label("user_id"),
+                   Enrollment.Enroll_date.label("at"))
+            .join(Course, Course.CourseID == Enrollment.CourseID)
+            .where(Enrollment.CourseID.in_(taught))
+            .order_by(Enrollment.Enroll_date.desc()).limit(limit),
+            select(literal("assignment_submission").label("kind"), AssignSubmission.SubID.label("ref_id"),
+                   AssignSubmission.AssID.label("lesson_id"), Assignment.Title, Module.CourseID,
+                   AssignSubmission.UserID.label("user_id"), AssignSubmission.Sub_date.label("at"))
+            .join(Assignment, Assignment.AssID == AssignSubmission.AssID)
+            .join(Module, Module.ModuleID == Assignment.ModuleID)
+            .where(Module.CourseID.in_(taught))
+            .order_by(AssignSubmission.Sub_date.desc()).limit(limit),
+            select(literal("quiz_submission").label("kind"), QuizSubmission.SubID.label("ref_id"),
+                   QuizSubmission.QuizID.label("lesson_id"), Quiz.Title, Module.CourseID,
+                   QuizSubmission.UserID.label("user_id"), QuizSubmission.Sub_date.label("at"))
+            .join(Quiz, Quiz.QuizID == QuizSubmission.QuizID)
+            .join(Module, Module.ModuleID == Quiz.ModuleID)
+            .where(Module.CourseID.in_(taught))
+            .order_by(QuizSubmission.Sub_date.desc()).limit(limit),
+        ]
+        activity = union_all(*(select(branch.subquery()) for branch in branches)).subquery()
+        with self.db_session() as session:
+            rows = session.execute(
+                select(activity, User.Full_name)
+                .outerjoin(User, User.UserID == activity.c.user_id)
+                .order_by(activity.c.at.desc())
+                .limit(limit)
+            ).all()
+        return [{"kind": row.kind, "ref_id": row.ref_id, "lesson_id": row.lesson_id, "title": row.Title,
+                 "course_id": row.CourseID, "user_id": row.user_id, "user_name": row.Full_name, "at": row.at}
+                for row in rows]
+
+    def forget_student(self, student_id: str) -> None:
+        self.students.pop(student_id)
+        self._invalidated.set(student_id, True)
+
+    def forget_watchers(self, key: str) -> None:
+        """Drop the instructor dashboards that show course or assessment ``key``."""
+        with self._watch_lock:
+            instructor_ids = self._watchers.pop(key, ())
+        for instructor_id in instructor_ids:
+            self.instructors.pop(instructor_id)
+            self._invalidated.set(instructor_id, True)
+
+    def _watch(self, instructor_id: str, keys: Iterable[str]) -> None:
+        with self._watch_lock:
+            for key in keys:
+                self._watchers.setdefault(key, set()).add(instructor_id)
+
+
+def _student_changed(domain_event) -> None:
+    student_id = getattr(domain_event, "student_id", None) or domain_event.user_id
+    container.get(DashboardService).forget_student(student_id)
+
+
+def _course_changed(domain_event) -> None:
+    container.get(DashboardService).forget_watchers(domain_event.course_id)
+
+
+def _assessment_changed(domain_event) -> None:
+    container.get(DashboardService).forget_watchers(getattr(domain_event, "ass_id", None) or domain_event.quiz_id)
+
+
+for _event_type in (LessonProgressChanged, EnrollmentCreated, EnrollmentChanged, EnrollmentDeleted,
+                    AssignmentSubmitted, QuizSubmitted):
+    bus.subscribe(_event_type, _student_changed)
+for _event_type in (EnrollmentCreated, EnrollmentChanged, EnrollmentDeleted):
+    bus.subscribe(_event_type, _course_changed)
+for _event_type in (AssignmentSubmitted, AssignmentGraded, QuizSubmitted, QuizGraded):
+    bus.subscribe(_event_type, _assessment_changed)
@@ -1,11 +1,87 @@
+import random
+import time
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
-from typing import List, Optional, Dict, Any
-from datetime import datetime, date
-from ..models.models import Enrollment, Payment, Certificate, Course, Instruct, User
-from ..models import generate_id
+from sqlalchemy import and_, func, insert, select
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime, date, timedelta
+from ..models.models import Enrollment, Payment, Certificate, CertificateRevocation, Course, Instruct, User
+from ..models import allocate_ids, generate_id, is_duplicate_key, route_reads
+from . import blobs
+from .events import (CertificateIssued, CertificateRevoked, EnrollmentChanged, EnrollmentCreated, EnrollmentDeleted,
+                     PaymentChanged, PaymentDeleted, PaymentRecorded, as_float, emit)
+from .idempotency import StoredResponse, idempotency, request_hash
+from ..core import config, get_logger
+from ..core.signing import InvalidCertificate, RevocationSet, is_signed_number, read_certificate, sign_certificate
 
+logger = get_logger("ENROLLMENT_SERVICE")
+sampled_logger = get_logger("ENROLLMENT_SERVICE", sample_rate=config.LOG_SAMPLE_RATE)
+
+# Certificate columns embedded in the signed Certificate_number
+SIGNED_FIELDS = ('CertificateID', 'CourseID', 'StudentID', 'Issue_date', 'Expiry_date')
+
+
+# PAYMENT.Payment_method CHECK constraint in DDL.sql
+PAYMENT_METHODS = ('Credit Card', 'Debit Card', 'PayPal', 'Bank Transfer', 'Cash')
+
+
+class AlreadyEnrolled(ValueError):
+    """The student already has an enrollment in the course."""
+
+
+class AlreadyCertified(ValueError):
+    """The student already holds a certificate for the course."""
+
+
+class CourseNotFound(LookupError):
+    """No course with the requested CourseID."""
+
+
+def as_date(value) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value.date() if isinstance(value, datetime) else value
+    return date.fromisoformat(str(value)[:10])
+
+
+def certificate_number(certificate: Certificate) -> str:
+    return sign_certificate(certificate.CertificateID, certificate.CourseID, certificate.StudentID,
+                            as_date(certificate.Issue_date), as_date(certificate.Expiry_date))
+
+
+def enrollment_changed(enrollment: Enrollment) -> EnrollmentChanged:
+    return EnrollmentChanged(enrollment_id=enrollment.EnrollmentID, course_id=enrollment.CourseID,
+                             student_id=enrollment.StudentID, status=enrollment.Status,
+                             progress=as_float(enrollment.Progress))
+
+
+def is_enrolled(session, student_id: str, course_id: str) -> bool:
+    """Whether the student has any enrollment in the course (IX_Enrollment_Student allows one)."""
+    return session.execute(
+        select(Enrollment.EnrollmentID)
+        .where(Enrollment.StudentID == student_id, Enrollment.CourseID == course_id)
+    ).first() is not None
+
+
+def has_certificate(session, student_id: str, course_id: str) -> bool:
+    """Whether the student holds a certificate for the course (IX_Certificate_Course_Student allows one)."""
+    return session.execute(
+        select(Certificate.CertificateID)
+        .where(Certificate.CourseID == course_id, Certificate.StudentID == student_id)
+    ).first() is not None
+
+
+def enrollment_stats(counts: Dict[str, int]) -> Dict[str, Any]:
+    """Shape enrollment counts per status the way ``/enrollments/me/stats`` returns them."""
+    return {
+        'total_enrollments': sum(counts.values()),
+        'active': counts.get('Active', 0),
+        'completed': counts.get('Completed', 0),
+        'dropped': counts.get('Dropped', 0),
+        'suspended': counts.get('Suspended', 0)
+    }
+
+
+@route_reads
 class EnrollmentService:
     """Service for Enrollment CRUD operations"""
     
@@ -22,18 +98,101 @@ class EnrollmentService:
                 try:
                     enrollment = Enrollment(**enrollment_data)
                     session.add(enrollment)
+                    emit(session, EnrollmentCreated(enrollment_id=enrollment.EnrollmentID, course_id=enrollment.CourseID,
+                                                    student_id=enrollment.StudentID, payment_id=enrollment.PaymentID))
                     session.commit()
                     session.refresh(enrollment)
                     return enrollment
                 except IntegrityError:
                     session.rollback()
-                    print(f"Collision detected for {new_id}. Retrying...")
+                    if is_enrolled(session, enrollment_data.get("StudentID"), enrollment_data.get("CourseID")):
+                        raise AlreadyEnrolled(f"Student {enrollment_data.get('StudentID')} is already enrolled "
+                                              f"in {enrollment_data.get('CourseID')}")
+                    logger.warning(f"Collision detected for {new_id}. Retrying...")
                     continue
                 except Exception as e:
                     session.rollback()
                     raise e
         raise Exception(f"Failed to generate unique ID for {Enrollment.__name__} after {self.max_retries} attempts.")
     
+    def checkout(self, student_id: str, course_id: str, amount: int, payment_method: Optional[str] = None,
+                 idempotency_key: Optional[str] = None) -> Tuple[StoredResponse, bool]:
+        """Pay for and enroll in a course in one transaction.
+        
+        Returns the response and whether it is a replay of an earlier request
+        with the same ``idempotency_key``. Raises CourseNotFound, ValueError for
+        an invalid amount or payment method, AlreadyEnrolled, or
+        IdempotencyMismatch when the key was used for a different checkout.
+        Only a taken ID or idempotency key is retried; a concurrent checkout for
+        the same student and course trips IX_Enrollment_Student and ends in
+        AlreadyEnrolled (or a replay, when it used the same key).
+        """
+        if not isinstance(amount, int) or isinstance(amount, bool) or amount < 0:
+            raise ValueError("Amount must be a non-negative integer")
+        if payment_method is not None and payment_method not in PAYMENT_METHODS:
+            raise ValueError(f"Payment_method must be one of: {', '.join(PAYMENT_METHODS)}")
+        fingerprint = request_hash({"CourseID": course_id, "Amount": amount, "Payment_method": payment_method})
+        for attempt in range(self.max_retries):
+            if idempotency_key:
+                replay = idempotency.lookup(student_id, idempotency_key, fingerprint)
+                if replay is not None:
+                    return replay, True
+            
+            with self.db_session() as session:
+                if session.get(Course, course_id) is None:
+                    raise CourseNotFound(f"Course {course_id} not found")
+                enrolled = is_enrolled(session, student_id, course_id)
+                if not enrolled:
+                    # IDs are read inside the transaction; a concurrent checkout taking the same ones fails on the PK
+                    payment_id = allocate_ids(session, Payment.PaymentID, 1)[0]
+                    enrollment_id = allocate_ids(session, Enrollment.EnrollmentID, 1)[0]
+                    try:
+                        session.add(Payment(PaymentID=payment_id, Amount=amount, Payment_method=payment_method,
+                                            UserID=student_id))
+                        session.flush()
+                        session.add(Enrollment(EnrollmentID=enrollment_id, CourseID=course_id, PaymentID=payment_id,
+                                               StudentID=student_id))
+                        emit(session, PaymentRecorded(payment_id=payment_id, user_id=student_id, amount=amount,
+                                                      method=payment_method))
+                        emit(session, EnrollmentCreated(enrollment_id=enrollment_id, course_id=course_id,
+                                                        student_id=student_id, payment_id=payment_id))
+                        response = StoredResponse(201, {"status": "created", "payment_id": payment_id,
+                                                        "enrollment_id": enrollment_id})
+                        if idempotency_key:
+                            idempotency.record(session, student_id, idempotency_key, fingerprint,
+                                               response.status_code, response.body)
+                        session.commit()
+                    except IntegrityError as e:
+                        session.rollback()
+                        if not is_duplicate_key(e):
+                            logger.warning(f"Checkout for {student_id} in {course_id} rejected: {e.orig}")
+                            raise ValueError(f"Checkout for {student_id} in {course_id} violates a constraint") from e
+                        # IX_Enrollment_Student: another checkout for this pair may have committed first
+                        enrolled = is_enrolled(session, student_id, course_id)
+                        if not enrolled:
+                            # Otherwise a concurrent checkout took the same IDs
+                            logger.warning(f"Checkout collision on {payment_id}/{enrollment_id}. Retrying...")
+                            time.sleep(random.uniform(0, 0.002 * min(attempt + 1, 10)))
+                            continue
+            
+            if enrolled:
+                # A request with the same key may have committed since the lookup above. Checked
+                # after the session closes, so the lookup never waits on a second pooled connection.
+                return self._replay_or_conflict(student_id, course_id, idempotency_key, fingerprint), True
+            if idempotency_key:
+                idempotency.remember(student_id, idempotency_key, fingerprint, response.status_code, response.body)
+            return response, False
+        raise Exception(f"Checkout for {student_id} in {course_id} failed after {self.max_retries} attempts.")
+    
+    @staticmethod
+    def _replay_or_conflict(student_id: str, course_id: str, idempotency_key: Optional[str],
+                            fingerprint: str) -> StoredResponse:
+        """The stored response when the existing enrollment came from this key, else AlreadyEnrolled."""
+        replay = idempotency_key and idempotency.lookup(student_id, idempotency_key, fingerprint)
+        if replay:
+            return replay
+        raise AlreadyEnrolled(f"Student {student_id} is already enrolled in {course_id}")
+    
     def get_enrollment_by_id(self, enrollment_id: str) -> Optional[Enrollment]:
         """Get enrollment by ID"""
         with self.db_session() as session:
@@ -60,48 +219,48 @@ class EnrollmentService:
                 Enrollment.StudentID == student_id
             ).all()
         
-    def get_student_enrollments_with_details(self, student_id: str):
+    def get_student_enrollments_with_details(self, student_id: str) -> List[Dict[str, Any]]:
         """
         Fetches enrollments with Course Title, Instructor Name, and Progress.
         """
-        # 1. Build the Query
-        # We join Enrollment -> Course
-        # Then Course -> Instruct -> User (to find the instructor)
-        # We use distinct() because a course might have multiple instructors, avoiding duplicate rows
-        with self.db_session() as session:
-            results = (
-                session.query(
+        # One instructor name per course, so a co-taught course still yields one row per enrollment
+        instructors = (
+            select(Instruct.CourseID, func.min(User.Full_name).label("instructor_name"))
+            .join(User, Instruct.UserID == User.UserID)
+            .group_by(Instruct.CourseID)
+            .subquery()
+        )
+        with self.db_session() as session:
+            results = session.execute(
+                select(
                     Enrollment.EnrollmentID,
                     Enrollment.Status,
                     Enrollment.Enroll_date,
+                    Enrollment.Progress,   # kept current by trg_update_progress_on_take
                     Course.CourseID,
                     Course.Title.label("course_title"),
-                    User.Full_name.label("instructor_name")
+                    Course.Description,
+                    Course.Description_hash,
+                    instructors.c.instructor_name,
                 )
                 .join(Course, Enrollment.CourseID == Course.CourseID)
-                .outerjoin(Instruct, Course.CourseID == Instruct.CourseID) # Left join in case no instructor assigned
-                .outerjoin(User, Instruct.UserID == User.UserID)
-                .filter(Enrollment.StudentID == student_id)
-                .distinct(Enrollment.EnrollmentID) # Ensure one row per enrollment
-                .all()
-            )
-
-        # 2. Format the output to match what your React Frontend needs
-        enrollments_data = []
-        for row in results:
-            # Optional: Fetch lessons/modules count for progress calculation if 'progress' isn't a column
-            # This is a sub-query optimization you can add later.
-            
-            enrollments_data.append({
-                "id": row.CourseID, # Frontend uses CourseID as key often
-                "enrollment_id": row.EnrollmentID,
-                "title": row.course_title,
-                "instructor": row.instructor_name or "MUDemy Instructor",
-                "status": row.Status,
-                "progress": row.progress if hasattr(row, 'progress') else 0,
-                "lessons": [] 
-            })
-        print("Enrollments Data:", enrollments_data)
+                .outerjoin(instructors, instructors.c.CourseID == Course.CourseID)
+                .where(Enrollment.StudentID == student_id)
+                .order_by(Enrollment.Enroll_date.desc())
+            ).all()
+
+        enrollments_data = [{
+            "id": row.CourseID,   # Frontend uses CourseID as key often
+            "enrollment_id": row.EnrollmentID,
+            "title": row.course_title,
+            "description": blobs.text(row, "Description"),
+            "instructor": row.instructor_name or "MUDemy Instructor",
+            "status": row.Status,
+            "enroll_date": row.Enroll_date,
+            "progress": as_float(row.Progress) or 0.0,
+            "lessons": []
+        } for row in results]
+        sampled_logger.debug(f"Loaded {len(enrollments_data)} enrollments for {student_id}")
         return enrollments_data
     
     def get_course_enrollments(self, course_id: str) -> List[Enrollment]:
@@ -151,6 +310,7 @@ class EnrollmentService:
                 raise ValueError(f"Invalid status. Must be one of: {', '.join(valid_statuses)}")
             
             enrollment.Status = status
+            emit(session, enrollment_changed(enrollment))
             session.commit()
             session.refresh(enrollment)
             return enrollment
@@ -169,6 +329,7 @@ class EnrollmentService:
                 if hasattr(enrollment, key):
                     setattr(enrollment, key, value)
             
+            emit(session, enrollment_changed(enrollment))
             session.commit()
             session.refresh(enrollment)
             return enrollment
@@ -184,6 +345,8 @@ class EnrollmentService:
                 return False
             
             session.delete(enrollment)
+            emit(session, EnrollmentDeleted(enrollment_id=enrollment.EnrollmentID, course_id=enrollment.CourseID,
+                                            student_id=enrollment.StudentID))
             session.commit()
             return True
     
@@ -197,24 +360,15 @@ class EnrollmentService:
     def get_enrollment_stats(self, student_id: str) -> Dict[str, Any]:
         """Get enrollment statistics for a student"""
         with self.db_session() as session:
-            all_enrollments = session.query(Enrollment).filter(
-                Enrollment.StudentID == student_id
-            ).all()
-            
-            active = sum(1 for e in all_enrollments if e.Status == 'Active')
-            completed = sum(1 for e in all_enrollments if e.Status == 'Completed')
-            dropped = sum(1 for e in all_enrollments if e.Status == 'Dropped')
-            suspended = sum(1 for e in all_enrollments if e.Status == 'Suspended')
-            
-            return {
-                'total_enrollments': len(all_enrollments),
-                'active': active,
-                'completed': completed,
-                'dropped': dropped,
-                'suspended': suspended
-            }
+            counts = dict(session.execute(
+                select(Enrollment.Status, func.count())
+                .where(Enrollment.StudentID == student_id)
+                .group_by(Enrollment.Status)
+            ).all())
+        return enrollment_stats(counts)
 
 
+@route_reads
 class PaymentService:
     """Service for Payment CRUD operations"""
     
@@ -231,12 +385,14 @@ class PaymentService:
                 try:
                     payment = Payment(**payment_data)
                     session.add(payment)
+                    emit(session, PaymentRecorded(payment_id=payment.PaymentID, user_id=payment.UserID,
+                                                  amount=payment.Amount, method=payment.Payment_method))
                     session.commit()
                     session.refresh(payment)
                     return payment
                 except IntegrityError:
                     session.rollback()
-                    print(f"Collision detected for {new_id}. Retrying...")
+                    logger.warning(f"Collision detected for {new_id}. Retrying...")
                     continue
                 except Exception as e:
                     session.rollback()
@@ -283,6 +439,7 @@ class PaymentService:
                 if hasattr(payment, key):
                     setattr(payment, key, value)
             
+            emit(session, PaymentChanged(payment_id=payment.PaymentID, user_id=payment.UserID, amount=payment.Amount))
             session.commit()
             session.refresh(payment)
             return payment
@@ -295,6 +452,7 @@ class PaymentService:
                 return False
             
             session.delete(payment)
+            emit(session, PaymentDeleted(payment_id=payment.PaymentID, user_id=payment.UserID))
             session.commit()
             return True
     
@@ -341,34 +499,94 @@ class PaymentService:
             }
 
 
+@route_reads
 class CertificateService:
     """Service for Certificate CRUD operations"""
     
     def __init__(self, db_session: sessionmaker, max_retries=50):
         self.db_session = db_session
         self.max_retries = max_retries
+        # Per process; reloaded by the certificate_revocations job
+        self.revoked = RevocationSet(self.get_revoked_numbers)
         
     def create_certificate(self, certificate_data: Dict[str, Any]) -> Certificate:
-        """Create a new certificate"""
+        """Create a new certificate; a signed Certificate_number is generated unless one is given"""
         for attempt in range(self.max_retries):
             new_id = generate_id(self.db_session, Certificate.CertificateID)
             certificate_data["CertificateID"] = new_id
             with self.db_session() as session:
                 try:
                     cer = Certificate(**certificate_data)
+                    cer.Issue_date = as_date(cer.Issue_date) or date.today()
+                    cer.Expiry_date = as_date(cer.Expiry_date)
+                    if not certificate_data.get("Certificate_number"):
+                        cer.Certificate_number = certificate_number(cer)
                     session.add(cer)
                     session.commit()
                     session.refresh(cer)
                     return cer
                 except IntegrityError:
                     session.rollback()
-                    print(f"Collision detected for {new_id}. Retrying...")
+                    if has_certificate(session, certificate_data.get("StudentID"), certificate_data.get("CourseID")):
+                        raise AlreadyCertified(f"Student {certificate_data.get('StudentID')} already holds a "
+                                               f"certificate for {certificate_data.get('CourseID')}")
+                    logger.warning(f"Collision detected for {new_id}. Retrying...")
                     continue
                 except Exception as e:
                     session.rollback()
                     raise e
         raise Exception(f"Failed to generate unique ID for {Certificate.__name__} after {self.max_retries} attempts.")
     
+    def issue_pending_certificates(self, batch_size: int = None) -> int:
+        """Issue certificates for completed enrollments that have none, one INSERT per batch; safe to rerun.
+
+        Each batch takes a block of IDs, inserts every certificate and stages a
+        CertificateIssued event in one transaction. Reruns skip pairs already
+        issued; when a concurrent run issues the same pair first, the unique
+        IX_Certificate_Course_Student index fails the batch, which is rolled
+        back and recomputed without that pair.
+        """
+        batch_size = batch_size or config.CERTIFICATE_ISSUE_BATCH
+        issued, collisions = 0, 0
+        while True:
+            with self.db_session() as session:
+                pending = session.execute(
+                    select(Enrollment.CourseID, Enrollment.StudentID)
+                    .outerjoin(Certificate, and_(Certificate.CourseID == Enrollment.CourseID,
+                                                 Certificate.StudentID == Enrollment.StudentID))
+                    .where(Enrollment.Status == 'Completed', Certificate.CertificateID.is_(None))
+                    .distinct()   # databases not yet migrated to a unique IX_Enrollment_Student
+                    .limit(batch_size)
+                ).all()
+                if not pending:
+                    return issued
+
+                today = date.today()
+                expiry = today + timedelta(days=config.CERTIFICATE_VALID_DAYS) if config.CERTIFICATE_VALID_DAYS else None
+                ids = allocate_ids(session, Certificate.CertificateID, len(pending))
+                rows = [{"CertificateID": cert_id, "CourseID": course_id, "StudentID": student_id,
+                         "Issue_date": today, "Expiry_date": expiry,
+                         "Certificate_number": sign_certificate(cert_id, course_id, student_id, today, expiry)}
+                        for cert_id, (course_id, student_id) in zip(ids, pending)]
+                try:
+                    session.execute(insert(Certificate), rows)
+                    for row in rows:
+                        emit(session, CertificateIssued(certificate_id=row["CertificateID"], course_id=row["CourseID"],
+                                                        student_id=row["StudentID"],
+                                                        certificate_number=row["Certificate_number"]))
+                    session.commit()
+                except IntegrityError:
+                    session.rollback()
+                    collisions += 1
+                    if collisions >= self.max_retries:
+                        raise Exception(f"Certificate issuance kept colliding after {collisions} attempts.")
+                    logger.warning(f"Collision issuing {len(rows)} certificates from {ids[0]}. Retrying...")
+                    continue
+            issued += len(rows)
+            logger.info(f"Issued {len(rows)} certificates ({ids[0]}..{ids[-1]})")
+            if len(pending) < batch_size:
+                return issued
+    
     def get_certificate_by_id(self, certificate_id: str) -> Optional[Certificate]:
         """Get certificate by ID"""
         with self.db_session() as session:
@@ -426,10 +644,18 @@ class CertificateService:
             if not certificate:
                 return None
             
+            previous_number = certificate.Certificate_number
             for key, value in update_data.items():
                 if hasattr(certificate, key):
                     setattr(certificate, key, value)
             
+            # The old number still carries the old claims: re-sign and revoke it
+            if (is_signed_number(previous_number) and certificate.Certificate_number == previous_number
+                    and any(key in update_data for key in SIGNED_FIELDS)):
+                certificate.Issue_date = as_date(certificate.Issue_date)
+                certificate.Expiry_date = as_date(certificate.Expiry_date)
+                certificate.Certificate_number = certificate_number(certificate)
+                self._revoke(session, certificate.CertificateID, previous_number, "reissued")
             session.commit()
             session.refresh(certificate)
             return certificate
@@ -445,9 +671,70 @@ class CertificateService:
                 return False
             
             session.delete(certificate)
+            if is_signed_number(certificate.Certificate_number):
+                self._revoke(session, certificate.CertificateID, certificate.Certificate_number, "deleted")
             session.commit()
             return True
     
+    def revoke_certificate(self, certificate_id: str, reason: Optional[str] = None) -> Optional[str]:
+        """Revoke a certificate's number; returns the number, or None if the certificate does not exist"""
+        with self.db_session() as session:
+            certificate = session.query(Certificate).filter(
+                Certificate.CertificateID == certificate_id
+            ).first()
+            
+            if not certificate:
+                return None
+            
+            self._revoke(session, certificate.CertificateID, certificate.Certificate_number, reason)
+            session.commit()
+            return certificate.Certificate_number
+    
+    def _revoke(self, session, certificate_id: str, number: str, reason: Optional[str]) -> None:
+        if session.get(CertificateRevocation, number) is not None:
+            return
+        session.add(CertificateRevocation(Certificate_number=number, CertificateID=certificate_id,
+                                          Revoked_at=datetime.utcnow(), Reason=reason))
+        emit(session, CertificateRevoked(certificate_id=certificate_id, certificate_number=number, reason=reason))
+    
+    def get_revoked_numbers(self) -> List[str]:
+        """Every revoked certificate number"""
+        with self.db_session() as session:
+            return [number for (number,) in session.query(CertificateRevocation.Certificate_number)]
+    
+    def verify_certificate(self, number: str) -> Optional[Dict[str, Any]]:
+        """Check a signed certificate number against its signature, expiry and the in-memory revocation set.
+        
+        Returns None when the number is not authentic. Numbers issued before
+        signing are looked up in the database instead.
+        """
+        if is_signed_number(number):
+            try:
+                claims = read_certificate(number)
+            except InvalidCertificate:
+                return None
+            issued, expires = claims.issued, claims.expires
+            certificate_id, course_id, student_id = claims.certificate_id, claims.course_id, claims.student_id
+        else:
+            legacy = self.get_certificate_by_number(number)
+            if legacy is None:
+                return None
+            issued, expires = as_date(legacy.Issue_date), as_date(legacy.Expiry_date)
+            certificate_id, course_id, student_id = legacy.CertificateID, legacy.CourseID, legacy.StudentID
+        
+        revoked = number in self.revoked
+        expired = expires is not None and expires <= date.today()
+        return {
+            "valid": not (revoked or expired),
+            "revoked": revoked,
+            "expired": expired,
+            "CertificateID": certificate_id,
+            "CourseID": course_id,
+            "StudentID": student_id,
+            "Issue_date": issued,
+            "Expiry_date": expires,
+        }
+    
     def get_active_certificates(self, student_id: str) -> List[Certificate]:
         """Get all non-expired certificates for a student"""
         with self.db_session() as session:
@@ -466,6 +753,14 @@ class CertificateService:
                 Certificate.Expiry_date <= today
             ).all()
     
+    def get_certificates_expiring_between(self, after: date, until: date) -> List[Certificate]:
+        """Get certificates whose expiry date falls in (after, until] (IX_Certificate_Expiry)"""
+        with self.db_session() as session:
+            return session.query(Certificate).filter(
+                Certificate.Expiry_date > after,
+                Certificate.Expiry_date <= until
+            ).order_by(Certificate.Expiry_date).all()
+    
     def is_certificate_valid(self, certificate_id: str) -> bool:
         """Check if a certificate is still valid (not expired)"""
         with self.db_session() as session:
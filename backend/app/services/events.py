@@ -0,0 +1,368 @@
+"""Domain events raised by the enrollment, payment, grading and lesson-progress services.
+
+Services stage events with ``emit(session, event)`` before committing. Each
+event is written to OUTBOX_EVENT in the same transaction as the change and
+published on ``core.events.bus`` once the commit succeeds, so subscribers
+never see a change that was rolled back. When every subscriber has handled an
+event its outbox row is marked dispatched; rows left behind by a worker that
+died (or by a failing subscriber) are claimed and published again by the
+relay, so delivery is at-least-once and subscribers should be idempotent.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event as orm_event, func, or_, select, update, delete
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..core import config, get_logger, http_cache
+from ..core.events import ASYNC, EventBus, bus
+from ..models import mudemy_session
+from ..models.models import OutboxEvent
+
+logger = get_logger("EVENTS")
+
+EVENT_TYPES: Dict[str, type] = {}
+_PENDING = "pending_events"
+
+
+@dataclass(frozen=True)
+class DomainEvent:
+    event_id: str = field(default_factory=lambda: uuid.uuid4().hex, kw_only=True)
+    occurred_at: datetime = field(default_factory=datetime.utcnow, kw_only=True)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        EVENT_TYPES[cls.__name__] = cls
+
+    def payload(self) -> str:
+        data = asdict(self)
+        data.pop("event_id")
+        data.pop("occurred_at")
+        return json.dumps(data)
+
+    @staticmethod
+    def from_row(row: OutboxEvent) -> "DomainEvent":
+        cls = EVENT_TYPES[row.Event_type]
+        return cls(**json.loads(row.Payload), event_id=row.EventID, occurred_at=row.Created_at)
+
+
+# Enrollment
+@dataclass(frozen=True)
+class EnrollmentCreated(DomainEvent):
+    enrollment_id: str
+    course_id: str
+    student_id: str
+    payment_id: str
+
+
+@dataclass(frozen=True)
+class EnrollmentChanged(DomainEvent):
+    enrollment_id: str
+    course_id: str
+    student_id: str
+    status: Optional[str]
+    progress: Optional[float]
+
+
+@dataclass(frozen=True)
+class EnrollmentDeleted(DomainEvent):
+    enrollment_id: str
+    course_id: str
+    student_id: str
+
+
+# Payment
+@dataclass(frozen=True)
+class PaymentRecorded(DomainEvent):
+    payment_id: str
+    user_id: str
+    amount: int
+    method: Optional[str]
+
+
+@dataclass(frozen=True)
+class PaymentChanged(DomainEvent):
+    payment_id: str
+    user_id: str
+    amount: int
+
+
+@dataclass(frozen=True)
+class PaymentDeleted(DomainEvent):
+    payment_id: str
+    user_id: str
+
+
+# Grading
+@dataclass(frozen=True)
+class AssignmentSubmitted(DomainEvent):
+    sub_id: str
+    ass_id: str
+    user_id: str
+
+
+@dataclass(frozen=True)
+class AssignmentGraded(DomainEvent):
+    sub_id: str
+    ass_id: str
+    user_id: str
+    grade: Optional[float]
+
+
+@dataclass(frozen=True)
+class QuizSubmitted(DomainEvent):
+    sub_id: str
+    quiz_id: str
+    user_id: str
+
+
+@dataclass(frozen=True)
+class QuizGraded(DomainEvent):
+    sub_id: str
+    quiz_id: str
+    user_id: str
+    grade: Optional[float]
+
+
+# Lesson progress (TAKE)
+@dataclass(frozen=True)
+class LessonProgressChanged(DomainEvent):
+    user_id: str
+    lesson_id: str
+    is_finished: Optional[bool]   # None when the record was deleted
+
+
+# Certificates
+@dataclass(frozen=True)
+class CertificateIssued(DomainEvent):
+    certificate_id: str
+    course_id: str
+    student_id: str
+    certificate_number: str
+
+
+@dataclass(frozen=True)
+class CertificateRevoked(DomainEvent):
+    certificate_id: str
+    certificate_number: str
+    reason: Optional[str]
+
+
+# Scheduled sweeps (services.jobs)
+@dataclass(frozen=True)
+class DeadlineApproaching(DomainEvent):
+    kind: str                     # "assignment" or "quiz"
+    lesson_id: str
+    module_id: Optional[str]
+    title: str
+    deadline: str                 # ISO 8601, UTC
+
+
+@dataclass(frozen=True)
+class CertificateExpired(DomainEvent):
+    certificate_id: str
+    course_id: str
+    student_id: str
+    expiry_date: str              # ISO 8601
+
+
+def as_float(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def emit(session: Session, event: DomainEvent) -> None:
+    """Stage ``event`` in ``session``: its outbox row commits with the change, publishing follows the commit."""
+    session.add(OutboxEvent(EventID=event.event_id, Event_type=type(event).__name__,
+                            Payload=event.payload(), Created_at=event.occurred_at, Attempts=0))
+    session.info.setdefault(_PENDING, []).append(event)
+
+
+@orm_event.listens_for(Session, "after_commit")
+def _publish_committed(session):
+    for staged in session.info.pop(_PENDING, ()):
+        outbox.publish(staged)
+
+
+@orm_event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING, None)
+
+
+class OutboxRelay:
+    """Marks delivered outbox rows and republishes the ones nobody confirmed.
+
+    Acknowledgements are buffered and written in one UPDATE per pass. A row
+    still undelivered OUTBOX_REDELIVER_AFTER seconds after it was written is
+    claimed with a conditional UPDATE (so one worker wins) and published again,
+    up to OUTBOX_MAX_ATTEMPTS times.
+    """
+
+    def __init__(self, db_session: sessionmaker, event_bus: EventBus):
+        self.db_session = db_session
+        self.bus = event_bus
+        self._acks: List[str] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._purged_at = float("-inf")
+        self.acknowledged = 0
+        self.redelivered = 0
+
+    def publish(self, domain_event: DomainEvent) -> bool:
+        self.start()
+        return self.bus.publish(domain_event, on_done=lambda: self._ack(domain_event.event_id))
+
+    def _ack(self, event_id: str) -> None:
+        with self._lock:
+            self._acks.append(event_id)
+            full = len(self._acks) >= config.OUTBOX_RELAY_BATCH
+        if full:
+            self._wake.set()
+
+    # ------------------------------------------------------------------
+    # Background loop
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._acks = []   # a forked child must not acknowledge the parent's deliveries
+            self._wake.clear()
+            self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._pid != os.getpid():
+            return
+        self._pid = None
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def _run(self) -> None:
+        pid = os.getpid()
+        while self._pid == pid:
+            self._wake.wait(config.OUTBOX_RELAY_INTERVAL)
+            self._wake.clear()
+            if self._pid != pid:
+                return
+            try:
+                self.flush()
+                self.redeliver()
+                self._purge()
+            except Exception as e:
+                logger.error(f"Outbox relay pass failed: {e}")
+
+    def flush(self) -> int:
+        """Mark acknowledged events dispatched."""
+        with self._lock:
+            acks, self._acks = self._acks, []
+        if not acks:
+            return 0
+        now = datetime.utcnow()
+        try:
+            with self.db_session() as session:
+                # Chunked to stay under SQL Server's 2100-parameter limit
+                for start in range(0, len(acks), 500):
+                    session.execute(update(OutboxEvent)
+                                    .where(OutboxEvent.EventID.in_(acks[start:start + 500]))
+                                    .values(Dispatched_at=now))
+                session.commit()
+        except Exception:
+            with self._lock:
+                self._acks = acks + self._acks
+            raise
+        self.acknowledged += len(acks)
+        return len(acks)
+
+    def redeliver(self) -> int:
+        """Claim and republish stale undelivered rows; returns how many were published."""
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=config.OUTBOX_REDELIVER_AFTER)
+        unclaimed = or_(OutboxEvent.Claimed_at.is_(None), OutboxEvent.Claimed_at < stale)
+        with self.db_session() as session:
+            candidates = session.execute(
+                select(OutboxEvent.EventID)
+                .where(OutboxEvent.Dispatched_at.is_(None), OutboxEvent.Created_at < stale,
+                       OutboxEvent.Attempts < config.OUTBOX_MAX_ATTEMPTS, unclaimed)
+                .order_by(OutboxEvent.Created_at)
+                .limit(config.OUTBOX_RELAY_BATCH)
+            ).scalars().all()
+
+            claimed = []
+            for event_id in candidates:
+                won = session.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.EventID == event_id, OutboxEvent.Dispatched_at.is_(None), unclaimed)
+                    .values(Claimed_at=now, Attempts=OutboxEvent.Attempts + 1)
+                ).rowcount
+                if won:
+                    claimed.append(event_id)
+            session.commit()
+            if not claimed:
+                return 0
+            rows = session.execute(select(OutboxEvent).where(OutboxEvent.EventID.in_(claimed))).scalars().all()
+
+        for row in rows:
+            if row.Attempts >= config.OUTBOX_MAX_ATTEMPTS:
+                logger.warning(f"Outbox event {row.EventID} ({row.Event_type}) on its last delivery attempt")
+            try:
+                domain_event = DomainEvent.from_row(row)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"Cannot decode outbox event {row.EventID} ({row.Event_type}): {e}")
+                continue
+            self.bus.publish(domain_event, on_done=lambda event_id=row.EventID: self._ack(event_id))
+        self.redelivered += len(rows)
+        logger.info(f"Republished {len(rows)} undelivered outbox events")
+        return len(rows)
+
+    def _purge(self) -> None:
+        if config.OUTBOX_RETENTION_HOURS <= 0 or time.monotonic() - self._purged_at < 3600:
+            return
+        self._purged_at = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(hours=config.OUTBOX_RETENTION_HOURS)
+        with self.db_session() as session:
+            removed = session.execute(delete(OutboxEvent).where(OutboxEvent.Dispatched_at < cutoff)).rowcount
+            session.commit()
+        if removed:
+            logger.info(f"Purged {removed} dispatched outbox events")
+
+    def stats(self) -> Dict[str, Any]:
+        with self.db_session() as session:
+            undelivered = session.execute(
+                select(func.count()).select_from(OutboxEvent).where(OutboxEvent.Dispatched_at.is_(None))
+            ).scalar()
+            dead = session.execute(
+                select(func.count()).select_from(OutboxEvent)
+                .where(OutboxEvent.Dispatched_at.is_(None), OutboxEvent.Attempts >= config.OUTBOX_MAX_ATTEMPTS)
+            ).scalar()
+        return {"undelivered": undelivered, "gave_up": dead, "acks_buffered": len(self._acks),
+                "acknowledged": self.acknowledged, "redelivered": self.redelivered}
+
+
+outbox = OutboxRelay(mudemy_session, bus)
+
+
+# ------------------------------------------------------------------
+# Built-in subscribers
+# ------------------------------------------------------------------
+def _refresh_course_pages(domain_events: List[DomainEvent]) -> None:
+    # COURSE.Enrollment_count is maintained by trg_update_course_enrollment_count.
+    # Async, so the bump neither holds a second pooled connection inside the
+    # publishing session's commit nor updates the "catalog" row once per enrollment.
+    http_cache.bump("catalog", *(http_cache.course_key(e.course_id) for e in domain_events))
+
+
+bus.subscribe(EnrollmentCreated, _refresh_course_pages, mode=ASYNC)
+bus.subscribe(EnrollmentDeleted, _refresh_course_pages, mode=ASYNC)
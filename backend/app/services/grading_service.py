@@ -0,0 +1,318 @@
+"""Cross-course grading queue with time-limited leases.
+
+An instructor's queue holds every ungraded assignment submission in the
+courses they teach, oldest first, read through IX_AssignSubmission_Ungraded.
+A grader claims a batch with one INSERT ... SELECT into GRADING_LEASE. The
+primary key on SubID means a submission is leased to one grader at a time, so
+two graders never get the same one. A grader that races another retries with
+jitter. Leases last GRADING_LEASE_SECONDS and can be renewed or released.
+Expired leases are deleted before each claim, so work abandoned by a grader
+returns to the queue on its own.
+
+Queue items carry no ``Sub_content``. It is loaded only when a grader opens a
+submission. Grading is a conditional UPDATE (``Grade IS NULL``), so a
+submission is graded once even if a lease ran out mid-way.
+
+``BatchGradingService`` grades thousands of assignment and quiz submissions
+in one transaction, with a few set-based ``UPDATE ... SET Grade = CASE SubID
+...`` statements per table instead of one load/update/commit per submission.
+"""
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, case, delete, func, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from ..core import config
+from ..models import route_reads
+from ..models.models import Assignment, AssignSubmission, GradingLease, Instruct, Module, Quiz, QuizSubmission
+from . import blobs
+from .assessment_service import assignment_graded
+from .events import AssignmentGraded, QuizGraded, as_float, emit
+
+ASSIGNMENT = "assignment"
+QUIZ = "quiz"
+# Rows per batch statement: the CASE binds SubID and Grade and the IN list binds SubID again,
+# which keeps each UPDATE under SQL Server's 2100 parameters
+BATCH_CHUNK = 500
+
+
+class LeaseHeld(ValueError):
+    """Another grader holds a live lease on the submission."""
+
+
+class AlreadyGraded(ValueError):
+    """The submission was graded in the meantime."""
+
+
+@route_reads
+class GradingQueueService:
+    """Service for the cross-course grading queue"""
+
+    def __init__(self, db_session: sessionmaker, max_retries=50):
+        self.db_session = db_session
+        self.max_retries = max_retries
+
+    @staticmethod
+    def _ungraded(instructor_id: str):
+        """Ungraded submissions in the instructor's courses, without Sub_content; callers order by Sub_date."""
+        return (
+            select(AssignSubmission.SubID, AssignSubmission.AssID, AssignSubmission.UserID, AssignSubmission.Sub_date,
+                   Assignment.Title, Module.CourseID)
+            .join(Assignment, Assignment.AssID == AssignSubmission.AssID)
+            .join(Module, Module.ModuleID == Assignment.ModuleID)
+            .where(AssignSubmission.Grade.is_(None),
+                   Module.CourseID.in_(select(Instruct.CourseID).where(Instruct.UserID == instructor_id)))
+        )
+
+    @staticmethod
+    def _item(row, lease_until: Optional[datetime] = None, grader: Optional[str] = None) -> Dict[str, Any]:
+        return {"SubID": row.SubID, "AssID": row.AssID, "title": row.Title, "CourseID": row.CourseID,
+                "UserID": row.UserID, "Sub_date": row.Sub_date, "claimed_by": grader, "lease_until": lease_until}
+
+    def get_queue(self, instructor_id: str, limit: int = 100) -> Dict[str, Any]:
+        """The oldest ungraded submissions and who holds them, plus queue totals"""
+        now = datetime.utcnow()
+        ungraded = self._ungraded(instructor_id).subquery()
+        live = and_(GradingLease.SubID == ungraded.c.SubID, GradingLease.Lease_until > now)
+        with self.db_session() as session:
+            rows = session.execute(
+                select(ungraded, GradingLease.Grader, GradingLease.Lease_until)
+                .outerjoin(GradingLease, live)
+                .order_by(ungraded.c.Sub_date, ungraded.c.SubID)
+                .limit(limit)
+            ).all()
+            total, leased = session.execute(
+                select(func.count(), func.count(GradingLease.SubID)).select_from(ungraded).outerjoin(GradingLease, live)
+            ).one()
+        return {"ungraded": total, "leased": leased, "available": total - leased,
+                "items": [self._item(row, row.Lease_until, row.Grader) for row in rows]}
+
+    def claim(self, instructor_id: str, grader_id: str, count: int) -> List[Dict[str, Any]]:
+        """Lease up to ``count`` of the oldest unleased submissions to ``grader_id``"""
+        count = max(1, min(count, config.GRADING_CLAIM_MAX))
+        for attempt in range(self.max_retries):
+            now = datetime.utcnow()
+            until = now + timedelta(seconds=config.GRADING_LEASE_SECONDS)
+            token = uuid.uuid4().hex
+            ungraded = self._ungraded(instructor_id).subquery()
+            free = (
+                select(ungraded.c.SubID, literal(grader_id), literal(token), literal(now), literal(until))
+                .where(~select(GradingLease.SubID).where(GradingLease.SubID == ungraded.c.SubID).exists())
+                .order_by(ungraded.c.Sub_date, ungraded.c.SubID)
+                .limit(count)
+            )
+            with self.db_session() as session:
+                try:
+                    session.execute(delete(GradingLease).where(GradingLease.Lease_until <= now))
+                    session.execute(GradingLease.__table__.insert().from_select(
+                        ["SubID", "Grader", "Claim_token", "Claimed_at", "Lease_until"], free))
+                    session.commit()
+                except IntegrityError:
+                    # Another grader leased one of the same rows first; the next attempt skips it
+                    session.rollback()
+                    time.sleep(random.uniform(0, 0.002 * min(attempt + 1, 10)))
+                    continue
+                claimed = self._ungraded(instructor_id).subquery()
+                rows = session.execute(
+                    select(claimed)
+                    .join(GradingLease, GradingLease.SubID == claimed.c.SubID)
+                    .where(GradingLease.Claim_token == token)
+                    .order_by(claimed.c.Sub_date, claimed.c.SubID)
+                ).all()
+            return [self._item(row, until, grader_id) for row in rows]
+        raise Exception(f"Failed to claim grading work after {self.max_retries} attempts.")
+
+    def renew(self, grader_id: str, sub_ids: List[str]) -> int:
+        """Extend the grader's live leases on ``sub_ids``; returns how many were extended"""
+        now = datetime.utcnow()
+        with self.db_session() as session:
+            renewed = session.execute(
+                update(GradingLease)
+                .where(GradingLease.SubID.in_(sub_ids), GradingLease.Grader == grader_id,
+                       GradingLease.Lease_until > now)
+                .values(Lease_until=now + timedelta(seconds=config.GRADING_LEASE_SECONDS))
+            ).rowcount
+            session.commit()
+        return renewed
+
+    def release(self, grader_id: str, sub_ids: List[str]) -> int:
+        """Hand the grader's leases on ``sub_ids`` back to the queue"""
+        with self.db_session() as session:
+            released = session.execute(
+                delete(GradingLease).where(GradingLease.SubID.in_(sub_ids), GradingLease.Grader == grader_id)
+            ).rowcount
+            session.commit()
+        return released
+
+    def get_submission(self, instructor_id: str, sub_id: str) -> Optional[Dict[str, Any]]:
+        """A submission in one of the instructor's courses, with its content"""
+        with self.db_session() as session:
+            row = session.execute(
+                select(AssignSubmission, Module.CourseID, GradingLease.Grader, GradingLease.Lease_until)
+                .join(Assignment, Assignment.AssID == AssignSubmission.AssID)
+                .join(Module, Module.ModuleID == Assignment.ModuleID)
+                .join(Instruct, and_(Instruct.CourseID == Module.CourseID, Instruct.UserID == instructor_id))
+                .outerjoin(GradingLease, GradingLease.SubID == AssignSubmission.SubID)
+                .where(AssignSubmission.SubID == sub_id)
+            ).first()
+        if row is None:
+            return None
+        submission = row.AssignSubmission
+        return {"SubID": submission.SubID, "AssID": submission.AssID, "CourseID": row.CourseID,
+                "UserID": submission.UserID, "Sub_date": submission.Sub_date, "Sub_content": blobs.text(submission, "Sub_content"),
+                "Grade": as_float(submission.Grade), "claimed_by": row.Grader, "lease_until": row.Lease_until}
+
+    def grade(self, instructor_id: str, grader_id: str, sub_id: str, grade: float) -> Optional[AssignSubmission]:
+        """Grade a queued submission once; None if it is not in the instructor's courses"""
+        now = datetime.utcnow()
+        with self.db_session() as session:
+            in_course = session.execute(
+                select(AssignSubmission.SubID)
+                .join(Assignment, Assignment.AssID == AssignSubmission.AssID)
+                .join(Module, Module.ModuleID == Assignment.ModuleID)
+                .join(Instruct, and_(Instruct.CourseID == Module.CourseID, Instruct.UserID == instructor_id))
+                .where(AssignSubmission.SubID == sub_id)
+            ).first()
+            if in_course is None:
+                return None
+            lease = session.get(GradingLease, sub_id)
+            if lease is not None and lease.Grader != grader_id and lease.Lease_until > now:
+                raise LeaseHeld(f"Submission {sub_id} is being graded by {lease.Grader} until {lease.Lease_until}")
+
+            graded = session.execute(
+                update(AssignSubmission)
+                .where(AssignSubmission.SubID == sub_id, AssignSubmission.Grade.is_(None))
+                .values(Grade=grade)
+            ).rowcount
+            if not graded:
+                session.rollback()
+                raise AlreadyGraded(f"Submission {sub_id} is already graded")
+            session.execute(delete(GradingLease).where(GradingLease.SubID == sub_id))
+            submission = session.get(AssignSubmission, sub_id)
+            emit(session, assignment_graded(submission))
+            session.commit()
+            return submission
+
+
+def parse_grade(value: Any) -> Optional[Decimal]:
+    """``value`` as a DECIMAL(5,2) grade within the 0-100 CHECK, or None"""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return None
+    try:
+        grade = Decimal(str(value))
+    except InvalidOperation:
+        return None
+    if not grade.is_finite() or not 0 <= grade <= 100:
+        return None
+    return grade.quantize(Decimal("0.01"))
+
+
+def _chunks(items: List[str]):
+    for start in range(0, len(items), BATCH_CHUNK):
+        yield items[start:start + BATCH_CHUNK]
+
+
+@route_reads
+class BatchGradingService:
+    """Service for grading many submissions in one transaction"""
+
+    def __init__(self, db_session: sessionmaker, max_retries=50):
+        self.db_session = db_session
+        self.max_retries = max_retries
+
+    @staticmethod
+    def _current(kind: str, sub_ids: List[str], grader_id: str, instructor_id: Optional[str], now: datetime):
+        """SubID, parent ID, student, current grade and any other grader's live lease"""
+        if kind == ASSIGNMENT:
+            model, parent, lesson = AssignSubmission, AssignSubmission.AssID, Assignment
+            stmt = (
+                select(model.SubID, parent.label("ParentID"), model.UserID, model.Grade, GradingLease.Grader)
+                .join(lesson, lesson.AssID == parent)
+                .outerjoin(GradingLease, and_(GradingLease.SubID == model.SubID, GradingLease.Grader != grader_id,
+                                              GradingLease.Lease_until > now))
+            )
+        else:
+            model, parent, lesson = QuizSubmission, QuizSubmission.QuizID, Quiz
+            stmt = (
+                select(model.SubID, parent.label("ParentID"), model.UserID, model.Grade, literal(None).label("Grader"))
+                .join(lesson, lesson.QuizID == parent)
+            )
+        if instructor_id is not None:
+            stmt = (
+                stmt.join(Module, Module.ModuleID == lesson.ModuleID)
+                .join(Instruct, and_(Instruct.CourseID == Module.CourseID, Instruct.UserID == instructor_id))
+            )
+        return stmt.where(model.SubID.in_(sub_ids))
+
+    def grade_batch(self, grader_id: str, items: List[Dict[str, Any]],
+                    instructor_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Apply ``{"SubID", "type", "grade"}`` items; one result per item, in order.
+
+        ``instructor_id`` limits the batch to submissions in that instructor's
+        courses (None for admins). Assignment submissions leased to another
+        grader are skipped, as in the grading queue. Everything that passes is
+        written in one transaction; events go out after the commit.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        wanted: Dict[str, Dict[str, tuple]] = {ASSIGNMENT: {}, QUIZ: {}}
+        for index, item in enumerate(items):
+            sub_id = item.get("SubID") if isinstance(item, dict) else None
+            kind = item.get("type") if isinstance(item, dict) else None
+            grade = parse_grade(item.get("grade")) if isinstance(item, dict) else None
+            if not isinstance(sub_id, str) or kind not in wanted:
+                results[index] = {"SubID": sub_id, "status": "invalid", "detail": "SubID and type (assignment|quiz) required"}
+            elif grade is None:
+                results[index] = {"SubID": sub_id, "status": "invalid", "detail": "grade must be a number from 0 to 100"}
+            elif sub_id in wanted[kind]:
+                results[index] = {"SubID": sub_id, "status": "duplicate"}
+            else:
+                wanted[kind][sub_id] = (index, grade)
+
+        now = datetime.utcnow()
+        with self.db_session() as session:
+            for kind, pending in wanted.items():
+                if not pending:
+                    continue
+                model = AssignSubmission if kind == ASSIGNMENT else QuizSubmission
+                current = {}
+                for chunk in _chunks(list(pending)):
+                    current.update((row.SubID, row) for row in session.execute(
+                        self._current(kind, chunk, grader_id, instructor_id, now)))
+
+                changed: Dict[str, Decimal] = {}
+                for sub_id, (index, grade) in pending.items():
+                    row = current.get(sub_id)
+                    if row is None:
+                        results[index] = {"SubID": sub_id, "status": "not_found"}
+                    elif row.Grader is not None:
+                        results[index] = {"SubID": sub_id, "status": "leased", "detail": f"being graded by {row.Grader}"}
+                    elif row.Grade is not None and Decimal(row.Grade) == grade:
+                        results[index] = {"SubID": sub_id, "status": "unchanged", "grade": float(grade)}
+                    else:
+                        changed[sub_id] = grade
+                        results[index] = {"SubID": sub_id, "status": "graded", "grade": float(grade)}
+                        if kind == ASSIGNMENT:
+                            emit(session, AssignmentGraded(sub_id=sub_id, ass_id=row.ParentID, user_id=row.UserID,
+                                                           grade=float(grade)))
+                        else:
+                            emit(session, QuizGraded(sub_id=sub_id, quiz_id=row.ParentID, user_id=row.UserID,
+                                                     grade=float(grade)))
+
+                for chunk in _chunks(list(changed)):
+                    session.execute(
+                        update(model)
+                        .where(model.SubID.in_(chunk))
+                        .values(Grade=case({sub_id: changed[sub_id] for sub_id in chunk}, value=model.SubID))
+                        .execution_options(synchronize_session=False)
+                    )
+                    if kind == ASSIGNMENT:
+                        session.execute(delete(GradingLease).where(GradingLease.SubID.in_(chunk))
+                                        .execution_options(synchronize_session=False))
+            session.commit()
+        return results
@@ -0,0 +1,104 @@
+"""Idempotency keys for POST endpoints that must not run twice (``/api/checkout``).
+
+The client sends an ``Idempotency-Key`` header. The request that first
+succeeds stores its response in IDEMPOTENCY_KEY in the same transaction as the
+change it made, so a retry after a timeout gets that response back instead of
+paying twice. Keys are scoped per user and remember a hash of the request
+body; reusing a key for a different body is an error. Keys expire after
+IDEMPOTENCY_TTL_HOURS, and the ``idempotency_purge`` job deletes them and keeps
+the table under IDEMPOTENCY_MAX_KEYS. Recent responses are also cached in
+memory, so most replays do not touch the database.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..core import config, get_logger
+from ..core.cache import TTLCache
+from ..models import mudemy_session
+from ..models.models import IdempotencyKey
+
+logger = get_logger("IDEMPOTENCY")
+
+
+class IdempotencyMismatch(ValueError):
+    """The key was already used for a request with a different body."""
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    status_code: int
+    body: Dict[str, Any]
+
+
+def request_hash(data: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self, db_session: sessionmaker):
+        self.db_session = db_session
+        self._recent = TTLCache(maxsize=config.IDEMPOTENCY_CACHE_SIZE, ttl=config.IDEMPOTENCY_CACHE_SECONDS)
+
+    def lookup(self, user_id: str, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """The stored response for ``key``, or None if no request with it has succeeded yet."""
+        entry = self._recent.get((user_id, key))
+        if entry is None:
+            with self.db_session() as session:
+                row = session.execute(
+                    select(IdempotencyKey.Request_hash, IdempotencyKey.Status_code, IdempotencyKey.Response)
+                    .where(IdempotencyKey.UserID == user_id, IdempotencyKey.Idempotency_key == key,
+                           IdempotencyKey.Expires_at > datetime.utcnow())
+                ).first()
+            if row is None:
+                return None
+            entry = (row.Request_hash, StoredResponse(row.Status_code, json.loads(row.Response)))
+            self._recent.set((user_id, key), entry)
+
+        stored_hash, response = entry
+        if stored_hash != fingerprint:
+            raise IdempotencyMismatch("Idempotency-Key was already used with a different request")
+        return response
+
+    def record(self, session: Session, user_id: str, key: str, fingerprint: str,
+               status_code: int, body: Dict[str, Any]) -> None:
+        """Stage the response in ``session``; it commits (or rolls back) with the change it describes."""
+        now = datetime.utcnow()
+        session.add(IdempotencyKey(UserID=user_id, Idempotency_key=key, Request_hash=fingerprint,
+                                   Status_code=status_code, Response=json.dumps(body), Created_at=now,
+                                   Expires_at=now + timedelta(hours=config.IDEMPOTENCY_TTL_HOURS)))
+
+    def remember(self, user_id: str, key: str, fingerprint: str, status_code: int, body: Dict[str, Any]) -> None:
+        """Cache a committed response so replays to this worker skip the database."""
+        self._recent.set((user_id, key), (fingerprint, StoredResponse(status_code, body)))
+
+    def purge(self) -> int:
+        """Delete expired keys, then the oldest ones beyond IDEMPOTENCY_MAX_KEYS; returns how many went."""
+        with self.db_session() as session:
+            removed = session.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.Expires_at <= datetime.utcnow())
+            ).rowcount
+            excess = session.execute(select(func.count()).select_from(IdempotencyKey)).scalar() - config.IDEMPOTENCY_MAX_KEYS
+            if excess > 0:
+                cutoff = session.execute(
+                    select(IdempotencyKey.Expires_at).order_by(IdempotencyKey.Expires_at)
+                    .offset(excess - 1).limit(1)
+                ).scalar()
+                removed += session.execute(
+                    delete(IdempotencyKey).where(IdempotencyKey.Expires_at <= cutoff)
+                ).rowcount
+            session.commit()
+        if removed:
+            logger.info(f"Purged {removed} idempotency keys")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        return {"cache": self._recent.stats()}
+
+
+idempotency = IdempotencyStore(mudemy_session)
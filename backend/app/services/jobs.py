@@ -0,0 +1,217 @@
+"""Scheduled background jobs and their database leases.
+
+Each job has a JOB_LEASE row. A worker runs a job only after winning a
+conditional UPDATE on that row (lease expired and next run due), so with
+several workers each run happens once. The row also keeps the job's
+watermark: the end of the time window the last successful run covered. Sweeps
+only look at the window since then, through the deadline/expiry indexes, and
+move the watermark in the same transaction as the events they emit.
+"""
+import os
+import random
+import socket
+from dataclasses import dataclass
+from datetime import date, datetime, time as time_of_day, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..core import config, get_logger
+from ..core.events import ASYNC, bus
+from ..core.scheduler import Job, RunRecord, Scheduler
+from ..models import mudemy_session, replicas, use_primary
+from ..models.models import JobLease
+from .assessment_service import AssignmentService, QuizService
+from .container import container
+from .enrollment_service import CertificateService
+from .events import (CertificateExpired, CertificateRevoked, DeadlineApproaching, EnrollmentChanged,
+                     LessonProgressChanged, emit)
+from .idempotency import idempotency
+
+logger = get_logger("JOBS")
+
+_HOST = socket.gethostname()
+
+
+def _owner() -> str:
+    return f"{_HOST}:{os.getpid()}"
+
+
+class LeaseLost(RuntimeError):
+    """Another worker took over the job while this run was still going."""
+
+
+@dataclass
+class LeaseGrant:
+    name: str
+    owner: str
+    watermark: Optional[datetime]
+    started_at: datetime
+
+    def advance(self, session: Session, watermark: datetime) -> None:
+        """Stage the new watermark in the job's transaction; raises if the lease is no longer ours."""
+        moved = session.execute(
+            update(JobLease)
+            .where(JobLease.JobName == self.name, JobLease.Owner == self.owner)
+            .values(Watermark=watermark)
+        ).rowcount
+        if not moved:
+            raise LeaseLost(f"Lease on {self.name} expired before the run finished")
+
+
+class JobLeases:
+    """JOB_LEASE-backed lease store for ``core.scheduler.Scheduler``."""
+
+    def __init__(self, db_session: sessionmaker):
+        self.db_session = db_session
+
+    def acquire(self, job: Job) -> Tuple[Optional[LeaseGrant], float]:
+        now = datetime.utcnow()
+        owner = _owner()
+        with self.db_session() as session:
+            if session.get(JobLease, job.name) is None:
+                session.add(JobLease(JobName=job.name, Run_count=0))
+                try:
+                    session.commit()
+                except IntegrityError:
+                    session.rollback()   # another worker created it first
+
+            won = session.execute(
+                update(JobLease)
+                .where(JobLease.JobName == job.name,
+                       or_(JobLease.Lease_until.is_(None), JobLease.Lease_until < now),
+                       or_(JobLease.Next_run_at.is_(None), JobLease.Next_run_at <= now))
+                .values(Owner=owner, Lease_until=now + timedelta(seconds=job.lease_seconds), Last_started_at=now)
+            ).rowcount
+            session.commit()
+            row = session.execute(
+                select(JobLease.Watermark, JobLease.Next_run_at, JobLease.Lease_until)
+                .where(JobLease.JobName == job.name)
+            ).one()
+
+        if won:
+            return LeaseGrant(name=job.name, owner=owner, watermark=row.Watermark, started_at=now), 0.0
+        due = max(t for t in (row.Next_run_at, row.Lease_until, now) if t is not None)
+        # Jitter keeps the losing workers from retrying in lockstep
+        return None, max(1.0, (due - now).total_seconds()) + random.uniform(0, 1)
+
+    def release(self, job: Job, grant: LeaseGrant, record: RunRecord) -> None:
+        now = datetime.utcnow()
+        with self.db_session() as session:
+            session.execute(
+                update(JobLease)
+                .where(JobLease.JobName == grant.name, JobLease.Owner == grant.owner)
+                .values(Owner=None, Lease_until=None, Next_run_at=now + timedelta(seconds=job.interval),
+                        Last_finished_at=now, Last_duration_ms=int(record.duration_ms),
+                        Last_status=record.status, Last_error=(record.error or "")[:500] or None,
+                        Run_count=JobLease.Run_count + 1)
+            )
+            session.commit()
+
+    def make_due(self, name: str) -> None:
+        """Let the next worker that checks run ``name`` straight away."""
+        with self.db_session() as session:
+            session.execute(update(JobLease).where(JobLease.JobName == name).values(Next_run_at=None))
+            session.commit()
+
+    def rows(self) -> List[JobLease]:
+        with self.db_session() as session:
+            return session.query(JobLease).order_by(JobLease.JobName).all()
+
+
+# ------------------------------------------------------------------
+# Sweeps
+# ------------------------------------------------------------------
+def sweep_deadlines(grant: LeaseGrant) -> Dict[str, Any]:
+    """Emit DeadlineApproaching for assignments and quizzes that entered the reminder window since the last run.
+
+    Items created with less notice than REMINDER_LEAD_HOURS fall behind the
+    watermark and are not reminded.
+    """
+    now = datetime.utcnow()
+    horizon = now + timedelta(hours=config.REMINDER_LEAD_HOURS)
+    start = max(grant.watermark or now, now)
+    with use_primary():   # a lagging replica would let the watermark skip fresh rows
+        assignments = container.get(AssignmentService).get_assignments_due_between(start, horizon)
+        quizzes = container.get(QuizService).get_quizzes_due_between(start, horizon)
+
+    with mudemy_session() as session:
+        for assignment in assignments:
+            emit(session, DeadlineApproaching(kind="assignment", lesson_id=assignment.AssID,
+                                              module_id=assignment.ModuleID, title=assignment.Title,
+                                              deadline=assignment.Deadline.isoformat()))
+        for quiz in quizzes:
+            emit(session, DeadlineApproaching(kind="quiz", lesson_id=quiz.QuizID, module_id=quiz.ModuleID,
+                                              title=quiz.Title, deadline=quiz.Deadline.isoformat()))
+        grant.advance(session, horizon)
+        session.commit()
+    return {"assignments": len(assignments), "quizzes": len(quizzes),
+            "window": [start.isoformat(), horizon.isoformat()]}
+
+
+def sweep_certificate_expiry(grant: LeaseGrant) -> Dict[str, Any]:
+    """Emit CertificateExpired for certificates whose expiry date passed since the last run."""
+    today = date.today()
+    after = grant.watermark.date() if grant.watermark else today - timedelta(days=1)
+    with use_primary():
+        certificates = container.get(CertificateService).get_certificates_expiring_between(after, today)
+
+    with mudemy_session() as session:
+        for certificate in certificates:
+            emit(session, CertificateExpired(certificate_id=certificate.CertificateID,
+                                             course_id=certificate.CourseID, student_id=certificate.StudentID,
+                                             expiry_date=certificate.Expiry_date.isoformat()))
+        grant.advance(session, datetime.combine(today, time_of_day.min))
+        session.commit()
+    return {"expired": len(certificates), "window": [after.isoformat(), today.isoformat()]}
+
+
+def issue_certificates(grant: LeaseGrant) -> Dict[str, Any]:
+    """Issue certificates for every completed enrollment that has none yet."""
+    return {"issued": container.get(CertificateService).issue_pending_certificates()}
+
+
+def refresh_revocations(grant: None) -> Dict[str, Any]:
+    """Reload this worker's in-memory set of revoked certificate numbers."""
+    return {"revoked": container.get(CertificateService).revoked.refresh()}
+
+
+def purge_idempotency_keys(grant: LeaseGrant) -> Dict[str, Any]:
+    """Drop expired checkout idempotency keys and trim the table to IDEMPOTENCY_MAX_KEYS."""
+    return {"purged": idempotency.purge()}
+
+
+def _revoked_here(domain_event: CertificateRevoked) -> None:
+    # Immediate in the worker that revoked; the others catch up on their next refresh
+    container.get(CertificateService).revoked.add(domain_event.certificate_number)
+
+
+def _completions_seen(events) -> None:
+    # ENROLLMENT.Status is flipped by trg_update_progress_on_take, so a finished lesson may complete a course
+    if any(getattr(e, "is_finished", False) or getattr(e, "status", None) == 'Completed' for e in events):
+        leases.make_due("certificate_issuance")
+        scheduler.run_now("certificate_issuance")
+
+
+leases = JobLeases(mudemy_session)
+scheduler = Scheduler(leases)
+scheduler.add("deadline_reminders", sweep_deadlines, config.DEADLINE_SWEEP_INTERVAL)
+scheduler.add("certificate_expiry", sweep_certificate_expiry, config.EXPIRY_SWEEP_INTERVAL)
+scheduler.add("certificate_issuance", issue_certificates, config.CERTIFICATE_ISSUE_INTERVAL)
+scheduler.add("certificate_revocations", refresh_revocations, config.REVOCATION_REFRESH_INTERVAL,
+              leased=False, initial_delay=0)
+scheduler.add("idempotency_purge", purge_idempotency_keys, config.IDEMPOTENCY_PURGE_INTERVAL)
+if replicas.configured:
+    # One worker writes the heartbeat; every worker measures the lag its own requests route on
+    scheduler.add("replica_heartbeat", lambda grant: replicas.beat(), config.REPLICA_CHECK_INTERVAL, initial_delay=0)
+    scheduler.add("replica_lag", lambda grant: replicas.measure(), config.REPLICA_CHECK_INTERVAL,
+                  leased=False, initial_delay=0)
+
+bus.subscribe(CertificateRevoked, _revoked_here)
+
+if config.SCHEDULER_ENABLED:
+    # Batched so a burst of completions triggers one issuance pass rather than one per lesson
+    bus.subscribe(LessonProgressChanged, _completions_seen, mode=ASYNC, max_wait=1.0)
+    bus.subscribe(EnrollmentChanged, _completions_seen, mode=ASYNC, max_wait=1.0)
@@ -0,0 +1,101 @@
+"""Column projections for the service getters.
+
+By default a getter loads full ORM entities. Every column comes along,
+including Password and the NVARCHAR(MAX) bodies, and each row gets identity
+map and change-tracking state. Most read routes serialize a few columns and
+throw the entity away. A getter called with ``view=`` selects only that view's
+columns and returns plain ``Row`` tuples instead. Rows support the same
+attribute access (``row.Title``), so route code reading attributes works with
+either.
+
+A view is a name from ``VIEWS`` or an explicit sequence of columns of the
+model. When a view includes a body kept in the blob store (``blobs.BLOB_COLUMNS``),
+``<column>_hash`` is added so ``blobs.text(row, column)`` still finds the body.
+Rows are read-only: anything that updates, deletes or walks relationships
+needs the full entity.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Sequence, Tuple, Union
+
+from ..models.models import (
+    Answer, Assignment, AssignSubmission, Content, Course, Module, Question, Quiz, QuizSubmission, User,
+)
+from .blobs import BLOB_COLUMNS
+
+FULL = "full"
+SUMMARY = "summary"
+
+View = Union[str, Sequence[Any]]
+
+_USER_SUMMARY = (User.UserID, User.User_name, User.Email, User.Full_name, User.City, User.Country)
+
+VIEWS: Dict[type, Dict[str, Tuple[Any, ...]]] = {
+    User: {
+        SUMMARY: _USER_SUMMARY,
+        "instructor": _USER_SUMMARY + (User.Phone, User.Date_of_birth, User.Bio_text,
+                                       User.Year_of_experience, User.Average_rating),
+        "student": _USER_SUMMARY + (User.Phone, User.Date_of_birth, User.Total_enrollments),
+        # everything UserOut serializes, i.e. all but Password
+        "profile": _USER_SUMMARY + (User.Phone, User.Date_of_birth, User.Last_login, User.IFlag, User.Bio_text,
+                                    User.Year_of_experience, User.Average_rating, User.SFlag,
+                                    User.Total_enrollments),
+    },
+    Course: {
+        SUMMARY: (Course.CourseID, Course.Title, Course.Difficulty, Course.Language, Course.Description),
+    },
+    Module: {
+        SUMMARY: (Module.ModuleID, Module.Title, Module.CourseID),
+    },
+    Content: {
+        SUMMARY: (Content.ContentID, Content.Title, Content.Slides, Content.ModuleID),
+    },
+    Assignment: {
+        SUMMARY: (Assignment.AssID, Assignment.Deadline, Assignment.Description, Assignment.Title,
+                  Assignment.ModuleID),
+    },
+    Quiz: {
+        SUMMARY: (Quiz.QuizID, Quiz.Time_limit, Quiz.Num_attempt, Quiz.Deadline, Quiz.Title, Quiz.ModuleID),
+    },
+    Question: {
+        SUMMARY: (Question.QuestionID, Question.QuizID, Question.Correct_answer, Question.Content),
+        "key": (Question.QuestionID, Question.QuizID),
+    },
+    Answer: {
+        SUMMARY: (Answer.QuestionID, Answer.QuizID, Answer.AnswerID, Answer.Answer),
+    },
+    AssignSubmission: {
+        SUMMARY: (AssignSubmission.SubID, AssignSubmission.UserID, AssignSubmission.AssID,
+                  AssignSubmission.Sub_content, AssignSubmission.Grade, AssignSubmission.Sub_date),
+    },
+    QuizSubmission: {
+        SUMMARY: (QuizSubmission.SubID, QuizSubmission.UserID, QuizSubmission.QuizID,
+                  QuizSubmission.Sub_content, QuizSubmission.Grade, QuizSubmission.Sub_date),
+    },
+}
+
+
+def _with_hashes(model: type, columns: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    keys = {column.key for column in columns}
+    extra = tuple(getattr(model, f"{name}_hash") for name in BLOB_COLUMNS.get(model, ())
+                  if name in keys and f"{name}_hash" not in keys)
+    return columns + extra
+
+
+@lru_cache(maxsize=None)
+def _named(model: type, view: str) -> Tuple[Any, ...]:
+    try:
+        columns = VIEWS[model][view]
+    except KeyError:
+        raise ValueError(f"Unknown view {view!r} for {model.__name__}") from None
+    return _with_hashes(model, columns)
+
+
+def projection(model: type, view: View = FULL) -> Tuple[Any, ...]:
+    """What to pass to ``session.query``: the entity for FULL, otherwise the view's columns"""
+    if isinstance(view, str):
+        return (model,) if view == FULL else _named(model, view)
+    columns = tuple(view)
+    for column in columns:
+        if getattr(column, "class_", None) is not model:
+            raise ValueError(f"{column!r} is not a column of {model.__name__}")
+    return _with_hashes(model, columns)
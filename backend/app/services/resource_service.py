@@ -2,8 +2,12 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional, Dict, Any
 from ..models.models import Resource, ProvideResource
-from ..models import generate_id
+from ..models import generate_id, route_reads
+from ..core import config, get_logger
 
+logger = get_logger("RESOURCE_SERVICE")
+
+@route_reads
 class ResourceService:
     """Service for Resource CRUD operations"""
     
@@ -25,7 +29,7 @@ class ResourceService:
                     return res
                 except IntegrityError:
                     session.rollback()
-                    print(f"Collision detected for {new_id}. Retrying...")
+                    logger.warning(f"Collision detected for {new_id}. Retrying...")
                     continue
                 except Exception as e:
                     session.rollback()
@@ -112,6 +116,7 @@ class ResourceService:
             return session.query(Resource).count()
 
 
+@route_reads
 class ProvideResourceService:
     """Service for ProvideResource (Resource-Lesson relationship) operations"""
     
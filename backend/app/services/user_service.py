@@ -3,8 +3,15 @@ from sqlalchemy.exc import IntegrityError
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from ..models.models import User, Take, Interests, Instruct, Qualification
-from ..models import generate_id
+from ..models import generate_id, route_reads
+from .projections import FULL, View, projection
+from .events import LessonProgressChanged, emit
+from ..core import config, get_logger
 
+logger = get_logger("USER_SERVICE")
+sampled_logger = get_logger("USER_SERVICE", sample_rate=config.LOG_SAMPLE_RATE)
+
+@route_reads
 class UserService:
     """Service for User CRUD operations"""
     
@@ -23,21 +30,21 @@ class UserService:
                     session.add(user)
                     session.commit()
                     session.refresh(user)
-                    print(f"Successfully created {new_id} on attempt {attempt + 1}")
+                    sampled_logger.debug(f"Successfully created {new_id} on attempt {attempt + 1}")
                     return user
                 except IntegrityError:
                     session.rollback()
-                    print(f"Collision detected for {new_id}. Retrying...")
+                    logger.warning(f"Collision detected for {new_id}. Retrying...")
                     continue
                 except Exception as e:
                     session.rollback()
                     raise e
         raise Exception(f"Failed to generate unique ID for {User.__name__} after {self.max_retries} attempts.")
     
-    def get_user_by_id(self, user_id: str) -> Optional[User]:
+    def get_user_by_id(self, user_id: str, view: View = FULL) -> Optional[User]:
         """Get user by ID"""
         with self.db_session() as session:
-            return session.query(User).filter(User.UserID == user_id).first()
+            return session.query(*projection(User, view)).filter(User.UserID == user_id).first()
     
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username"""
@@ -49,20 +56,20 @@ class UserService:
         with self.db_session() as session:
             return session.query(User).filter(User.Email == email).first()
     
-    def get_all_users(self, limit: int = 100) -> List[User]:
+    def get_all_users(self, limit: int = 100, view: View = FULL) -> List[User]:
         """Get all users with pagination"""
         with self.db_session() as session:
-            return session.query(User).limit(limit).all()
+            return session.query(*projection(User, view)).limit(limit).all()
     
-    def get_instructors(self) -> List[User]:
+    def get_instructors(self, view: View = FULL) -> List[User]:
         """Get all instructors"""
         with self.db_session() as session:
-            return session.query(User).filter(User.IFlag == True).all()
+            return session.query(*projection(User, view)).filter(User.IFlag == True).all()
     
-    def get_students(self) -> List[User]:
+    def get_students(self, view: View = FULL) -> List[User]:
         """Get all students"""
         with self.db_session() as session:
-            return session.query(User).filter(User.SFlag == True).all()
+            return session.query(*projection(User, view)).filter(User.SFlag == True).all()
     
     def update_user(self, user_id: str, update_data: Dict[str, Any]) -> Optional[User]:
         """Update user information"""
@@ -118,12 +125,13 @@ class UserService:
             session.refresh(user)
             return user
     
-    def search_users_by_name(self, name: str) -> List[User]:
+    def search_users_by_name(self, name: str, view: View = FULL) -> List[User]:
         """Search users by full name"""
         with self.db_session() as session:
-            return session.query(User).filter(User.Full_name.like(f'%{name}%')).all()
+            return session.query(*projection(User, view)).filter(User.Full_name.like(f'%{name}%')).all()
 
 
+@route_reads
 class TakeService:
     """Service for Take (lesson progress) operations"""
     
@@ -136,6 +144,7 @@ class TakeService:
             try:
                 take = Take(UserID=user_id, LessonID=lesson_id, is_finished=is_finished)
                 session.add(take)
+                emit(session, LessonProgressChanged(user_id=user_id, lesson_id=lesson_id, is_finished=is_finished))
                 session.commit()
                 session.refresh(take)
                 return take
@@ -184,6 +193,7 @@ class TakeService:
                 return None
             
             take.is_finished = True
+            emit(session, LessonProgressChanged(user_id=user_id, lesson_id=lesson_id, is_finished=True))
             session.commit()
             session.refresh(take)
             return take
@@ -200,6 +210,7 @@ class TakeService:
                 return None
             
             take.is_finished = False
+            emit(session, LessonProgressChanged(user_id=user_id, lesson_id=lesson_id, is_finished=False))
             session.commit()
             session.refresh(take)
             return take
@@ -216,6 +227,7 @@ class TakeService:
                 return False
             
             session.delete(take)
+            emit(session, LessonProgressChanged(user_id=user_id, lesson_id=lesson_id, is_finished=None))
             session.commit()
             return True
     
@@ -237,6 +249,7 @@ class TakeService:
             }
 
 
+@route_reads
 class InterestsService:
     """Service for Student Interests operations"""
     
@@ -296,6 +309,7 @@ class InterestsService:
             return True
 
 
+@route_reads
 class InstructService:
     """Service for Instructor-Course relationship operations"""
     
@@ -351,6 +365,7 @@ class InstructService:
             return instruct is not None
 
 
+@route_reads
 class QualificationService:
     """Service for Instructor Qualifications operations"""
     
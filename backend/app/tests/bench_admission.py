@@ -0,0 +1,124 @@
+"""Admission control under a report flood: login and catalog latency with and without ``AdmissionMiddleware``.
+
+    python -m app.tests.bench_admission --capacity 8 --reports 200 --logins 200
+    python -m app.tests.bench_admission --save admission.json --baseline before.json
+
+No database is needed. A trivial ASGI app stands in for the sync endpoints:
+every request sleeps in a thread pool of ``--capacity`` threads, the way
+Starlette runs ``def`` routes, for ``--report-ms`` (reports) or
+``--fast-ms`` (everything else). A burst of report requests arrives first, and
+logins and catalog reads trickle in behind it. Without admission they all
+queue for the same threads. With it, reports are held to their class limit,
+interactive requests go first, and the excess reports get a fast 503.
+The notes list the 503s and the Retry-After values handed out.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from ..core.admission import AUTH, CATALOG, REPORTS, WRITES, AdmissionController, AdmissionMiddleware, RouteClass
+from .benchmark import add_report_arguments, finish, summarize
+
+REPORT_PATH = "/api/courses/C0001/progress"
+LOGIN_PATH = "/api/auth/login"
+CATALOG_PATH = "/api/courses"
+
+
+def slow_app(capacity: int, report_ms: float, fast_ms: float):
+    pool = ThreadPoolExecutor(max_workers=capacity)
+
+    async def app(scope, receive, send):
+        seconds = (report_ms if scope["path"] == REPORT_PATH else fast_ms) / 1000
+        await asyncio.get_running_loop().run_in_executor(pool, time.sleep, seconds)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+    return app
+
+
+def build_controller(capacity: int, reports: str) -> AdmissionController:
+    return AdmissionController(
+        capacity=capacity,
+        classes=[RouteClass.parse(AUTH, f"{capacity}/200/2", 0), RouteClass.parse(CATALOG, f"{capacity}/200/3", 1),
+                 RouteClass.parse(WRITES, f"{capacity}/200/5", 1), RouteClass.parse(REPORTS, reports, 2)],
+        rules=[("*", LOGIN_PATH, AUTH), ("GET", "/api/courses/{course_id}/progress", REPORTS)],
+        default_read=CATALOG, default_write=WRITES)
+
+
+async def request(app, method: str, path: str) -> Tuple[int, float, int]:
+    status, retry_after = [0], [0]
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status[0] = message["status"]
+            for name, value in message["headers"]:
+                if name == b"retry-after":
+                    retry_after[0] = int(value)
+
+    t0 = time.perf_counter()
+    await app({"type": "http", "method": method, "path": path, "headers": [], "client": ("10.0.0.1", 5000)},
+              receive, send)
+    return status[0], (time.perf_counter() - t0) * 1000, retry_after[0]
+
+
+async def scenario(app, args) -> Dict[str, List[Tuple[int, float, int]]]:
+    """Reports all at once, then one login and one catalog read every ``--gap-ms``."""
+    reports = [asyncio.create_task(request(app, "GET", REPORT_PATH)) for _ in range(args.reports)]
+    await asyncio.sleep(0)
+    logins, catalog = [], []
+    for _ in range(args.logins):
+        logins.append(asyncio.create_task(request(app, "POST", LOGIN_PATH)))
+        catalog.append(asyncio.create_task(request(app, "GET", CATALOG_PATH)))
+        await asyncio.sleep(args.gap_ms / 1000)
+    return {"login": await asyncio.gather(*logins), "catalog": await asyncio.gather(*catalog),
+            "report": await asyncio.gather(*reports)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Interactive latency behind a report flood, with and without admission control.")
+    parser.add_argument("--capacity", type=int, default=8, help="worker threads (THREADPOOL_SIZE)")
+    parser.add_argument("--reports", type=int, default=200, help="report requests in the burst")
+    parser.add_argument("--logins", type=int, default=200, help="logins (and as many catalog reads) after it")
+    parser.add_argument("--report-ms", type=float, default=100.0)
+    parser.add_argument("--fast-ms", type=float, default=2.0)
+    parser.add_argument("--gap-ms", type=float, default=5.0, help="pause between interactive arrivals")
+    parser.add_argument("--report-class", default="2/20/1", help="ADMISSION_REPORTS spec for the admitted run")
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+    notes = []
+    runs = [("no admission", slow_app(args.capacity, args.report_ms, args.fast_ms), None)]
+    controller = build_controller(args.capacity, args.report_class)
+    runs.append(("admission", AdmissionMiddleware(slow_app(args.capacity, args.report_ms, args.fast_ms), controller),
+                 controller))
+    for name, app, ctl in runs:
+        start = time.perf_counter()
+        outcome = asyncio.run(scenario(app, args))
+        wall = time.perf_counter() - start
+        for kind, rows in outcome.items():
+            served = [ms for status, ms, _ in rows if status == 200]
+            results[f"{name}: {kind}"] = summarize(served, wall, sum(1 for status, _, _ in rows if status != 200))
+        shed = [retry for status, _, retry in outcome["report"] if status == 503]
+        notes.append(f"{name:<13} reports served {len(outcome['report']) - len(shed)}, shed {len(shed)}"
+                     + (f" (Retry-After {min(shed)}-{max(shed)}s)" if shed else ""))
+        if ctl is not None:
+            for route_class in ctl.stats()["classes"]:
+                notes.append(f"{'':<13} {route_class['name']:<8} queued {route_class['queued']:>4}  "
+                             f"shed {route_class['shed']}  wait avg {route_class['wait_ms_avg']} ms")
+
+    code = finish(args, f"Admission control: {args.capacity} threads, {args.reports} reports of {args.report_ms:g} ms",
+                  results)
+    print()
+    for line in notes:
+        print(line)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
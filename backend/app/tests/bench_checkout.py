@@ -0,0 +1,168 @@
+"""Checkout under contention: the two-request flow against ``POST /api/checkout``.
+
+    DATABASE_URL=sqlite:///bench.db python -m app.tests.bench_checkout --seed-scale small --threads 16 --checkouts 400
+
+Three runs against the service layer, each on fresh (student, course) pairs:
+
+* two-step: ``create_payment`` then ``create_enrollment``, as the old
+  ``POST /payments`` + ``POST /enroll`` pair did, with every request sent twice
+  to model a client retrying after a timeout;
+* checkout: ``EnrollmentService.checkout`` with an idempotency key, also sent
+  twice per request;
+* replay storm: ``--replays`` threads send the same key at the same time;
+* double submit: ``--replays`` checkouts for the same pair at the same time,
+  each with its own key, and again with no key at all.
+
+Every thread hammers the same ID ranges, so the latencies include collision
+retries. The notes report how many payments and enrollments each run left
+behind per purchase; anything above one is a duplicate charge or a second
+enrollment that IX_Enrollment_Student should have refused. AlreadyEnrolled
+is the expected answer for the losers of a double submit and is not counted
+as an error; in the two-step run the retried enrollment is refused the same
+way and does count, while its second payment still goes through.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from ..models import get_engine, mudemy_session
+from ..models.models import Enrollment, Payment
+from ..services import EnrollmentService, PaymentService, container
+from ..services.enrollment_service import AlreadyEnrolled
+from .bench_data import SCALES, create_schema, load_dataset, seed
+from .benchmark import add_report_arguments, finish, require_standin, summarize
+
+Pair = Tuple[str, str]
+
+
+def fresh_pairs(data, count: int, rng: random.Random) -> List[Pair]:
+    """(student, course) pairs with no enrollment yet."""
+    with mudemy_session() as session:
+        taken = set(session.execute(select(Enrollment.StudentID, Enrollment.CourseID)).all())
+    pairs = [(s, c) for s in data.students for c in data.courses if (s, c) not in taken]
+    rng.shuffle(pairs)
+    if len(pairs) < count:
+        sys.exit(f"Only {len(pairs)} unenrolled (student, course) pairs left; reseed with --seed-scale.")
+    return pairs[:count]
+
+
+def payment_count() -> int:
+    with mudemy_session() as session:
+        return session.execute(select(func.count()).select_from(Payment)).scalar()
+
+
+def enrollment_count() -> int:
+    with mudemy_session() as session:
+        return session.execute(select(func.count()).select_from(Enrollment)).scalar()
+
+
+def hammer(jobs: List[Callable[[], object]], threads: int) -> Tuple[List[float], float, int]:
+    samples, errors, lock = [], [0], threading.Lock()
+
+    def run(job):
+        t0 = time.perf_counter()
+        try:
+            job()
+        except Exception:
+            with lock:
+                errors[0] += 1
+            return
+        elapsed = (time.perf_counter() - t0) * 1000
+        with lock:
+            samples.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(run, jobs))
+    return samples, time.perf_counter() - start, errors[0]
+
+
+def two_step(pair: Pair) -> None:
+    student, course = pair
+    payment = container.get(PaymentService).create_payment(
+        {"Amount": 199000, "Payment_method": "Credit Card", "UserID": student})
+    container.get(EnrollmentService).create_enrollment(
+        {"CourseID": course, "PaymentID": payment.PaymentID, "StudentID": student})
+
+
+def checkout(pair: Pair, key: Optional[str]) -> None:
+    student, course = pair
+    container.get(EnrollmentService).checkout(student, course, 199000, "Credit Card", key)
+
+
+def submit(pair: Pair, key: Optional[str]) -> None:
+    """A checkout where losing to a concurrent one for the same pair is the expected outcome."""
+    try:
+        checkout(pair, key)
+    except AlreadyEnrolled:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Checkout vs. payment + enroll under concurrent writers.")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--checkouts", type=int, default=400, help="purchases per run")
+    parser.add_argument("--replays", type=int, default=8, help="concurrent copies of each request in the storm")
+    parser.add_argument("--seed-scale", choices=sorted(SCALES), help="reset and seed the database first")
+    parser.add_argument("--seed", type=int, default=42)
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    require_standin(engine, args.force)
+    if args.seed_scale:
+        create_schema(engine, reset=True)
+        data = seed(engine, SCALES[args.seed_scale], seed=args.seed)
+    else:
+        create_schema(engine)
+        data = load_dataset(engine)
+    if not data.students or not data.courses:
+        sys.exit("No benchmark data found; run app.tests.bench_data first or pass --seed-scale.")
+
+    rng = random.Random(args.seed)
+    storm_keys = max(1, args.checkouts // args.replays)
+    pairs = fresh_pairs(data, args.checkouts * 2 + storm_keys * 3, rng)
+    storm, keyed, unkeyed = (pairs[args.checkouts * 2 + storm_keys * i:][:storm_keys] for i in range(3))
+    results: Dict[str, Dict[str, float]] = {}
+    notes = []
+
+    # Each purchase is sent twice, the retry right behind the original
+    runs = [
+        ("two-step, retried", pairs[:args.checkouts],
+         lambda batch: [lambda p=p: two_step(p) for p in batch for _ in range(2)]),
+        ("checkout, retried", pairs[args.checkouts:args.checkouts * 2],
+         lambda batch: [lambda p=p, k=k: checkout(p, k) for p, k in ((p, uuid.uuid4().hex) for p in batch)
+                        for _ in range(2)]),
+        (f"checkout, {args.replays} concurrent replays", storm,
+         lambda batch: [lambda p=p, k=k: checkout(p, k) for p, k in ((p, uuid.uuid4().hex) for p in batch)
+                        for _ in range(args.replays)]),
+        # Same pair, different requests: only IX_Enrollment_Student keeps this to one enrollment
+        (f"{args.replays} submits, own keys", keyed,
+         lambda batch: [lambda p=p: submit(p, uuid.uuid4().hex) for p in batch for _ in range(args.replays)]),
+        (f"{args.replays} submits, no key", unkeyed,
+         lambda batch: [lambda p=p: submit(p, None) for p in batch for _ in range(args.replays)]),
+    ]
+    for name, batch, build in runs:
+        before, enrolled = payment_count(), enrollment_count()
+        samples, wall, errors = hammer(build(batch), args.threads)
+        results[name] = summarize(samples, wall, errors)
+        created, enrollments = payment_count() - before, enrollment_count() - enrolled
+        notes.append(f"{name:<34} {len(batch)} purchases -> {created} payments ({created / len(batch):.2f} each), "
+                     f"{enrollments} enrollments ({enrollments / len(batch):.2f} each)")
+
+    code = finish(args, f"Checkout contention: {args.threads} threads on {engine.dialect.name}", results)
+    print()
+    for line in notes:
+        print(line)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+"""Synthetic data generator for the benchmark suite.
+
+Scales the schema from DDL.sql to a configurable size and bulk-loads it into
+the engine selected by ``DATABASE_URL`` (a SQLite file or ``sqlite://`` works
+as a local stand-in for SQL Server):
+
+    DATABASE_URL=sqlite:///bench.db python -m app.tests.bench_data --scale medium --reset
+
+IDs follow ``prefix_map`` so ``generate_id`` keeps working on top of the data.
+"""
+import argparse
+import random
+import sys
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import insert, select
+
+from ..models import (
+    Base, engine, prefix_map,
+    User, Qualification, Interests, Category, Course, Requires, Instruct,
+    Enrollment, Payment, Certificate, Module, LessonRef, Content, Text, Video,
+    Resource, ProvideResource, Assignment, Quiz, Question, Answer,
+    AssignSubmission, QuizSubmission, Take,
+)
+from .benchmark import require_standin
+
+BENCH_PASSWORD = "bench-pass"
+
+DIFFICULTIES = ["Beginner", "Intermediate", "Advanced"]
+LANGUAGES = ["English", "Vietnamese"]
+CATEGORIES = ["Programming", "Data Science", "Design", "Business", "Marketing", "Mathematics"]
+PAYMENT_METHODS = ["Credit Card", "Cash", "Bank Transfer", "PayPal"]
+WORDS = ("learn build design data model system python web cloud design test deploy "
+         "network secure scale query index cache stream graph vector signal").split()
+
+
+@dataclass(frozen=True)
+class Scale:
+    students: int
+    instructors: int
+    courses: int
+    modules_per_course: int
+    lessons_per_module: int
+    quizzes_per_module: int = 1
+    assignments_per_module: int = 1
+    questions_per_quiz: int = 5
+    answers_per_question: int = 4
+    enrollments_per_student: int = 3
+    take_ratio: float = 0.6            # share of lessons a student has opened in an enrolled course
+    submission_ratio: float = 0.5      # share of quizzes/assignments submitted per enrollment
+    resources: int = 50
+
+
+SCALES = {
+    "tiny": Scale(students=50, instructors=5, courses=10, modules_per_course=2, lessons_per_module=3, resources=10),
+    "small": Scale(students=500, instructors=20, courses=40, modules_per_course=4, lessons_per_module=4),
+    "medium": Scale(students=5000, instructors=100, courses=200, modules_per_course=5, lessons_per_module=6),
+    "large": Scale(students=50000, instructors=500, courses=1000, modules_per_course=6, lessons_per_module=8,
+                   enrollments_per_student=4, resources=500),
+}
+
+
+@dataclass
+class Dataset:
+    """IDs the benchmarks pick their arguments from."""
+    students: List[str] = field(default_factory=list)
+    instructors: List[str] = field(default_factory=list)
+    usernames: Dict[str, str] = field(default_factory=dict)
+    courses: List[str] = field(default_factory=list)
+    modules: Dict[str, List[str]] = field(default_factory=dict)        # course -> modules
+    contents: Dict[str, List[str]] = field(default_factory=dict)       # module -> content lessons
+    quizzes: Dict[str, List[str]] = field(default_factory=dict)        # module -> quizzes
+    assignments: Dict[str, List[str]] = field(default_factory=dict)    # module -> assignments
+    enrollments: Dict[str, List[str]] = field(default_factory=dict)    # student -> courses
+    takes: Dict[str, List[str]] = field(default_factory=dict)          # student -> lessons already taken
+
+    def all_modules(self) -> List[str]:
+        return [m for mods in self.modules.values() for m in mods]
+
+    def all_quizzes(self) -> List[str]:
+        return [q for qs in self.quizzes.values() for q in qs]
+
+
+class _Ids:
+    """Sequential IDs in the ``prefix_map`` format, widened so MAX() ordering stays numeric."""
+
+    def __init__(self, key: str, total: int):
+        self.prefix, pad = prefix_map[key]
+        self.width = max(pad, len(str(max(total, 1))))
+        self.n = 0
+
+    def next(self) -> str:
+        self.n += 1
+        return f"{self.prefix}{self.n:0{self.width}d}"
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _bulk(conn, model, rows: List[dict], batch: int = 5000) -> None:
+    for i in range(0, len(rows), batch):
+        conn.execute(insert(model), rows[i:i + batch])
+
+
+def create_schema(bind, reset: bool = False) -> None:
+    if reset:
+        Base.metadata.drop_all(bind)
+    Base.metadata.create_all(bind)
+
+
+def seed(bind, scale: Scale, seed: int = 42) -> Dataset:
+    """Insert a synthetic dataset of ``scale`` size and return its IDs."""
+    rng = random.Random(seed)
+    now = datetime(2025, 11, 1, 9, 0, 0)
+    s = scale
+
+    n_modules = s.courses * s.modules_per_course
+    n_lessons = n_modules * s.lessons_per_module
+    n_quizzes = n_modules * s.quizzes_per_module
+    n_assignments = n_modules * s.assignments_per_module
+    n_enrollments = s.students * s.enrollments_per_student
+    n_submissions = int(n_enrollments * s.modules_per_course * max(s.quizzes_per_module, s.assignments_per_module)
+                        * s.submission_ratio) + 1
+
+    user_ids = _Ids("User.UserID", s.students + s.instructors)
+    course_ids = _Ids("Course.CourseID", s.courses)
+    module_ids = _Ids("Module.ModuleID", n_modules)
+    content_ids = _Ids("Content.ContentID", n_lessons)
+    text_ids = _Ids("Text.TextID", n_lessons)
+    video_ids = _Ids("Video.VideoID", n_lessons)
+    quiz_ids = _Ids("Quiz.QuizID", n_quizzes)
+    ass_ids = _Ids("Assignment.AssID", n_assignments)
+    question_ids = _Ids("Question.QuestionID", n_quizzes * s.questions_per_quiz)
+    answer_ids = _Ids("Answer.AnswerID", n_quizzes * s.questions_per_quiz * s.answers_per_question)
+    payment_ids = _Ids("Payment.PaymentID", n_enrollments)
+    enrollment_ids = _Ids("Enrollment.EnrollmentID", n_enrollments)
+    certificate_ids = _Ids("Certificate.CertificateID", n_enrollments)
+    resource_ids = _Ids("Resource.ResourceID", s.resources)
+    quiz_sub_ids = _Ids("QuizSubmission.SubID", n_submissions)
+    ass_sub_ids = _Ids("AssignSubmission.SubID", n_submissions)
+
+    rows = {model: [] for model in (
+        User, Qualification, Interests, Course, Category, Requires, Instruct, Module, LessonRef,
+        Content, Text, Video, Quiz, Question, Answer, Assignment, Resource, ProvideResource,
+        Payment, Enrollment, Certificate, Take, QuizSubmission, AssignSubmission)}
+
+    # Users
+    instructors, students = [], []
+    for i in range(s.instructors + s.students):
+        uid = user_ids.next()
+        is_instructor = i < s.instructors
+        name = f"{'tutor' if is_instructor else 'student'}{i + 1:06d}"
+        rows[User].append({
+            "UserID": uid, "User_name": name, "Email": f"{name}@bench.mudemy.local",
+            "Password": BENCH_PASSWORD, "Full_name": name.title(), "City": "Ho Chi Minh City",
+            "Country": "Vietnam", "Phone": f"09{rng.randrange(10**8):08d}",
+            "Date_of_birth": (now - timedelta(days=rng.randint(18 * 365, 50 * 365))).date(),
+            "Last_login": now - timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+            "IFlag": is_instructor, "SFlag": not is_instructor, "Total_enrollments": 0,
+            "Bio_text": _sentence(rng, 12) if is_instructor else None,
+            "Year_of_experience": rng.randint(1, 20) if is_instructor else None,
+            "Average_rating": round(rng.uniform(1.0, 5.0), 1) if is_instructor else None,
+        })
+        (instructors if is_instructor else students).append(uid)
+        if is_instructor:
+            rows[Qualification].append({"UserID": uid, "Qualification": rng.choice(["MSc", "PhD", "BEng"])})
+        else:
+            for interest in rng.sample(CATEGORIES, 2):
+                rows[Interests].append({"UserID": uid, "Interest": interest})
+
+    # Catalog
+    data = Dataset(students=students, instructors=instructors)
+    lessons_by_course: Dict[str, List[str]] = {}
+    for c in range(s.courses):
+        cid = course_ids.next()
+        data.courses.append(cid)
+        rows[Course].append({
+            "CourseID": cid, "Difficulty": rng.choice(DIFFICULTIES), "Language": rng.choice(LANGUAGES),
+            "Title": f"{_sentence(rng, 3)} {c + 1}", "Description": _sentence(rng, 25), "Enrollment_count": 0,
+        })
+        for category in rng.sample(CATEGORIES, rng.randint(1, 2)):
+            rows[Category].append({"CourseID": cid, "Category": category})
+        rows[Instruct].append({"UserID": instructors[c % len(instructors)], "CourseID": cid})
+        if c and rng.random() < 0.3:
+            rows[Requires].append({"CourseID": cid, "Required_courseID": rng.choice(data.courses[:-1])})
+
+        data.modules[cid] = []
+        lessons_by_course[cid] = []
+        for m in range(s.modules_per_course):
+            mid = module_ids.next()
+            data.modules[cid].append(mid)
+            rows[Module].append({"ModuleID": mid, "Title": f"Module {m + 1}: {_sentence(rng, 3)}", "CourseID": cid})
+            data.contents[mid], data.quizzes[mid], data.assignments[mid] = [], [], []
+
+            for _ in range(s.lessons_per_module):
+                lid = content_ids.next()
+                data.contents[mid].append(lid)
+                rows[LessonRef].append({"LessonID": lid})
+                rows[Content].append({"ContentID": lid, "Title": _sentence(rng, 4), "Slides": f"{lid}.pdf", "ModuleID": mid})
+                rows[Text].append({"ContentID": lid, "TextID": text_ids.next(), "Text": _sentence(rng, 20)})
+                if rng.random() < 0.5:
+                    rows[Video].append({"ContentID": lid, "VideoID": video_ids.next(), "Video": f"https://cdn.bench/{lid}.mp4"})
+
+            for _ in range(s.quizzes_per_module):
+                qid = quiz_ids.next()
+                data.quizzes[mid].append(qid)
+                rows[LessonRef].append({"LessonID": qid})
+                rows[Quiz].append({"QuizID": qid, "Time_limit": 30, "Num_attempt": 3, "Title": f"Quiz {qid}",
+                                   "Deadline": now + timedelta(days=rng.randint(-30, 60)), "ModuleID": mid})
+                for _ in range(s.questions_per_quiz):
+                    question = question_ids.next()
+                    rows[Question].append({"QuestionID": question, "QuizID": qid,
+                                           "Content": _sentence(rng, 10) + "?", "Correct_answer": "A"})
+                    for a in range(s.answers_per_question):
+                        rows[Answer].append({"QuestionID": question, "QuizID": qid, "AnswerID": answer_ids.next(),
+                                             "Answer": f"{'ABCD'[a % 4]}. {_sentence(rng, 4)}"})
+
+            for _ in range(s.assignments_per_module):
+                aid = ass_ids.next()
+                data.assignments[mid].append(aid)
+                rows[LessonRef].append({"LessonID": aid})
+                rows[Assignment].append({"AssID": aid, "Title": f"Assignment {aid}", "Description": _sentence(rng, 15),
+                                         "Deadline": now + timedelta(days=rng.randint(-30, 60)), "ModuleID": mid})
+            lessons_by_course[cid].extend(data.contents[mid])
+
+    for _ in range(s.resources):
+        rid = resource_ids.next()
+        rows[Resource].append({"ResourceID": rid, "File_Name": f"{_sentence(rng, 2)}.pdf",
+                               "File_link": f"/files/{rid}.pdf",
+                               "External_link": f"https://docs.bench/{rid}" if rng.random() < 0.3 else None})
+        all_lessons = rows[LessonRef]
+        for lesson in rng.sample(all_lessons, min(3, len(all_lessons))):
+            rows[ProvideResource].append({"ResourceID": rid, "LessonID": lesson["LessonID"]})
+
+    # Enrollment activity
+    enrollment_counts = {cid: 0 for cid in data.courses}
+    user_enrollments = {uid: 0 for uid in students}
+    for uid in students:
+        data.enrollments[uid] = []
+        for cid in rng.sample(data.courses, min(s.enrollments_per_student, len(data.courses))):
+            pid = payment_ids.next()
+            paid_at = now - timedelta(days=rng.randint(1, 365))
+            rows[Payment].append({"PaymentID": pid, "Amount": rng.choice([0, 199000, 499000, 999000]),
+                                  "Payment_date": paid_at, "Payment_method": rng.choice(PAYMENT_METHODS), "UserID": uid})
+            lessons = lessons_by_course[cid]
+            taken = rng.sample(lessons, int(len(lessons) * s.take_ratio))
+            finished = [lid for lid in taken if rng.random() < 0.8]
+            progress = round(100.0 * len(finished) / len(lessons), 1) if lessons else 0.0
+            status = "Completed" if progress >= 100 else rng.choice(["Active"] * 8 + ["Dropped", "Suspended"])
+            rows[Enrollment].append({"EnrollmentID": enrollment_ids.next(), "CourseID": cid, "PaymentID": pid,
+                                     "StudentID": uid, "Status": status, "Enroll_date": paid_at, "Progress": progress})
+            data.enrollments[uid].append(cid)
+            enrollment_counts[cid] += 1
+            user_enrollments[uid] += 1
+            for lid in taken:
+                rows[Take].append({"UserID": uid, "LessonID": lid, "is_finished": lid in finished})
+            if status == "Completed":
+                rows[Certificate].append({"CertificateID": certificate_ids.next(), "CourseID": cid, "StudentID": uid,
+                                          "Issue_date": paid_at.date(), "Expiry_date": (paid_at + timedelta(days=730)).date(),
+                                          "Certificate_number": f"MUD-BENCH-{certificate_ids.n:06d}"})
+            for mid in data.modules[cid]:
+                for qid in data.quizzes[mid]:
+                    if rng.random() < s.submission_ratio:
+                        rows[QuizSubmission].append({"SubID": quiz_sub_ids.next(), "UserID": uid, "QuizID": qid,
+                                                     "Sub_content": "A,B,A,C,D", "Grade": round(rng.uniform(0, 100), 2),
+                                                     "Sub_date": paid_at + timedelta(days=rng.randint(1, 30))})
+                for aid in data.assignments[mid]:
+                    if rng.random() < s.submission_ratio:
+                        graded = rng.random() < 0.6
+                        rows[AssignSubmission].append({"SubID": ass_sub_ids.next(), "UserID": uid, "AssID": aid,
+                                                       "Sub_content": _sentence(rng, 30),
+                                                       "Grade": round(rng.uniform(0, 100), 2) if graded else None,
+                                                       "Sub_date": paid_at + timedelta(days=rng.randint(1, 30))})
+    for course in rows[Course]:
+        course["Enrollment_count"] = enrollment_counts[course["CourseID"]]
+    for user in rows[User]:
+        user["Total_enrollments"] = user_enrollments.get(user["UserID"], 0)
+
+    with bind.begin() as conn:
+        for model, model_rows in rows.items():
+            if model_rows:
+                _bulk(conn, model, model_rows)
+    return load_dataset(bind)
+
+
+def load_dataset(bind) -> Dataset:
+    """Read back the IDs of an already seeded database."""
+    data = Dataset()
+    with bind.connect() as conn:
+        for uid, name, iflag in conn.execute(select(User.UserID, User.User_name, User.IFlag).order_by(User.UserID)):
+            (data.instructors if iflag else data.students).append(uid)
+            data.usernames[uid] = name
+        data.courses = list(conn.scalars(select(Course.CourseID).order_by(Course.CourseID)))
+        for mid, cid in conn.execute(select(Module.ModuleID, Module.CourseID).order_by(Module.ModuleID)):
+            data.modules.setdefault(cid, []).append(mid)
+        for attr, model, key in ((data.contents, Content, Content.ContentID),
+                                 (data.quizzes, Quiz, Quiz.QuizID),
+                                 (data.assignments, Assignment, Assignment.AssID)):
+            for lid, mid in conn.execute(select(key, model.ModuleID).order_by(key)):
+                attr.setdefault(mid, []).append(lid)
+        for uid, cid in conn.execute(select(Enrollment.StudentID, Enrollment.CourseID)):
+            data.enrollments.setdefault(uid, []).append(cid)
+        for uid, lid in conn.execute(select(Take.UserID, Take.LessonID)):
+            data.takes.setdefault(uid, []).append(lid)
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the DATABASE_URL database with synthetic data.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--students", type=int, help="override the preset")
+    parser.add_argument("--courses", type=int, help="override the preset")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate every table first")
+    parser.add_argument("--force", action="store_true", help="allow a non-SQLite target")
+    args = parser.parse_args(argv)
+
+    require_standin(engine, args.force)
+    scale = SCALES[args.scale]
+    overrides = {k: v for k, v in (("students", args.students), ("courses", args.courses)) if v}
+    scale = replace(scale, **overrides)
+
+    start = time.perf_counter()
+    create_schema(engine, reset=args.reset)
+    data = seed(engine, scale, seed=args.seed)
+    print(f"Seeded {len(data.students)} students, {len(data.instructors)} instructors, "
+          f"{len(data.courses)} courses, {len(data.all_modules())} modules "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
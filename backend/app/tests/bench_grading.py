@@ -0,0 +1,108 @@
+"""Grading throughput: one PUT per submission vs. ``POST /api/grades/batch``.
+
+    DATABASE_URL=sqlite:///bench.db python -m app.tests.bench_grading --seed-scale small --items 2000
+    DATABASE_URL=sqlite:///bench.db python -m app.tests.bench_grading --batch-sizes 100,1000,5000 --save grading.json
+
+Every run grades the same ``--items`` assignment and quiz submissions, each
+run with a new grade so nothing is skipped as unchanged:
+
+* single: ``AssignSubmissionService.grade_submission`` /
+  ``QuizSubmissionService.grade_submission`` per submission, as the
+  ``PUT /submissions/{type}/{sub_id}/grade`` routes do;
+* batch of N: ``BatchGradingService.grade_batch`` with N items per call.
+
+Latencies are per call. The notes give submissions graded per second, which
+is the number to compare across runs.
+"""
+import argparse
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from sqlalchemy import select
+
+from ..models import get_engine, mudemy_session
+from ..models.models import AssignSubmission, QuizSubmission
+from ..services import AssignSubmissionService, BatchGradingService, QuizSubmissionService, container
+from .bench_data import SCALES, create_schema, load_dataset, seed
+from .benchmark import add_report_arguments, finish, require_standin, summarize
+
+Item = Tuple[str, str]   # (type, SubID)
+
+
+def pick_items(count: int, rng: random.Random) -> List[Item]:
+    with mudemy_session() as session:
+        items = [("assignment", sub_id) for sub_id in session.scalars(select(AssignSubmission.SubID))]
+        items += [("quiz", sub_id) for sub_id in session.scalars(select(QuizSubmission.SubID))]
+    if len(items) < count:
+        sys.exit(f"Only {len(items)} submissions seeded; lower --items or reseed with a larger --seed-scale.")
+    rng.shuffle(items)
+    return items[:count]
+
+
+def run_single(items: List[Item], grade: float) -> Tuple[List[float], float]:
+    services = {"assignment": container.get(AssignSubmissionService), "quiz": container.get(QuizSubmissionService)}
+    samples = []
+    start = time.perf_counter()
+    for kind, sub_id in items:
+        t0 = time.perf_counter()
+        services[kind].grade_submission(sub_id, grade)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples, time.perf_counter() - start
+
+
+def run_batch(items: List[Item], grade: float, size: int) -> Tuple[List[float], float, int]:
+    service = container.get(BatchGradingService)
+    samples, failed = [], 0
+    start = time.perf_counter()
+    for offset in range(0, len(items), size):
+        batch = [{"SubID": sub_id, "type": kind, "grade": grade} for kind, sub_id in items[offset:offset + size]]
+        t0 = time.perf_counter()
+        results = service.grade_batch("bench", batch)
+        samples.append((time.perf_counter() - t0) * 1000)
+        failed += sum(1 for result in results if result["status"] != "graded")
+    return samples, time.perf_counter() - start, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-submission grading vs. the batch grading endpoint.")
+    parser.add_argument("--items", type=int, default=2000, help="submissions graded per run")
+    parser.add_argument("--batch-sizes", default="100,1000,5000", help="comma-separated items per batch call")
+    parser.add_argument("--seed-scale", choices=sorted(SCALES), help="reset and seed the database first")
+    parser.add_argument("--seed", type=int, default=42)
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    require_standin(engine, args.force)
+    if args.seed_scale:
+        create_schema(engine, reset=True)
+        seed(engine, SCALES[args.seed_scale], seed=args.seed)
+    else:
+        create_schema(engine)
+        load_dataset(engine)
+
+    items = pick_items(args.items, random.Random(args.seed))
+    results: Dict[str, Dict[str, float]] = {}
+    notes = []
+
+    samples, wall = run_single(items, 50.0)
+    results["single"] = summarize(samples, wall)
+    notes.append(f"{'single':<16} {len(items) / wall:>10.0f} submissions/s")
+    for run, size in enumerate(int(size) for size in args.batch_sizes.split(",")):
+        samples, wall, failed = run_batch(items, 60.0 + run, size)
+        name = f"batch of {size}"
+        results[name] = summarize(samples, wall, failed)
+        notes.append(f"{name:<16} {len(items) / wall:>10.0f} submissions/s"
+                     + (f"  ({failed} not graded)" if failed else ""))
+
+    code = finish(args, f"Grading {len(items)} submissions on {engine.dialect.name}", results)
+    print()
+    for line in notes:
+        print(line)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
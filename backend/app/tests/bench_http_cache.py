@@ -0,0 +1,96 @@
+"""Repeat-visit traffic on catalog/course pages with and without conditional GET.
+
+    DATABASE_URL=sqlite:///bench.db python -m app.tests.bench_http_cache --seed-scale small --visits 300 --write-every 50
+
+Each simulated browser revisits a small set of courses. In ``revalidate`` mode it
+keeps the ETag of every page and sends ``If-None-Match``; ``--write-every``
+updates a course title periodically so invalidation is part of the run.
+"""
+import argparse
+import random
+import sys
+import time
+from collections import defaultdict
+
+from fastapi.testclient import TestClient
+
+from .. import create_app
+from ..api.auth import create_access_token
+from ..core import config
+from ..models import engine
+from .bench_data import SCALES, create_schema, load_dataset, seed
+from .benchmark import add_report_arguments, finish, require_standin, summarize
+
+
+def run(client, data, visits: int, revalidate: bool, write_every: int, rng: random.Random):
+    student = {"Authorization": f"Bearer {create_access_token({'sub': data.students[0], 'role': 'tutee'})}"}
+    tutor = {"Authorization": f"Bearer {create_access_token({'sub': data.instructors[0], 'role': 'tutor'})}"}
+    favourites = rng.sample(data.courses, min(5, len(data.courses)))
+    etags, samples = {}, defaultdict(list)
+    stats = {"requests": 0, "not_modified": 0, "bytes": 0}
+
+    for visit in range(visits):
+        if write_every and visit and visit % write_every == 0:
+            cid = rng.choice(favourites)
+            client.put(f"/api/courses/{cid}", json={"Title": f"Edited {visit}"}, headers=tutor)
+        cid = rng.choice(favourites)
+        mid = data.modules[cid][0]
+        for step, url in (("GET /api/courses", "/api/courses?limit=50"),
+                          ("GET /api/courses/id/{id}", f"/api/courses/id/{cid}"),
+                          ("GET /api/courses/{id}/modules", f"/api/courses/{cid}/modules"),
+                          ("GET /api/modules/{id}/content", f"/api/modules/{mid}/content")):
+            headers = dict(student)
+            if revalidate and url in etags:
+                headers["If-None-Match"] = etags[url]
+            t0 = time.perf_counter()
+            response = client.get(url, headers=headers)
+            samples[step].append((time.perf_counter() - t0) * 1000)
+            stats["requests"] += 1
+            stats["bytes"] += len(response.content)
+            if response.status_code == 304:
+                stats["not_modified"] += 1
+            elif "etag" in response.headers:
+                etags[url] = response.headers["etag"]
+    return samples, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Conditional GET benchmark on repeat visits.")
+    parser.add_argument("--visits", type=int, default=300)
+    parser.add_argument("--write-every", type=int, default=50, help="edit a course every N visits (0 = never)")
+    parser.add_argument("--seed-scale", choices=sorted(SCALES), help="reset and seed the database first")
+    parser.add_argument("--seed", type=int, default=42)
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+
+    require_standin(engine, args.force)
+    if args.seed_scale:
+        create_schema(engine, reset=True)
+        data = seed(engine, SCALES[args.seed_scale], seed=args.seed)
+    else:
+        data = load_dataset(engine)
+    if not data.students or not data.courses:
+        sys.exit("No benchmark data found; run app.tests.bench_data first or pass --seed-scale.")
+
+    results, totals = {}, {}
+    config.RATE_LIMIT_ENABLED = False   # one simulated browser would drain its bucket
+    with TestClient(create_app()) as client:
+        for mode, revalidate in (("full", False), ("revalidate", True)):
+            start = time.perf_counter()
+            samples, stats = run(client, data, args.visits, revalidate, args.write_every, random.Random(args.seed))
+            wall = time.perf_counter() - start
+            for step, values in samples.items():
+                results[f"{mode}: {step}"] = summarize(values, wall)
+            results[f"{mode}: TOTAL"] = summarize([v for vs in samples.values() for v in vs], wall)
+            totals[mode] = stats
+
+    code = finish(args, f"Repeat visits: {args.visits} x 4 pages, write every {args.write_every}", results)
+    print()
+    for mode, stats in totals.items():
+        print(f"{mode:<11} requests={stats['requests']} 304={stats['not_modified']} "
+              f"({stats['not_modified'] / max(stats['requests'], 1):.0%}) body bytes={stats['bytes']}")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
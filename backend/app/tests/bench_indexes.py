@@ -0,0 +1,173 @@
+"""Before/after latency and query plans for the foreign-key indexes declared on the models.
+
+    DATABASE_URL=sqlite:///bench.db python -m app.tests.bench_indexes --seed-scale medium --iterations 200
+
+Drops the declared secondary indexes, times each service method that should use
+one, recreates them (plus ANALYZE) and times again. ``--plans`` prints SQLite's
+EXPLAIN QUERY PLAN for the statement each method issues, before and after.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, select, text
+
+from ..models import Base, Certificate, get_engine
+from ..services import (AssignSubmissionService, CertificateService, ContentService, EnrollmentService,
+                        ModuleService, PaymentService, QuizSubmissionService, TakeService, container)
+from .bench_data import SCALES, create_schema, load_dataset, seed
+from .benchmark import add_report_arguments, finish, require_standin, summarize
+
+
+def declared_indexes():
+    return [index for table in Base.metadata.sorted_tables for index in table.indexes]
+
+
+def build_cases(data, certificate_numbers):
+    enrollments, payments = container.get(EnrollmentService), container.get(PaymentService)
+    takes, certificates = container.get(TakeService), container.get(CertificateService)
+    modules, contents = container.get(ModuleService), container.get(ContentService)
+    quiz_subs, assign_subs = container.get(QuizSubmissionService), container.get(AssignSubmissionService)
+    students, courses, all_modules = data.students, data.courses, data.all_modules()
+    quizzes = data.all_quizzes()
+    assignments = [a for ids in data.assignments.values() for a in ids]
+    day = datetime(2025, 11, 1) - timedelta(days=180)
+
+    def student(r):
+        return r.choice(students)
+
+    # (name, index expected to serve it, call)
+    return [
+        ("EnrollmentService.get_student_enrollments", "IX_Enrollment_Student",
+         lambda r: enrollments.get_student_enrollments(student(r))),
+        ("EnrollmentService.is_student_enrolled", "IX_Enrollment_Student",
+         lambda r: enrollments.is_student_enrolled(student(r), r.choice(courses))),
+        ("TakeService.get_user_lessons", "primary key",
+         lambda r: takes.get_user_lessons(student(r))),
+        ("QuizSubmissionService.get_user_submissions_for_quiz", "IX_QuizSubmission_Quiz_User_Date",
+         lambda r: quiz_subs.get_user_submissions_for_quiz(student(r), r.choice(quizzes))),
+        ("QuizSubmissionService.get_best_score", "IX_QuizSubmission_Quiz_User_Date",
+         lambda r: quiz_subs.get_best_score(student(r), r.choice(quizzes))),
+        ("QuizSubmissionService.get_submissions_by_quiz", "IX_QuizSubmission_Quiz_User_Date",
+         lambda r: quiz_subs.get_submissions_by_quiz(r.choice(quizzes))),
+        ("AssignSubmissionService.get_user_submission_for_assignment", "IX_AssignSubmission_Ass_User",
+         lambda r: assign_subs.get_user_submission_for_assignment(student(r), r.choice(assignments))),
+        ("ContentService.get_content_by_module", "IX_Content_Module",
+         lambda r: contents.get_content_by_module(r.choice(all_modules))),
+        ("ModuleService.get_modules_by_course", "IX_Module_Course",
+         lambda r: modules.get_modules_by_course(r.choice(courses))),
+        ("PaymentService.get_payments_by_user", "IX_Payment_User_Date",
+         lambda r: payments.get_payments_by_user(student(r))),
+        ("PaymentService.get_payments_by_date_range", "IX_Payment_Date",
+         lambda r: payments.get_payments_by_date_range(day, day + timedelta(days=7))),
+        ("PaymentService.get_revenue_by_date_range", "IX_Payment_Date",
+         lambda r: payments.get_revenue_by_date_range(day, day + timedelta(days=7))),
+        ("CertificateService.get_certificate_by_number", "IX_Certificate_Number",
+         lambda r: certificates.get_certificate_by_number(r.choice(certificate_numbers))),
+    ]
+
+
+def capture_statement(engine, call, rng):
+    """The last SELECT a call sends, with its parameters."""
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            seen.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        call(rng)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return seen[-1] if seen else None
+
+
+def query_plan(engine, statement) -> str:
+    if statement is None or engine.dialect.name != "sqlite":
+        return "n/a"
+    sql, params = statement
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return "; ".join(row[-1] for row in rows)
+
+
+def analyze(engine) -> None:
+    """Refresh planner statistics so before/after plans reflect the current index set."""
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+
+def run_cases(cases, iterations: int, seed_value: int, label: str, results: dict) -> None:
+    for name, _, call in cases:
+        rng = random.Random(seed_value)
+        call(rng)   # warm the statement cache
+        samples = []
+        start = time.perf_counter()
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            call(rng)
+            samples.append((time.perf_counter() - t0) * 1000)
+        results[f"{label}: {name}"] = summarize(samples, time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Foreign-key index before/after benchmark.")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--plans", action="store_true", help="print EXPLAIN QUERY PLAN before and after")
+    parser.add_argument("--seed-scale", choices=sorted(SCALES), help="reset and seed the database first")
+    parser.add_argument("--seed", type=int, default=42)
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    require_standin(engine, args.force)
+    if args.seed_scale:
+        create_schema(engine, reset=True)
+        data = seed(engine, SCALES[args.seed_scale], seed=args.seed)
+    else:
+        create_schema(engine)
+        data = load_dataset(engine)
+    if not data.students or not data.courses:
+        sys.exit("No benchmark data found; run app.tests.bench_data first or pass --seed-scale.")
+
+    with engine.connect() as conn:
+        numbers = list(conn.execute(select(Certificate.Certificate_number).limit(1000)).scalars()) or ["none"]
+    cases = build_cases(data, numbers)
+    indexes = declared_indexes()
+    results, plans = {}, {}
+
+    for index in indexes:
+        index.drop(engine, checkfirst=True)
+    analyze(engine)
+    for name, _, call in cases:
+        plans[name] = [query_plan(engine, capture_statement(engine, call, random.Random(args.seed)))]
+    run_cases(cases, args.iterations, args.seed, "before", results)
+
+    start = time.perf_counter()
+    for index in indexes:
+        index.create(engine, checkfirst=True)
+    build_seconds = time.perf_counter() - start
+    analyze(engine)
+    for name, _, call in cases:
+        plans[name].append(query_plan(engine, capture_statement(engine, call, random.Random(args.seed))))
+    run_cases(cases, args.iterations, args.seed, "after", results)
+
+    code = finish(args, f"Foreign-key indexes, {args.iterations} calls per method", results)
+    print(f"\nBuilt {len(indexes)} indexes in {build_seconds:.2f}s")
+    print(f"\n{'method':<60}{'index':<34}{'p50 before':>11}{'p50 after':>11}{'speedup':>9}")
+    for name, index_name, _ in cases:
+        before, after = results[f"before: {name}"]["p50_ms"], results[f"after: {name}"]["p50_ms"]
+        print(f"{name:<60}{index_name:<34}{before:>11.3f}{after:>11.3f}{before / after if after else 0:>8.1f}x")
+    if args.plans:
+        print()
+        for name, (before, after) in plans.items():
+            print(f"{name}\n  before: {before}\n  after:  {after}")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Scripted HTTP load scenario: browse catalog, enroll, take lessons, submit a quiz.
+
+In-process against the DATABASE_URL stand-in (uses the Starlette TestClient):
+
+    DATABASE_URL=sqlite:///bench.db python -m app.tests.bench_load --seed-scale small --users 8 --iterations 5
+
+or against a running server seeded with app.tests.bench_data:
+
+    python -m app.tests.bench_load --base-url http://127.0.0.1:8000 --users 32 --duration 60 --save run.json
+
+Reports p50/p95/p99 latency and throughput per step, and compares with a
+saved baseline via ``--baseline``.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import httpx
+
+from ..models import engine
+from .bench_data import BENCH_PASSWORD, SCALES, Dataset, create_schema, load_dataset, seed
+from .benchmark import add_report_arguments, finish, require_standin, summarize
+
+
+class Recorder:
+    """Thread-safe latency samples keyed by scenario step."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def call(self, client, step: str, method: str, url: str, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            response = client.request(method, url, **kwargs)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            response, failed = None, True
+        elapsed = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self.samples[step].append(elapsed)
+            if failed:
+                self.errors[step] += 1
+        return response if not failed else None
+
+
+def _json(response, key, default=None):
+    return response.json().get(key, default) if response is not None else default
+
+
+def virtual_user(client, rec: Recorder, data: Dataset, uid: str, rng: random.Random, deadline: float, iterations: int):
+    login = rec.call(client, "POST /api/auth/login", "POST", "/api/auth/login",
+                     json={"username": data.usernames[uid], "password": BENCH_PASSWORD, "role": "tutee"})
+    token = _json(login, "access_token")
+    if not token:
+        return
+    client.headers["Authorization"] = f"Bearer {token}"
+    enrolled = set(data.enrollments.get(uid, []))
+    taken = set(data.takes.get(uid, []))
+
+    done = 0
+    while done < iterations or (deadline and time.monotonic() < deadline):
+        if deadline and time.monotonic() >= deadline:
+            break
+        done += 1
+        # Browse the catalog
+        rec.call(client, "GET /api/courses", "GET", "/api/courses", params={"limit": 50})
+        cid = rng.choice(data.courses)
+        rec.call(client, "GET /api/courses/id/{id}", "GET", f"/api/courses/id/{cid}")
+        rec.call(client, "GET /api/courses/{id}/modules", "GET", f"/api/courses/{cid}/modules")
+        modules = data.modules.get(cid) or []
+        if not modules:
+            continue
+        mid = rng.choice(modules)
+        rec.call(client, "GET /api/modules/{id}/content", "GET", f"/api/modules/{mid}/content")
+        lessons = data.contents.get(mid, [])
+        if lessons:
+            rec.call(client, "GET /api/content/{id}", "GET", f"/api/content/{rng.choice(lessons)}")
+
+        # Pay and enroll once per course
+        if cid not in enrolled:
+            payment = rec.call(client, "POST /api/payments", "POST", "/api/payments",
+                               json={"Amount": 199000, "Payment_method": "Credit Card"})
+            payment_id = _json(payment, "payment_id")
+            if payment_id and rec.call(client, "POST /api/enroll", "POST", "/api/enroll",
+                                       json={"CourseID": cid, "PaymentID": payment_id}) is not None:
+                enrolled.add(cid)
+
+        # Take a couple of lessons
+        for lid in [l for l in lessons if l not in taken][:2]:
+            if rec.call(client, "POST /api/takes", "POST", "/api/takes", json={"LessonID": lid}) is not None:
+                taken.add(lid)
+                rec.call(client, "POST /api/takes/{uid}/{lid}/finish", "POST", f"/api/takes/{uid}/{lid}/finish")
+
+        # Submit a quiz
+        rec.call(client, "GET /api/modules/{id}/quizzes", "GET", f"/api/modules/{mid}/quizzes")
+        quizzes = data.quizzes.get(mid, [])
+        if quizzes:
+            rec.call(client, "POST /api/quizzes/{id}/submit", "POST", f"/api/quizzes/{rng.choice(quizzes)}/submit",
+                     json={"Sub_content": "A,B,C,D,A"})
+        rec.call(client, "GET /api/enrollments/me", "GET", "/api/enrollments/me")
+
+
+def make_client(base_url: str):
+    if base_url:
+        return httpx.Client(base_url=base_url, timeout=30.0)
+    from fastapi.testclient import TestClient
+    from .. import create_app
+    from ..core import config
+    config.RATE_LIMIT_ENABLED = False   # every in-process virtual user shares the "testclient" IP
+    config.ADMISSION_ENABLED = False    # each TestClient call runs on its own event loop; admission assumes one
+    # A server error becomes a 500 sample instead of an exception aborting the run
+    return TestClient(create_app(), raise_server_exceptions=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP load scenario with latency percentiles.")
+    parser.add_argument("--users", type=int, default=8, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=5, help="scenario loops per user")
+    parser.add_argument("--duration", type=float, default=0, help="run for N seconds instead of --iterations")
+    parser.add_argument("--base-url", help="target a running server instead of the in-process app")
+    parser.add_argument("--seed-scale", choices=sorted(SCALES), help="reset and seed the database first")
+    parser.add_argument("--seed", type=int, default=42)
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+
+    # The scenario reads IDs from the local database even when targeting --base-url
+    require_standin(engine, args.force)
+    if args.seed_scale:
+        create_schema(engine, reset=True)
+        data = seed(engine, SCALES[args.seed_scale], seed=args.seed)
+    else:
+        data = load_dataset(engine)
+    if not data.students or not data.courses:
+        sys.exit("No benchmark data found; run app.tests.bench_data first or pass --seed-scale.")
+
+    rec = Recorder()
+    rng = random.Random(args.seed)
+    vus = [(rng.choice(data.students), random.Random(rng.random())) for _ in range(args.users)]
+    deadline = time.monotonic() + args.duration if args.duration else 0
+    iterations = 0 if args.duration else args.iterations
+
+    def run(vu):
+        uid, vu_rng = vu
+        with make_client(args.base_url) as client:
+            virtual_user(client, rec, data, uid, vu_rng, deadline, iterations)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        list(pool.map(run, vus))
+    wall = time.perf_counter() - start
+
+    results = {step: summarize(samples, wall, rec.errors[step]) for step, samples in sorted(rec.samples.items())}
+    everything = [ms for samples in rec.samples.values() for ms in samples]
+    results["TOTAL"] = summarize(everything, wall, sum(rec.errors.values()))
+    target = args.base_url or f"in-process {engine.dialect.name}"
+    return finish(args, f"Load scenario: {args.users} users, {wall:.1f}s against {target}", results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
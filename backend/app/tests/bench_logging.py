@@ -0,0 +1,88 @@
+"""Caller-side cost of print() versus the loguru sinks used by app.core.logger.
+
+    python -m app.tests.bench_logging --messages 20000 --sink-latency-us 50
+
+``--sink-latency-us`` emulates a slow console or pipe; the enqueue sink hides
+that latency from request threads, which is the point of the change.
+"""
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+from ..core.logger import TEXT_FORMAT, logger
+
+
+class SlowFile:
+    """Line-buffered file whose writes block for a fixed time."""
+
+    def __init__(self, path: str, latency: float):
+        self._fh = open(path, "a", buffering=1, encoding="utf-8")
+        self._latency = latency
+
+    def write(self, message: str):
+        if self._latency:
+            time.sleep(self._latency)
+        self._fh.write(message)
+
+    def flush(self):
+        self._fh.flush()
+
+    def close(self):
+        self._fh.close()
+
+
+def bench_print(n: int, sink: SlowFile) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sink):
+        for i in range(n):
+            print(f"Collision detected for USR{i:05d}. Retrying...")
+    return time.perf_counter() - start
+
+
+def bench_loguru(n: int, sink: SlowFile, enqueue: bool, serialize: bool = False):
+    handler_id = logger.add(sink, format=TEXT_FORMAT, enqueue=enqueue, serialize=serialize, colorize=False)
+    log = logger.bind(context="BENCH")
+    start = time.perf_counter()
+    for i in range(n):
+        log.warning(f"Collision detected for USR{i:05d}. Retrying...")
+    caller = time.perf_counter() - start
+    logger.remove(handler_id)          # waits for the queue to drain
+    return caller, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--sink-latency-us", type=float, default=50.0)
+    args = parser.parse_args(argv)
+
+    latency = args.sink_latency_us / 1e6
+    logger.remove()                    # keep the app's stdout handler out of the measurement
+    with tempfile.TemporaryDirectory() as tmp:
+        def sink():
+            return SlowFile(os.path.join(tmp, "bench.log"), latency)
+
+        rows = []
+        s = sink()
+        rows.append(("print (sync)", bench_print(args.messages, s), None))
+        s.close()
+        for label, enqueue, serialize in [("loguru sync", False, False),
+                                          ("loguru enqueue", True, False),
+                                          ("loguru enqueue json", True, True)]:
+            s = sink()
+            caller, total = bench_loguru(args.messages, s, enqueue, serialize)
+            s.close()
+            rows.append((label, caller, total))
+
+    print(f"{args.messages} messages, sink latency {args.sink_latency_us:.0f}us")
+    print(f"{'mode':<22}{'caller s':>10}{'msg/s (caller)':>16}{'drained s':>11}")
+    for label, caller, total in rows:
+        drained = f"{total:>11.3f}" if total is not None else f"{caller:>11.3f}"
+        print(f"{label:<22}{caller:>10.3f}{args.messages / caller:>16.0f}{drained}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
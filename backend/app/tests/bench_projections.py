@@ -0,0 +1,132 @@
+"""Full entities vs. column projections (``services.projections``) for the list getters.
+
+    DATABASE_URL=sqlite:///bench.db python -m app.tests.bench_projections --seed-scale small
+    DATABASE_URL=sqlite:///bench.db python -m app.tests.bench_projections --iterations 500 --save projections.json
+
+Each case calls one getter twice: with the default ``view=FULL`` and with the
+view its route now passes. Timings run without tracing. A second, shorter pass
+runs under ``tracemalloc`` and records the peak allocated while building one
+result. The notes give rows per second and peak KiB per call, which are the
+numbers to compare across runs.
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from ..models import engine, mudemy_session
+from ..services import (
+    AssignmentService, AssignSubmissionService, CourseService, QuestionService, QuizService,
+    QuizSubmissionService, UserService,
+)
+from ..services.projections import FULL, SUMMARY, View
+from .bench_data import SCALES, Dataset, create_schema, load_dataset, seed
+from .benchmark import add_report_arguments, finish, require_standin, summarize
+
+Case = Tuple[str, View, Callable[[random.Random, View], list]]
+
+
+def build_cases(data: Dataset) -> List[Case]:
+    s = mudemy_session
+    users, courses = UserService(s), CourseService(s)
+    assignments, quizzes, questions = AssignmentService(s), QuizService(s), QuestionService(s)
+    assign_subs, quiz_subs = AssignSubmissionService(s), QuizSubmissionService(s)
+
+    all_modules, all_quizzes = data.all_modules(), data.all_quizzes()
+    all_assignments = [a for As in data.assignments.values() for a in As]
+    module = lambda r: r.choice(all_modules)
+
+    return [
+        ("CourseService.get_all_courses", SUMMARY, lambda r, v: courses.get_all_courses(100, view=v)),
+        ("UserService.get_all_users", "profile", lambda r, v: users.get_all_users(1000, view=v)),
+        ("UserService.get_instructors", "instructor", lambda r, v: users.get_instructors(view=v)),
+        ("UserService.get_students", "student", lambda r, v: users.get_students(view=v)),
+        ("AssignmentService.get_assignments_by_module", SUMMARY,
+         lambda r, v: assignments.get_assignments_by_module(module(r), view=v)),
+        ("QuizService.get_quizzes_by_module", SUMMARY, lambda r, v: quizzes.get_quizzes_by_module(module(r), view=v)),
+        ("QuestionService.get_questions_by_quiz", SUMMARY,
+         lambda r, v: questions.get_questions_by_quiz(r.choice(all_quizzes), view=v)),
+        ("AssignSubmissionService.get_submissions_by_assignment", SUMMARY,
+         lambda r, v: assign_subs.get_submissions_by_assignment(r.choice(all_assignments), view=v)),
+        ("QuizSubmissionService.get_submissions_by_quiz", SUMMARY,
+         lambda r, v: quiz_subs.get_submissions_by_quiz(r.choice(all_quizzes), view=v)),
+    ]
+
+
+def run_timed(fn: Callable, view: View, iterations: int, warmup: int, seed_: int) -> Dict[str, float]:
+    rng = random.Random(seed_)
+    for _ in range(warmup):
+        fn(rng, view)
+    rng = random.Random(seed_)
+    samples, rows = [], 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        rows += len(fn(rng, view))
+        samples.append((time.perf_counter() - t0) * 1000)
+    wall = time.perf_counter() - start
+    timing = summarize(samples, wall)
+    timing["rows_per_s"] = round(rows / wall, 1)
+    return timing
+
+
+def run_traced(fn: Callable, view: View, iterations: int, seed_: int) -> float:
+    """Mean peak KiB allocated while one call builds its result."""
+    rng = random.Random(seed_)
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(iterations):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            result = fn(rng, view)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+            del result
+    finally:
+        tracemalloc.stop()
+    return sum(peaks) / len(peaks) / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full ORM entities vs. narrow projections in the service getters.")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--traced", type=int, default=20, help="calls per case measured under tracemalloc")
+    parser.add_argument("--only", help="run cases whose name contains this text")
+    parser.add_argument("--seed-scale", choices=sorted(SCALES), help="reset and seed the database first")
+    parser.add_argument("--seed", type=int, default=42)
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+
+    require_standin(engine, args.force)
+    if args.seed_scale:
+        create_schema(engine, reset=True)
+        data = seed(engine, SCALES[args.seed_scale], seed=args.seed)
+    else:
+        data = load_dataset(engine)
+    if not data.students or not data.courses:
+        sys.exit("No benchmark data found; run app.tests.bench_data first or pass --seed-scale.")
+
+    results: Dict[str, Dict[str, float]] = {}
+    notes = []
+    for name, view, fn in build_cases(data):
+        if args.only and args.only not in name:
+            continue
+        for v in (FULL, view):
+            timing = run_timed(fn, v, args.iterations, args.warmup, args.seed)
+            timing["peak_kib"] = round(run_traced(fn, v, args.traced, args.seed), 1)
+            label = f"{name} [{v}]"
+            results[label] = timing
+            notes.append(f"{label:<66} {timing['rows_per_s']:>10.0f} rows/s {timing['peak_kib']:>8.1f} KiB peak")
+
+    code = finish(args, f"Projections ({args.iterations} iterations, {engine.dialect.name})", results)
+    print()
+    for line in notes:
+        print(line)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Cost of the rate limiter: bucket stores on their own and the middleware around a trivial ASGI app.
+
+    python -m app.tests.bench_ratelimit --calls 20000 --threads 8
+    python -m app.tests.bench_ratelimit --save limits.json --baseline before.json
+
+No database is needed. Every sample times a batch of 1000 calls, so the
+millisecond columns read as microseconds per call. Middleware cases compare a
+bare app with the same app behind ``RateLimitMiddleware`` for anonymous
+requests (keyed by IP), bearer requests whose token is cached, and bearer
+requests that pay for JWT verification every time. The shared store runs on
+the SQLite stand-in in a temporary directory.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from ..api.auth import create_access_token
+from ..core import ratelimit
+from ..core.ratelimit import (Limit, MemoryBucketStore, Policy, RateLimiter, RateLimitMiddleware, SharedBucketStore,
+                              SQLiteBackend)
+from .benchmark import add_report_arguments, finish, summarize
+
+BATCH = 1000
+# Large enough that nothing is rejected: the cases measure bookkeeping, not refusals
+OPEN = Limit(rate=1e9, burst=10 ** 9)
+
+
+def timed_batches(call: Callable[[int], object], calls: int) -> List[float]:
+    samples = []
+    for start in range(0, calls, BATCH):
+        t0 = time.perf_counter()
+        for i in range(start, start + BATCH):
+            call(i)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def store_case(store, calls: int, threads: int, keys: int) -> Dict[str, float]:
+    per_thread = max(BATCH, calls // threads // BATCH * BATCH)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        runs = list(pool.map(lambda t: timed_batches(lambda i: store.take(f"user:{(i + t) % keys}", OPEN),
+                                                     per_thread), range(threads)))
+    return summarize([ms for run in runs for ms in run], time.perf_counter() - start)
+
+
+async def _ok(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def asgi_case(app, headers_for: Callable[[int], list], calls: int) -> Dict[str, float]:
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    async def run():
+        samples = []
+        for start in range(0, calls, BATCH):
+            t0 = time.perf_counter()
+            for i in range(start, start + BATCH):
+                await app({"type": "http", "method": "GET", "path": "/api/courses", "headers": headers_for(i),
+                           "client": (f"10.0.{i % 250}.1", 5000)}, receive, send)
+            samples.append((time.perf_counter() - t0) * 1000)
+        return samples
+
+    start = time.perf_counter()
+    samples = asyncio.run(run())
+    return summarize(samples, time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rate limiter overhead (per 1000 calls).")
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8, help="threads for the contended store cases")
+    parser.add_argument("--keys", type=int, default=1000, help="distinct buckets touched")
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+    calls = max(BATCH, args.calls // BATCH * BATCH)
+
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = MemoryBucketStore()
+        shared = SharedBucketStore(SQLiteBackend(os.path.join(tmp, "buckets.db")))
+        results["store: memory, 1 thread"] = store_case(memory, calls, 1, args.keys)
+        results[f"store: memory, {args.threads} threads"] = store_case(memory, calls, args.threads, args.keys)
+        results["store: shared sqlite, 1 thread"] = store_case(shared, calls // 4, 1, args.keys)
+        results[f"store: shared sqlite, {args.threads} threads"] = store_case(shared, calls // 4, args.threads, args.keys)
+        conflicts = shared.stats()["cas_conflicts"]
+
+    identify = ratelimit.limiter.identify
+    limiter = RateLimiter(MemoryBucketStore(), [], default=Policy("default", OPEN), identify=identify)
+    limited = RateLimitMiddleware(_ok, limiter)
+    tokens = [f"Bearer {create_access_token({'sub': f'USR{n:05d}', 'role': 'tutee'})}".encode()
+              for n in range(args.keys)]
+    anonymous = lambda i: []
+    bearer = lambda i: [(b"authorization", tokens[i % len(tokens)])]
+
+    def uncached(i):
+        limiter._users.clear()
+        return bearer(i)
+
+    results["asgi: bare app"] = asgi_case(_ok, anonymous, calls)
+    results["asgi: limited, anonymous (IP)"] = asgi_case(limited, anonymous, calls)
+    results["asgi: limited, bearer (cached)"] = asgi_case(limited, bearer, calls)
+    results["asgi: limited, bearer (verify)"] = asgi_case(limited, uncached, calls // 4)
+
+    code = finish(args, f"Rate limiter, ms per {BATCH} calls (= us per call)", results)
+    print(f"\nshared store compare-and-set conflicts: {conflicts}")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Read-replica routing on the local stand-in: two SQLite files, one primary and one replica.
+
+    DATABASE_URL=sqlite:///bench.db DATABASE_REPLICA_URLS=sqlite:///bench_replica.db \
+        python -m app.tests.bench_replicas --seed-scale small --iterations 200
+
+The replica is refreshed from the primary with SQLite's backup API, so it lags
+for real between syncs. The run reports where statements went for a read-heavy
+mix, checks read-your-writes inside a request scope, and checks that a replica
+whose heartbeat falls behind REPLICA_MAX_LAG_SECONDS drops out of rotation.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import event
+
+from ..core import config
+from ..models import get_engine, replicas, request_scope, use_primary
+from ..services import CourseService, EnrollmentService, ModuleService, PaymentService, container
+from .bench_data import SCALES, create_schema, load_dataset, seed
+from .benchmark import add_report_arguments, finish, require_standin, summarize
+
+
+def sync_replicas() -> None:
+    """Copy the primary SQLite file onto every replica file."""
+    source = get_engine().raw_connection()
+    try:
+        for engine in replicas.engines():
+            target = engine.raw_connection()
+            try:
+                source.driver_connection.backup(target.driver_connection)
+            finally:
+                target.close()
+    finally:
+        source.close()
+
+
+def measure_in_background(stop: threading.Event) -> threading.Thread:
+    """Stand in for the replica_heartbeat/replica_lag jobs, which need the scheduler."""
+    def loop():
+        while not stop.is_set():
+            replicas.refresh()
+            stop.wait(config.REPLICA_CHECK_INTERVAL)
+    thread = threading.Thread(target=loop, name="replica-lag", daemon=True)
+    thread.start()
+    return thread
+
+
+def count_statements(counts: Counter) -> None:
+    for name, engine in [("primary", get_engine())] + [(f"replica{i}", e) for i, e in enumerate(replicas.engines())]:
+        event.listen(engine, "before_cursor_execute",
+                     lambda *args, _name=name: counts.update([_name]))
+
+
+def read_mix(data, rng: random.Random, iterations: int):
+    courses, modules = container.get(CourseService), container.get(ModuleService)
+    enrollments = container.get(EnrollmentService)
+    samples = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        courses.get_all_courses(50)
+        modules.get_modules_by_course(rng.choice(data.courses))
+        enrollments.get_student_enrollments_with_details(rng.choice(data.students))
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples, time.perf_counter() - start
+
+
+def read_your_writes(student: str) -> dict:
+    payments = container.get(PaymentService)
+    outcome = {}
+    for label, scoped in (("without request scope", False), ("inside request scope", True)):
+        if scoped:
+            with request_scope():
+                created = payments.create_payment({"Amount": 1000, "Payment_method": "Credit Card", "UserID": student})
+                outcome[label] = payments.get_payment_by_id(created.PaymentID) is not None
+        else:
+            created = payments.create_payment({"Amount": 1000, "Payment_method": "Credit Card", "UserID": student})
+            outcome[label] = payments.get_payment_by_id(created.PaymentID) is not None
+    return outcome
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read-replica routing benchmark on two SQLite files.")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--max-lag", type=float, default=1.0, help="REPLICA_MAX_LAG_SECONDS for the lag check")
+    parser.add_argument("--seed-scale", choices=sorted(SCALES), help="reset and seed the primary first")
+    parser.add_argument("--seed", type=int, default=42)
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    require_standin(engine, args.force)
+    if not replicas.configured:
+        sys.exit("Set DATABASE_REPLICA_URLS (e.g. sqlite:///bench_replica.db) to run this benchmark.")
+    if args.seed_scale:
+        create_schema(engine, reset=True)
+        data = seed(engine, SCALES[args.seed_scale], seed=args.seed)
+    else:
+        create_schema(engine)
+        data = load_dataset(engine)
+    if not data.students or not data.courses:
+        sys.exit("No benchmark data found; run app.tests.bench_data first or pass --seed-scale.")
+
+    config.REPLICA_MAX_LAG_SECONDS = args.max_lag
+    config.REPLICA_CHECK_INTERVAL = min(config.REPLICA_CHECK_INTERVAL, args.max_lag / 4)
+    replicas.beat()
+    sync_replicas()
+    stop = threading.Event()
+    measure_in_background(stop)
+    time.sleep(config.REPLICA_CHECK_INTERVAL * 2)
+
+    counts = Counter()
+    count_statements(counts)
+    results, notes = {}, []
+
+    with use_primary():
+        samples, wall = read_mix(data, random.Random(args.seed), args.iterations)
+    results["read mix: primary only"] = summarize(samples, wall)
+    notes.append(f"primary only      statements {dict(counts)}")
+
+    counts.clear()
+    samples, wall = read_mix(data, random.Random(args.seed), args.iterations)
+    results["read mix: routed"] = summarize(samples, wall)
+    notes.append(f"routed            statements {dict(counts)}")
+
+    for label, seen in read_your_writes(data.students[0]).items():
+        notes.append(f"read-your-writes  {label}: {'sees the write' if seen else 'stale read'}")
+
+    time.sleep(args.max_lag + config.REPLICA_CHECK_INTERVAL * 2)
+    counts.clear()
+    read_mix(data, random.Random(args.seed), 5)
+    notes.append(f"replica lagging   statements {dict(counts)} status {replicas.status()}")
+
+    sync_replicas()
+    time.sleep(config.REPLICA_CHECK_INTERVAL * 2)
+    counts.clear()
+    read_mix(data, random.Random(args.seed), 5)
+    notes.append(f"replica caught up statements {dict(counts)} status {replicas.status()}")
+
+    stop.set()
+    code = finish(args, f"Read mix x {args.iterations} (3 service reads per iteration)", results)
+    print()
+    for line in notes:
+        print(line)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
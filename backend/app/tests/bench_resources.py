@@ -0,0 +1,121 @@
+"""Resource downloads through the full middleware stack: whole files, resumed ranges and revalidation.
+
+    DATABASE_URL=sqlite:///bench.db RESOURCE_DIR=/tmp/bench-res python -m app.tests.bench_resources --seed-scale small --requests 200
+
+Two files are uploaded with ``PUT /api/resources/{id}/file``: a small JSON file,
+which CompressionMiddleware would otherwise gzip, and a larger binary one. Each
+is then fetched three ways per request:
+
+* full: a plain GET with ``Accept-Encoding: gzip, br``;
+* resume: ``Range`` for the second half with ``If-Range`` set to the ETag of the
+  full response, as a download manager resuming would send;
+* revalidate: ``If-None-Match`` with that ETag.
+
+The notes report the status codes seen. A resume must be a 206 and the ETag must
+stay strong; a 200 there means the whole file was sent again. The exit code is 1
+when that happens.
+"""
+import argparse
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from .. import create_app
+from ..api.auth import create_access_token
+from ..core import config
+from ..models import engine, mudemy_session
+from ..models.models import Resource
+from .bench_data import SCALES, create_schema, load_dataset, seed
+from .benchmark import add_report_arguments, finish, require_standin, summarize
+
+
+def sample_files(small_size: int, large_size: int):
+    """(name, body) of a compressible JSON file and an incompressible binary one."""
+    rows = [{"lesson": i, "title": f"Lesson {i}", "notes": "Read the chapter before the quiz."}
+            for i in range(small_size // 40 + 1)]
+    small = json.dumps(rows).encode()[:small_size]
+    large = bytes((i * 7919 + (i >> 8)) & 0xFF for i in range(large_size))
+    return [("notes.json", small), ("lecture.bin", large)]
+
+
+def run(client, uploads, requests: int, headers):
+    samples = defaultdict(list)
+    statuses = defaultdict(Counter)
+    broken = 0
+    for _ in range(requests):
+        for resource_id, name, body in uploads:
+            url = f"/api/resources/{resource_id}/download"
+            t0 = time.perf_counter()
+            full = client.get(url, headers={**headers, "Accept-Encoding": "gzip, br"})
+            samples[f"full: {name}"].append((time.perf_counter() - t0) * 1000)
+            statuses[f"full: {name}"][full.status_code] += 1
+            etag = full.headers.get("etag", "")
+
+            half = len(body) // 2
+            t0 = time.perf_counter()
+            resume = client.get(url, headers={**headers, "Accept-Encoding": "gzip, br",
+                                              "Range": f"bytes={half}-", "If-Range": etag})
+            samples[f"resume: {name}"].append((time.perf_counter() - t0) * 1000)
+            statuses[f"resume: {name}"][resume.status_code] += 1
+            if etag.startswith("W/") or resume.status_code != 206 or resume.content != body[half:]:
+                broken += 1
+
+            t0 = time.perf_counter()
+            again = client.get(url, headers={**headers, "Accept-Encoding": "gzip, br", "If-None-Match": etag})
+            samples[f"revalidate: {name}"].append((time.perf_counter() - t0) * 1000)
+            statuses[f"revalidate: {name}"][again.status_code] += 1
+    return samples, statuses, broken
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resource download benchmark: full, resumed and revalidated.")
+    parser.add_argument("--requests", type=int, default=200, help="rounds per file")
+    parser.add_argument("--small-size", type=int, default=8 * 1024, help="bytes of the JSON file")
+    parser.add_argument("--large-size", type=int, default=1024 * 1024, help="bytes of the binary file")
+    parser.add_argument("--seed-scale", choices=sorted(SCALES), help="reset and seed the database first")
+    parser.add_argument("--seed", type=int, default=42)
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+
+    require_standin(engine, args.force)
+    if args.seed_scale:
+        create_schema(engine, reset=True)
+        data = seed(engine, SCALES[args.seed_scale], seed=args.seed)
+    else:
+        data = load_dataset(engine)
+    with mudemy_session() as session:
+        resource_ids = session.execute(select(Resource.ResourceID).order_by(Resource.ResourceID).limit(2)).scalars().all()
+    if not data.instructors or len(resource_ids) < 2:
+        sys.exit("No benchmark data found; run app.tests.bench_data first or pass --seed-scale.")
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': data.instructors[0], 'role': 'tutor'})}"}
+    config.RATE_LIMIT_ENABLED = False   # one simulated client would drain its bucket
+    with TestClient(create_app()) as client:
+        uploads = []
+        for resource_id, (name, body) in zip(resource_ids, sample_files(args.small_size, args.large_size)):
+            response = client.put(f"/api/resources/{resource_id}/file", params={"filename": name},
+                                  content=body, headers=headers)
+            if response.status_code >= 300:
+                sys.exit(f"Upload of {name} failed: {response.status_code} {response.text}")
+            uploads.append((resource_id, name, body))
+        start = time.perf_counter()
+        samples, statuses, broken = run(client, uploads, args.requests, headers)
+        wall = time.perf_counter() - start
+
+    results = {step: summarize(values, wall) for step, values in samples.items()}
+    code = finish(args, f"Resource downloads: {args.requests} rounds x {len(uploads)} files", results)
+    print()
+    for step, counts in statuses.items():
+        print(f"{step:<26} " + " ".join(f"{status}={count}" for status, count in sorted(counts.items())))
+    if broken:
+        print(f"\n{broken} resumed downloads did not get a 206 of the requested bytes under a strong ETag")
+        return 1
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Serialization cost of large list responses: hand-built dicts vs typed response models.
+
+    python -m app.tests.bench_serialization --rows 10000 --repeat 20
+
+Rows are transient ORM objects shaped like ``/users``, ``/payments`` and
+``/courses/{id}/enrollments`` results; no database is touched.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from ..api.schemas import CourseEnrollmentListResponse, PaymentListResponse, UserListResponse
+from ..core.responses import FastJSONResponse, orjson
+from ..models import Enrollment, Payment, User
+from .benchmark import add_report_arguments, finish, summarize
+
+
+def make_rows(n: int, rng: random.Random):
+    now = datetime(2025, 11, 1, 9, 0, 0)
+    users = [User(UserID=f"USR{i:05d}", User_name=f"user{i}", Email=f"user{i}@bench.local", Full_name=f"User {i}",
+                  City="Ho Chi Minh City", Country="Vietnam", Phone="0903123456", Date_of_birth=date(1990, 1, 1),
+                  Last_login=now - timedelta(minutes=i), IFlag=i % 10 == 0, SFlag=i % 10 != 0,
+                  Bio_text="Lorem ipsum dolor sit amet", Year_of_experience=rng.randint(0, 20),
+                  Average_rating=Decimal(f"{rng.uniform(0, 5):.1f}"), Total_enrollments=rng.randint(0, 9))
+             for i in range(n)]
+    payments = [Payment(PaymentID=f"PAY{i:05d}", Amount=499000, Payment_date=now - timedelta(hours=i),
+                        Payment_method="Credit Card", UserID=f"USR{i:05d}") for i in range(n)]
+    enrollments = [Enrollment(EnrollmentID=f"ENR{i:05d}", CourseID="CRS00001", PaymentID=f"PAY{i:05d}",
+                              StudentID=f"USR{i:05d}", Status="Active", Enroll_date=now - timedelta(hours=i))
+                   for i in range(n)]
+    return users, payments, enrollments
+
+
+USER_FIELDS = ["UserID", "User_name", "Email", "Full_name", "City", "Country", "Phone", "Date_of_birth",
+               "Last_login", "IFlag", "Bio_text", "Year_of_experience", "Average_rating", "SFlag", "Total_enrollments"]
+PAYMENT_FIELDS = ["PaymentID", "Amount", "Payment_date", "Payment_method", "UserID"]
+ENROLLMENT_FIELDS = ["EnrollmentID", "CourseID", "PaymentID", "StudentID", "Status", "Enroll_date"]
+
+
+def hand_built(rows, key, fields):
+    """What the routes did before: nested dicts built per row."""
+    return {"status": "success", "count": len(rows), key: [{f: getattr(r, f) for f in fields} for r in rows]}
+
+
+def time_it(fn, repeat: int):
+    samples = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return summarize(samples, time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Large response serialization benchmark.")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+
+    users, payments, enrollments = make_rows(args.rows, random.Random(42))
+    cases = [
+        ("users", users, "users", USER_FIELDS, UserListResponse),
+        ("payments", payments, "payments", PAYMENT_FIELDS, PaymentListResponse),
+        ("enrollments", enrollments, "enrollments", ENROLLMENT_FIELDS, CourseEnrollmentListResponse),
+    ]
+    results = {}
+    for name, rows, key, fields, model in cases:
+        adapter = TypeAdapter(model)
+        payload = {"status": "success", "count": len(rows), key: rows}
+        results[f"{name}: dicts + jsonable_encoder + json"] = time_it(
+            lambda: JSONResponse(jsonable_encoder(hand_built(rows, key, fields))).body, args.repeat)
+        results[f"{name}: dicts + jsonable_encoder + fast"] = time_it(
+            lambda: FastJSONResponse(jsonable_encoder(hand_built(rows, key, fields))).body, args.repeat)
+        results[f"{name}: response_model + fast"] = time_it(
+            lambda: FastJSONResponse(adapter.dump_python(adapter.validate_python(payload), mode="json")).body,
+            args.repeat)
+        results[f"{name}: response_model dump_json"] = time_it(
+            lambda: adapter.dump_json(adapter.validate_python(payload)), args.repeat)
+
+    encoder = "orjson" if orjson is not None else "stdlib json"
+    return finish(args, f"Serializing {args.rows} rows x {args.repeat} (fast = FastJSONResponse on {encoder})", results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
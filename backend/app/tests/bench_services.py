@@ -0,0 +1,163 @@
+"""Micro-benchmarks of the service layer against the DATABASE_URL stand-in.
+
+    DATABASE_URL=sqlite:///bench.db python -m app.tests.bench_services --seed-scale small --iterations 200
+    DATABASE_URL=sqlite:///bench.db python -m app.tests.bench_services --only Enrollment --baseline base.json
+
+Each case calls one service method with arguments drawn from the seeded data.
+"""
+import argparse
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from ..models import engine, mudemy_session
+from ..services import (
+    UserService, TakeService, InterestsService, InstructService, QualificationService,
+    CourseService, ModuleService, RequiresService, ContentService, TextService, CategoryService,
+    EnrollmentService, PaymentService, CertificateService,
+    AssignmentService, QuizService, QuestionService, AssignSubmissionService, QuizSubmissionService,
+    ResourceService, ProvideResourceService, DashboardService,
+)
+from .bench_data import SCALES, Dataset, create_schema, load_dataset, seed
+from .benchmark import add_report_arguments, finish, require_standin, summarize
+
+Case = Tuple[str, Callable[[random.Random], object]]
+
+
+def build_cases(data: Dataset) -> List[Case]:
+    s = mudemy_session
+    users, takes, interests = UserService(s), TakeService(s), InterestsService(s)
+    instruct, qualifications = InstructService(s), QualificationService(s)
+    courses, modules, requires = CourseService(s), ModuleService(s), RequiresService(s)
+    contents, texts, categories = ContentService(s), TextService(s), CategoryService(s)
+    enrollments, payments, certificates = EnrollmentService(s), PaymentService(s), CertificateService(s)
+    assignments, quizzes, questions = AssignmentService(s), QuizService(s), QuestionService(s)
+    assign_subs, quiz_subs = AssignSubmissionService(s), QuizSubmissionService(s)
+    resources, provides = ResourceService(s), ProvideResourceService(s)
+    dashboards = DashboardService(s)
+
+    all_modules, all_quizzes = data.all_modules(), data.all_quizzes()
+    all_contents = [c for cs in data.contents.values() for c in cs]
+    all_assignments = [a for As in data.assignments.values() for a in As]
+    student = lambda r: r.choice(data.students)
+    instructor = lambda r: r.choice(data.instructors)
+    course = lambda r: r.choice(data.courses)
+    module = lambda r: r.choice(all_modules)
+
+    return [
+        # User services
+        ("UserService.get_user_by_id", lambda r: users.get_user_by_id(student(r))),
+        ("UserService.get_user_by_username", lambda r: users.get_user_by_username(data.usernames[student(r)])),
+        ("UserService.get_all_users", lambda r: users.get_all_users(100)),
+        ("UserService.get_instructors", lambda r: users.get_instructors()),
+        ("UserService.search_users_by_name", lambda r: users.search_users_by_name("student0001")),
+        ("UserService.update_last_login", lambda r: users.update_last_login(student(r))),
+        ("TakeService.get_user_lessons", lambda r: takes.get_user_lessons(student(r))),
+        ("TakeService.get_lesson_progress", lambda r: takes.get_lesson_progress(student(r))),
+        ("TakeService.mark_lesson_finished", lambda r: takes.mark_lesson_finished(student(r), r.choice(all_contents))),
+        ("InterestsService.get_user_interests", lambda r: interests.get_user_interests(student(r))),
+        ("InstructService.get_instructor_courses", lambda r: instruct.get_instructor_courses(instructor(r))),
+        ("InstructService.is_instructor_of_course", lambda r: instruct.is_instructor_of_course(instructor(r), course(r))),
+        ("QualificationService.get_user_qualifications", lambda r: qualifications.get_user_qualifications(instructor(r))),
+        # Course services
+        ("CourseService.get_course_by_id", lambda r: courses.get_course_by_id(course(r))),
+        ("CourseService.get_all_courses", lambda r: courses.get_all_courses(100)),
+        ("CourseService.search_courses_by_title", lambda r: courses.search_courses_by_title("data")),
+        ("CourseService.get_courses_by_difficulty", lambda r: courses.get_courses_by_difficulty("Beginner")),
+        ("ModuleService.get_modules_by_course", lambda r: modules.get_modules_by_course(course(r))),
+        ("RequiresService.get_prerequisites", lambda r: requires.get_prerequisites(course(r))),
+        ("ContentService.get_content_by_module", lambda r: contents.get_content_by_module(module(r))),
+        ("TextService.get_text_by_content_id", lambda r: texts.get_text_by_content_id(r.choice(all_contents))),
+        ("CategoryService.get_courses_by_category", lambda r: categories.get_courses_by_category("Programming")),
+        # Enrollment services
+        ("EnrollmentService.get_student_enrollments", lambda r: enrollments.get_student_enrollments(student(r))),
+        ("EnrollmentService.get_student_enrollments_with_details",
+         lambda r: enrollments.get_student_enrollments_with_details(student(r))),
+        ("EnrollmentService.get_course_enrollments", lambda r: enrollments.get_course_enrollments(course(r))),
+        ("EnrollmentService.is_student_enrolled", lambda r: enrollments.is_student_enrolled(student(r), course(r))),
+        ("EnrollmentService.get_enrollment_stats", lambda r: enrollments.get_enrollment_stats(student(r))),
+        ("EnrollmentService.get_enrollment_count_by_course", lambda r: enrollments.get_enrollment_count_by_course(course(r))),
+        ("PaymentService.get_payments_by_user", lambda r: payments.get_payments_by_user(student(r))),
+        ("PaymentService.get_payment_statistics", lambda r: payments.get_payment_statistics()),
+        ("PaymentService.create_payment",
+         lambda r: payments.create_payment({"Amount": 199000, "Payment_method": "Credit Card", "UserID": student(r)})),
+        ("CertificateService.get_student_certificates", lambda r: certificates.get_student_certificates(student(r))),
+        ("CertificateService.get_certificate_statistics", lambda r: certificates.get_certificate_statistics()),
+        # Assessment services
+        ("AssignmentService.get_assignments_by_module", lambda r: assignments.get_assignments_by_module(module(r))),
+        ("AssignmentService.get_upcoming_assignments", lambda r: assignments.get_upcoming_assignments(7)),
+        ("QuizService.get_quizzes_by_module", lambda r: quizzes.get_quizzes_by_module(module(r))),
+        ("QuestionService.get_questions_by_quiz", lambda r: questions.get_questions_by_quiz(r.choice(all_quizzes))),
+        ("AssignSubmissionService.get_ungraded_submissions",
+         lambda r: assign_subs.get_ungraded_submissions(r.choice(all_assignments))),
+        ("QuizSubmissionService.get_submissions_by_quiz", lambda r: quiz_subs.get_submissions_by_quiz(r.choice(all_quizzes))),
+        ("QuizSubmissionService.get_best_score", lambda r: quiz_subs.get_best_score(student(r), r.choice(all_quizzes))),
+        ("QuizSubmissionService.get_average_score", lambda r: quiz_subs.get_average_score(r.choice(all_quizzes))),
+        ("QuizSubmissionService.create_submission",
+         lambda r: quiz_subs.create_submission({"UserID": student(r), "QuizID": r.choice(all_quizzes), "Sub_content": "A,B,C"})),
+        # Resource services
+        ("ResourceService.get_all_resources", lambda r: resources.get_all_resources(0, 100)),
+        ("ResourceService.search_resources_by_name", lambda r: resources.search_resources_by_name("data")),
+        ("ProvideResourceService.get_resources_by_lesson", lambda r: provides.get_resources_by_lesson(r.choice(all_contents))),
+
+        # Dashboards: cold builds every time, warm hits the per-user cache after the first call
+        ("DashboardService.get_student_dashboard (cold)",
+         lambda r: dashboards.students.clear() or dashboards.get_student_dashboard(student(r))),
+        ("DashboardService.get_student_dashboard (warm)", lambda r: dashboards.get_student_dashboard(data.students[0])),
+        ("DashboardService.get_instructor_dashboard (cold)",
+         lambda r: dashboards.instructors.clear() or dashboards.get_instructor_dashboard(instructor(r))),
+        ("DashboardService.get_instructor_dashboard (warm)",
+         lambda r: dashboards.get_instructor_dashboard(data.instructors[0])),
+    ]
+
+
+def run_case(fn: Callable, iterations: int, warmup: int, rng: random.Random) -> Dict[str, float]:
+    errors = 0
+    for _ in range(warmup):
+        try:
+            fn(rng)
+        except Exception:
+            pass
+    samples = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        try:
+            fn(rng)
+        except Exception:
+            errors += 1
+        samples.append((time.perf_counter() - t0) * 1000)
+    return summarize(samples, time.perf_counter() - start, errors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service-layer micro-benchmarks.")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--only", help="run cases whose name contains this text")
+    parser.add_argument("--seed-scale", choices=sorted(SCALES), help="reset and seed the database first")
+    parser.add_argument("--seed", type=int, default=42)
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+
+    require_standin(engine, args.force)
+    if args.seed_scale:
+        create_schema(engine, reset=True)
+        data = seed(engine, SCALES[args.seed_scale], seed=args.seed)
+    else:
+        data = load_dataset(engine)
+    if not data.students or not data.courses:
+        sys.exit("No benchmark data found; run app.tests.bench_data first or pass --seed-scale.")
+
+    rng = random.Random(args.seed)
+    results = {}
+    for name, fn in build_cases(data):
+        if args.only and args.only not in name:
+            continue
+        results[name] = run_case(fn, args.iterations, args.warmup, rng)
+    return finish(args, f"Service micro-benchmarks ({args.iterations} iterations, {engine.dialect.name})", results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
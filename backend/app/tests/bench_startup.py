@@ -0,0 +1,92 @@
+"""Cold-start cost of a worker: imports, app construction and the first requests.
+
+    DATABASE_URL=sqlite:///bench.db python -m app.tests.bench_startup --runs 10 --importtime 15
+
+Every run is a fresh interpreter, like a recycled or newly scaled worker.
+``--importtime`` additionally runs once under ``python -X importtime`` and lists
+the slowest top-level packages.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from .benchmark import add_report_arguments, finish, summarize
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROBE = """
+import json, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+application = app.create_app()
+t2 = time.perf_counter()
+from fastapi.testclient import TestClient
+t3 = time.perf_counter()
+with TestClient(application) as client:   # runs the lifespan, like a worker booting
+    t4 = time.perf_counter()
+    live = client.get("/health/live").status_code
+    t5 = time.perf_counter()
+    ready = client.get("/health/ready").status_code
+    t6 = time.perf_counter()
+print(json.dumps({"import app": t1 - t0, "create_app()": t2 - t1, "lifespan startup": t4 - t3,
+                  "first request": t5 - t4, "first database request": t6 - t5,
+                  "ready to serve": (t2 - t0) + (t6 - t3), "errors": int(live != 200) + int(ready != 200)}))
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    env.setdefault("LOG_LEVEL", "WARNING")
+    return env
+
+
+def probe_once() -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=_env(),
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def import_profile(top: int):
+    """Import self-time per third-party package (and per app module) for ``import app.main``."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"], cwd=BACKEND_DIR,
+                         env=_env(), capture_output=True, text=True, check=True)
+    totals = defaultdict(int)
+    for line in out.stderr.splitlines():
+        parts = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        totals[name if name.startswith("app.") else name.split(".")[0]] += int(parts[0])
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Worker cold-start benchmark.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="show the N slowest imported packages")
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+
+    samples, errors = defaultdict(list), 0
+    for _ in range(args.runs):
+        timings = probe_once()
+        errors += timings.pop("errors")
+        for phase, seconds in timings.items():
+            samples[phase].append(seconds * 1000)
+    results = {phase: summarize(values, errors=errors if phase == "first database request" else 0)
+               for phase, values in samples.items()}
+
+    code = finish(args, f"Cold start over {args.runs} fresh interpreters", results)
+    if args.importtime:
+        print("\nSlowest imports (self time summed per package):")
+        for name, micros in import_profile(args.importtime):
+            print(f"  {name:<32}{micros / 1000:>9.1f} ms")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
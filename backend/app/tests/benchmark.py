@@ -0,0 +1,86 @@
+"""Shared helpers for the ``bench_*`` modules: latency stats, reports and baselines.
+
+Modules are named ``bench_*`` so pytest does not collect them; run them with
+``python -m app.tests.bench_<name>`` from ``backend/``.
+"""
+import json
+import math
+import sys
+from typing import Dict, List, Optional
+
+
+def require_standin(engine, force: bool = False) -> None:
+    """Refuse to seed or hammer a real database unless explicitly forced."""
+    if engine.dialect.name != "sqlite" and not force:
+        sys.exit(f"Refusing to benchmark against {engine.dialect.name}; "
+                 "set DATABASE_URL=sqlite:///bench.db or pass --force.")
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    pos = (len(ordered) - 1) * q / 100.0
+    lo, hi = math.floor(pos), math.ceil(pos)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def summarize(samples_ms: List[float], wall_seconds: Optional[float] = None, errors: int = 0) -> Dict[str, float]:
+    """p50/p95/p99 in milliseconds plus throughput (ops per second of wall time)."""
+    ordered = sorted(samples_ms)
+    wall = wall_seconds if wall_seconds is not None else sum(ordered) / 1000.0
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "mean_ms": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+        "throughput": round(len(ordered) / wall, 1) if wall else 0.0,
+    }
+
+
+def print_report(title: str, results: Dict[str, Dict[str, float]]) -> None:
+    width = max([len(name) for name in results] + [10]) + 2
+    print(f"\n{title}")
+    print(f"{'name':<{width}}{'count':>7}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'ops/s':>10}")
+    for name, r in results.items():
+        print(f"{name:<{width}}{r['count']:>7}{r['errors']:>5}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+              f"{r['p99_ms']:>10.2f}{r['max_ms']:>10.2f}{r['throughput']:>10.1f}")
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float, metric: str = "p95_ms") -> List[str]:
+    """Names whose ``metric`` grew by more than ``tolerance`` (0.2 = 20%) over the baseline."""
+    regressions = []
+    for name, r in results.items():
+        before = baseline.get(name, {}).get(metric)
+        if before and r[metric] > before * (1 + tolerance):
+            regressions.append(f"{name}: {metric} {before:.2f} -> {r[metric]:.2f} (+{(r[metric] / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def add_report_arguments(parser) -> None:
+    parser.add_argument("--save", metavar="PATH", help="write results as JSON (e.g. to use as a baseline)")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved JSON run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 growth vs baseline (default 0.2)")
+    parser.add_argument("--force", action="store_true", help="allow a non-SQLite target")
+
+
+def finish(args, title: str, results: Dict[str, Dict[str, float]]) -> int:
+    """Print, optionally save and compare; the exit code is 1 on regression."""
+    print_report(title, results)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            regressions = compare(results, json.load(fh), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo p95 regression beyond {args.tolerance:.0%} of {args.baseline}")
+    return 0
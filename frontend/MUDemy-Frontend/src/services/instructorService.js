@@ -11,25 +11,15 @@ export const instructorService = {
     return response.user;
   },
 
+  getDashboard: async () => {
+    return await axiosClient.get('/api/instructors/me/dashboard');
+  },
+
+  // Courses of the signed-in instructor with details, from the dashboard (one request)
   getCourses: async (user_id) => {
     try {
-      const response = await axiosClient.get(`/api/instructors/${user_id}/courses`);
-      const courses = response.courses || [];
-      
-      // Hydrate with details (Difficulty, Language)
-      const detailedCourses = await Promise.all(
-        courses.map(async (course) => {
-          try {
-            const courseId = course.CourseID || course.id || course.courseId;
-            if (!courseId) return course;
-            const detailResponse = await axiosClient.get(`/api/courses/id/${courseId}`);
-            return detailResponse.course || detailResponse;
-          } catch (err) {
-            return course; 
-          }
-        })
-      );
-      return detailedCourses;
+      const dashboard = await instructorService.getDashboard();
+      return dashboard.courses || [];
     } catch (error) {
       console.error("Failed to fetch instructor courses:", error);
       return [];
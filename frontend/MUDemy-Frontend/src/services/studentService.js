@@ -1,5 +1,4 @@
 import axiosClient from '../api/axiosClient';
-import { courseService } from './courseService';
 
 /**
  * Maps backend enrollment data to the frontend Dashboard structure.
@@ -15,7 +14,7 @@ const mapEnrollmentToFrontend = (enrollment, courseDetails, progressValue) => {
     
     // Hydrate Missing Data from Course Details
     title: courseDetails?.title || "Unknown Course",
-    instructor: "MUDemy Instructor", 
+    instructor: enrollment.instructor || "MUDemy Instructor", 
     image: courseDetails?.image || "https://lh3.googleusercontent.com/aida-public/AB6AXuCJvR2L-V_bsDptQ-El7f4IB80ZyZ-SV3qbu6Nom0Ws7UhdYu9Lna_El1veVNYZYuBt9J3loaGHH7UBMhdCeV24v7PyMrdy4vnmTV2zmdYh-93MfjFTAunJirtgwPAdtWkCH8szlG-3IuD_TYV-DExhjkKFP0Dl910ZytvCh7TzUJQL_HjnPfo0tarGFC4Ex47S1WPShmMDOOYJZSgwta3MBsPFw8xwP9rDY4fxAf_j_PucY9UX12yVfQtQaUMkhgKqKSmfYLMVZBc",
     description: courseDetails?.description || "No description available",
     
@@ -51,46 +50,23 @@ export const studentService = {
   },
 
   /**
-   * Fetch enrolled courses and hydrate with Details + Progress.
+   * Fetch the dashboard: enrollments with progress, stats and upcoming deadlines in one call.
+   */
+  getDashboard: async () => {
+    return await axiosClient.get('/api/me/dashboard');
+  },
+
+  /**
+   * Fetch enrolled courses with details + progress (one request, see getDashboard).
    */
   getEnrolledCourses: async () => {
     try {
-      // Step A: Get raw enrollments
-      const enrollmentResponse = await axiosClient.get('/api/enrollments/me');
-      const rawEnrollments = enrollmentResponse.enrollments || enrollmentResponse || [];
-      
-      console.log("Raw Enrollments from Backend:", rawEnrollments);
-
-      // Step B: Process in parallel
-      const detailedEnrollments = await Promise.all(
-        rawEnrollments.map(async (enrollment) => {
-          // Robust ID Extraction
-          const courseId = enrollment.CourseID || enrollment.course_id || enrollment.courseId || enrollment.id;
-
-          if (!courseId) {
-            console.error("Critical: Enrollment record missing CourseID", enrollment);
-            return null; 
-          }
-
-          try {
-            // Fetch Details & Progress simultaneously
-            const [courseDetails, progressValue] = await Promise.all([
-              courseService.getCourseById(courseId),
-              studentService.getCourseProgress(courseId)
-            ]);
-            
-            return mapEnrollmentToFrontend(enrollment, courseDetails, progressValue);
-          } catch (err) {
-            console.warn(`Failed to hydrate course ${courseId}`, err);
-            return mapEnrollmentToFrontend(enrollment, {}, 0); 
-          }
-        })
+      const dashboard = await studentService.getDashboard();
+      return (dashboard.enrollments || []).map((enrollment) =>
+        mapEnrollmentToFrontend(enrollment, enrollment, enrollment.progress)
       );
-
-      // Filter out any nulls
-      return detailedEnrollments.filter(item => item !== null);
     } catch (error) {
-      console.error("Failed to fetch enrollments chain:", error);
+      console.error("Failed to fetch dashboard:", error);
       return []; 
     }
   }